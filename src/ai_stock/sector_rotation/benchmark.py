@@ -0,0 +1,405 @@
+"""Offline performance benchmarks for the analysis pipeline.
+
+Each benchmark generates a deterministic board/stock universe of the
+requested size, serves it through the ``_synthetic_*`` generators with
+akshare disabled (see :func:`~.utils.akshare_helper.offline`) and times
+every stage of :func:`~.main.run_daily_analysis`, plus standalone
+``rank_boards`` / ``write_results`` over the full ranking and a batch of
+:class:`~ai_stock.portfolio.Portfolio` operations.  Timings are the best of
+``repeat`` cold runs; peak memory comes from one extra traced run.
+
+Results can be saved as a local baseline and later runs compared against
+it, flagging stages that got slower than ``threshold``::
+
+    python -m ai_stock.sector_rotation.benchmark --sizes 100 1000 --save-baseline
+    python -m ai_stock.sector_rotation.benchmark --sizes 100 1000
+
+``--universe`` instead runs the full industry + concept universe
+(:meth:`~.config.AnalysisConfig.full_universe`) with every data request
+delayed by ``--latency`` seconds, and fails when throughput falls below
+:data:`UNIVERSE_TARGET_BOARDS_PER_SECOND`::
+
+    python -m ai_stock.sector_rotation.benchmark --universe --latency 0.05
+
+The target is only checked against this synthetic offline universe; live
+akshare throughput depends on upstream rate limits and is not measured.
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import logging
+import random
+import sys
+import tempfile
+import threading
+import time as time_module
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from datetime import date
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+from ..portfolio import Portfolio
+from .config import AnalysisConfig
+from .db.database import Database
+from .db.writer import write_results
+from .factors import capital_factor, hype_factor, leader_factor, trend_factor
+from .main import load_market_data, run_daily_analysis
+from .models import strong_board
+from .utils import akshare_helper
+from .utils.profiler import StageProfiler
+
+
+DEFAULT_SIZES = (100, 1_000, 5_000)
+DEFAULT_BASELINE = Path(".benchmarks") / "sector_rotation.json"
+DEFAULT_THRESHOLD = 0.25
+# Stages faster than this are too noisy to flag.
+MIN_REGRESSION_SECONDS = 0.005
+AS_OF = date(2024, 3, 8)
+
+# Eastmoney lists ~90 industry and ~400 concept boards over ~5000 A-shares.
+UNIVERSE_INDUSTRY = 90
+UNIVERSE_CONCEPT = 400
+UNIVERSE_STOCKS = 5_000
+UNIVERSE_MEMBERS = 50
+# Full-universe runs must sustain this with 16 fetch workers against endpoints
+# answering in 50ms: ~490 boards in under a minute, far inside the 30-minute
+# scheduler window even at several times that latency.
+UNIVERSE_TARGET_BOARDS_PER_SECOND = 10.0
+DEFAULT_LATENCY = 0.05
+# Caches whose misses are one data request each when akshare is live.
+_REQUEST_CACHES = ("_board_constituents_cache", "_board_price_cache", "_board_money_cache", "_stock_history_cache")
+
+
+@dataclass
+class BenchmarkResult:
+    boards: int
+    stocks: int
+    timings: Dict[str, float] = field(default_factory=dict)
+    peak_memory: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def label(self) -> str:
+        return f"{self.boards}x{self.stocks}"
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "boards": self.boards,
+            "stocks": self.stocks,
+            "timings": dict(self.timings),
+            "peak_memory": dict(self.peak_memory),
+        }
+
+
+@dataclass(frozen=True)
+class Regression:
+    label: str
+    stage: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+
+def make_catalogue(
+    board_count: int,
+    stock_count: int,
+    members_per_board: int = 20,
+    seed: int = 0,
+    concept_count: int = 0,
+) -> Dict[str, Dict[str, akshare_helper.SyntheticBoard]]:
+    """Return a deterministic catalogue for :func:`akshare_helper.offline`.
+
+    ``board_count`` industry boards are followed by ``concept_count``
+    concept boards; members are sampled independently, so boards overlap.
+    """
+
+    if board_count <= 0 or stock_count <= 0:
+        raise ValueError("Universe needs at least one board and one stock")
+    rng = random.Random(seed)
+    symbols = [f"{600000 + index:06d}" for index in range(stock_count)]
+    size = min(members_per_board, stock_count)
+    catalogue: Dict[str, Dict[str, akshare_helper.SyntheticBoard]] = {"industry": {}, "concept": {}}
+    for index in range(board_count + concept_count):
+        code = f"BK{index:04d}"
+        category = "industry" if index < board_count else "concept"
+        catalogue[category][code] = akshare_helper.SyntheticBoard(
+            code, f"Board {index:04d}", category, rng.sample(symbols, size)
+        )
+    return catalogue
+
+
+def run_benchmark(
+    board_count: int,
+    stock_count: Optional[int] = None,
+    members_per_board: int = 20,
+    repeat: int = 3,
+    trace_memory: bool = True,
+    as_of: date = AS_OF,
+) -> BenchmarkResult:
+    """Benchmark one universe size; ``stock_count`` defaults to ``board_count``."""
+
+    stock_count = stock_count or board_count
+    catalogue = make_catalogue(board_count, stock_count, members_per_board)
+    cfg = replace(AnalysisConfig.daily_defaults(as_of), board_count=board_count)
+    result = BenchmarkResult(boards=board_count, stocks=stock_count)
+
+    with akshare_helper.offline(catalogue), tempfile.TemporaryDirectory() as workdir:
+        for attempt in range(max(1, repeat)):
+            akshare_helper.clear_caches()
+            profiler = StageProfiler()
+            started = time_module.perf_counter()
+            run_daily_analysis(cfg, db_path=Path(workdir) / f"run-{attempt}.sqlite", profiler=profiler)
+            timings = {metrics.name: metrics.wall_seconds for metrics in profiler.stages}
+            timings["total"] = time_module.perf_counter() - started
+            timings.update(_micro_benchmarks(cfg, Path(workdir) / f"micro-{attempt}.sqlite"))
+            for stage, seconds in timings.items():
+                result.timings[stage] = min(seconds, result.timings.get(stage, seconds))
+
+        if trace_memory:
+            akshare_helper.clear_caches()
+            profiler = StageProfiler(trace_memory=True)
+            with profiler.stage("total"):
+                run_daily_analysis(cfg, db_path=Path(workdir) / "traced.sqlite", profiler=profiler)
+            profiler.close()
+            result.peak_memory = {
+                metrics.name: metrics.peak_memory_bytes
+                for metrics in profiler.stages
+                if metrics.peak_memory_bytes is not None
+            }
+    return result
+
+
+def _micro_benchmarks(cfg: AnalysisConfig, db_path: Path) -> Dict[str, float]:
+    # Uses the warm caches of the preceding run, so only compute is timed.
+    data = load_market_data(cfg)
+    trend = trend_factor.calculate_trend_factor(data.price_history)
+    hype = hype_factor.calculate_hype_factor(data.hot_metrics)
+    capital = capital_factor.calculate_capital_factor(data.money_flow)
+    _, leader_components = leader_factor.calculate_leader_factor(
+        data.component_quotes, data.stock_history, top_n=cfg.leaders_per_board
+    )
+    names = {board.code: board.name for board in data.boards}
+
+    timings: Dict[str, float] = {}
+    started = time_module.perf_counter()
+    rankings = strong_board.rank_boards(trend, hype, capital, leader_components, names, cfg.factor_weights)
+    timings["micro.rank_boards"] = time_module.perf_counter() - started
+
+    started = time_module.perf_counter()
+    write_results(Database(db_path), cfg.end_date, rankings, [], {})
+    timings["micro.write_results"] = time_module.perf_counter() - started
+
+    prices = {symbol: bars[-1].close for symbol, bars in data.stock_history.items() if bars}
+    started = time_module.perf_counter()
+    portfolio = Portfolio(cash=1e12)
+    for symbol, price in prices.items():
+        portfolio.buy(symbol, price=price, shares=100)
+    portfolio.snapshot(prices)
+    for symbol, price in prices.items():
+        portfolio.sell(symbol, price=price * 1.01, shares=50)
+    portfolio.unrealised_pnl(prices)
+    timings["micro.portfolio"] = time_module.perf_counter() - started
+    return timings
+
+
+@dataclass
+class UniverseResult:
+    boards: int
+    stocks: int
+    requests: int
+    seconds: float
+    fetch_workers: int
+    latency: float
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def boards_per_second(self) -> float:
+        return self.boards / self.seconds if self.seconds else float("inf")
+
+
+@contextmanager
+def simulated_latency(seconds: float) -> Iterator[List[int]]:
+    """Delay every data request (response cache miss) by ``seconds``.
+
+    Offline data costs microseconds; this stands in for a remote endpoint
+    so request scheduling shows up in timings.  Yields a one-item list
+    counting the requests made.
+    """
+
+    caches = [getattr(akshare_helper, name) for name in _REQUEST_CACHES]
+    originals = [cache.__wrapped__ for cache in caches]
+    counter = [0]
+    lock = threading.Lock()
+
+    def delayed(func: Callable[..., object]) -> Callable[..., object]:
+        @functools.wraps(func)
+        def request(*args: object, **kwargs: object) -> object:
+            with lock:
+                counter[0] += 1
+            time_module.sleep(seconds)
+            return func(*args, **kwargs)
+
+        return request
+
+    for cache, func in zip(caches, originals):
+        cache.__wrapped__ = delayed(func)
+    try:
+        yield counter
+    finally:
+        for cache, func in zip(caches, originals):
+            cache.__wrapped__ = func
+
+
+def run_universe_benchmark(
+    industry: int = UNIVERSE_INDUSTRY,
+    concept: int = UNIVERSE_CONCEPT,
+    stocks: int = UNIVERSE_STOCKS,
+    members_per_board: int = UNIVERSE_MEMBERS,
+    latency: float = DEFAULT_LATENCY,
+    fetch_workers: int = 16,
+    as_of: date = AS_OF,
+) -> UniverseResult:
+    """Time one cold full-universe run with ``latency`` per data request."""
+
+    catalogue = make_catalogue(industry, stocks, members_per_board, concept_count=concept)
+    cfg = AnalysisConfig.full_universe(as_of, fetch_workers=fetch_workers)
+    profiler = StageProfiler()
+    with akshare_helper.offline(catalogue), simulated_latency(latency) as requests:
+        started = time_module.perf_counter()
+        run_daily_analysis(cfg, profiler=profiler)
+        seconds = time_module.perf_counter() - started
+    return UniverseResult(
+        boards=next(metrics.items for metrics in profiler.stages if metrics.name == "fetch.boards") or 0,
+        stocks=stocks,
+        requests=requests[0],
+        seconds=seconds,
+        fetch_workers=fetch_workers,
+        latency=latency,
+        timings={metrics.name: metrics.wall_seconds for metrics in profiler.stages},
+    )
+
+
+def format_universe(result: UniverseResult) -> str:
+    lines = [
+        f"== full universe: {result.boards} boards / {result.stocks} stocks, {result.requests} requests "
+        f"at {result.latency * 1000:.0f}ms on {result.fetch_workers} workers",
+        f"{'stage':<28}{'ms':>12}",
+    ]
+    lines.extend(f"{stage:<28}{seconds * 1000:>12.1f}" for stage, seconds in result.timings.items())
+    lines.append(
+        f"total {result.seconds:.1f}s, {result.boards_per_second:.1f} boards/s "
+        f"(target {UNIVERSE_TARGET_BOARDS_PER_SECOND:.0f})"
+    )
+    return "\n".join(lines)
+
+
+def load_baseline(path: Path) -> Dict[str, Dict[str, object]]:
+    path = Path(path)
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baseline(results: Sequence[BenchmarkResult], path: Path) -> None:
+    """Merge ``results`` into the baseline file, replacing matching sizes."""
+
+    path = Path(path)
+    baseline = load_baseline(path)
+    for result in results:
+        baseline[result.label] = result.as_dict()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(baseline, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def compare(
+    results: Sequence[BenchmarkResult],
+    baseline: Dict[str, Dict[str, object]],
+    threshold: float = DEFAULT_THRESHOLD,
+    min_seconds: float = MIN_REGRESSION_SECONDS,
+) -> List[Regression]:
+    """Return stages slower than ``baseline * (1 + threshold)``."""
+
+    regressions: List[Regression] = []
+    for result in results:
+        reference: Dict[str, float] = baseline.get(result.label, {}).get("timings", {})  # type: ignore[assignment]
+        for stage, current in sorted(result.timings.items()):
+            previous = reference.get(stage)
+            if previous is None or current < min_seconds:
+                continue
+            if current > previous * (1 + threshold):
+                regressions.append(Regression(result.label, stage, previous, current))
+    return regressions
+
+
+def format_results(results: Sequence[BenchmarkResult]) -> str:
+    lines: List[str] = []
+    for result in results:
+        lines.append(f"== {result.boards} boards / {result.stocks} stocks")
+        lines.append(f"{'stage':<28}{'best_ms':>12}{'peak_kb':>12}")
+        for stage, seconds in sorted(result.timings.items()):
+            peak = result.peak_memory.get(stage)
+            peak_text = f"{peak / 1024:.0f}" if peak is not None else "-"
+            lines.append(f"{stage:<28}{seconds * 1000:>12.1f}{peak_text:>12}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline sector rotation benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Universe sizes (boards)")
+    parser.add_argument("--stocks", type=int, default=None, help="Stocks per universe (defaults to the size)")
+    parser.add_argument("--members", type=int, default=20, help="Constituents per board")
+    parser.add_argument("--repeat", type=int, default=3, help="Cold runs per size; the best time is kept")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the traced peak memory run")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Flag stages slower than baseline by more than this fraction",
+    )
+    parser.add_argument("--universe", action="store_true", help="Benchmark the full industry + concept universe")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="Seconds per data request (--universe)")
+    parser.add_argument("--fetch-workers", type=int, default=16, help="Fetch threads (--universe)")
+    args = parser.parse_args(argv)
+    # Offline runs always use synthetic data; keep per-run logs and fallback warnings quiet.
+    logging.disable(logging.WARNING)
+
+    if args.universe:
+        universe = run_universe_benchmark(latency=args.latency, fetch_workers=args.fetch_workers)
+        print(format_universe(universe))
+        return 0 if universe.boards_per_second >= UNIVERSE_TARGET_BOARDS_PER_SECOND else 1
+
+    results = [
+        run_benchmark(
+            size,
+            stock_count=args.stocks,
+            members_per_board=args.members,
+            repeat=args.repeat,
+            trace_memory=not args.no_memory,
+        )
+        for size in args.sizes
+    ]
+    print(format_results(results))
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = compare(results, load_baseline(args.baseline), threshold=args.threshold)
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression.label} {regression.stage}: "
+            f"{regression.baseline * 1000:.1f}ms -> {regression.current * 1000:.1f}ms ({regression.ratio:.2f}x)"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    sys.exit(main())
@@ -8,9 +8,13 @@ when tests need deterministic behaviour.
 """
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from datetime import date, timedelta
-from typing import Dict
+from typing import Dict, Optional, Tuple
+
+
+# Every board category published by Eastmoney (~90 industry, ~400 concept boards).
+UNIVERSE_CATEGORIES: Tuple[str, ...] = ("industry", "concept")
 
 
 @dataclass
@@ -39,6 +43,8 @@ class RotationWeights:
     capital_spillover: float = 0.3
     hype_spillover: float = 0.2
     technical_readiness: float = 0.1
+    # Bonus per unit of lagged return correlation with a currently strong board.
+    lead_lag: float = 0.2
 
     def as_dict(self) -> Dict[str, float]:
         return {
@@ -46,20 +52,38 @@ class RotationWeights:
             "capital_spillover": self.capital_spillover,
             "hype_spillover": self.hype_spillover,
             "technical_readiness": self.technical_readiness,
+            "lead_lag": self.lead_lag,
         }
 
 
+@dataclass
+class UniverseRules:
+    """Constituents dropped before their history is downloaded (see :mod:`.data.universe_filter`)."""
+
+    exclude_st: bool = True
+    exclude_suspended: bool = True
+    exclude_new_listings: bool = True
+
+
 @dataclass
 class AnalysisConfig:
     """Input configuration for the daily analysis run."""
 
     start_date: date
     end_date: date
-    board_count: int = 6
+    board_count: Optional[int] = 6
     leaders_per_board: int = 2
     initial_cash: float = 1_000_000.0
     factor_weights: FactorWeights = field(default_factory=FactorWeights)
     rotation_weights: RotationWeights = field(default_factory=RotationWeights)
+    categories: Tuple[str, ...] = ("industry",)
+    # Threads issuing data requests; boards and symbols are fetched independently.
+    fetch_workers: int = 1
+    # Boards whose constituent Jaccard overlap reaches this are collapsed to one
+    # representative before fetching and in the selection (None keeps every board).
+    overlap_threshold: Optional[float] = None
+    # Applied to live sessions only; None downloads every constituent.
+    universe_rules: Optional[UniverseRules] = field(default_factory=UniverseRules)
 
     @classmethod
     def daily_defaults(cls, as_of: date | None = None) -> "AnalysisConfig":
@@ -68,3 +92,18 @@ class AnalysisConfig:
         as_of = as_of or date.today()
         start = as_of - timedelta(days=7)
         return cls(start_date=start, end_date=as_of)
+
+    @classmethod
+    def full_universe(cls, as_of: date | None = None, fetch_workers: int = 16) -> "AnalysisConfig":
+        """Every industry and concept board, fetched on ``fetch_workers`` threads.
+
+        Concept boards duplicating another board's constituents are collapsed.
+        """
+
+        return replace(
+            cls.daily_defaults(as_of),
+            board_count=None,
+            categories=UNIVERSE_CATEGORIES,
+            fetch_workers=fetch_workers,
+            overlap_threshold=0.5,
+        )
@@ -0,0 +1,90 @@
+"""Point-in-time lookups over many symbols' daily bars.
+
+Re-pricing component quotes "as of" a session used to scan a symbol's
+whole history for the latest bar on or before the target date, once per
+quote; a backtest doing that per board per day over years is quadratic in
+the history length.  :class:`BarIndex` sorts every symbol's bars once and
+keeps their dates as one ``int64`` array of ``symbol × span + ordinal``
+keys, so a batch of ``k`` symbols is answered with a single
+``searchsorted`` in ``O(k log n)``::
+
+    index = BarIndex(stock_history)
+    bars = index.as_of_many(symbols, date(2024, 3, 7))  # {symbol: bar or None}
+    window = index.window(date(2024, 2, 27), date(2024, 3, 7))  # {symbol: [bars]}
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .stock_data import StockBar
+
+
+# Larger than any date ordinal (date.max is 3_652_059), so keys of different symbols never interleave.
+_SPAN = 1 << 22
+
+
+class BarIndex:
+    """Bars of every symbol sorted by date, searchable by ``(symbol, day)``."""
+
+    def __init__(self, history: Mapping[str, Sequence["StockBar"]]) -> None:
+        self.symbols: List[str] = list(history)
+        self._columns: Dict[str, int] = {symbol: idx for idx, symbol in enumerate(self.symbols)}
+        self._bars: List["StockBar"] = []
+        offsets = [0]
+        for symbol in self.symbols:
+            self._bars.extend(sorted(history[symbol], key=lambda bar: bar.date))
+            offsets.append(len(self._bars))
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+        owners = np.repeat(np.arange(len(self.symbols), dtype=np.int64), np.diff(self._offsets))
+        days = np.fromiter((bar.date.toordinal() for bar in self._bars), dtype=np.int64, count=len(self._bars))
+        self._keys = owners * _SPAN + days
+
+    def __len__(self) -> int:
+        return len(self._bars)
+
+    def __contains__(self, symbol: object) -> bool:
+        return symbol in self._columns
+
+    def bars(self, symbol: str) -> List["StockBar"]:
+        column = self._columns.get(symbol)
+        if column is None:
+            return []
+        return self._bars[self._offsets[column] : self._offsets[column + 1]]
+
+    def as_of(self, symbol: str, day: date, since: Optional[date] = None) -> Optional["StockBar"]:
+        """Latest bar of ``symbol`` on or before ``day`` (and not before ``since``)."""
+
+        return self.as_of_many([symbol], day, since=since)[symbol]
+
+    def as_of_many(
+        self, symbols: Iterable[str], day: date, since: Optional[date] = None
+    ) -> Dict[str, Optional["StockBar"]]:
+        """:meth:`as_of` for a batch of symbols; unknown symbols map to ``None``."""
+
+        wanted = list(dict.fromkeys(symbols))
+        columns = np.fromiter((self._columns.get(symbol, -1) for symbol in wanted), dtype=np.int64, count=len(wanted))
+        known = columns >= 0
+        positions = np.searchsorted(self._keys, columns * _SPAN + day.toordinal(), side="right") - 1
+        # The hit must belong to the symbol itself (and fall inside the window).
+        first = np.where(known, self._offsets[np.where(known, columns, 0)], 0)
+        if since is not None:
+            first = np.maximum(first, np.searchsorted(self._keys, columns * _SPAN + since.toordinal(), side="left"))
+        found = known & (positions >= first)
+        return {
+            symbol: self._bars[position] if hit else None
+            for symbol, position, hit in zip(wanted, positions.tolist(), found.tolist())
+        }
+
+    def window(self, start: date, end: date) -> Dict[str, List["StockBar"]]:
+        """Bars within ``[start, end]`` per symbol; symbols without any are left out."""
+
+        base = np.arange(len(self.symbols), dtype=np.int64) * _SPAN
+        lower = np.searchsorted(self._keys, base + start.toordinal(), side="left").tolist()
+        upper = np.searchsorted(self._keys, base + end.toordinal(), side="right").tolist()
+        return {
+            symbol: self._bars[lo:hi] for symbol, lo, hi in zip(self.symbols, lower, upper) if hi > lo
+        }
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import date
 from typing import Iterable, List, Optional
 
 from ..utils import akshare_helper
@@ -13,14 +14,16 @@ class Board:
     name: str
     category: str = "industry"
 
-    def member_symbols(self, limit: Optional[int] = None) -> List[str]:
-        return akshare_helper.board_members(self.code, category=self.category, limit=limit)
+    def member_symbols(self, limit: Optional[int] = None, as_of: Optional[date] = None) -> List[str]:
+        return akshare_helper.board_members(self.code, category=self.category, limit=limit, as_of=as_of)
 
 
 def list_boards(
     limit: int | None = None,
     categories: Iterable[str] | None = None,
 ) -> List[Board]:
+    """Boards of ``categories`` (industry only by default), each code once."""
+
     infos = akshare_helper.list_boards(limit=None, categories=tuple(categories) if categories is not None else None)
     boards = [Board(code=info.code, name=info.name, category=info.category) for info in infos]
     if limit is not None:
@@ -42,5 +45,5 @@ def list_concept_boards(limit: int | None = None) -> List[Board]:
     ]
 
 
-def list_board_members(board: Board, limit: Optional[int] = None) -> List[str]:
-    return list(board.member_symbols(limit=limit))
+def list_board_members(board: Board, limit: Optional[int] = None, as_of: Optional[date] = None) -> List[str]:
+    return list(board.member_symbols(limit=limit, as_of=as_of))
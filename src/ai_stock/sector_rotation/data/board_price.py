@@ -1,7 +1,7 @@
 """Board price history sourced from AKShare with fallbacks."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import date
 from typing import Dict, Iterable, List
 
@@ -61,6 +61,53 @@ def fetch_board_prices(boards: Iterable[Board], start: date, end: date) -> Dict[
     return result
 
 
+def append_live_bar(
+    bars: List[BoardPriceBar],
+    board: Board,
+    trading_day: date,
+    item: Dict[str, float],
+) -> List[BoardPriceBar]:
+    """Return ``bars`` plus a provisional bar for ``trading_day``.
+
+    Used intraday: closed sessions are reused as-is and only the live bar
+    (and its moving averages) is computed.
+    """
+
+    closed = [bar for bar in bars if bar.date < trading_day]
+    closes = [bar.close for bar in closed] + [item["close"]]
+    idx = len(closes) - 1
+    live = BoardPriceBar(
+        board=board.code,
+        category=board.category,
+        date=trading_day,
+        close=item["close"],
+        change_pct=item.get("change_pct", 0.0),
+        change_amount=item.get("change_amount", 0.0),
+        volume=item.get("volume", 0.0),
+        turnover=item.get("turnover", 0.0),
+        turnover_rate=item.get("turnover_rate", 0.0),
+        ma5=_moving_average(closes, idx, 5),
+        ma10=_moving_average(closes, idx, 10),
+    )
+    return closed + [live]
+
+
+def trim_history(history: Dict[str, List[BoardPriceBar]], start: date) -> Dict[str, List[BoardPriceBar]]:
+    """Bars from ``start`` on, with moving averages as if the history had been fetched from ``start``."""
+
+    result: Dict[str, List[BoardPriceBar]] = {}
+    for code, bars in history.items():
+        kept = [bar for bar in bars if bar.date >= start]
+        closes = [bar.close for bar in kept]
+        trimmed = [
+            replace(bar, ma5=_moving_average(closes, idx, 5), ma10=_moving_average(closes, idx, 10))
+            for idx, bar in enumerate(kept)
+        ]
+        if trimmed:
+            result[code] = trimmed
+    return result
+
+
 def _moving_average(values: List[float], idx: int, window: int) -> float:
     start_idx = max(0, idx - window + 1)
     subset = values[start_idx : idx + 1]
@@ -0,0 +1,193 @@
+"""Constituent overlap between boards, estimated with MinHash and LSH.
+
+Concept boards overlap heavily (新能源 and 新能源汽车 list mostly the same
+stocks), so rankings end up with near-duplicates and every duplicate
+costs a full set of fetches.  Comparing all pairs of ~500 boards with
+thousands of members is quadratic; instead every board gets a MinHash
+signature (the minimum of ``permutations`` salted hashes over its
+members, computed for all boards at once over the CSR membership
+matrix) and locality-sensitive hashing buckets signatures band by band.
+Only boards sharing a bucket in some band are compared exactly; pairs at
+or above the Jaccard ``threshold`` are linked and connected boards form
+a cluster.  With the defaults (40 bands of 3 rows) pairs at a Jaccard
+overlap of 0.5 are found with probability above 99%.
+
+Clusters chain (A overlaps B, B overlaps C, yet A and C may share
+nothing), so deduplication never drops a board for its cluster alone:
+boards are walked in priority order and one is dropped only when it is
+directly linked to a board already kept (:meth:`BoardClusters.representatives`).
+"""
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .board_data import Board
+from .membership import MembershipMatrix
+
+
+DEFAULT_PERMUTATIONS = 120
+DEFAULT_BANDS = 40
+DEFAULT_THRESHOLD = 0.5
+# Permutations hashed per pass; bounds the (entries × chunk) working array.
+_CHUNK = 16
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+
+
+@dataclass
+class BoardClusters:
+    """Boards grouped by constituent overlap; unclustered boards are singletons."""
+
+    clusters: List[List[str]]
+    # Exact Jaccard overlap of every linked pair, keyed by (board, board) in sorted order.
+    similarity: Dict[Tuple[str, str], float]
+    _cluster_of: Dict[str, int] = field(init=False, repr=False)
+    _linked: Dict[str, Set[str]] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._cluster_of = {board: idx for idx, boards in enumerate(self.clusters) for board in boards}
+        self._linked = {}
+        for first, second in self.similarity:
+            self._linked.setdefault(first, set()).add(second)
+            self._linked.setdefault(second, set()).add(first)
+
+    def cluster_of(self, board: str) -> Tuple[str, ...]:
+        index = self._cluster_of.get(board)
+        return tuple(self.clusters[index]) if index is not None else (board,)
+
+    def overlapping(self, board: str, kept: Iterable[str]) -> Optional[str]:
+        """The first board of ``kept`` linked to ``board`` by a direct overlap, if any."""
+
+        linked = self._linked.get(board, ())
+        return next((other for other in kept if other in linked), None)
+
+    def representatives(self, order: Iterable[str]) -> Dict[str, str]:
+        """Map every board of ``order`` to the kept board it directly overlaps, or itself.
+
+        Boards are walked in ``order``; a board is dropped in favour of the
+        earliest kept board it is linked to and kept otherwise.
+        """
+
+        kept: List[str] = []
+        mapping: Dict[str, str] = {}
+        for board in order:
+            chosen = self.overlapping(board, kept)
+            if chosen is None:
+                kept.append(board)
+            mapping[board] = chosen or board
+        return mapping
+
+
+def minhash_signatures(
+    members: Mapping[str, Sequence[str]],
+    permutations: int = DEFAULT_PERMUTATIONS,
+    seed: int = 0,
+) -> Tuple[List[str], np.ndarray]:
+    """``(boards, signatures)`` with one row of ``permutations`` minimum hashes per board.
+
+    Boards without members keep the all-ones sentinel row.
+    """
+
+    matrix = MembershipMatrix.from_members(members)
+    keys = np.fromiter(
+        (zlib.crc32(symbol.encode("utf-8")) for symbol in matrix.symbols), dtype=np.uint64, count=len(matrix.symbols)
+    )
+    salts = _mix(np.arange(permutations, dtype=np.uint64) + np.uint64(seed) * _GOLDEN)
+    indptr, indices, _ = matrix.csr()
+    filled = np.flatnonzero(np.diff(indptr))
+    signatures = np.full((len(matrix.boards), permutations), np.iinfo(np.uint64).max, dtype=np.uint64)
+    if len(filled):
+        hashed = _mix(keys)
+        for first in range(0, permutations, _CHUNK):
+            block = _mix(hashed[indices, None] ^ salts[None, first : first + _CHUNK])
+            signatures[filled, first : first + _CHUNK] = np.minimum.reduceat(block, indptr[filled], axis=0)
+    return matrix.boards, signatures
+
+
+def candidate_pairs(signatures: np.ndarray, bands: int = DEFAULT_BANDS) -> Set[Tuple[int, int]]:
+    """Row pairs whose signatures agree on every row of at least one band."""
+
+    permutations = signatures.shape[1]
+    if bands <= 0 or permutations % bands:
+        raise ValueError(f"{permutations} permutations cannot be split into {bands} bands")
+    rows = permutations // bands
+    sentinel = np.iinfo(np.uint64).max
+    active = np.flatnonzero(signatures[:, 0] != sentinel)
+    pairs: Set[Tuple[int, int]] = set()
+    for band in range(bands):
+        buckets: Dict[bytes, List[int]] = {}
+        block = np.ascontiguousarray(signatures[active, band * rows : (band + 1) * rows])
+        for position, row in enumerate(active.tolist()):
+            buckets.setdefault(block[position].tobytes(), []).append(row)
+        for bucket in buckets.values():
+            for index, first in enumerate(bucket):
+                pairs.update((first, second) for second in bucket[index + 1 :])
+    return pairs
+
+
+def cluster_boards(
+    members: Mapping[str, Sequence[str]],
+    threshold: float = DEFAULT_THRESHOLD,
+    permutations: int = DEFAULT_PERMUTATIONS,
+    bands: int = DEFAULT_BANDS,
+    seed: int = 0,
+) -> BoardClusters:
+    """Link boards whose exact Jaccard overlap is at least ``threshold``.
+
+    Clusters are connected components of the links, listed in the order
+    of ``members``; boards without a link are left out.
+    """
+
+    boards, signatures = minhash_signatures(members, permutations=permutations, seed=seed)
+    sets = [frozenset(members[board]) for board in boards]
+    parent = list(range(len(boards)))
+
+    def root(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    similarity: Dict[Tuple[str, str], float] = {}
+    for first, second in sorted(candidate_pairs(signatures, bands)):
+        overlap = len(sets[first] & sets[second]) / len(sets[first] | sets[second])
+        if overlap >= threshold:
+            similarity[tuple(sorted((boards[first], boards[second])))] = overlap  # type: ignore[index]
+            parent[root(second)] = root(first)
+
+    groups: Dict[int, List[str]] = {}
+    for index, board in enumerate(boards):
+        groups.setdefault(root(index), []).append(board)
+    return BoardClusters(clusters=[group for group in groups.values() if len(group) > 1], similarity=similarity)
+
+
+def collapse_overlapping(
+    boards: Sequence[Board],
+    members: Mapping[str, Sequence[str]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> Tuple[List[Board], Dict[str, str]]:
+    """Drop every board directly overlapping an earlier kept board of ``boards``.
+
+    Returns the kept boards and ``{dropped board: representative}``.
+    """
+
+    clusters = cluster_boards({board.code: members.get(board.code, []) for board in boards}, threshold=threshold)
+    representatives = clusters.representatives(board.code for board in boards)
+    kept = [board for board in boards if representatives[board.code] == board.code]
+    dropped = {code: chosen for code, chosen in representatives.items() if code != chosen}
+    return kept, dropped
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finaliser; wraps modulo 2**64 like the reference."""
+
+    values = (values + _GOLDEN).astype(np.uint64)
+    values = (values ^ (values >> np.uint64(30))) * _MIX_1
+    values = (values ^ (values >> np.uint64(27))) * _MIX_2
+    return values ^ (values >> np.uint64(31))
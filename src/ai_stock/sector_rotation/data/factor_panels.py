@@ -0,0 +1,260 @@
+"""Board × session arrays read by the trend, hype and capital factors.
+
+Weight sweeps, backtests and backfills score the same boards over the
+same sessions many times.  :func:`build_panels` turns the per-bar lists of
+one data load into dense ``float64`` arrays (``NaN`` where a board has no
+bar) once; :meth:`FactorPanels.window` slices sessions as views, and the
+``*_from_panels`` functions of the factor modules work on whole panels.
+
+To share them between processes, :class:`PanelPublisher` copies the
+panels into one shared memory segment (or a ``.npy`` file mapped with
+``mmap``) and exposes a small picklable :class:`PanelDescriptor`; workers
+call :func:`attach_panels` to get read-only NumPy views of that block
+without copying or unpickling any data::
+
+    with PanelPublisher(build_panels(prices, flows, hot)) as publisher:
+        pool.map(job, [publisher.descriptor] * n)
+
+    def job(descriptor):
+        panels = attach_panels(descriptor)
+        return trend_factor.calculate_trend_factor_from_panels(panels)
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import date
+from multiprocessing import shared_memory
+from operator import attrgetter
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .board_hot import BoardHotMetric
+from .board_money import BoardMoneyFlow
+from .board_price import BoardPriceBar
+from ..utils.shm import attach_segment, create_segment
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .stock_data import StockBar
+
+
+# Field name -> (source series, bar attribute).
+PANEL_FIELDS: Dict[str, Tuple[str, str]] = {
+    "close": ("price", "close"),
+    "net_inflow": ("money", "net_inflow"),
+    "main_inflow": ("money", "main_inflow"),
+    "hot_score": ("hot", "hot_score"),
+    "mentions": ("hot", "mentions"),
+}
+DTYPE = np.float64
+
+
+@dataclass
+class FactorPanels:
+    """Board × session arrays; ``NaN`` marks sessions without a bar."""
+
+    boards: List[str]
+    dates: List[date]
+    fields: Dict[str, np.ndarray]
+    _rows: Dict[str, int] = field(init=False, repr=False)
+    _segment: Optional[shared_memory.SharedMemory] = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        self._rows = {board: idx for idx, board in enumerate(self.boards)}
+
+    def __contains__(self, board: object) -> bool:
+        return board in self._rows
+
+    def values(self, name: str, board: str) -> np.ndarray:
+        """``board``'s bars of field ``name`` in date order, gaps dropped."""
+
+        row = self.fields[name][self._rows[board]]
+        return row[~np.isnan(row)]
+
+    def window(self, start: date, end: date) -> "FactorPanels":
+        """Sessions in ``[start, end]`` as views of these arrays.
+
+        The window does not own an attached block; close the panels
+        returned by :func:`attach_panels` once the windows are dropped.
+        """
+
+        first, last = bisect_left(self.dates, start), bisect_right(self.dates, end)
+        return FactorPanels(
+            boards=self.boards,
+            dates=self.dates[first:last],
+            fields={name: values[:, first:last] for name, values in self.fields.items()},
+        )
+
+    def select(self, boards: Iterable[str]) -> "FactorPanels":
+        """Rows of ``boards`` (unknown ones skipped); adjacent rows in order stay views."""
+
+        rows = [self._rows[board] for board in boards if board in self._rows]
+        if rows and rows == list(range(rows[0], rows[0] + len(rows))):
+            index: object = slice(rows[0], rows[0] + len(rows))
+        else:
+            index = rows
+        return FactorPanels(
+            boards=[self.boards[row] for row in rows],
+            dates=self.dates,
+            fields={name: values[index] for name, values in self.fields.items()},
+        )
+
+    def aligned(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Field ``name`` with each row's bars moved to its last columns.
+
+        Returns the values (``NaN`` padding on the left) and the number of
+        bars per board, so "the last ``n`` bars" is ``values[:, -n:]`` for
+        every board at once.  Dense panels are returned without copying.
+        """
+
+        values = self.fields[name]
+        valid = ~np.isnan(values)
+        counts = valid.sum(axis=1)
+        if bool(valid.all()):
+            return values, counts
+        order = np.argsort(valid, axis=1, kind="stable")
+        return np.take_along_axis(values, order, axis=1), counts
+
+    def close(self) -> None:
+        """Detach from a shared memory block; drop every view first."""
+
+        self.fields = {}
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+
+def build_panels(
+    price_history: Mapping[str, Sequence[BoardPriceBar]],
+    money_flow: Mapping[str, Sequence[BoardMoneyFlow]],
+    hot_metrics: Mapping[str, Sequence[BoardHotMetric]],
+) -> FactorPanels:
+    """Pack per-board bar lists (as in :class:`~..main.MarketData`) into panels."""
+
+    sources = {"price": price_history, "money": money_flow, "hot": hot_metrics}
+    boards = list(dict.fromkeys(code for series in sources.values() for code in series))
+    rows = {board: idx for idx, board in enumerate(boards)}
+
+    # One pass over the bars: (field names, board, dates, *field values).
+    tables = []
+    for source, series in sources.items():
+        names = [name for name, (origin, _) in PANEL_FIELDS.items() if origin == source]
+        read = attrgetter("date", *(PANEL_FIELDS[name][1] for name in names))
+        tables.extend((names, board, *zip(*map(read, bars))) for board, bars in series.items() if bars)
+
+    # Boards usually share their sessions; only distinct date tuples are hashed.
+    days: set = set()
+    previous: tuple = ()
+    for table in tables:
+        if table[2] != previous:
+            days.update(table[2])
+            previous = table[2]
+    dates = sorted(days)
+    columns = {day: idx for idx, day in enumerate(dates)}
+
+    fields = {name: np.full((len(boards), len(dates)), np.nan, dtype=DTYPE) for name in PANEL_FIELDS}
+    previous, cells = (), np.empty(0, dtype=np.intp)
+    for names, board, sessions, *values in tables:
+        if sessions != previous:
+            cells = np.fromiter((columns[day] for day in sessions), dtype=np.intp, count=len(sessions))
+            previous = sessions
+        for name, column in zip(names, values):
+            fields[name][rows[board], cells] = column
+    return FactorPanels(boards=boards, dates=dates, fields=fields)
+
+
+def build_close_panel(stock_history: Mapping[str, Sequence["StockBar"]]) -> FactorPanels:
+    """Symbol × session ``close`` panel of stock bars (rows are symbols)."""
+
+    symbols = [symbol for symbol, bars in stock_history.items() if bars]
+    dates = sorted({bar.date for symbol in symbols for bar in stock_history[symbol]})
+    columns = {day: idx for idx, day in enumerate(dates)}
+    closes = np.full((len(symbols), len(dates)), np.nan, dtype=DTYPE)
+    for row, symbol in enumerate(symbols):
+        bars = stock_history[symbol]
+        cells = np.fromiter((columns[bar.date] for bar in bars), dtype=np.intp, count=len(bars))
+        closes[row, cells] = [bar.close for bar in bars]
+    return FactorPanels(boards=symbols, dates=dates, fields={"close": closes})
+
+
+@dataclass(frozen=True)
+class PanelDescriptor:
+    """What a process needs to attach to published panels (a few KB to pickle)."""
+
+    location: str
+    boards: Tuple[str, ...]
+    dates: Tuple[date, ...]
+    fields: Tuple[str, ...]
+    in_file: bool = False
+
+    @property
+    def shape(self) -> Tuple[int, int, int]:
+        return (len(self.fields), len(self.boards), len(self.dates))
+
+
+class PanelPublisher:
+    """Publishes one copy of ``panels`` for other processes to attach to.
+
+    Without ``path`` the block lives in shared memory until :meth:`close`;
+    with ``path`` it is written as a ``.npy`` file that outlives the
+    publisher, so later jobs on the same host can map it again.
+    """
+
+    def __init__(self, panels: FactorPanels, path: Optional[Path] = None) -> None:
+        names = tuple(panels.fields)
+        shape = (len(names), len(panels.boards), len(panels.dates))
+        self._segment: Optional[shared_memory.SharedMemory] = None
+        if path is None:
+            self._segment = create_segment(int(np.prod(shape)) * np.dtype(DTYPE).itemsize)
+            block = np.ndarray(shape, dtype=DTYPE, buffer=self._segment.buf)
+            location = self._segment.name
+        else:
+            block = np.lib.format.open_memmap(Path(path), mode="w+", dtype=DTYPE, shape=shape)
+            location = str(path)
+        for index, name in enumerate(names):
+            block[index] = panels.fields[name]
+        if isinstance(block, np.memmap):
+            block.flush()
+        # The segment cannot be closed while an array still exports its buffer.
+        del block
+        self.descriptor = PanelDescriptor(
+            location=location,
+            boards=tuple(panels.boards),
+            dates=tuple(panels.dates),
+            fields=names,
+            in_file=path is not None,
+        )
+
+    def close(self) -> None:
+        if self._segment is not None:
+            self._segment.close()
+            self._segment.unlink()
+            self._segment = None
+
+    def __enter__(self) -> "PanelPublisher":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+def attach_panels(descriptor: PanelDescriptor) -> FactorPanels:
+    """Read-only panels viewing a published block; nothing is copied."""
+
+    segment: Optional[shared_memory.SharedMemory] = None
+    if descriptor.in_file:
+        block = np.load(descriptor.location, mmap_mode="r")
+        if block.shape != descriptor.shape:
+            raise ValueError(f"Panel file {descriptor.location} has shape {block.shape}, expected {descriptor.shape}")
+    else:
+        segment = attach_segment(descriptor.location)
+        block = np.ndarray(descriptor.shape, dtype=DTYPE, buffer=segment.buf)
+        block.flags.writeable = False
+    return FactorPanels(
+        boards=list(descriptor.boards),
+        dates=list(descriptor.dates),
+        fields={name: block[index] for index, name in enumerate(descriptor.fields)},
+        _segment=segment,
+    )
@@ -0,0 +1,163 @@
+"""Sparse board × stock membership matrix.
+
+Board aggregates of constituent data (turnover totals, leader returns,
+limit-up counts) are sums over each board's members.  A
+:class:`MembershipMatrix` keeps the constituent lists in CSR form with a
+symbol index, so a stock-level vector aligned to :attr:`~MembershipMatrix.symbols`
+is reduced to every board in one sparse matrix-vector product::
+
+    matrix = MembershipMatrix.from_members(board_members)
+    turnover = matrix.vector({symbol: bars[-1].turnover for symbol, bars in history.items()})
+    totals = matrix.aggregate(turnover)  # {board: summed turnover}
+
+Entries carry a weight (1.0 unless given).  :meth:`~MembershipMatrix.set_members`
+replaces one board's row without touching the others; the CSR arrays are
+reassembled from the per-board rows on the next product.  Symbols are
+never renumbered, so vectors built before an update stay valid for the
+columns they cover.
+"""
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class MembershipMatrix:
+    def __init__(self) -> None:
+        self.boards: List[str] = []
+        self.symbols: List[str] = []
+        self._board_rows: Dict[str, int] = {}
+        self._symbol_columns: Dict[str, int] = {}
+        # Per-board (columns, weights); the CSR arrays are derived from these.
+        self._rows: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._csr: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+
+    @classmethod
+    def from_members(
+        cls,
+        members: Mapping[str, Sequence[str]],
+        weights: Optional[Mapping[str, Sequence[float]]] = None,
+    ) -> "MembershipMatrix":
+        """One row per board of ``members``; ``weights`` parallel the symbol lists."""
+
+        matrix = cls()
+        for board, symbols in members.items():
+            matrix.set_members(board, symbols, weights.get(board) if weights is not None else None)
+        return matrix
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (len(self.boards), len(self.symbols))
+
+    @property
+    def nnz(self) -> int:
+        return sum(len(columns) for columns, _ in self._rows)
+
+    def __contains__(self, board: object) -> bool:
+        return board in self._board_rows
+
+    def set_members(self, board: str, symbols: Sequence[str], weights: Optional[Sequence[float]] = None) -> None:
+        """Add ``board`` or replace its constituents; a repeated symbol keeps its last weight."""
+
+        if weights is not None and len(weights) != len(symbols):
+            raise ValueError(f"Board {board} has {len(symbols)} symbols but {len(weights)} weights")
+        row: Dict[int, float] = {}
+        for index, symbol in enumerate(symbols):
+            column = self._symbol_columns.get(symbol)
+            if column is None:
+                column = self._symbol_columns[symbol] = len(self.symbols)
+                self.symbols.append(symbol)
+            row[column] = float(weights[index]) if weights is not None else 1.0
+        columns = np.fromiter(row, dtype=np.intp, count=len(row))
+        entry = (columns, np.fromiter(row.values(), dtype=np.float64, count=len(row)))
+        position = self._board_rows.get(board)
+        if position is None:
+            self._board_rows[board] = len(self.boards)
+            self.boards.append(board)
+            self._rows.append(entry)
+        else:
+            self._rows[position] = entry
+        self._csr = None
+
+    def remove(self, board: str) -> None:
+        position = self._board_rows.pop(board)
+        del self.boards[position]
+        del self._rows[position]
+        for other in self.boards[position:]:
+            self._board_rows[other] -= 1
+        self._csr = None
+
+    def members(self, board: str) -> List[str]:
+        columns, _ = self._rows[self._board_rows[board]]
+        return [self.symbols[column] for column in columns]
+
+    def csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """``(indptr, indices, data)`` of the current matrix."""
+
+        indptr, indices, data, _ = self._compiled()
+        return indptr, indices, data
+
+    def _compiled(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        if self._csr is None:
+            lengths = np.fromiter((len(columns) for columns, _ in self._rows), dtype=np.intp, count=len(self._rows))
+            indptr = np.zeros(len(self._rows) + 1, dtype=np.intp)
+            np.cumsum(lengths, out=indptr[1:])
+            indices = np.concatenate([columns for columns, _ in self._rows]) if self._rows else np.empty(0, np.intp)
+            data = np.concatenate([weights for _, weights in self._rows]) if self._rows else np.empty(0)
+            # Row of every stored entry, for bincount-based products.
+            entry_rows = np.repeat(np.arange(len(self._rows)), lengths)
+            self._csr = (indptr, indices, data, entry_rows)
+        return self._csr
+
+    def vector(self, values: Mapping[str, float], default: float = 0.0) -> np.ndarray:
+        """Stock values aligned to :attr:`symbols`; absent symbols get ``default``."""
+
+        return np.fromiter(
+            (values.get(symbol, default) for symbol in self.symbols), dtype=np.float64, count=len(self.symbols)
+        )
+
+    def matvec(self, vector: np.ndarray, weighted: bool = True) -> np.ndarray:
+        """Sum of ``vector`` over each board's members (one entry per board).
+
+        Values are multiplied by the entry weights unless ``weighted`` is false.
+        """
+
+        vector = np.asarray(vector, dtype=np.float64)
+        if vector.shape != (len(self.symbols),):
+            raise ValueError(f"Expected a vector of {len(self.symbols)} stock values, got shape {vector.shape}")
+        _, indices, data, entry_rows = self._compiled()
+        values = vector[indices]
+        if weighted:
+            values *= data
+        return np.bincount(entry_rows, weights=values, minlength=len(self.boards))
+
+    def matmat(self, values: np.ndarray) -> np.ndarray:
+        """Weighted sums of every column of a ``(stocks, k)`` array: ``(boards, k)``."""
+
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim != 2 or values.shape[0] != len(self.symbols):
+            raise ValueError(f"Expected {len(self.symbols)} rows of stock values, got shape {values.shape}")
+        indptr, indices, data, _ = self._compiled()
+        totals = np.zeros((len(self.boards), values.shape[1]))
+        # reduceat misreads empty segments, so only non-empty rows are reduced.
+        filled = np.flatnonzero(np.diff(indptr))
+        if len(filled):
+            totals[filled] = np.add.reduceat(values[indices] * data[:, None], indptr[filled], axis=0)
+        return totals
+
+    def counts(self, weighted: bool = True) -> np.ndarray:
+        """Summed weights per board, or member counts when not ``weighted``."""
+
+        return self.matvec(np.ones(len(self.symbols)), weighted=weighted)
+
+    def aggregate(self, vector: np.ndarray, how: str = "sum") -> Dict[str, float]:
+        """Reduce a stock vector to ``{board: value}`` by ``"sum"`` or ``"mean"``."""
+
+        totals = self.matvec(vector)
+        if how == "mean":
+            counts = self.counts()
+            totals = np.divide(totals, counts, out=np.zeros_like(totals), where=counts != 0)
+        elif how != "sum":
+            raise ValueError(f"Unsupported aggregation '{how}'")
+        return dict(zip(self.boards, totals.tolist()))
@@ -3,9 +3,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import date
-from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Union
 
+from .bar_index import BarIndex
 from .board_data import Board
+from .membership import MembershipMatrix
 from ..utils import akshare_helper
 
 
@@ -62,18 +64,95 @@ def fetch_stock_data(stocks: Iterable[str], start: date, end: date) -> Dict[str,
     return result
 
 
+History = Union[Mapping[str, List[StockBar]], BarIndex]
+
+
 def fetch_board_component_quotes(
     board: Board,
     limit: int = 50,
-    history: Optional[Mapping[str, List[StockBar]]] = None,
+    history: Optional[History] = None,
     target_date: Optional[date] = None,
     members: Optional[Sequence[str]] = None,
+    refresh: bool = False,
 ) -> List[BoardComponentQuote]:
-    snapshot = akshare_helper.board_member_snapshot(board.code, category=board.category, limit=limit)
+    snapshot = _board_snapshot(board, limit, members, refresh)
+    bars = _bars_as_of(history, target_date, _snapshot_symbols([snapshot]))
+    raw_items = _component_items(snapshot, bars, target_date)
+    total_turnover = sum(max(0.0, item["turnover"]) for item in raw_items) or 1.0
+    return _component_quotes(board, raw_items, total_turnover)
+
+
+def fetch_component_quotes(
+    boards: Sequence[Board],
+    limit: int = 50,
+    history: Optional[History] = None,
+    target_date: Optional[date] = None,
+    members: Optional[Mapping[str, Sequence[str]]] = None,
+    since: Optional[date] = None,
+) -> Dict[str, List[BoardComponentQuote]]:
+    """:func:`fetch_board_component_quotes` for many boards at once.
+
+    The constituents of every board are priced from ``history`` (ignoring
+    bars before ``since``) in one batched as-of lookup, and every board's
+    turnover total is one sparse product over the membership matrix of
+    the quoted constituents.  Pass a :class:`~.bar_index.BarIndex` when
+    the same history is re-priced for many dates.
+    """
+
+    members = members or {}
+    snapshots = {board.code: _board_snapshot(board, limit, members.get(board.code), False) for board in boards}
+    bars = _bars_as_of(history, target_date, _snapshot_symbols(snapshots.values()), since)
+    items = {code: _component_items(snapshot, bars, target_date) for code, snapshot in snapshots.items()}
+    # Entry weights are each quote's own turnover: snapshots of one symbol may differ per board.
+    matrix = MembershipMatrix.from_members(
+        {code: [item["symbol"] for item in raw] for code, raw in items.items()},
+        weights={code: [max(0.0, item["turnover"]) for item in raw] for code, raw in items.items()},
+    )
+    totals = dict(zip(matrix.boards, matrix.counts().tolist()))
+    return {board.code: _component_quotes(board, items[board.code], totals[board.code] or 1.0) for board in boards}
+
+
+def _board_snapshot(
+    board: Board, limit: int, members: Optional[Sequence[str]], refresh: bool
+) -> List[Dict[str, object]]:
+    snapshot = akshare_helper.board_member_snapshot(
+        board.code, category=board.category, limit=limit, refresh=refresh
+    )
     if members is not None:
-        snapshot = [item for item in snapshot if item.get("symbol") in set(members)]
+        wanted = set(members)
+        snapshot = [item for item in snapshot if item.get("symbol") in wanted]
+    return snapshot
+
+
+def _snapshot_symbols(snapshots: Iterable[List[Dict[str, object]]]) -> List[str]:
+    return [str(item.get("symbol", "")).strip() for snapshot in snapshots for item in snapshot]
+
+
+def _bars_as_of(
+    history: Optional[History], target_date: Optional[date], symbols: Sequence[str], since: Optional[date] = None
+) -> Optional[Dict[str, Optional[StockBar]]]:
+    """Latest bar on or before ``target_date`` per symbol; ``None`` when quotes are not re-priced.
+
+    A plain mapping is indexed over ``symbols`` only, so pricing one
+    board does not sort the bars of the whole universe.
+    """
+
+    if history is None or target_date is None:
+        return None
+    if not isinstance(history, BarIndex):
+        history = BarIndex({symbol: history[symbol] for symbol in dict.fromkeys(symbols) if symbol in history})
+    return history.as_of_many(symbols, target_date, since=since)
+
+
+def _component_items(
+    snapshot: List[Dict[str, object]],
+    bars: Optional[Mapping[str, Optional[StockBar]]],
+    target_date: Optional[date],
+) -> List[Dict[str, float]]:
+    """Snapshot rows, re-priced from ``bars`` when given."""
 
     raw_items: List[Dict[str, float]] = []
+    seen: Dict[str, int] = {}
     for item in snapshot:
         symbol = str(item.get("symbol", "")).strip()
         name = str(item.get("name", "")).strip()
@@ -85,8 +164,8 @@ def fetch_board_component_quotes(
         turnover = float(item.get("turnover", 0.0) or 0.0)
         turnover_rate = float(item.get("turnover_rate", 0.0) or 0.0)
 
-        if history is not None and target_date is not None:
-            bar = _select_bar(history.get(symbol, []), target_date)
+        if bars is not None:
+            bar = bars.get(symbol)
             if bar is not None:
                 price = bar.close
                 pct_change = bar.pct_change
@@ -107,8 +186,10 @@ def fetch_board_component_quotes(
                 "turnover_rate": turnover_rate,
             }
         )
+    return raw_items
 
-    total_turnover = sum(max(0.0, item["turnover"]) for item in raw_items) or 1.0
+
+def _component_quotes(board: Board, raw_items: List[Dict[str, float]], total_turnover: float) -> List[BoardComponentQuote]:
     quotes: List[BoardComponentQuote] = []
     for item in raw_items:
         quotes.append(
@@ -127,16 +208,6 @@ def fetch_board_component_quotes(
     return quotes
 
 
-def _select_bar(bars: Sequence[StockBar], target: date) -> Optional[StockBar]:
-    chosen: Optional[StockBar] = None
-    for bar in bars:
-        if bar.date > target:
-            continue
-        if chosen is None or bar.date > chosen.date:
-            chosen = bar
-    return chosen
-
-
 def identify_leader_snapshots(board: Board, top_n: int = 3) -> List[LeaderSnapshot]:
     quotes = fetch_board_component_quotes(board)
     quotes.sort(key=lambda item: item.pct_change, reverse=True)
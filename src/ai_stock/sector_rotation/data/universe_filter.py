@@ -0,0 +1,161 @@
+"""Drop untradable constituents before their history is downloaded.
+
+Every constituent costs one ``stock_zh_a_hist`` request, yet ST names,
+suspended stocks and fresh listings can never be sensible leaders.  One
+bulk ``stock_zh_a_spot_em`` snapshot (see
+:func:`~..utils.akshare_helper.stock_spot_listing`) tells them apart:
+
+* ST / *ST / delisting names carry ``ST`` or ``退`` in the name;
+* suspended stocks have no price or no volume in the session (judged
+  only once the session has opened: before 9:30 every stock looks like
+  that, see :func:`session_opened`);
+* Eastmoney prefixes fresh listings with ``N`` (first session) or ``C``
+  (first five sessions of a registration-based IPO).
+
+Which rules apply is set by :class:`~..config.UniverseRules`.  Symbols
+missing from the snapshot are kept, so an unavailable snapshot filters
+nothing.  The snapshot describes the current session only, which is why
+:func:`~..main.load_market_data` skips the filter for closed windows.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from ..config import UniverseRules
+from ..scheduler.windows import INTRADAY_SESSIONS
+from ..utils import akshare_helper
+
+SESSION_OPEN = INTRADAY_SESSIONS[0][0]
+
+
+@dataclass(frozen=True)
+class ListingStatus:
+    symbol: str
+    name: str
+    price: float
+    volume: float
+
+    @property
+    def is_st(self) -> bool:
+        return "ST" in self.name.upper() or "退" in self.name
+
+    @property
+    def is_suspended(self) -> bool:
+        return self.price <= 0 or self.volume <= 0
+
+    @property
+    def is_new_listing(self) -> bool:
+        return self.name[:1] in ("N", "C")
+
+
+@dataclass
+class UniverseReport:
+    """Symbols kept and, per rule, the symbols dropped (each under its first matching rule)."""
+
+    kept: Set[str] = field(default_factory=set)
+    excluded: Dict[str, Set[str]] = field(default_factory=dict)
+
+    @property
+    def requests_saved(self) -> int:
+        """History requests not issued: one ``stock_zh_a_hist`` call per dropped symbol."""
+
+        return sum(len(symbols) for symbols in self.excluded.values())
+
+    def merge(self, other: "UniverseReport") -> None:
+        for rule, symbols in other.excluded.items():
+            self.excluded.setdefault(rule, set()).update(symbols)
+        self.kept |= other.kept
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "checked": len(self.kept) + self.requests_saved,
+            "kept": len(self.kept),
+            "excluded": {rule: sorted(symbols) for rule, symbols in self.excluded.items()},
+            "requests_saved": self.requests_saved,
+        }
+
+
+def merge_reports(reports: Iterable[Optional[UniverseReport]]) -> Optional[UniverseReport]:
+    """One report for the universe of several loads (``None`` when none of them was filtered)."""
+
+    merged: Optional[UniverseReport] = None
+    for report in reports:
+        if report is not None:
+            merged = merged or UniverseReport()
+            merged.merge(report)
+    return merged
+
+
+def session_opened(now: Optional[datetime] = None) -> bool:
+    """Whether the spot snapshot shows trading of its session.
+
+    Before the open of a trading day the snapshot carries no price or
+    volume for any stock; on other days it holds the last session.
+    """
+
+    now = now or datetime.now()
+    return now.time() >= SESSION_OPEN or not akshare_helper.is_trading_day(now.date())
+
+
+def rules_at(rules: UniverseRules, now: Optional[datetime] = None) -> UniverseRules:
+    """``rules`` without the suspension check while the session has not opened yet."""
+
+    if rules.exclude_suspended and not session_opened(now):
+        return replace(rules, exclude_suspended=False)
+    return rules
+
+
+def fetch_listing() -> Dict[str, ListingStatus]:
+    """Current session status of every A-share (empty when the snapshot is unavailable)."""
+
+    return {
+        symbol: ListingStatus(
+            symbol=symbol,
+            name=str(item.get("name", "")),
+            price=float(item.get("price", 0.0) or 0.0),
+            volume=float(item.get("volume", 0.0) or 0.0),
+        )
+        for symbol, item in akshare_helper.stock_spot_listing().items()
+    }
+
+
+def exclusion_reason(status: ListingStatus, rules: UniverseRules) -> str:
+    """The first rule ``status`` breaks, or ``""`` when the stock stays."""
+
+    if rules.exclude_st and status.is_st:
+        return "st"
+    if rules.exclude_suspended and status.is_suspended:
+        return "suspended"
+    if rules.exclude_new_listings and status.is_new_listing:
+        return "new_listing"
+    return ""
+
+
+def filter_symbols(
+    symbols: Iterable[str], listing: Mapping[str, ListingStatus], rules: UniverseRules
+) -> Tuple[List[str], UniverseReport]:
+    """Keep the symbols no enabled rule excludes, in their original order."""
+
+    report = UniverseReport()
+    kept: List[str] = []
+    for symbol in dict.fromkeys(symbols):
+        status = listing.get(symbol)
+        reason = exclusion_reason(status, rules) if status is not None else ""
+        if reason:
+            report.excluded.setdefault(reason, set()).add(symbol)
+        else:
+            report.kept.add(symbol)
+            kept.append(symbol)
+    return kept, report
+
+
+def filter_members(
+    members: Mapping[str, Sequence[str]], listing: Mapping[str, ListingStatus], rules: UniverseRules
+) -> Tuple[Dict[str, List[str]], UniverseReport]:
+    """Drop excluded symbols from every board's member list."""
+
+    _, report = filter_symbols((symbol for symbols in members.values() for symbol in symbols), listing, rules)
+    kept = {board: [symbol for symbol in symbols if symbol in report.kept] for board, symbols in members.items()}
+    return kept, report
@@ -0,0 +1,235 @@
+"""Background persistence so database latency never blocks the pipeline.
+
+:class:`AsyncWriter` accepts the same ``append`` / ``append_many`` calls as
+:class:`~.database.Database` but only places the records on a bounded
+queue.  A single writer thread drains the queue in batches (one
+transaction per table and batch).  When the queue is full callers block,
+which gives natural backpressure instead of unbounded memory growth, and
+:meth:`AsyncWriter.flush` / :meth:`AsyncWriter.close` act as barriers for
+code that must know the data has reached storage; both raise
+:class:`PersistenceError` for batches that failed since the last barrier.
+"""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .database import Database
+
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class WriterStats:
+    enqueued: int = 0
+    written: int = 0
+    failed: int = 0
+    batches: int = 0
+    max_queue_depth: int = 0
+
+
+class PersistenceError(RuntimeError):
+    """Records the writer thread could not store, reported at the next barrier."""
+
+    def __init__(self, failed: int, errors: Sequence[BaseException]) -> None:
+        super().__init__(f"{failed} records failed to persist: {errors[-1]!r}")
+        self.failed = failed
+        self.errors = list(errors)
+
+
+class _Barrier:
+    __slots__ = ("event",)
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+
+
+_STOP = object()
+
+
+class AsyncWriter:
+    """Queue-backed writer thread in front of a :class:`Database`."""
+
+    def __init__(
+        self,
+        db: Database,
+        max_queue: int = 10_000,
+        batch_size: int = 500,
+        flush_interval: float = 0.2,
+        put_timeout: Optional[float] = None,
+    ) -> None:
+        if max_queue <= 0:
+            raise ValueError("max_queue must be positive")
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.stats = WriterStats()
+        self.last_error: Optional[BaseException] = None
+        # Producers and the writer thread both update ``stats``.
+        self._stats_lock = threading.Lock()
+        self._errors: List[BaseException] = []
+        self._unreported = 0
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="sector-rotation-writer", daemon=True)
+        self._thread.start()
+
+    # Producer API ---------------------------------------------------------
+    def append(self, table: str, record: Dict[str, Any], timeout: Optional[float] = None) -> None:
+        """Enqueue one record, blocking while the queue is full.
+
+        Raises :class:`queue.Full` when ``timeout`` (or ``put_timeout``)
+        elapses before space becomes available.
+        """
+
+        self._put((table, record), timeout)
+
+    def append_many(self, table: str, records: Sequence[Dict[str, Any]], timeout: Optional[float] = None) -> None:
+        for record in records:
+            self._put((table, record), timeout)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything enqueued so far has been written.
+
+        Returns ``False`` if ``timeout`` elapsed first; raises
+        :class:`PersistenceError` when records failed to persist.
+        """
+
+        if not self._thread.is_alive():
+            done = self._queue.empty()
+        else:
+            barrier = _Barrier()
+            self._put(barrier, timeout, allow_closed=True)
+            done = barrier.event.wait(timeout)
+        self._raise_failures()
+        return done
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Drain the queue, stop the writer thread and reject new records.
+
+        Raises :class:`PersistenceError` like :meth:`flush`.
+        """
+
+        with self._lock:
+            if self._closed:
+                already_closed = True
+            else:
+                already_closed = False
+                self._closed = True
+        if not already_closed and self._thread.is_alive():
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._raise_failures()
+        return not self._thread.is_alive()
+
+    def __enter__(self) -> "AsyncWriter":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _raise_failures(self) -> None:
+        with self._stats_lock:
+            failed, errors = self._unreported, self._errors
+            self._unreported, self._errors = 0, []
+        if errors:
+            raise PersistenceError(failed, errors)
+
+    def _put(self, item: object, timeout: Optional[float], allow_closed: bool = False) -> None:
+        if self._closed and not allow_closed:
+            raise RuntimeError("AsyncWriter is closed")
+        wait = self.put_timeout if timeout is None else timeout
+        self._queue.put(item, block=True, timeout=wait)
+        if not isinstance(item, _Barrier):
+            depth = self._queue.qsize()
+            with self._stats_lock:
+                self.stats.enqueued += 1
+                if depth > self.stats.max_queue_depth:
+                    self.stats.max_queue_depth = depth
+
+    # Writer thread --------------------------------------------------------
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            batch: List[Tuple[str, Dict[str, Any]]] = []
+            barriers: List[_Barrier] = []
+            item: object = first
+            while True:
+                if item is _STOP:
+                    stopping = True
+                elif isinstance(item, _Barrier):
+                    barriers.append(item)
+                else:
+                    batch.append(item)  # type: ignore[arg-type]
+                if stopping or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._write_batch(batch)
+            for barrier in barriers:
+                barrier.event.set()
+
+        # Anything enqueued concurrently with close() is still written before its barriers are released.
+        leftovers: List[Tuple[str, Dict[str, Any]]] = []
+        barriers = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, _Barrier):
+                barriers.append(item)
+            elif item is not _STOP:
+                leftovers.append(item)  # type: ignore[arg-type]
+        if leftovers:
+            self._write_batch(leftovers)
+        for barrier in barriers:
+            barrier.event.set()
+
+    def _write_batch(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for table, record in batch:
+            grouped.setdefault(table, []).append(record)
+        started = time.perf_counter()
+        for table, records in grouped.items():
+            try:
+                self.db.append_many(table, records)
+            except Exception as exc:
+                LOGGER.error("Failed to persist %d %s records: %s", len(records), table, exc)
+                with self._stats_lock:
+                    self.last_error = exc
+                    self._errors.append(exc)
+                    self._unreported += len(records)
+                    self.stats.failed += len(records)
+            else:
+                with self._stats_lock:
+                    self.stats.written += len(records)
+        with self._stats_lock:
+            self.stats.batches += 1
+        LOGGER.debug(
+            "Persisted batch of %d records in %.1f ms",
+            len(batch),
+            (time.perf_counter() - started) * 1000,
+        )
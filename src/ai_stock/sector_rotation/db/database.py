@@ -4,8 +4,9 @@ from __future__ import annotations
 import json
 import sqlite3
 from dataclasses import dataclass, field
+from datetime import date
 from pathlib import Path
-from typing import Any, Dict, Iterable
+from typing import Any, Dict, Iterable, List, Sequence, Set
 
 
 _JSON_SUFFIXES = {".json", ".jsonl", ".ndjson"}
@@ -61,6 +62,55 @@ class Database:
         else:
             self._append_sqlite(table, record)
 
+    def append_many(self, table: str, records: Sequence[Dict[str, Any]]) -> None:
+        """Persist ``records`` in a single file rewrite / transaction."""
+
+        if not records:
+            return
+        if self.engine == "json":
+            self._append_json_many(table, records)
+        else:
+            self._append_sqlite_many(table, records)
+
+    def run_dates(self, table: str = "strong_boards") -> Set[date]:
+        """Return the distinct ``run_date`` values already stored in ``table``."""
+
+        if self.engine == "json":
+            values = [record.get("run_date") for record in self._load_json().get(table, [])]
+        else:
+            if table not in _SQLITE_TABLE_COLUMNS:
+                raise ValueError(f"Unknown table '{table}' for sqlite backend")
+            with sqlite3.connect(self.path) as conn:
+                values = [row[0] for row in conn.execute(f"SELECT DISTINCT run_date FROM {table}")]
+        dates: Set[date] = set()
+        for value in values:
+            try:
+                dates.add(date.fromisoformat(str(value)))
+            except ValueError:
+                continue
+        return dates
+
+    def latest_scores(self) -> Dict[str, float]:
+        """Return ``board_name -> score`` of the most recent stored run."""
+
+        if self.engine == "json":
+            rows = self._load_json().get("strong_boards", [])
+            dates = [str(row.get("run_date")) for row in rows if row.get("run_date")]
+            if not dates:
+                return {}
+            latest = max(dates)
+            return {
+                str(row.get("board_name")): float(row.get("score") or 0.0)
+                for row in rows
+                if str(row.get("run_date")) == latest
+            }
+        with sqlite3.connect(self.path) as conn:
+            rows = conn.execute(
+                "SELECT board_name, score FROM strong_boards"
+                " WHERE run_date = (SELECT MAX(run_date) FROM strong_boards)"
+            ).fetchall()
+        return {str(name): float(score) for name, score in rows}
+
     # JSON backend ---------------------------------------------------------
     def _load_json(self) -> Dict[str, Any]:
         if not self.path.exists():
@@ -69,9 +119,12 @@ class Database:
             return json.load(handle)
 
     def _append_json(self, table: str, record: Dict[str, Any]) -> None:
+        self._append_json_many(table, [record])
+
+    def _append_json_many(self, table: str, records: Sequence[Dict[str, Any]]) -> None:
         payload = self._load_json()
         bucket = payload.setdefault(table, [])
-        bucket.append(record)
+        bucket.extend(records)
         self.path.parent.mkdir(parents=True, exist_ok=True)
         with self.path.open("w", encoding="utf-8") as handle:
             json.dump(payload, handle, indent=2, ensure_ascii=False)
@@ -84,24 +137,31 @@ class Database:
             conn.executescript(schema_sql)
 
     def _append_sqlite(self, table: str, record: Dict[str, Any]) -> None:
+        self._append_sqlite_many(table, [record])
+
+    def _append_sqlite_many(self, table: str, records: Sequence[Dict[str, Any]]) -> None:
         try:
             columns = tuple(_SQLITE_TABLE_COLUMNS[table])
         except KeyError as exc:
             raise ValueError(f"Unknown table '{table}' for sqlite backend") from exc
 
-        values = []
-        for column in columns:
-            value = record.get(column)
-            if column == "breakdown" and value is not None and not isinstance(value, str):
-                value = json.dumps(value, ensure_ascii=False)
-            if column == "is_leader" and value is not None:
-                value = int(bool(value))
-            values.append(value)
-
+        rows = [_sqlite_row(columns, record) for record in records]
         placeholders = ", ".join(["?"] * len(columns))
         column_list = ", ".join(columns)
         sql = f"INSERT OR REPLACE INTO {table} ({column_list}) VALUES ({placeholders})"
 
         with sqlite3.connect(self.path) as conn:
-            conn.execute(sql, values)
+            conn.executemany(sql, rows)
             conn.commit()
+
+
+def _sqlite_row(columns: Sequence[str], record: Dict[str, Any]) -> List[Any]:
+    values = []
+    for column in columns:
+        value = record.get(column)
+        if column == "breakdown" and value is not None and not isinstance(value, str):
+            value = json.dumps(value, ensure_ascii=False)
+        if column == "is_leader" and value is not None:
+            value = int(bool(value))
+        values.append(value)
+    return values
@@ -0,0 +1,187 @@
+"""SQLite-backed work queue shared by a coordinator and its workers.
+
+A *job* holds the read-only inputs of one run (stored once) and a list of
+*tasks*.  Workers :meth:`~TaskQueue.claim` a pending task under a lease,
+keep it alive with :meth:`~TaskQueue.heartbeat` while working, then
+:meth:`~TaskQueue.complete` or :meth:`~TaskQueue.fail` it.  A task whose
+lease runs out (worker crashed or was stopped) becomes claimable again and
+counts as a failed attempt; after ``max_attempts`` it is marked failed.
+Only the worker holding a live lease can finish a task, so a worker that
+lost its lease cannot overwrite the result of the one that took over.
+Claims run in ``BEGIN IMMEDIATE`` transactions, so any number of
+processes on hosts sharing the database file pick disjoint tasks.
+
+Payloads and results are pickles: only point workers at queues written by
+your own coordinator.  SQLite needs a filesystem with working locks; on
+network shares without them, use a queue with the same methods instead.
+"""
+from __future__ import annotations
+
+import pickle
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    payload BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    job_id TEXT NOT NULL,
+    task_id INTEGER NOT NULL,
+    payload BLOB NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    result BLOB,
+    error TEXT,
+    PRIMARY KEY (job_id, task_id)
+);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_until);
+"""
+
+
+@dataclass(frozen=True)
+class Task:
+    job_id: str
+    task_id: int
+    payload: Any
+    attempts: int
+    worker: str
+
+
+class TaskQueue:
+    def __init__(self, path: Path, max_attempts: int = 3) -> None:
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def publish(self, payload: Any, tasks: Sequence[Any], job_id: Optional[str] = None) -> str:
+        """Store a job's shared ``payload`` and enqueue ``tasks``; return the job id."""
+
+        job_id = job_id or uuid.uuid4().hex
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT INTO jobs (job_id, created_at, payload) VALUES (?, ?, ?)",
+                (job_id, time.time(), _dumps(payload)),
+            )
+            conn.executemany(
+                "INSERT INTO tasks (job_id, task_id, payload, status) VALUES (?, ?, ?, ?)",
+                [(job_id, index, _dumps(task), PENDING) for index, task in enumerate(tasks)],
+            )
+            conn.execute("COMMIT")
+        return job_id
+
+    def job_payload(self, job_id: str) -> Any:
+        with self._connect() as conn:
+            row = conn.execute("SELECT payload FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown job '{job_id}'")
+        return pickle.loads(row[0])
+
+    def claim(self, worker: str, lease_seconds: float = 300.0, job_id: Optional[str] = None) -> Optional[Task]:
+        """Lease the oldest claimable task, or return ``None`` when there is none."""
+
+        now = time.time()
+        job_filter, job_params = (" AND job_id = ?", [job_id]) if job_id is not None else ("", [])
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Expired leases used up their attempt; give up on tasks that have none left.
+            conn.execute(
+                "UPDATE tasks SET status = ?, lease_until = NULL,"
+                " error = 'lease of ' || worker || ' expired on attempt ' || attempts"
+                " WHERE status = ? AND lease_until < ? AND attempts >= ?" + job_filter,
+                [FAILED, RUNNING, now, self.max_attempts, *job_params],
+            )
+            row = conn.execute(
+                "SELECT job_id, task_id, payload, attempts FROM tasks"
+                " WHERE (status = ? OR (status = ? AND lease_until < ?))" + job_filter + " ORDER BY rowid LIMIT 1",
+                [PENDING, RUNNING, now, *job_params],
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            conn.execute(
+                "UPDATE tasks SET status = ?, worker = ?, attempts = attempts + 1, lease_until = ?"
+                " WHERE job_id = ? AND task_id = ?",
+                (RUNNING, worker, now + lease_seconds, row[0], row[1]),
+            )
+            conn.execute("COMMIT")
+        return Task(job_id=row[0], task_id=row[1], payload=pickle.loads(row[2]), attempts=row[3] + 1, worker=worker)
+
+    def heartbeat(self, task: Task, lease_seconds: float = 300.0) -> bool:
+        """Extend ``task``'s lease; ``False`` when the worker no longer holds it."""
+
+        return self._update_leased(task, "lease_until = ?", [time.time() + lease_seconds])
+
+    def complete(self, task: Task, result: Any) -> bool:
+        """Store ``result``; ``False`` (and nothing stored) when the lease was lost."""
+
+        return self._update_leased(task, "status = ?, result = ?, lease_until = NULL", [DONE, _dumps(result)])
+
+    def fail(self, task: Task, error: str) -> bool:
+        """Record a failure; the task is retried until ``max_attempts``."""
+
+        status = FAILED if task.attempts >= self.max_attempts else PENDING
+        return self._update_leased(task, "status = ?, error = ?, lease_until = NULL", [status, error])
+
+    def _update_leased(self, task: Task, assignments: str, params: List[Any]) -> bool:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"UPDATE tasks SET {assignments} WHERE job_id = ? AND task_id = ?"
+                " AND status = ? AND worker = ? AND lease_until > ?",
+                [*params, task.job_id, task.task_id, RUNNING, task.worker, time.time()],
+            )
+            return cursor.rowcount == 1
+
+    def progress(self, job_id: str) -> Dict[str, int]:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM tasks WHERE job_id = ? GROUP BY status", (job_id,))
+            counts = {status: 0 for status in (PENDING, RUNNING, DONE, FAILED)}
+            counts.update({status: count for status, count in rows})
+        return counts
+
+    def results(self, job_id: str) -> List[Any]:
+        """Results of the job's completed tasks in task order."""
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT result FROM tasks WHERE job_id = ? AND status = ? ORDER BY task_id", (job_id, DONE)
+            ).fetchall()
+        return [pickle.loads(row[0]) for row in rows]
+
+    def errors(self, job_id: str) -> Dict[int, str]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT task_id, error FROM tasks WHERE job_id = ? AND status = ?", (job_id, FAILED)
+            ).fetchall()
+        return {task_id: error for task_id, error in rows}
+
+
+def _dumps(value: Any) -> bytes:
+    return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
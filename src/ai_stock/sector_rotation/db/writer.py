@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from datetime import date
-from typing import Dict, Iterable, List, Sequence
+from typing import Any, Dict, Iterable, List, Protocol, Sequence, Tuple
 
 from ..factors.leader_factor import LeaderCandidate
 from ..models.rps_predict import RpsCandidate
@@ -10,51 +10,87 @@ from ..models.strong_board import BoardScore
 from .database import Database
 
 
-def write_results(
-    db: Database,
+class ResultSink(Protocol):
+    """Anything accepting table records, e.g. :class:`Database` or ``AsyncWriter``."""
+
+    def append_many(self, table: str, records: Sequence[Dict[str, Any]]) -> None:
+        ...
+
+
+def build_result_records(
     run_date: date,
     board_scores: Iterable[BoardScore],
     rotation_candidates: Sequence[RpsCandidate],
     leaders: Dict[str, List[LeaderCandidate]],
-) -> None:
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """Return ``(table, record)`` pairs describing one analysis run."""
+
     iso_date = run_date.isoformat()
+    records: List[Tuple[str, Dict[str, Any]]] = []
     for score in board_scores:
-        db.append(
-            "strong_boards",
-            {
-                "run_date": iso_date,
-                "board_name": score.name or score.board,
-                "score": score.score,
-                "trend_score": float(score.breakdown.get("trend", 0.0)),
-                "hype_score": float(score.breakdown.get("hype", 0.0)),
-                "capital_score": float(score.breakdown.get("capital", 0.0)),
-                "leader_score": float(score.breakdown.get("leader", 0.0)),
-            },
-        )
-        for leader in leaders.get(score.board, []):
-            db.append(
-                "leaders",
+        records.append(
+            (
+                "strong_boards",
                 {
                     "run_date": iso_date,
                     "board_name": score.name or score.board,
-                    "stock_code": leader.symbol,
-                    "stock_name": leader.name,
-                    "is_leader": 1,
-                    "strength": leader.score,
+                    "score": score.score,
+                    "trend_score": float(score.breakdown.get("trend", 0.0)),
+                    "hype_score": float(score.breakdown.get("hype", 0.0)),
+                    "capital_score": float(score.breakdown.get("capital", 0.0)),
+                    "leader_score": float(score.breakdown.get("leader", 0.0)),
                 },
             )
+        )
+        for leader in leaders.get(score.board, []):
+            records.append(
+                (
+                    "leaders",
+                    {
+                        "run_date": iso_date,
+                        "board_name": score.name or score.board,
+                        "stock_code": leader.symbol,
+                        "stock_name": leader.name,
+                        "is_leader": 1,
+                        "strength": leader.score,
+                    },
+                )
+            )
 
     for candidate in rotation_candidates:
         breakdown = candidate.breakdown
-        db.append(
-            "rps_candidates",
-            {
-                "run_date": iso_date,
-                "board_name": candidate.name or candidate.board,
-                "rps_score": candidate.predicted,
-                "relative_lag": float(breakdown.get("relative_lag", 0.0)),
-                "capital_spillover": float(breakdown.get("capital_spillover", 0.0)),
-                "hype_spillover": float(breakdown.get("hype_spillover", 0.0)),
-                "tech_ready": float(breakdown.get("technical_readiness", 0.0)),
-            },
+        records.append(
+            (
+                "rps_candidates",
+                {
+                    "run_date": iso_date,
+                    "board_name": candidate.name or candidate.board,
+                    "rps_score": candidate.predicted,
+                    "relative_lag": float(breakdown.get("relative_lag", 0.0)),
+                    "capital_spillover": float(breakdown.get("capital_spillover", 0.0)),
+                    "hype_spillover": float(breakdown.get("hype_spillover", 0.0)),
+                    "tech_ready": float(breakdown.get("technical_readiness", 0.0)),
+                },
+            )
         )
+    return records
+
+
+def write_results(
+    db: Database | ResultSink,
+    run_date: date,
+    board_scores: Iterable[BoardScore],
+    rotation_candidates: Sequence[RpsCandidate],
+    leaders: Dict[str, List[LeaderCandidate]],
+) -> None:
+    """Write one run to ``db`` using one batch per table.
+
+    ``db`` may also be an :class:`~.async_writer.AsyncWriter`, in which case
+    the records are only enqueued and the call returns immediately.
+    """
+
+    grouped: Dict[str, List[Dict[str, Any]]] = {}
+    for table, record in build_result_records(run_date, board_scores, rotation_candidates, leaders):
+        grouped.setdefault(table, []).append(record)
+    for table, records in grouped.items():
+        db.append_many(table, records)
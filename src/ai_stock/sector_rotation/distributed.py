@@ -0,0 +1,221 @@
+"""Multi-node board sharding through a shared task queue.
+
+The coordinator lists boards and constituents once, stores them as a job
+in a :class:`~.db.task_queue.TaskQueue` and enqueues one task per shard of
+boards.  Workers on any host that can open the queue claim shards, fetch
+and score them (:func:`~.sharded.score_shard`) and store the per-board
+factor components; the coordinator merges them and runs ranking,
+prediction, reporting and persistence like a single-process run.  Workers
+renew their lease while scoring; a worker that dies loses only its lease
+and the shard is handed out again.
+
+    # on the coordinator (optionally also working on shards)
+    python -m ai_stock.sector_rotation.distributed coordinator --queue /shared/queue.sqlite --db results.sqlite
+    # on every worker host
+    python -m ai_stock.sector_rotation.distributed worker --queue /shared/queue.sqlite
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import socket
+import sys
+import threading
+import time as time_module
+import traceback
+from contextlib import contextmanager
+from dataclasses import replace
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .config import AnalysisConfig
+from .data.universe_filter import merge_reports
+from .db.async_writer import AsyncWriter
+from .db.task_queue import FAILED, PENDING, RUNNING, Task, TaskQueue
+from .sharded import ShardPayload, ShardResult, build_payload, finish_analysis, score_shard, shard_boards
+from .utils import akshare_helper, logger
+from .utils.profiler import StageProfiler
+
+
+LOGGER = logger.get_logger(__name__)
+
+DEFAULT_SHARD_SIZE = 25
+DEFAULT_LEASE_SECONDS = 600.0
+
+
+def publish_job(
+    queue: TaskQueue,
+    cfg: AnalysisConfig,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    profiler: Optional[StageProfiler] = None,
+) -> str:
+    """List boards for ``cfg`` and enqueue them in shards of ``shard_size``."""
+
+    payload = build_payload(cfg, profiler or StageProfiler.disabled())
+    boards = list(payload.boards.values())
+    shard_count = max(1, -(-len(boards) // max(1, shard_size)))
+    tasks = [[board.code for board in shard] for shard in shard_boards(boards, shard_count)]
+    job_id = queue.publish(payload, tasks)
+    LOGGER.info("Published job %s: %d boards in %d shards", job_id, len(boards), len(tasks))
+    return job_id
+
+
+def run_worker(
+    queue: TaskQueue,
+    worker_id: Optional[str] = None,
+    job_id: Optional[str] = None,
+    lease_seconds: float = DEFAULT_LEASE_SECONDS,
+    poll_interval: float = 2.0,
+    idle_timeout: Optional[float] = None,
+    max_tasks: Optional[int] = None,
+) -> int:
+    """Process shards until the queue stays empty for ``idle_timeout`` seconds.
+
+    With ``idle_timeout=None`` the worker keeps polling forever.  Returns
+    the number of shards completed.
+    """
+
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    payloads: Dict[str, ShardPayload] = {}
+    completed = 0
+    idle_since = time_module.monotonic()
+    while max_tasks is None or completed < max_tasks:
+        task = queue.claim(worker_id, lease_seconds=lease_seconds, job_id=job_id)
+        if task is None:
+            if idle_timeout is not None and time_module.monotonic() - idle_since >= idle_timeout:
+                break
+            time_module.sleep(poll_interval)
+            continue
+
+        payload = payloads.get(task.job_id)
+        if payload is None:
+            payload = payloads[task.job_id] = queue.job_payload(task.job_id)
+        try:
+            # Mirror the coordinator's offline/replay mode for reproducible runs.
+            with _lease_heartbeat(queue, task, lease_seconds), akshare_helper.use_source(payload.source):
+                result = score_shard(payload, task.payload)
+        except Exception:  # pragma: no cover - network dependent
+            LOGGER.exception("Shard %s/%d failed on %s", task.job_id, task.task_id, worker_id)
+            queue.fail(task, traceback.format_exc(limit=5))
+        else:
+            if queue.complete(task, result):
+                completed += 1
+            else:
+                LOGGER.warning("Dropped shard %s/%d: %s lost its lease", task.job_id, task.task_id, worker_id)
+        idle_since = time_module.monotonic()
+    return completed
+
+
+@contextmanager
+def _lease_heartbeat(queue: TaskQueue, task: Task, lease_seconds: float) -> Iterator[None]:
+    """Renew ``task``'s lease every third of ``lease_seconds`` while the block runs."""
+
+    stop = threading.Event()
+
+    def renew() -> None:
+        while not stop.wait(lease_seconds / 3):
+            if not queue.heartbeat(task, lease_seconds):
+                LOGGER.warning("Lease on shard %s/%d expired", task.job_id, task.task_id)
+                return
+
+    thread = threading.Thread(target=renew, name=f"lease-{task.job_id}-{task.task_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def collect_job(
+    queue: TaskQueue,
+    job_id: str,
+    timeout: Optional[float] = None,
+    poll_interval: float = 2.0,
+    work: bool = False,
+) -> List[ShardResult]:
+    """Wait until every shard of ``job_id`` finished and return the results.
+
+    With ``work`` the coordinator processes shards itself while waiting.
+    Raises ``TimeoutError`` after ``timeout`` seconds and ``RuntimeError``
+    when shards failed permanently.
+    """
+
+    started = time_module.monotonic()
+    while True:
+        progress = queue.progress(job_id)
+        if progress[FAILED]:
+            raise RuntimeError(f"{progress[FAILED]} shards of job {job_id} failed: {queue.errors(job_id)}")
+        if not progress[PENDING] and not progress[RUNNING]:
+            return queue.results(job_id)
+        if timeout is not None and time_module.monotonic() - started >= timeout:
+            raise TimeoutError(f"Job {job_id} unfinished after {timeout:.0f}s: {progress}")
+        if work and run_worker(queue, job_id=job_id, max_tasks=1, idle_timeout=0):
+            continue
+        time_module.sleep(poll_interval)
+
+
+def run_coordinator(
+    queue: TaskQueue,
+    cfg: Optional[AnalysisConfig] = None,
+    db_path: Optional[Path] = None,
+    writer: Optional[AsyncWriter] = None,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    timeout: Optional[float] = None,
+    work: bool = True,
+    profiler: Optional[StageProfiler] = None,
+) -> Dict[str, object]:
+    """Publish a run, wait for the workers and rank the merged scores."""
+
+    cfg = cfg or AnalysisConfig.daily_defaults()
+    profiler = profiler or StageProfiler()
+    checkpoint = akshare_helper.telemetry_checkpoint()
+    job_id = publish_job(queue, cfg, shard_size=shard_size, profiler=profiler)
+    boards = list(queue.job_payload(job_id).boards.values())
+    with profiler.stage("shards", items=len(boards)):
+        results = collect_job(queue, job_id, timeout=timeout, work=work)
+
+    # Every worker screened the constituents of its own shards.
+    universe = merge_reports(shard.universe for shard in results)
+    result = finish_analysis(cfg, boards, results, db_path, writer, profiler, checkpoint, universe=universe)
+    workers: Dict[str, int] = {}
+    for shard in results:
+        workers[shard.worker] = workers.get(shard.worker, 0) + len(shard.boards)
+    result["distributed"] = {"job_id": job_id, "shards": len(results), "boards_per_worker": workers}
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Distributed sector rotation runs over a shared task queue")
+    parser.add_argument("role", choices=("coordinator", "worker"))
+    parser.add_argument("--queue", type=Path, required=True, help="SQLite queue file on shared storage")
+    parser.add_argument("--db", type=Path, default=None, help="Results database (coordinator)")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None, help="Session to analyse (YYYY-MM-DD)")
+    parser.add_argument("--boards", type=int, default=None, help="Universe size (coordinator)")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="Boards per task")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds to wait for the workers")
+    parser.add_argument("--no-work", action="store_true", help="Coordinator only waits instead of scoring shards")
+    parser.add_argument("--idle-timeout", type=float, default=None, help="Worker exits after idling this long")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s - %(message)s")
+
+    queue = TaskQueue(args.queue)
+    if args.role == "worker":
+        completed = run_worker(queue, idle_timeout=args.idle_timeout)
+        logger.get_logger(__name__).info("Worker finished after %d shards", completed)
+        return 0
+
+    cfg = AnalysisConfig.daily_defaults(args.as_of)
+    if args.boards is not None:
+        cfg = replace(cfg, board_count=args.boards)
+    result = run_coordinator(
+        queue, cfg, db_path=args.db, shard_size=args.shard_size, timeout=args.timeout, work=not args.no_work
+    )
+    print(result["report"])
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    sys.exit(main())
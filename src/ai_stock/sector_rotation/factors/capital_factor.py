@@ -2,11 +2,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List
+
+import numpy as np
 
 from ..data.board_money import BoardMoneyFlow, StockMoneyFlow
 from ..utils.indicators import moving_average
 
+if TYPE_CHECKING:  # pragma: no cover
+    from ..data.factor_panels import FactorPanels
+
 
 @dataclass(frozen=True)
 class CapitalComponents:
@@ -40,6 +45,37 @@ def calculate_capital_factor(money_flow: Dict[str, List[BoardMoneyFlow]]) -> Dic
     return results
 
 
+def calculate_capital_factor_from_panels(panels: "FactorPanels") -> Dict[str, CapitalComponents]:
+    """:func:`calculate_capital_factor` over the money-flow panels, all boards at once."""
+
+    net, counts = panels.aligned("net_inflow")
+    main, _ = panels.aligned("main_inflow")
+    if net.shape[1] == 0:
+        return {}
+    sessions = np.maximum(counts, 1)
+    avg_net = np.nansum(net, axis=1) / sessions
+    avg_main = np.nansum(main, axis=1) / sessions
+    main_ratio = np.divide(avg_main, avg_net, out=np.zeros_like(avg_net), where=avg_net != 0)
+
+    streak = np.zeros(len(net), dtype=np.int64)
+    longest = np.zeros_like(streak)
+    for column in net.T:
+        # NaN padding compares False and only precedes a board's bars.
+        streak = np.where(column > 0, streak + 1, 0)
+        np.maximum(longest, streak, out=longest)
+    continuity = longest / sessions
+
+    return {
+        board: CapitalComponents(
+            avg_net_inflow=float(avg_net[row]),
+            main_ratio=float(main_ratio[row]),
+            continuity=float(continuity[row]),
+        )
+        for row, board in enumerate(panels.boards)
+        if counts[row]
+    }
+
+
 def calculate_stock_capital_factor(stock_flows: Dict[str, List[StockMoneyFlow]]) -> Dict[str, float]:
     ratios: Dict[str, float] = {}
     for symbol, flows in stock_flows.items():
@@ -2,11 +2,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List
+
+import numpy as np
 
 from ..data.board_hot import BoardHotMetric
 from ..utils.indicators import moving_average
 
+if TYPE_CHECKING:  # pragma: no cover
+    from ..data.factor_panels import FactorPanels
+
 
 @dataclass(frozen=True)
 class HypeComponents:
@@ -45,6 +50,39 @@ def calculate_hype_factor(hot_metrics: Dict[str, List[BoardHotMetric]]) -> Dict[
     return results
 
 
+def calculate_hype_factor_from_panels(panels: "FactorPanels") -> Dict[str, HypeComponents]:
+    """:func:`calculate_hype_factor` over the hot-metric panels, all boards at once."""
+
+    scores, counts = panels.aligned("hot_score")
+    mentions, _ = panels.aligned("mentions")
+    if scores.shape[1] == 0:
+        return {}
+    sessions = np.maximum(counts, 1)
+    avg_turnover_rate = np.nansum(scores, axis=1) / sessions
+    avg_turnover = np.nansum(mentions, axis=1) / sessions
+    hot_trend = _panel_momentum(scores, counts)
+    hot_change = _panel_momentum(mentions, counts)
+
+    return {
+        board: HypeComponents(
+            avg_turnover_rate=float(avg_turnover_rate[row]),
+            avg_turnover=float(avg_turnover[row]),
+            hot_trend=float(hot_trend[row]),
+            hot_change=float(hot_change[row]),
+        )
+        for row, board in enumerate(panels.boards)
+        if counts[row]
+    }
+
+
+def _panel_momentum(values: "np.ndarray", counts: "np.ndarray") -> "np.ndarray":
+    width = values.shape[1]
+    start = values[np.arange(len(values)), np.minimum(width - counts, width - 1)]
+    end = values[:, -1]
+    valid = (counts >= 2) & (start != 0)
+    return np.where(valid, (end - start) / np.where(valid, start, 1.0), 0.0)
+
+
 def _momentum(values: List[float]) -> float:
     if len(values) < 2:
         return 0.0
@@ -2,11 +2,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
 
+from ..data.membership import MembershipMatrix
 from ..data.stock_data import BoardComponentQuote, StockBar
 from ..utils.indicators import moving_average, rate_of_change
 
+if TYPE_CHECKING:  # pragma: no cover
+    from ..data.factor_panels import FactorPanels
+
 
 @dataclass(frozen=True)
 class LeaderCandidate:
@@ -52,14 +56,48 @@ def create_empty_leader_components(board: str) -> LeaderComponents:
 
 def calculate_leader_factor(
     board_quotes: Dict[str, List[BoardComponentQuote]],
-    stock_history: Dict[str, List[StockBar]],
+    stock_history: Mapping[str, Sequence[StockBar]],
     top_n: int = 3,
     limit_threshold: float = 9.5,
 ) -> Tuple[Dict[str, List[LeaderCandidate]], Dict[str, LeaderComponents]]:
     """Return leader candidates and aggregated board level metrics."""
 
+    def history_return(symbol: str) -> Optional[float]:
+        history = stock_history.get(symbol, [])
+        return rate_of_change([bar.close for bar in history]) if history else None
+
+    return _leaders(board_quotes, history_return, top_n, limit_threshold)
+
+
+def calculate_leader_factor_from_panels(
+    board_quotes: Dict[str, List[BoardComponentQuote]],
+    closes: "FactorPanels",
+    top_n: int = 3,
+    limit_threshold: float = 9.5,
+) -> Tuple[Dict[str, List[LeaderCandidate]], Dict[str, LeaderComponents]]:
+    """:func:`calculate_leader_factor` reading closes from a symbol × session panel.
+
+    ``closes`` is laid out like :func:`~..data.factor_panels.build_close_panel`.
+    """
+
+    def history_return(symbol: str) -> Optional[float]:
+        if symbol not in closes:
+            return None
+        values = closes.values("close", symbol)
+        return rate_of_change(values.tolist()) if len(values) else None
+
+    return _leaders(board_quotes, history_return, top_n, limit_threshold)
+
+
+def _leaders(
+    board_quotes: Dict[str, List[BoardComponentQuote]],
+    history_return: Callable[[str], Optional[float]],
+    top_n: int,
+    limit_threshold: float,
+) -> Tuple[Dict[str, List[LeaderCandidate]], Dict[str, LeaderComponents]]:
     leader_candidates: Dict[str, List[LeaderCandidate]] = {}
-    leader_components: Dict[str, LeaderComponents] = {}
+    # A stock leading several boards has its history return computed once.
+    history_returns: Dict[str, Optional[float]] = {}
 
     for board, quotes in board_quotes.items():
         if not quotes:
@@ -68,21 +106,12 @@ def calculate_leader_factor(
         selected = sorted_quotes[:top_n]
 
         candidates: List[LeaderCandidate] = []
-        limit_up_count = 0
-        turnover_share = 0.0
-        returns: List[float] = []
-
         for quote in selected:
-            history = stock_history.get(quote.symbol, [])
-            if history:
-                ret = rate_of_change([bar.close for bar in history])
-            else:
+            if quote.symbol not in history_returns:
+                history_returns[quote.symbol] = history_return(quote.symbol)
+            ret = history_returns[quote.symbol]
+            if ret is None:
                 ret = quote.pct_change / 100.0
-            turnover_share += quote.turnover_share
-            is_limit_up = quote.pct_change >= limit_threshold
-            if is_limit_up:
-                limit_up_count += 1
-            returns.append(ret)
             candidates.append(
                 LeaderCandidate(
                     symbol=quote.symbol,
@@ -90,21 +119,49 @@ def calculate_leader_factor(
                     return_pct=ret,
                     pct_change=quote.pct_change,
                     turnover_share=quote.turnover_share,
-                    is_limit_up=is_limit_up,
+                    is_limit_up=quote.pct_change >= limit_threshold,
                 )
             )
 
-        if not candidates:
-            continue
-
-        avg_return = sum(returns) / len(returns) if returns else 0.0
-        leader_candidates[board] = candidates
-        leader_components[board] = LeaderComponents(
+        if candidates:
+            leader_candidates[board] = candidates
+
+    return leader_candidates, aggregate_leaders(leader_candidates)
+
+
+def aggregate_leaders(leader_candidates: Dict[str, List[LeaderCandidate]]) -> Dict[str, LeaderComponents]:
+    """Board level leader metrics, summed over a board × leader membership matrix."""
+
+    # Every value comes from one board's snapshot (a stock leading two boards may
+    # show a different change in each), so columns are (board, symbol) entries;
+    # turnover shares are relative to each board and serve as the entry weights.
+    members = {
+        board: [(board, candidate.symbol) for candidate in candidates] for board, candidates in leader_candidates.items()
+    }
+    shares = {
+        board: [candidate.turnover_share for candidate in candidates] for board, candidates in leader_candidates.items()
+    }
+    leaders = MembershipMatrix.from_members(members, weights=shares)
+    entries = {
+        (board, candidate.symbol): candidate
+        for board, candidates in leader_candidates.items()
+        for candidate in candidates
+    }
+    returns = leaders.vector({key: candidate.return_pct for key, candidate in entries.items()})
+    limit_up = leaders.vector({key: 1.0 for key, candidate in entries.items() if candidate.is_limit_up})
+
+    counts = leaders.counts(weighted=False)
+    limit_up_counts = leaders.matvec(limit_up, weighted=False)
+    turnover_shares = leaders.counts()
+    avg_returns = leaders.matvec(returns, weighted=False) / counts
+
+    return {
+        board: LeaderComponents(
             board=board,
-            limit_up_count=limit_up_count,
-            leader_turnover_share=turnover_share,
-            avg_leader_return=avg_return,
-            leader_symbols=[candidate.symbol for candidate in candidates],
+            limit_up_count=int(limit_up_counts[row]),
+            leader_turnover_share=float(turnover_shares[row]),
+            avg_leader_return=float(avg_returns[row]),
+            leader_symbols=[candidate.symbol for candidate in leader_candidates[board]],
         )
-
-    return leader_candidates, leader_components
+        for row, board in enumerate(leaders.boards)
+    }
@@ -2,11 +2,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable, List, Tuple
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from ..data.board_price import BoardPriceBar
 from ..utils.indicators import moving_average, rate_of_change
 
+if TYPE_CHECKING:  # pragma: no cover
+    from ..data.factor_panels import FactorPanels
+
 
 HS300_SYMBOL = "000300"
 
@@ -71,6 +76,48 @@ def calculate_trend_factor(
     return results
 
 
+def calculate_trend_factor_from_panels(
+    panels: "FactorPanels",
+    index_closes: Optional[Sequence[float]] = None,
+) -> Dict[str, TrendComponents]:
+    """:func:`calculate_trend_factor` over the ``close`` panel, all boards at once."""
+
+    closes, counts = panels.aligned("close")
+    if closes.shape[1] == 0:
+        return {}
+    return_3d = _panel_window_return(closes, counts, 3)
+    return_5d = _panel_window_return(closes, counts, 5)
+    return_10d = _panel_window_return(closes, counts, 10)
+    ma_signal = _panel_tail_mean(closes, counts, 5) - _panel_tail_mean(closes, counts, 10)
+    excess = np.zeros(len(closes))
+    if index_closes:
+        excess = return_10d - _window_return(list(index_closes), 10)
+
+    return {
+        board: TrendComponents(
+            return_3d=float(return_3d[row]),
+            return_5d=float(return_5d[row]),
+            return_10d=float(return_10d[row]),
+            excess_vs_hs300=float(excess[row]),
+            ma_signal=float(ma_signal[row]),
+        )
+        for row, board in enumerate(panels.boards)
+        if counts[row]
+    }
+
+
+def _panel_window_return(closes: "np.ndarray", counts: "np.ndarray", window: int) -> "np.ndarray":
+    span = np.clip(counts - 1, 0, window)
+    start = closes[np.arange(len(closes)), closes.shape[1] - 1 - span]
+    end = closes[:, -1]
+    valid = (counts >= 2) & (start != 0)
+    return np.where(valid, (end - start) / np.where(valid, start, 1.0), 0.0)
+
+
+def _panel_tail_mean(values: "np.ndarray", counts: "np.ndarray", window: int) -> "np.ndarray":
+    return np.nansum(values[:, -window:], axis=1) / np.maximum(np.minimum(counts, window), 1)
+
+
 def _window_return(closes: List[float], window: int) -> float:
     if len(closes) < 2:
         return 0.0
@@ -0,0 +1,193 @@
+"""Intraday refresh of the rotation signals.
+
+A full :func:`~.main.run_daily_analysis` re-downloads every history series,
+which is far too slow to repeat every few minutes during the session.
+:class:`IntradaySession` loads the closed-day data once (up to the previous
+trading session) and each :meth:`IntradaySession.tick` only refreshes the
+live pieces:
+
+* board spot quotes (one request per board category) become a provisional
+  bar for today, feeding the trend and hype factors;
+* constituent snapshots replace the component quotes used by the leader
+  factor and provide today's stock bar.
+
+Money flow and the lead-lag graph (built once from the closed sessions,
+see :mod:`.models.lead_lag`) are reused as is; with ``db_path`` the graph
+advances the lead-lag state persisted next to the database.  The stock hot rank feeds no
+factor, so ticks do not request it.  Boards without a live
+quote keep their closed history and are listed under ``stale_boards``.
+"""
+from __future__ import annotations
+
+import time as time_module
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from .config import AnalysisConfig
+from .data import board_hot, board_price, stock_data
+from .data.board_data import Board
+from .main import (
+    MarketData,
+    analyse_market_data,
+    lead_lag_start,
+    lead_lag_state_path,
+    load_market_data,
+    lookback_panels,
+    track_follow_graph,
+)
+from .utils import akshare_helper, logger
+
+
+class IntradaySession:
+    """Closed-day data for one session plus cheap live refreshes."""
+
+    def __init__(
+        self,
+        cfg: Optional[AnalysisConfig] = None,
+        session_day: Optional[date] = None,
+        snapshot_workers: int = 8,
+        db_path: Optional[Path] = None,
+    ) -> None:
+        self.session_day = session_day or date.today()
+        base = cfg or AnalysisConfig.daily_defaults(self.session_day)
+        self.cfg = replace(base, end_date=self.session_day)
+        self.closed_cfg = replace(base, end_date=akshare_helper.previous_trading_day(self.session_day))
+        self.snapshot_workers = max(1, snapshot_workers)
+        self.ticks = 0
+        self._log = logger.get_logger(__name__)
+
+        started = time_module.perf_counter()
+        state_path = lead_lag_state_path(db_path)
+        self.closed: MarketData = load_market_data(
+            self.closed_cfg, lead_lag_start=lead_lag_start(self.closed_cfg, state_path)
+        )
+        self.follow_graph = track_follow_graph(
+            self.closed_cfg,
+            self.closed.boards,
+            self.closed.price_history,
+            self.closed.money_flow,
+            state_path=state_path,
+            lookback=lookback_panels(self.closed),
+        ).graph()
+        self._log.info(
+            "Loaded closed-day data up to %s for %d boards in %.2fs",
+            self.closed_cfg.end_date.isoformat(),
+            len(self.closed.boards),
+            time_module.perf_counter() - started,
+        )
+
+    def tick(self) -> Dict[str, object]:
+        """Refresh live snapshots and recompute factors and rankings."""
+
+        started = time_module.perf_counter()
+        day = self.session_day
+        closed = self.closed
+
+        spot: Dict[str, Dict[str, float]] = {}
+        for category in sorted({board.category for board in closed.boards}):
+            spot.update(akshare_helper.board_spot_quotes(category))
+
+        price_history: Dict[str, List[board_price.BoardPriceBar]] = {}
+        hot_metrics: Dict[str, List[board_hot.BoardHotMetric]] = {}
+        stale: List[str] = []
+        for board in closed.boards:
+            bars = closed.price_history.get(board.code, [])
+            metrics = closed.hot_metrics.get(board.code, [])
+            quote = spot.get(board.code)
+            if not bars or quote is None or quote.get("price", 0.0) <= 0:
+                stale.append(board.code)
+                if bars:
+                    price_history[board.code] = bars
+                if metrics:
+                    hot_metrics[board.code] = metrics
+                continue
+
+            prev = bars[-1]
+            # Float shares do not change intraday, so volume and turnover
+            # scale with the turnover rate relative to the last session.
+            ratio = quote["turnover_rate"] / prev.turnover_rate if prev.turnover_rate else 1.0
+            live = {
+                "close": quote["price"],
+                "change_pct": quote.get("change_pct", 0.0),
+                "change_amount": quote.get("change_amount", 0.0),
+                "turnover_rate": quote["turnover_rate"],
+                "volume": prev.volume * ratio,
+                "turnover": prev.turnover * ratio,
+            }
+            price_history[board.code] = board_price.append_live_bar(bars, board, day, live)
+            hot_metrics[board.code] = [metric for metric in metrics if metric.date < day] + [
+                board_hot.BoardHotMetric(
+                    board=board.code,
+                    category=board.category,
+                    date=day,
+                    hot_score=live["turnover_rate"],
+                    mentions=live["volume"],
+                )
+            ]
+
+        component_quotes = self._refresh_component_quotes(closed.boards)
+        stock_history = self._with_live_stock_bars(component_quotes)
+
+        data = MarketData(
+            boards=closed.boards,
+            price_history=price_history,
+            money_flow=closed.money_flow,
+            hot_metrics=hot_metrics,
+            board_members=closed.board_members,
+            stock_history=stock_history,
+            component_quotes=component_quotes,
+        )
+        result = dict(analyse_market_data(self.cfg, data, follow_graph=self.follow_graph).result)
+
+        elapsed = time_module.perf_counter() - started
+        self.ticks += 1
+        result["intraday"] = {
+            "as_of": datetime.now().isoformat(timespec="seconds"),
+            "session_day": day,
+            "tick": self.ticks,
+            "elapsed": elapsed,
+            "stale_boards": stale,
+        }
+        self._log.info("Intraday tick %d finished in %.2fs (%d stale boards)", self.ticks, elapsed, len(stale))
+        return result
+
+    def _refresh_component_quotes(self, boards: List[Board]) -> Dict[str, List[stock_data.BoardComponentQuote]]:
+        def load(board: Board) -> List[stock_data.BoardComponentQuote]:
+            return stock_data.fetch_board_component_quotes(
+                board,
+                limit=80,
+                members=self.closed.board_members.get(board.code),
+                refresh=True,
+            )
+
+        with ThreadPoolExecutor(max_workers=self.snapshot_workers) as pool:
+            return dict(zip((board.code for board in boards), pool.map(load, boards)))
+
+    def _with_live_stock_bars(
+        self,
+        component_quotes: Dict[str, List[stock_data.BoardComponentQuote]],
+    ) -> Dict[str, List[stock_data.StockBar]]:
+        day = self.session_day
+        history = {
+            symbol: [bar for bar in bars if bar.date < day]
+            for symbol, bars in self.closed.stock_history.items()
+        }
+        for quotes in component_quotes.values():
+            for quote in quotes:
+                bars = history.setdefault(quote.symbol, [])
+                if bars and bars[-1].date == day:
+                    continue
+                bars.append(
+                    stock_data.StockBar(
+                        symbol=quote.symbol,
+                        date=day,
+                        close=quote.last_price,
+                        turnover_rate=quote.turnover_rate,
+                        turnover=quote.turnover,
+                        pct_change=quote.pct_change,
+                    )
+                )
+        return history
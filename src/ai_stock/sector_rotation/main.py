@@ -1,141 +1,520 @@
 """Entry point for the sector rotation workflow."""
 from __future__ import annotations
 
-from dataclasses import asdict
-from datetime import date
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
 
 from . import config as config_module
 from .config import AnalysisConfig
-from .data import board_data, board_hot, board_money, board_price, stock_data
+from .data import (
+    board_data,
+    board_hot,
+    board_money,
+    board_price,
+    board_similarity,
+    factor_panels,
+    stock_data,
+    universe_filter,
+)
+from .db.async_writer import AsyncWriter
 from .db.database import Database
 from .db.writer import write_results
 from .factors import capital_factor, hype_factor, leader_factor, rotation_factor, trend_factor
-from .models import rps_predict, strong_board
+from .models import lead_lag, rps_predict, strong_board
 from .reports import daily_report, visualization
 from .strategy import board_selection, position_control, stock_selection
-from .utils import logger
+from .utils import akshare_helper, logger
+from .utils.profiler import StageProfiler
 
+if TYPE_CHECKING:  # pragma: no cover
+    from .data.board_similarity import BoardClusters
+    from .data.factor_panels import FactorPanels
+    from .models.lead_lag import FollowGraph, LeadLagState
 
-def _collect_board_members(boards: Iterable[board_data.Board]) -> Dict[str, List[str]]:
-    return {board.code: board_data.list_board_members(board) for board in boards}
+T = TypeVar("T")
 
+# Serialises saving the lead-lag state of a results database between threads of this process.
+_LEAD_LAG_LOCK = threading.Lock()
 
-def run_daily_analysis(
-    cfg: Optional[AnalysisConfig] = None,
-    db_path: Optional[Path] = None,
-) -> Dict[str, object]:
-    """Execute the full analysis tree and optionally persist the outcome."""
 
-    cfg = cfg or AnalysisConfig.daily_defaults()
-    log = logger.get_logger(__name__)
-    log.info(
-        "Running sector rotation analysis for %s to %s",
-        cfg.start_date.isoformat(),
-        cfg.end_date.isoformat(),
-    )
+def _collect_board_members(boards: Iterable[board_data.Board], as_of: Optional[date] = None) -> Dict[str, List[str]]:
+    return {board.code: board_data.list_board_members(board, as_of=as_of) for board in boards}
+
+
+@dataclass
+class MarketData:
+    """Inputs of the factor stage for one analysis window."""
+
+    boards: List[board_data.Board]
+    price_history: Dict[str, List[board_price.BoardPriceBar]]
+    money_flow: Dict[str, List[board_money.BoardMoneyFlow]]
+    hot_metrics: Dict[str, List[board_hot.BoardHotMetric]]
+    board_members: Dict[str, List[str]]
+    stock_history: Dict[str, List[stock_data.StockBar]]
+    component_quotes: Dict[str, List[stock_data.BoardComponentQuote]]
+    # Constituents screened out before fetching (None when no filter ran).
+    universe: Optional[universe_filter.UniverseReport] = None
+    # Board bars from the lead-lag lookback on; only loaded when requested (see load_market_data).
+    lead_lag_prices: Dict[str, List[board_price.BoardPriceBar]] = field(default_factory=dict)
+    lead_lag_flows: Dict[str, List[board_money.BoardMoneyFlow]] = field(default_factory=dict)
 
-    boards = board_data.list_boards(limit=cfg.board_count)
-    price_history = board_price.fetch_board_prices(boards, cfg.start_date, cfg.end_date)
-    money_flow = board_money.fetch_money_flow(boards, cfg.start_date, cfg.end_date)
-    hot_metrics = board_hot.fetch_board_hot(boards, cfg.start_date, cfg.end_date)
 
-    board_members = _collect_board_members(boards)
+@dataclass
+class FactorScores:
+    """Per-board factor components; boards are scored independently."""
 
-    all_stock_symbols = {symbol for symbols in board_members.values() for symbol in symbols}
+    trend: Dict[str, trend_factor.TrendComponents]
+    hype: Dict[str, hype_factor.HypeComponents]
+    capital: Dict[str, capital_factor.CapitalComponents]
+    leader_candidates: Dict[str, List[leader_factor.LeaderCandidate]]
+    leader_components: Dict[str, leader_factor.LeaderComponents]
+    # Bars kept for the cross-board lead-lag graph, which needs every board at once.
+    price_history: Dict[str, List[board_price.BoardPriceBar]] = field(default_factory=dict)
+    money_flow: Dict[str, List[board_money.BoardMoneyFlow]] = field(default_factory=dict)
 
-    stock_history = stock_data.fetch_stock_data(all_stock_symbols, cfg.start_date, cfg.end_date)
 
-    board_component_quotes = {
-        board.code: stock_data.fetch_board_component_quotes(
-            board,
-            limit=80,
-            history=stock_history,
-            target_date=cfg.end_date,
-            members=board_members.get(board.code),
+@dataclass
+class AnalysisOutcome:
+    """Everything computed from one :class:`MarketData` instance."""
+
+    top_selection: List[strong_board.BoardScore]
+    leader_picks: Dict[str, List[leader_factor.LeaderCandidate]]
+    rotation_candidates: List[rps_predict.RpsCandidate]
+    result: Dict[str, object]
+
+
+def load_market_data(
+    cfg: AnalysisConfig,
+    boards: Optional[List[board_data.Board]] = None,
+    profiler: Optional[StageProfiler] = None,
+    board_members: Optional[Dict[str, List[str]]] = None,
+    lead_lag_start: Optional[date] = None,
+) -> MarketData:
+    """Fetch every dataset the factor stage needs for ``cfg``'s window.
+
+    ``board_members`` supplies already known constituents (e.g. fetched
+    once by a coordinator); boards missing from it are looked up.  With
+    ``cfg.fetch_workers`` > 1 the requests of each stage are issued per
+    board (or per symbol) on that many threads; constituents shared by
+    several boards are fetched once.  Boards listed here (``boards`` is
+    ``None``) are collapsed by ``cfg.overlap_threshold`` once their
+    constituents are known, before any other request.  With
+    ``lead_lag_start`` (see :func:`lead_lag_start`) board prices and money
+    flow are requested from that day on and the earlier bars are kept
+    apart for the lead-lag graph, instead of fetching them again later.
+    """
+
+    profiler = profiler or StageProfiler.disabled()
+    with ExitStack() as stack:
+        pool = None
+        if cfg.fetch_workers > 1:
+            pool = stack.enter_context(ThreadPoolExecutor(cfg.fetch_workers, thread_name_prefix="fetch"))
+        listed = boards is None
+        if boards is None:
+            with profiler.stage("fetch.boards") as stage:
+                boards = board_data.list_boards(limit=cfg.board_count, categories=cfg.categories)
+                stage.items = len(boards)
+
+        with profiler.stage("fetch.members") as stage:
+            known = board_members or {}
+            board_members = _fetch_each(
+                pool, _collect_board_members, [board for board in boards if board.code not in known], cfg.end_date
+            )
+            board_members.update({board.code: known[board.code] for board in boards if board.code in known})
+            stage.items = sum(len(symbols) for symbols in board_members.values())
+        if listed:
+            # list_boards puts concept boards first; an industry board wins any overlap it is part of.
+            preferred = sorted(boards, key=lambda board: board.category != "industry")
+            kept, board_members = collapse_overlaps(cfg, preferred, board_members, profiler)
+            kept_codes = {board.code for board in kept}
+            boards = [board for board in boards if board.code in kept_codes]
+        board_members, universe = filter_universe(cfg, board_members, profiler)
+
+        first = min(cfg.start_date, lead_lag_start) if lead_lag_start is not None else cfg.start_date
+        with profiler.stage("fetch.board_prices") as stage:
+            price_history = _fetch_each(pool, board_price.fetch_board_prices, boards, first, cfg.end_date)
+            stage.items = sum(len(bars) for bars in price_history.values())
+        with profiler.stage("fetch.money_flow") as stage:
+            money_flow = _fetch_each(pool, board_money.fetch_money_flow, boards, first, cfg.end_date)
+            stage.items = sum(len(flows) for flows in money_flow.values())
+        with profiler.stage("fetch.hot_metrics") as stage:
+            # Same range as the prices: the hot proxies are derived from the cached price rows.
+            hot_metrics = _fetch_each(pool, board_hot.fetch_board_hot, boards, first, cfg.end_date)
+            stage.items = sum(len(metrics) for metrics in hot_metrics.values())
+        lead_lag_prices: Dict[str, List[board_price.BoardPriceBar]] = {}
+        lead_lag_flows: Dict[str, List[board_money.BoardMoneyFlow]] = {}
+        if first < cfg.start_date:
+            lead_lag_prices, lead_lag_flows = price_history, money_flow
+            price_history = board_price.trim_history(price_history, cfg.start_date)
+            money_flow = _since(money_flow, cfg.start_date)
+            hot_metrics = _since(hot_metrics, cfg.start_date)
+
+        all_stock_symbols = sorted({symbol for symbols in board_members.values() for symbol in symbols})
+
+        with profiler.stage("fetch.stock_history") as stage:
+            stock_history = _fetch_each(
+                pool, stock_data.fetch_stock_data, all_stock_symbols, cfg.start_date, cfg.end_date
+            )
+            stage.items = sum(len(bars) for bars in stock_history.values())
+
+    with profiler.stage("fetch.component_quotes") as stage:
+        board_component_quotes = stock_data.fetch_component_quotes(
+            boards, limit=80, history=stock_history, target_date=cfg.end_date, members=board_members
         )
-        for board in boards
+        stage.items = sum(len(quotes) for quotes in board_component_quotes.values())
+    return MarketData(
+        boards=list(boards),
+        price_history=price_history,
+        money_flow=money_flow,
+        hot_metrics=hot_metrics,
+        board_members=board_members,
+        stock_history=stock_history,
+        component_quotes=board_component_quotes,
+        universe=universe,
+        lead_lag_prices=lead_lag_prices,
+        lead_lag_flows=lead_lag_flows,
+    )
+
+
+def _since(series: Dict[str, List[T]], start: date) -> Dict[str, List[T]]:
+    """Keep the rows dated on or after ``start``, dropping boards left empty."""
+
+    return {
+        code: kept for code, rows in series.items() if (kept := [row for row in rows if row.date >= start])
     }
 
-    trend_scores = trend_factor.calculate_trend_factor(price_history)
-    hype_scores = hype_factor.calculate_hype_factor(hot_metrics)
-    capital_scores = capital_factor.calculate_capital_factor(money_flow)
 
-    leader_candidates, leader_components = leader_factor.calculate_leader_factor(
-        board_component_quotes,
-        stock_history,
-        top_n=cfg.leaders_per_board,
-    )
+def collapse_overlaps(
+    cfg: AnalysisConfig,
+    boards: List[board_data.Board],
+    members: Dict[str, List[str]],
+    profiler: Optional[StageProfiler] = None,
+) -> Tuple[List[board_data.Board], Dict[str, List[str]]]:
+    """Drop boards overlapping a kept board by ``cfg.overlap_threshold`` (see :mod:`.data.board_similarity`)."""
 
-    rotation_scores = rotation_factor.calculate_rotation_factor(
-        trend_scores,
-        capital_scores,
-        hype_scores,
-        leader_components,
-    )
+    if cfg.overlap_threshold is None:
+        return boards, members
+    profiler = profiler or StageProfiler.disabled()
+    with profiler.stage("plan.overlap") as stage:
+        kept, dropped = board_similarity.collapse_overlapping(boards, members, cfg.overlap_threshold)
+        stage.items = len(dropped)
+    if dropped:
+        logger.get_logger(__name__).info("Skipping %d boards overlapping another board: %s", len(dropped), dropped)
+    return kept, {board.code: members[board.code] for board in kept if board.code in members}
 
-    board_names = {board.code: board.name for board in boards}
-    board_rankings = strong_board.rank_boards(
-        trend_scores,
-        hype_scores,
-        capital_scores,
-        leader_components,
-        board_names,
-        cfg.factor_weights,
+
+def filter_universe(
+    cfg: AnalysisConfig,
+    members: Dict[str, List[str]],
+    profiler: Optional[StageProfiler] = None,
+) -> Tuple[Dict[str, List[str]], Optional[universe_filter.UniverseReport]]:
+    """Screen constituents by ``cfg.universe_rules`` (see :mod:`.data.universe_filter`).
+
+    The spot snapshot only describes the current session, so windows
+    ending before today are left untouched; suspensions are not judged
+    before the session opens.
+    """
+
+    if cfg.universe_rules is None or cfg.end_date < akshare_helper.session_today():
+        return members, None
+    profiler = profiler or StageProfiler.disabled()
+    with profiler.stage("filter.universe") as stage:
+        listing = universe_filter.fetch_listing()
+        rules = universe_filter.rules_at(cfg.universe_rules)
+        members, report = universe_filter.filter_members(members, listing, rules)
+        stage.items = report.requests_saved
+    logger.get_logger(__name__).info(
+        "Universe filter kept %d constituents and saved %d history requests", len(report.kept), report.requests_saved
     )
+    return members, report
 
-    top_selection = board_selection.select_primary_boards(
-        board_rankings, top_n=min(3, len(board_rankings)), min_score=0.0
+
+def _fetch_each(
+    pool: Optional[ThreadPoolExecutor],
+    fetch: Callable[..., Dict[str, T]],
+    items: Sequence[object],
+    *args: object,
+) -> Dict[str, T]:
+    """``fetch(items, *args)``, issued item by item on ``pool`` when given.
+
+    One task per item balances slow boards across threads; results keep
+    the order of ``items``.
+    """
+
+    if pool is None:
+        return fetch(items, *args)
+    merged: Dict[str, T] = {}
+    for part in pool.map(lambda item: fetch([item], *args), items):
+        merged.update(part)
+    return merged
+
+
+def merge_market_data(parts: Iterable[MarketData]) -> MarketData:
+    """Combine per-board loads (e.g. from shards) into one :class:`MarketData`."""
+
+    parts = list(parts)
+    merged = MarketData(
+        boards=[],
+        price_history={},
+        money_flow={},
+        hot_metrics={},
+        board_members={},
+        stock_history={},
+        component_quotes={},
     )
+    for part in parts:
+        merged.boards.extend(part.boards)
+        merged.price_history.update(part.price_history)
+        merged.money_flow.update(part.money_flow)
+        merged.hot_metrics.update(part.hot_metrics)
+        merged.board_members.update(part.board_members)
+        merged.stock_history.update(part.stock_history)
+        merged.component_quotes.update(part.component_quotes)
+        merged.lead_lag_prices.update(part.lead_lag_prices)
+        merged.lead_lag_flows.update(part.lead_lag_flows)
+    merged.universe = universe_filter.merge_reports(part.universe for part in parts)
+    return merged
+
 
-    predictions = rps_predict.predict_next_session(rotation_scores, cfg.rotation_weights)
-    rotation_candidates = rps_predict.predict_rotation_candidates(
-        top_selection,
-        rotation_scores,
-        cfg.rotation_weights,
-        top_n=min(5, len(rotation_scores)),
-        board_names=board_names,
+def slice_market_data(
+    data: MarketData, start: date, end: date, index: Optional["stock_data.BarIndex"] = None
+) -> MarketData:
+    """Restrict ``data`` to ``[start, end]`` without touching the network.
+
+    Used to derive many per-session windows from one wide data load;
+    component quotes are re-priced as of ``end`` from the sliced history.
+    Callers slicing the same load repeatedly pass a
+    :class:`~.data.bar_index.BarIndex` of ``data.stock_history`` built once.
+    """
+
+    def window(series: Dict[str, list]) -> Dict[str, list]:
+        sliced = {key: [item for item in items if start <= item.date <= end] for key, items in series.items()}
+        return {key: items for key, items in sliced.items() if items}
+
+    if index is None:
+        index = stock_data.BarIndex(data.stock_history)
+    stock_history = index.window(start, end)
+    component_quotes = stock_data.fetch_component_quotes(
+        data.boards,
+        limit=80,
+        history=index,
+        target_date=end,
+        members=data.board_members,
+        since=start,
     )
-    candidate_boards = board_selection.select_candidate_boards(
-        rotation_candidates,
-        exclude=[score.board for score in top_selection],
-        top_n=min(2, len(rotation_candidates)),
-        min_predicted=0.0,
+    return MarketData(
+        boards=data.boards,
+        price_history=window(data.price_history),
+        money_flow=window(data.money_flow),
+        hot_metrics=window(data.hot_metrics),
+        board_members=data.board_members,
+        stock_history=stock_history,
+        component_quotes=component_quotes,
+        universe=data.universe,
     )
 
-    leader_picks = stock_selection.select_leaders(top_selection, leader_candidates, cfg.leaders_per_board)
 
-    regime = position_control.assess_market_regime(top_selection, predictions)
-    allocations = position_control.allocate_portfolio(cfg.initial_cash, top_selection, regime)
+def compute_factors(
+    cfg: AnalysisConfig,
+    data: MarketData,
+    profiler: Optional[StageProfiler] = None,
+    panels: Optional["FactorPanels"] = None,
+) -> FactorScores:
+    """Score every board of ``data``; shards can be scored separately and merged.
+
+    ``panels`` built from the same boards and window (see
+    :mod:`.data.factor_panels`) replace the per-bar lists of ``data`` for
+    the trend, hype and capital factors.
+    """
 
-    report_text = daily_report.build_daily_report(
-        cfg.end_date,
-        top_selection,
-        leader_picks,
-        allocations,
-        predictions,
-        rotation_candidates,
-        candidate_boards,
-        regime,
+    profiler = profiler or StageProfiler.disabled()
+    if panels is not None:
+        with profiler.stage("factor.trend", items=len(panels.boards)):
+            trend_scores = trend_factor.calculate_trend_factor_from_panels(panels)
+        with profiler.stage("factor.hype", items=len(panels.boards)):
+            hype_scores = hype_factor.calculate_hype_factor_from_panels(panels)
+        with profiler.stage("factor.capital", items=len(panels.boards)):
+            capital_scores = capital_factor.calculate_capital_factor_from_panels(panels)
+    else:
+        with profiler.stage("factor.trend", items=len(data.price_history)):
+            trend_scores = trend_factor.calculate_trend_factor(data.price_history)
+        with profiler.stage("factor.hype", items=len(data.hot_metrics)):
+            hype_scores = hype_factor.calculate_hype_factor(data.hot_metrics)
+        with profiler.stage("factor.capital", items=len(data.money_flow)):
+            capital_scores = capital_factor.calculate_capital_factor(data.money_flow)
+
+    with profiler.stage("factor.leader", items=len(data.component_quotes)):
+        leader_candidates, leader_components = leader_factor.calculate_leader_factor(
+            data.component_quotes,
+            data.stock_history,
+            top_n=cfg.leaders_per_board,
+        )
+    return FactorScores(
+        trend=trend_scores,
+        hype=hype_scores,
+        capital=capital_scores,
+        leader_candidates=leader_candidates,
+        leader_components=leader_components,
+        price_history=data.price_history,
+        money_flow=data.money_flow,
     )
-    heatmap = visualization.rotation_heatmap(top_selection)
-    factor_table = visualization.factor_table(
-        trend_scores,
-        hype_scores,
-        capital_scores,
-        leader_components,
-        board_rankings,
+
+
+def merge_factor_scores(parts: Iterable[FactorScores]) -> FactorScores:
+    merged = FactorScores(trend={}, hype={}, capital={}, leader_candidates={}, leader_components={})
+    for part in parts:
+        merged.trend.update(part.trend)
+        merged.hype.update(part.hype)
+        merged.capital.update(part.capital)
+        merged.leader_candidates.update(part.leader_candidates)
+        merged.leader_components.update(part.leader_components)
+        merged.price_history.update(part.price_history)
+        merged.money_flow.update(part.money_flow)
+    return merged
+
+
+def analyse_market_data(
+    cfg: AnalysisConfig,
+    data: MarketData,
+    coverage: Optional[Dict[str, object]] = None,
+    profiler: Optional[StageProfiler] = None,
+    panels: Optional["FactorPanels"] = None,
+    follow_graph: Optional["FollowGraph"] = None,
+    lead_lag_state: Optional[Path] = None,
+) -> AnalysisOutcome:
+    """Run factors, models, strategy and reporting over loaded data.
+
+    ``coverage`` describes partially loaded universes (see
+    :mod:`.progressive`); it is flagged in the report and returned as-is.
+    ``panels`` is passed on to :func:`compute_factors`.  Without a
+    ``follow_graph`` the lead-lag state saved at ``lead_lag_state`` is
+    advanced (see :func:`track_follow_graph`).
+    """
+
+    profiler = profiler or StageProfiler.disabled()
+    factors = compute_factors(cfg, data, profiler=profiler, panels=panels)
+    clusters = None
+    if cfg.overlap_threshold is not None:
+        clusters = board_similarity.cluster_boards(data.board_members, threshold=cfg.overlap_threshold)
+    if follow_graph is None:
+        with profiler.stage("model.lead_lag", items=len(data.price_history)):
+            follow_graph = track_follow_graph(
+                cfg, data.boards, data.price_history, data.money_flow, lead_lag_state, lookback_panels(data)
+            ).graph()
+    outcome = analyse_factors(
+        cfg,
+        data.boards,
+        factors,
+        coverage=coverage,
+        profiler=profiler,
+        clusters=clusters,
+        follow_graph=follow_graph,
     )
-    rotation_path = visualization.rotation_pathway(rotation_candidates, predictions)
+    if data.universe is not None:
+        outcome.result["universe"] = data.universe.as_dict()
+    return outcome
 
-    if db_path is not None:
-        db = Database(db_path)
-        write_results(db, cfg.end_date, top_selection, rotation_candidates, leader_picks)
 
-    log.info("Report generated with %d boards", len(top_selection))
+def analyse_factors(
+    cfg: AnalysisConfig,
+    boards: List[board_data.Board],
+    factors: FactorScores,
+    coverage: Optional[Dict[str, object]] = None,
+    profiler: Optional[StageProfiler] = None,
+    clusters: Optional["BoardClusters"] = None,
+    follow_graph: Optional["FollowGraph"] = None,
+    lead_lag_state: Optional[Path] = None,
+) -> AnalysisOutcome:
+    """Rank, predict, select and report from (possibly merged) factor scores.
 
-    return {
+    With ``clusters`` at most one board per overlap cluster is selected.
+    ``follow_graph`` (see :mod:`.models.lead_lag`) is advanced from the bars
+    carried by ``factors`` when not given (see :func:`track_follow_graph`).
+    """
+
+    profiler = profiler or StageProfiler.disabled()
+    if follow_graph is None and factors.price_history:
+        with profiler.stage("model.lead_lag", items=len(factors.price_history)):
+            follow_graph = track_follow_graph(
+                cfg, boards, factors.price_history, factors.money_flow, state_path=lead_lag_state
+            ).graph()
+    trend_scores, hype_scores, capital_scores = factors.trend, factors.hype, factors.capital
+    leader_candidates, leader_components = factors.leader_candidates, factors.leader_components
+    with profiler.stage("factor.rotation") as stage:
+        rotation_scores = rotation_factor.calculate_rotation_factor(
+            trend_scores,
+            capital_scores,
+            hype_scores,
+            leader_components,
+        )
+        stage.items = len(rotation_scores)
+
+    board_names = {board.code: board.name for board in boards}
+    with profiler.stage("rank", items=len(boards)):
+        board_rankings = strong_board.rank_boards(
+            trend_scores,
+            hype_scores,
+            capital_scores,
+            leader_components,
+            board_names,
+            cfg.factor_weights,
+        )
+
+        top_selection = board_selection.select_primary_boards(
+            board_rankings, top_n=min(3, len(board_rankings)), min_score=0.0, clusters=clusters
+        )
+
+    with profiler.stage("predict", items=len(rotation_scores)):
+        predictions = rps_predict.predict_next_session(rotation_scores, cfg.rotation_weights)
+        rotation_candidates = rps_predict.predict_rotation_candidates(
+            top_selection,
+            rotation_scores,
+            cfg.rotation_weights,
+            top_n=min(5, len(rotation_scores)),
+            board_names=board_names,
+            follow_graph=follow_graph,
+        )
+        candidate_boards = board_selection.select_candidate_boards(
+            rotation_candidates,
+            exclude=[score.board for score in top_selection],
+            top_n=min(2, len(rotation_candidates)),
+            min_predicted=0.0,
+        )
+
+    with profiler.stage("select", items=len(top_selection)):
+        leader_picks = stock_selection.select_leaders(top_selection, leader_candidates, cfg.leaders_per_board)
+
+        regime = position_control.assess_market_regime(top_selection, predictions)
+        allocations = position_control.allocate_portfolio(cfg.initial_cash, top_selection, regime)
+
+    with profiler.stage("report"):
+        report_text = daily_report.build_daily_report(
+            cfg.end_date,
+            top_selection,
+            leader_picks,
+            allocations,
+            predictions,
+            rotation_candidates,
+            candidate_boards,
+            regime,
+            coverage=coverage,
+        )
+        heatmap = visualization.rotation_heatmap(top_selection)
+        factor_table = visualization.factor_table(
+            trend_scores,
+            hype_scores,
+            capital_scores,
+            leader_components,
+            board_rankings,
+        )
+        rotation_path = visualization.rotation_pathway(rotation_candidates, predictions, follow_graph)
+
+    result: Dict[str, object] = {
         "config": asdict(cfg),
         "selected_boards": [asdict(score) for score in top_selection],
         "allocations": allocations,
@@ -149,3 +528,156 @@ def run_daily_analysis(
         "factor_table": factor_table,
         "rotation_path": rotation_path,
     }
+    if follow_graph is not None:
+        result["follow_graph"] = [asdict(edge) for edges in follow_graph.edges.values() for edge in edges]
+    if coverage is not None:
+        result["coverage"] = coverage
+    return AnalysisOutcome(
+        top_selection=top_selection,
+        leader_picks=leader_picks,
+        rotation_candidates=rotation_candidates,
+        result=result,
+    )
+
+
+def lead_lag_panels(
+    boards: Sequence[board_data.Board], start: date, end: date, fetch_workers: int = 1
+) -> "FactorPanels":
+    """Close and net inflow panels of ``boards`` over ``[start, end]`` for the lead-lag matrices."""
+
+    with ExitStack() as stack:
+        pool = None
+        if fetch_workers > 1:
+            pool = stack.enter_context(ThreadPoolExecutor(fetch_workers, thread_name_prefix="fetch"))
+        price_history = _fetch_each(pool, board_price.fetch_board_prices, boards, start, end)
+        money_flow = _fetch_each(pool, board_money.fetch_money_flow, boards, start, end)
+    return factor_panels.build_panels(price_history, money_flow, {})
+
+
+def track_follow_graph(
+    cfg: AnalysisConfig,
+    boards: Sequence[board_data.Board],
+    price_history: Dict[str, List[board_price.BoardPriceBar]],
+    money_flow: Dict[str, List[board_money.BoardMoneyFlow]],
+    state_path: Optional[Path] = None,
+    lookback: Optional["FactorPanels"] = None,
+) -> "LeadLagState":
+    """Lead-lag state as of ``cfg.end_date``, advanced by the sessions of the window.
+
+    The state saved at ``state_path`` is reused when its last session lies
+    within the window, so a daily run pushes just the new session.  A
+    missing or stale state (or none, without ``state_path``) is rebuilt
+    from ``lookback`` (see :func:`lookback_panels`), or else from
+    :data:`~.models.lead_lag.LOOKBACK_DAYS` of board history fetched here.
+    The state is only saved when it gets past the saved one, so runs for
+    earlier days (backfills, replays) leave it alone.
+    """
+
+    panels = factor_panels.build_panels(price_history, money_flow, {})
+    state = lead_lag.LeadLagState.load(state_path) if state_path is not None else lead_lag.LeadLagState()
+    if state.last is None or not panels.dates or not panels.dates[0] <= state.last <= panels.dates[-1]:
+        state = lead_lag.LeadLagState()
+        if lookback is None:
+            start = cfg.end_date - timedelta(days=lead_lag.LOOKBACK_DAYS)
+            lookback = lead_lag_panels(boards, start, cfg.end_date, cfg.fetch_workers)
+        state.advance(lookback.window(lookback.dates[0], cfg.end_date) if lookback.dates else lookback)
+    state.advance(panels)
+    if state_path is not None:
+        save_lead_lag_state(state, state_path)
+    return state
+
+
+def save_lead_lag_state(state: "LeadLagState", path: Path) -> bool:
+    """Save ``state`` at ``path`` unless the saved state is as recent; returns whether it was written."""
+
+    with _LEAD_LAG_LOCK:
+        saved = lead_lag.saved_as_of(path)
+        if state.last is None or (saved is not None and saved >= state.last):
+            return False
+        state.save(path)
+        return True
+
+
+def lead_lag_start(cfg: AnalysisConfig, state_path: Optional[Path]) -> Optional[date]:
+    """First day of board history the lead-lag graph of ``cfg`` needs beyond the window.
+
+    ``None`` when the state saved at ``state_path`` can simply be advanced.
+    """
+
+    saved = lead_lag.saved_as_of(state_path) if state_path is not None else None
+    if saved is not None and cfg.start_date <= saved <= cfg.end_date:
+        return None
+    return cfg.end_date - timedelta(days=lead_lag.LOOKBACK_DAYS)
+
+
+def lookback_panels(data: MarketData) -> Optional["FactorPanels"]:
+    """Panels of the lead-lag lookback loaded with ``data`` (``None`` when none was requested)."""
+
+    if not data.lead_lag_prices:
+        return None
+    return factor_panels.build_panels(data.lead_lag_prices, data.lead_lag_flows, {})
+
+
+def lead_lag_state_path(db_path: Optional[Path], writer: Optional[AsyncWriter] = None) -> Optional[Path]:
+    """Where runs persisting to ``writer`` (or ``db_path``) keep their lead-lag state."""
+
+    if writer is not None:
+        return lead_lag.state_path(writer.db.path)
+    return lead_lag.state_path(db_path) if db_path is not None else None
+
+
+def run_daily_analysis(
+    cfg: Optional[AnalysisConfig] = None,
+    db_path: Optional[Path] = None,
+    writer: Optional[AsyncWriter] = None,
+    profiler: Optional[StageProfiler] = None,
+    profile_memory: bool = False,
+) -> Dict[str, object]:
+    """Execute the full analysis tree and optionally persist the outcome.
+
+    When ``writer`` is given the results are handed to its queue and the
+    function returns without waiting for storage; call ``writer.flush()``
+    where durability matters.  Otherwise ``db_path`` is written synchronously.
+
+    Per-stage timings are returned under ``result["metrics"]``;
+    ``profile_memory`` additionally traces peak allocations (slower).
+    Data source latency, errors and synthetic fallbacks of this run are
+    returned under ``result["telemetry"]``.  Fetches share keep-alive
+    connections (:func:`~.utils.akshare_helper.pooled_http`).  The lead-lag
+    state is kept next to the results database (see :func:`track_follow_graph`).
+    """
+
+    cfg = cfg or AnalysisConfig.daily_defaults()
+    profiler = profiler or StageProfiler(trace_memory=profile_memory)
+    log = logger.get_logger(__name__)
+    log.info(
+        "Running sector rotation analysis for %s to %s",
+        cfg.start_date.isoformat(),
+        cfg.end_date.isoformat(),
+    )
+
+    checkpoint = akshare_helper.telemetry_checkpoint()
+    try:
+        with akshare_helper.pooled_http():
+            state_path = lead_lag_state_path(db_path, writer)
+            data = load_market_data(cfg, profiler=profiler, lead_lag_start=lead_lag_start(cfg, state_path))
+            outcome = analyse_market_data(cfg, data, profiler=profiler, lead_lag_state=state_path)
+
+        with profiler.stage("persist") as stage:
+            sink = writer if writer is not None else Database(db_path) if db_path is not None else None
+            if sink is not None:
+                write_results(
+                    sink, cfg.end_date, outcome.top_selection, outcome.rotation_candidates, outcome.leader_picks
+                )
+            stage.items = len(outcome.top_selection) + len(outcome.rotation_candidates)
+    finally:
+        profiler.close()
+
+    log.info("Report generated with %d boards", len(outcome.top_selection))
+    log.debug("Stage metrics:\n%s", profiler.summary())
+
+    outcome.result["metrics"] = profiler.as_dict()
+    telemetry = akshare_helper.telemetry_snapshot(since=checkpoint)
+    akshare_helper.warn_on_fallbacks(telemetry)
+    outcome.result["telemetry"] = telemetry
+    return outcome.result
@@ -0,0 +1,402 @@
+"""Lead–lag correlations between boards ("who follows whom").
+
+The rotation factor scores every board on its own.  Here each board's
+daily returns (and net money flow) are correlated with every other
+board's series ``1..max_lag`` sessions later: a high
+``corr(x_i[t], x_j[t + lag])`` says board ``j`` tends to follow ``i``.
+
+:class:`LeadLagMatrix` keeps, per lag, the six pairwise sums a Pearson
+correlation needs (count, sums, sums of squares and cross products over
+the sessions both boards traded) as ``boards × boards`` arrays.  A whole
+panel is folded in with one batched matrix product per lag; a new
+session is a rank-one update per lag, and with ``window`` the pairs that
+left the window are subtracted the same way, so a daily run updates the
+matrix in ``O(lags · boards²)`` instead of recomputing it.
+:func:`follow_graph` turns the strongest positive links into a
+:class:`FollowGraph` used by :mod:`.rps_predict` and the rotation
+pathway report.
+
+A graph over a short analysis window never reaches ``min_periods``, so
+daily runs keep a :class:`LeadLagState` next to the results database and
+push only the sessions it has not seen (one per daily run).  A missing or
+stale state is rebuilt from :data:`LOOKBACK_DAYS` of board history, the
+same span a backfill loads before each session, so a session's graph is
+the last ``window`` sessions before it however the runs were batched.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ..data.factor_panels import FactorPanels
+
+
+DEFAULT_MAX_LAG = 3
+DEFAULT_WINDOW = 60
+# Overlapping sessions a pair needs before its correlation is trusted.
+DEFAULT_MIN_PERIODS = 8
+DEFAULT_MIN_CORRELATION = 0.3
+DEFAULT_TOP_K = 3
+# Calendar days holding the window's sessions, their leaders and one prior close, holidays included.
+LOOKBACK_DAYS = (DEFAULT_WINDOW + DEFAULT_MAX_LAG + 1) * 7 // 5 + 21
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LeadLagMatrix:
+    """Correlations of ``values[i, t]`` with ``values[j, t + lag]`` for every board pair."""
+
+    def __init__(self, boards: Sequence[str], max_lag: int = DEFAULT_MAX_LAG, window: Optional[int] = DEFAULT_WINDOW):
+        if max_lag < 1:
+            raise ValueError(f"max_lag must be at least 1, got {max_lag}")
+        if window is not None and window < 1:
+            raise ValueError(f"window must be positive, got {window}")
+        self.boards = list(boards)
+        self.max_lag = max_lag
+        self.window = window
+        # count, sum x, sum y, sum x², sum y², sum xy -> (6, lags, boards, boards)
+        self._sums = np.zeros((6, max_lag, len(self.boards), len(self.boards)))
+        # Columns still needed as leaders, or to retire pairs leaving the window.
+        self._columns: Deque[np.ndarray] = deque(maxlen=max_lag + (window or 0))
+        self.sessions = 0
+
+    @classmethod
+    def from_series(
+        cls,
+        boards: Sequence[str],
+        values: np.ndarray,
+        max_lag: int = DEFAULT_MAX_LAG,
+        window: Optional[int] = DEFAULT_WINDOW,
+    ) -> "LeadLagMatrix":
+        """Fold a ``boards × sessions`` array (``NaN`` for gaps) in one batch.
+
+        Equivalent to pushing its columns one by one.
+        """
+
+        values = np.asarray(values, dtype=np.float64)
+        matrix = cls(boards, max_lag=max_lag, window=window)
+        sessions = values.shape[1]
+        first_follower = max(0, sessions - window) if window is not None else 0
+        for lag in range(1, max_lag + 1):
+            start = max(lag, first_follower)
+            if start < sessions:
+                matrix._accumulate(lag, values[:, start - lag : sessions - lag], values[:, start:], 1.0)
+        matrix._columns.extend(values[:, column].copy() for column in range(sessions))
+        matrix.sessions = sessions
+        return matrix
+
+    def push(self, column: np.ndarray) -> None:
+        """Add the next session (one value per board, ``NaN`` when missing)."""
+
+        column = np.asarray(column, dtype=np.float64).reshape(-1, 1)
+        history = self._columns
+        for lag in range(1, min(self.max_lag, len(history)) + 1):
+            self._accumulate(lag, history[-lag].reshape(-1, 1), column, 1.0)
+        if self.window is not None and len(history) >= self.window:
+            # The follower session leaving the window, with each of its leaders.
+            leaving = history[-self.window].reshape(-1, 1)
+            for lag in range(1, self.max_lag + 1):
+                if len(history) >= self.window + lag:
+                    self._accumulate(lag, history[-self.window - lag].reshape(-1, 1), leaving, -1.0)
+        history.append(column.ravel().copy())
+        self.sessions += 1
+
+    def reindex(self, boards: Sequence[str]) -> "LeadLagMatrix":
+        """The same sums over ``boards``; boards new to the matrix start without history."""
+
+        boards = list(boards)
+        positions = {board: idx for idx, board in enumerate(self.boards)}
+        old = np.array([positions.get(board, -1) for board in boards], dtype=np.intp)
+        known = old >= 0
+        matrix = LeadLagMatrix(boards, max_lag=self.max_lag, window=self.window)
+        matrix._sums[np.ix_(range(6), range(self.max_lag), known, known)] = self._sums[
+            np.ix_(range(6), range(self.max_lag), old[known], old[known])
+        ]
+        for column in self._columns:
+            moved = np.full(len(boards), np.nan)
+            moved[known] = column[old[known]]
+            matrix._columns.append(moved)
+        matrix.sessions = self.sessions
+        return matrix
+
+    def _accumulate(self, lag: int, leaders: np.ndarray, followers: np.ndarray, sign: float) -> None:
+        leader_mask, follower_mask = ~np.isnan(leaders), ~np.isnan(followers)
+        x = np.where(leader_mask, leaders, 0.0)
+        y = np.where(follower_mask, followers, 0.0)
+        mx, my = leader_mask.astype(np.float64), follower_mask.astype(np.float64)
+        left = np.stack([mx, x, mx, x * x, mx, x])
+        right = np.stack([my, my, y, my, y * y, y])
+        self._sums[:, lag - 1] += sign * np.matmul(left, right.transpose(0, 2, 1))
+
+    def correlations(self, min_periods: int = DEFAULT_MIN_PERIODS) -> np.ndarray:
+        """``(lags, boards, boards)`` Pearson correlations; ``NaN`` below ``min_periods`` pairs."""
+
+        count, sx, sy, sxx, syy, sxy = self._sums
+        covariance = count * sxy - sx * sy
+        spread = (count * sxx - sx * sx) * (count * syy - sy * sy)
+        valid = (count >= min_periods) & (spread > 1e-18)
+        result = np.full(covariance.shape, np.nan)
+        np.divide(covariance, np.sqrt(np.where(valid, spread, 1.0)), out=result, where=valid)
+        return np.clip(result, -1.0, 1.0, out=result)
+
+    def strongest(self, min_periods: int = DEFAULT_MIN_PERIODS) -> Tuple[np.ndarray, np.ndarray]:
+        """Per pair, the highest correlation over all lags and that lag (0 when undefined)."""
+
+        correlations = self.correlations(min_periods)
+        filled = np.where(np.isnan(correlations), -np.inf, correlations)
+        best = filled.argmax(axis=0)
+        values = np.take_along_axis(correlations, best[None], axis=0)[0]
+        lags = np.where(np.isnan(values), 0, best + 1)
+        return values, lags
+
+
+@dataclass(frozen=True)
+class LeadLagEdge:
+    leader: str
+    follower: str
+    lag: int
+    correlation: float
+    # Money-flow correlation at the same lag (0.0 when unknown).
+    flow_correlation: float = 0.0
+
+
+@dataclass
+class FollowGraph:
+    """Directed leader → follower links; ``edges`` are grouped by follower."""
+
+    edges: Dict[str, List[LeadLagEdge]] = field(default_factory=dict)
+
+    def leaders_of(self, board: str) -> List[LeadLagEdge]:
+        return self.edges.get(board, [])
+
+    def followers_of(self, board: str) -> List[LeadLagEdge]:
+        return [edge for edges in self.edges.values() for edge in edges if edge.leader == board]
+
+    def follow_score(self, board: str, leaders: Iterable[str]) -> float:
+        """Strongest link from any of ``leaders`` to ``board`` (0.0 without one)."""
+
+        wanted = set(leaders)
+        return max((edge.correlation for edge in self.leaders_of(board) if edge.leader in wanted), default=0.0)
+
+
+def follow_graph(
+    returns: LeadLagMatrix,
+    flows: Optional[LeadLagMatrix] = None,
+    min_correlation: float = DEFAULT_MIN_CORRELATION,
+    top_k: int = DEFAULT_TOP_K,
+    min_periods: int = DEFAULT_MIN_PERIODS,
+) -> FollowGraph:
+    """Keep each board's ``top_k`` leaders whose lagged return correlation reaches ``min_correlation``."""
+
+    values, lags = returns.strongest(min_periods)
+    np.fill_diagonal(values, np.nan)
+    flow_values = flows.correlations(min_periods) if flows is not None else None
+    graph = FollowGraph()
+    for column, follower in enumerate(returns.boards):
+        scores = np.where(np.isnan(values[:, column]), -np.inf, values[:, column])
+        for row in np.argsort(-scores, kind="stable")[:top_k]:
+            if scores[row] < min_correlation:
+                break
+            lag = int(lags[row, column])
+            flow = flow_values[lag - 1, row, column] if flow_values is not None else np.nan
+            graph.edges.setdefault(follower, []).append(
+                LeadLagEdge(
+                    leader=returns.boards[row],
+                    follower=follower,
+                    lag=lag,
+                    correlation=float(scores[row]),
+                    flow_correlation=0.0 if np.isnan(flow) else float(flow),
+                )
+            )
+    return graph
+
+
+def session_signals(panels: "FactorPanels") -> Tuple[np.ndarray, np.ndarray]:
+    """Daily returns and net inflow of every board, aligned to ``panels.dates``."""
+
+    close = panels.fields["close"]
+    returns = np.full(close.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[:, 1:] = close[:, 1:] / close[:, :-1] - 1.0
+    return returns, panels.fields["net_inflow"]
+
+
+def build_follow_graph(
+    panels: "FactorPanels",
+    max_lag: int = DEFAULT_MAX_LAG,
+    window: Optional[int] = DEFAULT_WINDOW,
+    min_correlation: float = DEFAULT_MIN_CORRELATION,
+) -> FollowGraph:
+    """Lead–lag graph over the sessions of ``panels`` (the last ``window`` of them)."""
+
+    returns, flows = session_signals(panels)
+    return follow_graph(
+        LeadLagMatrix.from_series(panels.boards, returns, max_lag=max_lag, window=window),
+        LeadLagMatrix.from_series(panels.boards, flows, max_lag=max_lag, window=window),
+        min_correlation=min_correlation,
+    )
+
+
+def graphs_by_session(
+    panels: "FactorPanels",
+    sessions: Iterable[date],
+    max_lag: int = DEFAULT_MAX_LAG,
+    window: Optional[int] = DEFAULT_WINDOW,
+) -> Dict[date, FollowGraph]:
+    """Point-in-time graphs: each uses the sessions of ``panels`` up to that date.
+
+    The matrices walk the panel once, pushing one session at a time.
+    """
+
+    returns, flows = session_signals(panels)
+    return_matrix = LeadLagMatrix(panels.boards, max_lag=max_lag, window=window)
+    flow_matrix = LeadLagMatrix(panels.boards, max_lag=max_lag, window=window)
+    graphs: Dict[date, FollowGraph] = {}
+    column = 0
+    for day in sorted(sessions):
+        while column < len(panels.dates) and panels.dates[column] <= day:
+            return_matrix.push(returns[:, column])
+            flow_matrix.push(flows[:, column])
+            column += 1
+        graphs[day] = follow_graph(return_matrix, flow_matrix)
+    return graphs
+
+
+class LeadLagState:
+    """Return and flow matrices carried from one daily run to the next.
+
+    ``last`` is the latest session pushed; :meth:`advance` only pushes
+    later sessions, so running the same day twice changes nothing.
+    """
+
+    def __init__(self, boards: Sequence[str] = (), max_lag: int = DEFAULT_MAX_LAG, window: int = DEFAULT_WINDOW):
+        if window < DEFAULT_MIN_PERIODS:
+            raise ValueError(f"window must cover at least {DEFAULT_MIN_PERIODS} sessions, got {window}")
+        self.returns = LeadLagMatrix(boards, max_lag=max_lag, window=window)
+        self.flows = LeadLagMatrix(boards, max_lag=max_lag, window=window)
+        self.last: Optional[date] = None
+
+    @property
+    def boards(self) -> List[str]:
+        return self.returns.boards
+
+    def covers(self, day: date) -> bool:
+        """Whether every session up to ``day`` has been pushed."""
+
+        return self.last is not None and self.last >= day
+
+    def advance(self, panels: "FactorPanels") -> int:
+        """Push the sessions of ``panels`` after :attr:`last`; returns how many were pushed.
+
+        Boards new to the state are added; boards missing from ``panels``
+        get gaps for the pushed sessions and are dropped once none of their
+        sessions is left in the window.
+        """
+
+        known = set(self.boards)
+        added = [board for board in panels.boards if board not in known]
+        if added:
+            self._reindex(self.boards + added)
+        returns, flows = session_signals(panels)
+        positions = {board: idx for idx, board in enumerate(self.boards)}
+        rows = np.array([positions[board] for board in panels.boards], dtype=np.intp)
+        pushed = 0
+        for column, day in enumerate(panels.dates):
+            if self.last is not None and day <= self.last:
+                continue
+            for matrix, values in ((self.returns, returns), (self.flows, flows)):
+                session = np.full(len(self.boards), np.nan)
+                session[rows] = values[:, column]
+                matrix.push(session)
+            self.last = day
+            pushed += 1
+        columns = self.returns._columns
+        if pushed and len(columns) == columns.maxlen:
+            live = ~np.isnan(np.array(columns)).all(axis=0) | ~np.isnan(np.array(self.flows._columns)).all(axis=0)
+            if not live.all():
+                self._reindex([board for board, keep in zip(self.boards, live.tolist()) if keep])
+        return pushed
+
+    def _reindex(self, boards: Sequence[str]) -> None:
+        self.returns = self.returns.reindex(boards)
+        self.flows = self.flows.reindex(boards)
+
+    def graph(self) -> FollowGraph:
+        return follow_graph(self.returns, self.flows)
+
+    def save(self, path: Path) -> None:
+        """Write the state to ``path`` (``.npz``); readers never see a partial file."""
+
+        path = Path(path)
+        arrays: Dict[str, np.ndarray] = {
+            "boards": np.array(self.boards, dtype=str),
+            "shape": np.array([self.returns.max_lag, self.returns.window, self.returns.sessions]),
+            "last": np.array([self.last.toordinal() if self.last is not None else 0]),
+        }
+        for name, matrix in (("returns", self.returns), ("flows", self.flows)):
+            arrays[f"{name}_sums"] = matrix._sums
+            arrays[f"{name}_columns"] = np.array(list(matrix._columns)).reshape(-1, len(self.boards))
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as handle:
+            np.savez(handle, **arrays)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, max_lag: int = DEFAULT_MAX_LAG, window: int = DEFAULT_WINDOW) -> "LeadLagState":
+        """State saved by :meth:`save`; a fresh state when the file is missing, unreadable or differently shaped."""
+
+        state = cls(max_lag=max_lag, window=window)
+        path = Path(path)
+        if not path.exists():
+            return state
+        try:
+            with np.load(path) as stored:
+                boards = stored["boards"].tolist()
+                saved_lag, saved_window, sessions = stored["shape"].tolist()
+                if (saved_lag, saved_window) != (max_lag, window):
+                    LOGGER.info("Lead-lag state %s was built for other settings; starting over", path)
+                    return state
+                matrices = []
+                for name in ("returns", "flows"):
+                    matrix = LeadLagMatrix(boards, max_lag=max_lag, window=window)
+                    matrix._sums = stored[f"{name}_sums"].astype(np.float64)
+                    matrix._columns.extend(stored[f"{name}_columns"].astype(np.float64))
+                    matrix.sessions = sessions
+                    matrices.append(matrix)
+                last = int(stored["last"][0])
+        except (OSError, ValueError, KeyError) as exc:
+            LOGGER.warning("Ignoring unreadable lead-lag state %s: %s", path, exc)
+            return state
+        state.returns, state.flows = matrices
+        state.last = date.fromordinal(last) if last else None
+        return state
+
+
+def saved_as_of(path: Path) -> Optional[date]:
+    """Last session of the state saved at ``path`` (``None`` when there is no readable state)."""
+
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with np.load(path) as stored:
+            last = int(stored["last"][0])
+    except (OSError, ValueError, KeyError):
+        return None
+    return date.fromordinal(last) if last else None
+
+
+def state_path(db_path: Path) -> Path:
+    """Where the :class:`LeadLagState` of the results database ``db_path`` is kept."""
+
+    db_path = Path(db_path)
+    return db_path.with_name(f"{db_path.name}.leadlag.npz")
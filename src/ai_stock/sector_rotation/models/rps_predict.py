@@ -2,13 +2,16 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Iterable, List
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
 
 from ..config import RotationWeights
 from ..factors.rotation_factor import RotationComponents
 from ..models.strong_board import BoardScore
 from .multi_factor import combine_rotation_score, rotation_from_breakdown
 
+if TYPE_CHECKING:  # pragma: no cover
+    from .lead_lag import FollowGraph
+
 
 @dataclass(frozen=True)
 class RpsCandidate:
@@ -41,22 +44,33 @@ def predict_rotation_candidates(
     top_n: int = 5,
     exclude_current: bool = True,
     board_names: Dict[str, str] | None = None,
+    follow_graph: Optional["FollowGraph"] = None,
 ) -> List[RpsCandidate]:
-    """Return next rotation candidates ranked by readiness."""
+    """Return next rotation candidates ranked by readiness.
+
+    With a ``follow_graph`` (see :mod:`.lead_lag`) boards that historically
+    follow one of the current ``strengths`` gain ``weights.lead_lag`` per
+    unit of lagged correlation.
+    """
 
-    exclude_set = {score.board for score in strengths} if exclude_current else set()
+    strong = [score.board for score in strengths]
+    exclude_set = set(strong) if exclude_current else set()
     candidates: List[RpsCandidate] = []
     for board, component in rotation.items():
         if board in exclude_set:
             continue
         breakdown = combine_rotation_score(component, weights)
         total = rotation_from_breakdown(breakdown)
+        details = breakdown.as_dict
+        if follow_graph is not None:
+            details["lead_lag"] = follow_graph.follow_score(board, strong) * weights.lead_lag
+            total += details["lead_lag"]
         candidates.append(
             RpsCandidate(
                 board=board,
                 name=(board_names.get(board) if board_names else board),
                 predicted=total,
-                breakdown=breakdown.as_dict,
+                breakdown=details,
             )
         )
     candidates.sort(key=lambda c: c.predicted, reverse=True)
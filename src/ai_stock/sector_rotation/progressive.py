@@ -0,0 +1,261 @@
+"""Deadline-aware variant of the daily pipeline.
+
+:func:`~.main.run_daily_analysis` is all-or-nothing: one slow endpoint
+delays the whole report past the scheduler window.  Here boards are loaded
+one by one on a thread pool in priority order (previous run's score, then
+live turnover rate), a partial ranking is emitted as boards complete, and
+when the time budget runs out the analysis proceeds with whatever has
+been loaded.  The result carries a ``coverage`` entry describing what was
+skipped so downstream consumers can tell a partial report from a full one.
+"""
+from __future__ import annotations
+
+import bisect
+import time as time_module
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional
+
+from .config import AnalysisConfig
+from .data import board_data
+from .db.async_writer import AsyncWriter
+from .db.database import Database
+from .db.writer import write_results
+from .factors import capital_factor, hype_factor, leader_factor, trend_factor
+from .main import (
+    MarketData,
+    analyse_market_data,
+    collapse_overlaps,
+    lead_lag_start,
+    lead_lag_state_path,
+    load_market_data,
+    merge_market_data,
+)
+from .models import strong_board
+from .utils import akshare_helper, logger
+from .utils.profiler import StageProfiler
+
+
+@dataclass(frozen=True)
+class ProgressUpdate:
+    processed: int
+    total: int
+    elapsed: float
+    rankings: List[strong_board.BoardScore]
+
+
+def prioritise_boards(
+    boards: List[board_data.Board],
+    prior_scores: Optional[Mapping[str, float]] = None,
+    spot: Optional[Mapping[str, Mapping[str, float]]] = None,
+) -> List[board_data.Board]:
+    """Order boards by prior score (by code or name), then turnover rate."""
+
+    prior_scores = prior_scores or {}
+    spot = spot or {}
+
+    def key(item: tuple) -> tuple:
+        position, board = item
+        prior = prior_scores.get(board.code, prior_scores.get(board.name))
+        turnover = float(spot.get(board.code, {}).get("turnover_rate", 0.0))
+        return (prior is None, -(prior or 0.0), -turnover, position)
+
+    return [board for _, board in sorted(enumerate(boards), key=key)]
+
+
+def run_progressive_analysis(
+    cfg: Optional[AnalysisConfig] = None,
+    time_budget: Optional[float] = None,
+    deadline: Optional[datetime] = None,
+    db_path: Optional[Path] = None,
+    writer: Optional[AsyncWriter] = None,
+    prior_scores: Optional[Mapping[str, float]] = None,
+    on_progress: Optional[Callable[[ProgressUpdate], None]] = None,
+    workers: int = 8,
+    profiler: Optional[StageProfiler] = None,
+) -> Dict[str, object]:
+    """Run the pipeline, returning the best ranking available by the deadline.
+
+    ``time_budget`` (seconds) or ``deadline`` bound the data loading phase;
+    the factor/report stage itself takes milliseconds.  ``prior_scores``
+    defaults to the latest run stored in ``db_path``.  Boards load on
+    ``workers`` threads, or ``cfg.fetch_workers`` if that is larger.
+    """
+
+    cfg = cfg or AnalysisConfig.daily_defaults()
+    profiler = profiler or StageProfiler()
+    checkpoint = akshare_helper.telemetry_checkpoint()
+    log = logger.get_logger(__name__)
+    started = time_module.perf_counter()
+    if deadline is not None:
+        remaining = (deadline - datetime.now()).total_seconds()
+        time_budget = remaining if time_budget is None else min(time_budget, remaining)
+    budget = max(0.0, time_budget) if time_budget is not None else None
+
+    def remaining() -> Optional[float]:
+        return None if budget is None else budget - (time_module.perf_counter() - started)
+
+    # Board loads run concurrently on the pool and share keep-alive connections.
+    with akshare_helper.pooled_http():
+        with profiler.stage("fetch.boards") as stage:
+            boards = board_data.list_boards(limit=cfg.board_count, categories=cfg.categories)
+            stage.items = len(boards)
+        if prior_scores is None and db_path is not None and Path(db_path).exists():
+            prior_scores = Database(db_path).latest_scores()
+        spot: Dict[str, Dict[str, float]] = {}
+        for category in sorted({board.category for board in boards}):
+            spot.update(akshare_helper.board_spot_quotes(category))
+        ordered = prioritise_boards(boards, prior_scores, spot)
+
+        pool = ThreadPoolExecutor(max_workers=max(1, workers, cfg.fetch_workers))
+        members: Dict[str, List[str]] = {}
+        collapsed: List[str] = []
+        if cfg.overlap_threshold is not None:
+            # Constituents first, so boards duplicating a higher priority board are never loaded.
+            # They count against the budget: boards whose list is late are skipped, not compared.
+            with profiler.stage("fetch.members") as stage:
+                requests = {
+                    pool.submit(board_data.list_board_members, board, as_of=cfg.end_date): board for board in ordered
+                }
+                timeout = remaining()
+                done, _ = wait(requests, timeout=None if timeout is None else max(0.0, timeout))
+                for future in done:
+                    board = requests[future]
+                    try:
+                        members[board.code] = future.result()
+                    except Exception as exc:  # pragma: no cover - network dependent
+                        log.warning("Listing members of %s failed: %s", board.code, exc)
+                        members[board.code] = []
+                stage.items = sum(len(symbols) for symbols in members.values())
+            listed = [board for board in ordered if board.code in members]
+            _, members = collapse_overlaps(cfg, listed, members, profiler)
+            collapsed = [board.code for board in listed if board.code not in members]
+            dropped = set(collapsed)
+            ordered = [board for board in ordered if board.code not in dropped]
+
+        loaded: Dict[str, MarketData] = {}
+        # Each board is one task here; its own requests run sequentially
+        # (constituents fetched above come from the response cache).
+        board_cfg = replace(cfg, fetch_workers=1)
+        state_path = lead_lag_state_path(db_path, writer)
+        first = lead_lag_start(cfg, state_path)
+        # Loads left running at the deadline keep fetching in the background, so none are queued once it has passed.
+        timeout = remaining()
+        futures: Dict[Future, board_data.Board] = {
+            pool.submit(load_market_data, board_cfg, [board], lead_lag_start=first): board
+            for board in (ordered if timeout is None or timeout > 0 else [])
+        }
+        pending = set(futures)
+        partial = _PartialRanking(cfg)
+        # Per-board loads overlap on the pool, so only the whole phase is timed.
+        with profiler.stage("fetch.progressive") as load_stage:
+            try:
+                while pending:
+                    timeout = remaining()
+                    if timeout is not None and timeout <= 0:
+                        break
+                    done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        board = futures[future]
+                        try:
+                            loaded[board.code] = future.result()
+                        except Exception as exc:  # pragma: no cover - network dependent
+                            log.warning("Loading board %s failed: %s", board.code, exc)
+                            continue
+                        if on_progress is not None:
+                            partial.add(loaded[board.code])
+                    if done and on_progress is not None:
+                        on_progress(
+                            ProgressUpdate(
+                                processed=len(loaded),
+                                total=len(ordered),
+                                elapsed=time_module.perf_counter() - started,
+                                rankings=partial.rankings(),
+                            )
+                        )
+            finally:
+                # Boards still loading keep running in the background but are ignored.
+                pool.shutdown(wait=False, cancel_futures=True)
+                load_stage.items = len(loaded)
+
+    parts = [loaded[board.code] for board in ordered if board.code in loaded]
+    skipped = [board.code for board in ordered if board.code not in loaded]
+    elapsed = time_module.perf_counter() - started
+    coverage: Dict[str, object] = {
+        "boards_total": len(ordered),
+        "boards_processed": len(parts),
+        "boards_skipped": skipped,
+        "complete": not skipped,
+        "elapsed": elapsed,
+        "budget": budget if budget is not None else elapsed,
+        "order": [board.code for board in ordered],
+        "boards_collapsed": collapsed,
+    }
+    if skipped:
+        log.warning("Time budget exhausted: %d/%d boards analysed", len(parts), len(ordered))
+
+    outcome = analyse_market_data(
+        cfg,
+        merge_market_data(parts),
+        coverage=coverage,
+        profiler=profiler,
+        lead_lag_state=state_path,
+    )
+    with profiler.stage("persist"):
+        if writer is not None:
+            write_results(
+                writer, cfg.end_date, outcome.top_selection, outcome.rotation_candidates, outcome.leader_picks
+            )
+        elif db_path is not None:
+            write_results(
+                Database(db_path),
+                cfg.end_date,
+                outcome.top_selection,
+                outcome.rotation_candidates,
+                outcome.leader_picks,
+            )
+    profiler.close()
+    outcome.result["metrics"] = profiler.as_dict()
+    telemetry = akshare_helper.telemetry_snapshot(since=checkpoint)
+    akshare_helper.warn_on_fallbacks(telemetry)
+    outcome.result["telemetry"] = telemetry
+    return outcome.result
+
+
+class _PartialRanking:
+    """Running ranking of the boards loaded so far.
+
+    Factors are per board, so each completed board is scored once and
+    inserted into the sorted ranking instead of re-merging and re-scoring
+    every loaded board on each progress update.
+    """
+
+    def __init__(self, cfg: AnalysisConfig) -> None:
+        self._cfg = cfg
+        self._scores: List[strong_board.BoardScore] = []
+        self._keys: List[float] = []
+
+    def add(self, part: MarketData) -> None:
+        for score in _rank_part(self._cfg, part):
+            position = bisect.bisect_right(self._keys, -score.score)
+            self._keys.insert(position, -score.score)
+            self._scores.insert(position, score)
+
+    def rankings(self) -> List[strong_board.BoardScore]:
+        return list(self._scores)
+
+
+def _rank_part(cfg: AnalysisConfig, data: MarketData) -> List[strong_board.BoardScore]:
+    _, leader_components = leader_factor.calculate_leader_factor(
+        data.component_quotes, data.stock_history, top_n=cfg.leaders_per_board
+    )
+    return strong_board.rank_boards(
+        trend_factor.calculate_trend_factor(data.price_history),
+        hype_factor.calculate_hype_factor(data.hot_metrics),
+        capital_factor.calculate_capital_factor(data.money_flow),
+        leader_components,
+        {board.code: board.name for board in data.boards},
+        cfg.factor_weights,
+    )
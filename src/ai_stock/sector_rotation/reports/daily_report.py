@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from datetime import date
-from typing import Dict, Iterable, List, Sequence
+from typing import Dict, Iterable, List, Optional, Sequence
 
 from ..factors.leader_factor import LeaderCandidate
 from ..models.rps_predict import RpsCandidate
@@ -30,10 +30,16 @@ def build_daily_report(
     rotation_candidates: Sequence[RpsCandidate],
     candidate_boards: Sequence[RpsCandidate],
     regime_summary: Dict[str, float],
+    coverage: Optional[Dict[str, object]] = None,
 ) -> str:
     lines: List[str] = []
     lines.append(f"Sector rotation summary for {as_of.isoformat()}")
     lines.append("=")
+    if coverage is not None and not coverage.get("complete", True):
+        lines.append(
+            f"Partial coverage: {coverage.get('boards_processed', 0)}/{coverage.get('boards_total', 0)} boards"
+            f" within {float(coverage.get('budget', 0.0)):.0f}s budget"
+        )
     lines.append(
         f"Regime: {regime_summary.get('regime', 'neutral')}"
         f" | Strength={regime_summary.get('avg_strength', 0.0):.2f}"
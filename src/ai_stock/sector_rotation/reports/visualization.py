@@ -1,7 +1,7 @@
 """ASCII based visualisations for quick inspection."""
 from __future__ import annotations
 
-from typing import Dict, Iterable, List, Mapping, Sequence
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional, Sequence
 
 from ..factors.capital_factor import CapitalComponents
 from ..factors.hype_factor import HypeComponents
@@ -10,6 +10,9 @@ from ..factors.trend_factor import TrendComponents
 from ..models.rps_predict import RpsCandidate
 from ..models.strong_board import BoardScore
 
+if TYPE_CHECKING:  # pragma: no cover
+    from ..models.lead_lag import FollowGraph
+
 
 def rotation_heatmap(scores: Iterable[BoardScore]) -> str:
     scores = list(scores)
@@ -49,8 +52,12 @@ def factor_table(
 def rotation_pathway(
     candidates: Sequence[RpsCandidate],
     predictions: Mapping[str, float],
+    follow_graph: Optional["FollowGraph"] = None,
 ) -> str:
-    """Represent candidate transitions via a simple text diagram."""
+    """Represent candidate transitions via a simple text diagram.
+
+    With a ``follow_graph`` each candidate lists the boards it tends to follow.
+    """
 
     if not candidates:
         return "(no rotation candidates)"
@@ -62,4 +69,9 @@ def rotation_pathway(
         lines.append(
             f"{label} -> readiness={candidate.predicted:.2f} next={next_score:.2f}"
         )
+        if follow_graph is not None:
+            for edge in follow_graph.leaders_of(candidate.board):
+                lines.append(
+                    f"    follows {edge.leader} by {edge.lag}d (r={edge.correlation:.2f}, flow r={edge.flow_correlation:.2f})"
+                )
     return "\n".join(lines)
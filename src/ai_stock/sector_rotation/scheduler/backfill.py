@@ -0,0 +1,161 @@
+"""Holiday-aware catch-up of missed sessions.
+
+When the scheduler host is down for a few days the skipped ``run_date``
+rows would otherwise never be written.  :func:`missing_sessions` compares
+the trading calendar with the dates already stored, and
+:func:`backfill_sessions` recomputes all of them from a single data load
+covering the union of their windows: every session is sliced out of that
+load and analysed on a worker pool instead of running N cold pipelines.  The
+board factors of every session read column windows of one set of
+:mod:`~..data.factor_panels` built from that load, and the lead-lag
+matrices of :mod:`~..models.lead_lag` walk one board history reaching
+:data:`~..models.lead_lag.LOOKBACK_DAYS` before the first session, session
+by session, instead of being rebuilt for every day.  That walk also
+advances the persisted lead-lag state, unless the state is already at or
+past the last backfilled session.
+"""
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from ..config import AnalysisConfig
+from ..data import factor_panels, stock_data
+from ..db.database import Database
+from ..db.writer import ResultSink, write_results
+from ..main import (
+    AnalysisOutcome,
+    analyse_market_data,
+    lead_lag_panels,
+    load_market_data,
+    save_lead_lag_state,
+    slice_market_data,
+)
+from ..models import lead_lag
+from ..utils import akshare_helper
+
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_LOOKBACK_DAYS = 10
+
+
+def missing_sessions(
+    db: Database,
+    end: date,
+    lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+    since: Optional[date] = None,
+) -> List[date]:
+    """Return trading sessions in the lookback window without stored results.
+
+    Without ``since`` the search starts at the first stored ``run_date`` (an
+    empty database has nothing to catch up on) but never further back than
+    ``lookback_days`` before ``end``.
+    """
+
+    existing = db.run_dates()
+    if since is None:
+        if not existing:
+            return []
+        since = max(min(existing), end - timedelta(days=lookback_days))
+    return [day for day in akshare_helper.iter_trading_days(since, end) if day not in existing]
+
+
+def backfill_sessions(
+    sessions: Sequence[date],
+    sink: Optional[ResultSink] = None,
+    config_factory: Callable[[date], AnalysisConfig] = AnalysisConfig.daily_defaults,
+    workers: int = 4,
+    state_path: Optional[Path] = None,
+) -> Dict[date, Dict[str, object]]:
+    """Analyse ``sessions`` from one shared data load and persist them.
+
+    The lead-lag state at ``state_path`` is rebuilt from the backfill
+    history only when it is older than the last session.
+    """
+
+    sessions = sorted(set(sessions))
+    if not sessions:
+        return {}
+
+    configs = {day: config_factory(day) for day in sessions}
+    union = replace(
+        configs[sessions[-1]],
+        start_date=min(cfg.start_date for cfg in configs.values()),
+        end_date=max(cfg.end_date for cfg in configs.values()),
+    )
+    LOGGER.info(
+        "Backfilling %d sessions with one load for %s to %s",
+        len(sessions),
+        union.start_date.isoformat(),
+        union.end_date.isoformat(),
+    )
+    data = load_market_data(union)
+    # Every session re-prices its quotes from the same stock bars.
+    index = stock_data.BarIndex(data.stock_history)
+    panels = factor_panels.build_panels(data.price_history, data.money_flow, data.hot_metrics)
+    # Point in time: each day's graph sees the last window of sessions up to that day.  The history starts a
+    # full lookback before the first session, so a day's graph does not depend on how sessions are batched.
+    start = sessions[0] - timedelta(days=lead_lag.LOOKBACK_DAYS)
+    history = lead_lag_panels(data.boards, start, union.end_date, union.fetch_workers)
+    graphs = lead_lag.graphs_by_session(history, sessions)
+    saved = lead_lag.saved_as_of(state_path) if state_path is not None else None
+    if state_path is not None and (saved is None or saved < union.end_date):
+        state = lead_lag.LeadLagState()
+        state.advance(history)
+        save_lead_lag_state(state, state_path)
+
+    def analyse(day: date) -> AnalysisOutcome:
+        cfg = configs[day]
+        return analyse_market_data(
+            cfg,
+            slice_market_data(data, cfg.start_date, cfg.end_date, index=index),
+            panels=panels.window(cfg.start_date, cfg.end_date),
+            follow_graph=graphs.get(day),
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        outcomes = dict(zip(sessions, pool.map(analyse, sessions)))
+
+    # Persist from this thread, in session order; sinks need not be thread safe.
+    if sink is not None:
+        for day in sessions:
+            outcome = outcomes[day]
+            write_results(sink, day, outcome.top_selection, outcome.rotation_candidates, outcome.leader_picks)
+    return {day: outcome.result for day, outcome in outcomes.items()}
+
+
+def catch_up(
+    db: Database,
+    today: date,
+    sink: Optional[ResultSink] = None,
+    lookback_days: int = DEFAULT_LOOKBACK_DAYS,
+    since: Optional[date] = None,
+    config_factory: Callable[[date], AnalysisConfig] = AnalysisConfig.daily_defaults,
+    workers: int = 4,
+) -> List[date]:
+    """Backfill sessions before ``today`` that are missing from ``db``.
+
+    ``today`` itself is left to the regular window run.  Returns the
+    sessions that were written.
+    """
+
+    if lookback_days <= 0 and since is None:
+        return []
+    last_closed = akshare_helper.previous_trading_day(today)
+    sessions = missing_sessions(db, last_closed, lookback_days=lookback_days, since=since)
+    if not sessions:
+        return []
+    LOGGER.info("Catching up %d missed sessions: %s", len(sessions), ", ".join(day.isoformat() for day in sessions))
+    backfill_sessions(
+        sessions,
+        sink if sink is not None else db,
+        config_factory=config_factory,
+        workers=workers,
+        state_path=lead_lag.state_path(db.path),
+    )
+    return sessions
@@ -0,0 +1,336 @@
+"""Long-lived scheduler daemon with a local result API.
+
+Unlike ``--once`` (cron) mode the daemon keeps one process alive, so board
+lists, the trading calendar, constituent tables and finalized history stay
+resident in :mod:`..utils.akshare_helper` between runs; only session
+scoped caches are dropped when the calendar day rolls over.  The latest
+result is served from memory over a small HTTP API bound to localhost or a
+Unix socket:
+
+``GET /health``            scheduler state
+``GET /latest``            full result of the last run (JSON)
+``GET /report``            text report (also ``/factor_table``, ``/rotation_path``)
+``GET /boards``            selected strong boards
+``GET /rotation?top=N``    RPS rotation candidates
+``GET /leaders?board=X``   leader picks, optionally for one board
+``GET /telemetry``         live data source latency/error/fallback counters
+
+With ``intraday_interval`` set the daemon also publishes live refreshes
+during the trading sessions (see :mod:`..intraday`).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socketserver
+import threading
+import time as time_module
+from datetime import date, datetime, time, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from ..config import AnalysisConfig
+from ..db.async_writer import AsyncWriter, PersistenceError
+from ..db.database import Database
+from ..intraday import IntradaySession
+from ..main import run_daily_analysis
+from ..progressive import run_progressive_analysis
+from ..utils import akshare_helper
+from .backfill import DEFAULT_LOOKBACK_DAYS, catch_up
+from .windows import INTRADAY_SESSIONS, in_sessions, seconds_until_next_session
+
+
+LOGGER = logging.getLogger(__name__)
+
+_TEXT_KEYS = ("report", "factor_table", "rotation_path", "heatmap")
+
+
+def _json_default(value: object) -> object:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _encode_json(payload: object) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+
+class ResultCache:
+    """Latest analysis result with pre-encoded responses.
+
+    Responses are serialised once when a result is published so that API
+    requests only copy bytes out of memory.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._result: Optional[Dict[str, Any]] = None
+        self._encoded: Dict[str, Tuple[str, bytes]] = {}
+        self.published_at: Optional[datetime] = None
+        self.run_date: Optional[date] = None
+        self.runs = 0
+
+    def publish(self, result: Dict[str, Any], run_date: Optional[date] = None) -> None:
+        encoded: Dict[str, Tuple[str, bytes]] = {"latest": ("application/json", _encode_json(result))}
+        for key in _TEXT_KEYS:
+            encoded[key] = ("text/plain; charset=utf-8", str(result.get(key, "")).encode("utf-8"))
+        encoded["boards"] = ("application/json", _encode_json(result.get("selected_boards", [])))
+        encoded["leaders"] = ("application/json", _encode_json(result.get("leaders", {})))
+        encoded["rotation"] = ("application/json", _encode_json(result.get("rotation_candidates", [])))
+        with self._lock:
+            self._result = result
+            self._encoded = encoded
+            self.published_at = datetime.now()
+            self.run_date = run_date
+            self.runs += 1
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._result
+
+    def encoded(self, key: str) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            return self._encoded.get(key)
+
+    def health(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "status": "ok" if self._result is not None else "warming",
+                "runs": self.runs,
+                "run_date": self.run_date,
+                "published_at": self.published_at,
+            }
+
+
+class _ApiHandler(BaseHTTPRequestHandler):
+    server_version = "SectorRotationDaemon/1.0"
+    cache: ResultCache  # Injected by make_handler.
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        parsed = urlparse(self.path)
+        route = parsed.path.strip("/") or "health"
+        query = parse_qs(parsed.query)
+
+        if route == "health":
+            health = self.cache.health()
+            health["cache"] = akshare_helper.cache_stats()
+            self._send(200, "application/json", _encode_json(health))
+            return
+
+        if route == "telemetry":
+            self._send(200, "application/json", _encode_json(akshare_helper.telemetry_snapshot()))
+            return
+
+        if route == "leaders" and "board" in query:
+            result = self.cache.result() or {}
+            leaders = result.get("leaders", {})
+            board = query["board"][0]
+            if board not in leaders:
+                self._send(404, "application/json", _encode_json({"error": f"unknown board '{board}'"}))
+                return
+            self._send(200, "application/json", _encode_json(leaders[board]))
+            return
+
+        if route == "rotation" and "top" in query:
+            result = self.cache.result() or {}
+            try:
+                top = max(0, int(query["top"][0]))
+            except ValueError:
+                self._send(400, "application/json", _encode_json({"error": "top must be an integer"}))
+                return
+            self._send(200, "application/json", _encode_json(result.get("rotation_candidates", [])[:top]))
+            return
+
+        cached = self.cache.encoded(route)
+        if cached is None:
+            if self.cache.result() is None and route in {"latest", "boards", "leaders", "rotation", *_TEXT_KEYS}:
+                self._send(503, "application/json", _encode_json({"error": "no result yet"}))
+            else:
+                self._send(404, "application/json", _encode_json({"error": f"unknown route '{route}'"}))
+            return
+        content_type, body = cached
+        self._send(200, content_type, body)
+
+    def _send(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix socket peers have no (host, port) address.
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002 - stdlib signature
+        LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+
+def make_handler(cache: ResultCache) -> type:
+    return type("BoundApiHandler", (_ApiHandler,), {"cache": cache})
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):  # type: ignore[override]
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+def start_api_server(
+    cache: ResultCache,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[Path] = None,
+) -> socketserver.BaseServer:
+    """Serve ``cache`` from a background thread and return the server."""
+
+    handler = make_handler(cache)
+    server: socketserver.BaseServer
+    if socket_path is not None:
+        socket_path = Path(socket_path)
+        if socket_path.exists():
+            os.unlink(socket_path)
+        server = _UnixHTTPServer(str(socket_path), handler)
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="sector-rotation-api", daemon=True)
+    thread.start()
+    LOGGER.info("Result API listening on %s", socket_path or f"http://{host}:{server.server_address[1]}")
+    return server
+
+
+class SchedulerDaemon:
+    """Run the daily window in-process, keeping caches warm across days."""
+
+    def __init__(
+        self,
+        config_factory: Optional[Callable[[date], AnalysisConfig]] = None,
+        db_path: Optional[Path] = None,
+        start: time = time(15, 30),
+        end: time = time(16, 0),
+        idle_ceiling: int = 300,
+        intraday_interval: Optional[int] = None,
+        sessions: Sequence[Tuple[time, time]] = INTRADAY_SESSIONS,
+        catch_up_days: int = DEFAULT_LOOKBACK_DAYS,
+        deadline_margin: float = 60.0,
+    ) -> None:
+        self.config_factory = config_factory or AnalysisConfig.daily_defaults
+        self.intraday_interval = intraday_interval
+        self.sessions = tuple(sessions)
+        self.catch_up_days = catch_up_days
+        self.deadline_margin = deadline_margin
+        self._caught_up: Optional[date] = None
+        self._intraday: Optional[IntradaySession] = None
+        self.db_path = db_path
+        self.start = start
+        self.end = end
+        self.idle_ceiling = idle_ceiling
+        self.cache = ResultCache()
+        self._session: Optional[date] = None
+        self._last_run: Optional[date] = None
+        self._stop = threading.Event()
+        self._writer: Optional[AsyncWriter] = None
+
+    def run_once(self, as_of: Optional[date] = None, deadline: Optional[datetime] = None) -> Dict[str, Any]:
+        """Run the analysis for ``as_of`` and publish it to the API cache.
+
+        With a ``deadline`` the run is progressive and may cover only part of
+        the universe (see :mod:`..progressive`).
+        """
+
+        as_of = as_of or date.today()
+        self._roll_session(as_of)
+        cfg = self.config_factory(as_of)
+        started = time_module.perf_counter()
+        if deadline is not None:
+            result = run_progressive_analysis(cfg=cfg, deadline=deadline, db_path=self.db_path, writer=self._writer)
+        else:
+            result = run_daily_analysis(cfg=cfg, db_path=self.db_path, writer=self._writer)
+        LOGGER.info("Daemon run for %s finished in %.2fs", as_of.isoformat(), time_module.perf_counter() - started)
+        self.cache.publish(result, run_date=as_of)
+        self._last_run = as_of
+        return result
+
+    def serve_forever(self) -> None:
+        """Block running the window loop until :meth:`stop` is called."""
+
+        db = Database(self.db_path) if self.db_path is not None else None
+        if db is not None:
+            self._writer = AsyncWriter(db)
+        try:
+            while not self._stop.is_set():
+                now = datetime.now()
+                today = now.date()
+                self._roll_session(today)
+                if db is not None and self._caught_up != today:
+                    try:
+                        self._writer.flush()  # type: ignore[union-attr]
+                    except PersistenceError as exc:
+                        LOGGER.error("Earlier results were not stored: %s", exc)
+                    catch_up(
+                        db,
+                        today,
+                        sink=self._writer,
+                        lookback_days=self.catch_up_days,
+                        config_factory=self.config_factory,
+                    )
+                    self._caught_up = today
+                if not akshare_helper.is_trading_day(today):
+                    self._stop.wait(min(float(self.idle_ceiling), self._seconds_until_start(now)))
+                    continue
+                if self.start <= now.time() <= self.end and self._last_run != today:
+                    LOGGER.info("Window reached (%s). Launching analysis run.", now.isoformat(timespec="seconds"))
+                    deadline = datetime.combine(today, self.end) - timedelta(seconds=self.deadline_margin)
+                    self.run_once(today, deadline=max(deadline, now))
+                    continue
+                if self.intraday_interval and in_sessions(now.time(), self.sessions):
+                    self.tick_intraday(today)
+                    elapsed = (datetime.now() - now).total_seconds()
+                    self._stop.wait(max(1.0, self.intraday_interval - elapsed))
+                    continue
+                wait = self._seconds_until_start(now)
+                if self.intraday_interval:
+                    wait = min(wait, seconds_until_next_session(now, self.sessions))
+                self._stop.wait(min(float(self.idle_ceiling), wait))
+        finally:
+            if self._writer is not None:
+                try:
+                    self._writer.close()
+                except PersistenceError as exc:
+                    LOGGER.error("Results lost on shutdown: %s", exc)
+                self._writer = None
+
+    def tick_intraday(self, today: Optional[date] = None) -> Dict[str, Any]:
+        """Publish a live refresh; closed-day data is loaded once per day."""
+
+        today = today or date.today()
+        self._roll_session(today)
+        if self._intraday is None or self._intraday.session_day != today:
+            self._intraday = IntradaySession(cfg=self.config_factory(today), session_day=today, db_path=self.db_path)
+        result = self._intraday.tick()
+        self.cache.publish(result, run_date=today)
+        return result
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _roll_session(self, today: date) -> None:
+        if self._session == today:
+            return
+        if self._session is not None:
+            LOGGER.info("Session rollover %s -> %s; dropping session caches", self._session, today)
+            akshare_helper.roll_session(today)
+            self._intraday = None
+        self._session = today
+
+    def _seconds_until_start(self, now: datetime) -> float:
+        candidate = datetime.combine(now.date(), self.start)
+        if now >= candidate:
+            candidate += timedelta(days=1)
+        return max(1.0, (candidate - now).total_seconds())
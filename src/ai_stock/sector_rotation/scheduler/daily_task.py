@@ -10,24 +10,79 @@ from __future__ import annotations
 import argparse
 import logging
 import time as time_module
-from datetime import datetime, time, timedelta
+from contextlib import ExitStack
+from dataclasses import replace
+from datetime import date, datetime, time, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Dict, Optional, Sequence, Tuple
 
 from ..config import AnalysisConfig
+from ..db.async_writer import AsyncWriter, PersistenceError
+from ..db.database import Database
+from ..intraday import IntradaySession
 from ..main import run_daily_analysis
+from ..models import lead_lag
+from ..progressive import run_progressive_analysis
+from ..sharded import run_sharded_analysis
+from ..utils import akshare_helper
+from ..utils.profiler import StageProfiler, export_json, export_prometheus
+from .backfill import DEFAULT_LOOKBACK_DAYS, backfill_sessions, catch_up, missing_sessions
+from .daemon import SchedulerDaemon, start_api_server
+from .windows import INTRADAY_INTERVAL, INTRADAY_SESSIONS, in_sessions, seconds_until_next_session
 
 
 DEFAULT_DB_PATH = Path("sector_rotation_results.sqlite")
 WINDOW_START = time(15, 30)
 WINDOW_END = time(16, 0)
+# Seconds reserved before the window end for ranking, reporting and persistence.
+DEADLINE_MARGIN = 60.0
+METRICS_JSON = "sector_rotation_metrics.json"
+METRICS_TEXTFILE = "sector_rotation.prom"
 
 
-def run(config: Optional[AnalysisConfig] = None, db_path: Optional[Path] = None) -> None:
-    """Trigger the daily pipeline and persist results once."""
+def run(
+    config: Optional[AnalysisConfig] = None,
+    db_path: Optional[Path] = None,
+    writer: Optional[AsyncWriter] = None,
+    deadline: Optional[datetime] = None,
+    metrics_dir: Optional[Path] = None,
+    profile_memory: bool = False,
+    processes: Optional[int] = None,
+) -> None:
+    """Trigger the daily pipeline and persist results once.
+
+    With a ``writer`` the results are queued for the background writer
+    thread and the call returns as soon as the analysis itself is done.
+    With a ``deadline`` boards are loaded progressively and whatever is
+    ready by then is reported (see :mod:`..progressive`).  Otherwise
+    ``processes`` > 1 shards the boards across worker processes (see
+    :mod:`..sharded`).  Stage metrics are written to ``metrics_dir`` when
+    given (see :func:`export_metrics`).
+    """
 
     db_path = db_path or DEFAULT_DB_PATH
-    run_daily_analysis(cfg=config, db_path=db_path)
+    if deadline is not None:
+        profiler = StageProfiler(trace_memory=profile_memory)
+        result = run_progressive_analysis(
+            cfg=config, deadline=deadline, db_path=db_path, writer=writer, profiler=profiler
+        )
+    elif processes is not None and processes > 1:
+        profiler = StageProfiler(trace_memory=profile_memory)
+        result = run_sharded_analysis(
+            cfg=config, processes=processes, db_path=db_path, writer=writer, profiler=profiler
+        )
+    else:
+        result = run_daily_analysis(cfg=config, db_path=db_path, writer=writer, profile_memory=profile_memory)
+    if metrics_dir is not None:
+        export_metrics(result["metrics"], metrics_dir)  # type: ignore[arg-type]
+
+
+def export_metrics(metrics: Dict[str, object], metrics_dir: Path) -> None:
+    """Write run metrics as JSON and as a Prometheus textfile-collector file."""
+
+    metrics_dir = Path(metrics_dir)
+    export_json(metrics, metrics_dir / METRICS_JSON)
+    export_prometheus(metrics, metrics_dir / METRICS_TEXTFILE)
 
 
 def run_daily_window(
@@ -36,8 +91,15 @@ def run_daily_window(
     start: time = WINDOW_START,
     end: time = WINDOW_END,
     idle_ceiling: int = 300,
+    catch_up_days: int = DEFAULT_LOOKBACK_DAYS,
+    metrics_dir: Optional[Path] = None,
 ) -> None:
-    """Run the analysis once per day inside the given intraday window."""
+    """Run the analysis once per trading day inside the given window.
+
+    Weekends and exchange holidays are skipped.  Once per day, sessions of
+    the last ``catch_up_days`` that are missing from the database are
+    backfilled first (see :mod:`.backfill`).
+    """
 
     log = logging.getLogger(__name__)
     log.info(
@@ -46,13 +108,58 @@ def run_daily_window(
         end.strftime("%H:%M"),
     )
 
+    db = Database(db_path or DEFAULT_DB_PATH)
+    writer = AsyncWriter(db)
+    try:
+        _window_loop(config, db, writer, start, end, idle_ceiling, catch_up_days, log, metrics_dir=metrics_dir)
+    finally:
+        try:
+            writer.close()
+        except PersistenceError as exc:
+            log.error("Results lost on shutdown: %s", exc)
+
+
+def _window_loop(
+    config: Optional[AnalysisConfig],
+    db: Database,
+    writer: AsyncWriter,
+    start: time,
+    end: time,
+    idle_ceiling: int,
+    catch_up_days: int,
+    log: logging.Logger,
+    deadline_margin: float = DEADLINE_MARGIN,
+    metrics_dir: Optional[Path] = None,
+) -> None:
+    caught_up: Optional[date] = None
     while True:
         now = datetime.now()
         current = now.time()
 
+        if caught_up != now.date():
+            try:
+                writer.flush()
+            except PersistenceError as exc:
+                log.error("Earlier results were not stored: %s", exc)
+            catch_up(db, now.date(), sink=writer, lookback_days=catch_up_days, config_factory=config_factory(config))
+            caught_up = now.date()
+
+        if not akshare_helper.is_trading_day(now.date()):
+            sleep_seconds = _seconds_until_next_window(start)
+            log.info("%s is not a trading session. Sleeping %.0f seconds.", now.date().isoformat(), sleep_seconds)
+            time_module.sleep(sleep_seconds)
+            continue
+
         if start <= current <= end:
             log.info("Window reached (%s). Launching analysis run.", now.isoformat(timespec="seconds"))
-            run(config=config, db_path=db_path)
+            deadline = datetime.combine(now.date(), end) - timedelta(seconds=deadline_margin)
+            run(
+                config=config_factory(config)(now.date()) if config is not None else None,
+                db_path=db.path,
+                writer=writer,
+                deadline=max(deadline, now),
+                metrics_dir=metrics_dir,
+            )
             sleep_seconds = _seconds_until_next_window(start)
             log.info("Run finished. Sleeping %.0f seconds until next window.", sleep_seconds)
             time_module.sleep(sleep_seconds)
@@ -68,6 +175,94 @@ def run_daily_window(
         time_module.sleep(sleep_value)
 
 
+def config_factory(config: Optional[AnalysisConfig]) -> Callable[[date], AnalysisConfig]:
+    """Return a per-session config builder keeping ``config``'s window length."""
+
+    if config is None:
+        return AnalysisConfig.daily_defaults
+    span = config.end_date - config.start_date
+    return lambda day: replace(config, start_date=day - span, end_date=day)
+
+
+def run_daemon(
+    config: Optional[AnalysisConfig] = None,
+    db_path: Optional[Path] = None,
+    start: time = WINDOW_START,
+    end: time = WINDOW_END,
+    idle_ceiling: int = 300,
+    port: int = 8765,
+    socket_path: Optional[Path] = None,
+    intraday_interval: Optional[int] = None,
+    catch_up_days: int = DEFAULT_LOOKBACK_DAYS,
+) -> None:
+    """Run the window scheduler as a warm daemon with the result API."""
+
+    daemon = SchedulerDaemon(
+        config_factory=config_factory(config),
+        db_path=db_path or DEFAULT_DB_PATH,
+        start=start,
+        end=end,
+        idle_ceiling=idle_ceiling,
+        intraday_interval=intraday_interval,
+        catch_up_days=catch_up_days,
+    )
+    server = start_api_server(daemon.cache, port=port, socket_path=socket_path)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:  # pragma: no cover - interactive shutdown
+        daemon.stop()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def run_intraday_window(
+    config: Optional[AnalysisConfig] = None,
+    interval: int = INTRADAY_INTERVAL,
+    sessions: Sequence[Tuple[time, time]] = INTRADAY_SESSIONS,
+    on_tick: Optional[Callable[[Dict[str, object]], None]] = None,
+    idle_ceiling: int = 300,
+    db_path: Optional[Path] = None,
+) -> None:
+    """Refresh rotation signals every ``interval`` seconds while trading.
+
+    Closed-day history is loaded once per session day; each tick only
+    pulls live snapshots (see :class:`~..intraday.IntradaySession`).
+    ``db_path`` locates the persisted lead-lag state.
+    Weekends and exchange holidays are slept through.
+    """
+
+    log = logging.getLogger(__name__)
+    log.info(
+        "Intraday scheduler active. Sessions %s, every %ds",
+        ", ".join(f"{start.strftime('%H:%M')}-{end.strftime('%H:%M')}" for start, end in sessions),
+        interval,
+    )
+    session: Optional[IntradaySession] = None
+    while True:
+        now = datetime.now()
+        if not akshare_helper.is_trading_day(now.date()):
+            session = None
+            tomorrow = datetime.combine(now.date() + timedelta(days=1), sessions[0][0])
+            sleep_seconds = min(float(idle_ceiling), max(1.0, (tomorrow - now).total_seconds()))
+            log.debug("%s is not a trading session. Sleeping %.0f seconds.", now.date().isoformat(), sleep_seconds)
+            time_module.sleep(sleep_seconds)
+            continue
+        if not in_sessions(now.time(), sessions):
+            if session is not None and now.time() > sessions[-1][1]:
+                session = None
+            time_module.sleep(min(float(idle_ceiling), seconds_until_next_session(now, sessions)))
+            continue
+
+        if session is None or session.session_day != now.date():
+            session = IntradaySession(cfg=config_factory(config)(now.date()), session_day=now.date(), db_path=db_path)
+        result = session.tick()
+        if on_tick is not None:
+            on_tick(result)
+        elapsed = (datetime.now() - now).total_seconds()
+        time_module.sleep(max(1.0, interval - elapsed))
+
+
 def _seconds_until_start(start: time) -> float:
     now = datetime.now()
     candidate = datetime.combine(now.date(), start)
@@ -102,21 +297,164 @@ def main(argv: Optional[list[str]] = None) -> None:
         default=300,
         help="Maximum seconds to sleep between window checks",
     )
+    parser.add_argument(
+        "--catch-up-days",
+        type=int,
+        default=DEFAULT_LOOKBACK_DAYS,
+        help="Backfill missing sessions from the last N days (0 disables)",
+    )
+    parser.add_argument(
+        "--backfill-from",
+        type=date.fromisoformat,
+        default=None,
+        help="Backfill every missing session since YYYY-MM-DD and exit",
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Worker threads for backfill batches")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="Shard boards across this many worker processes with --once",
+    )
+    parser.add_argument(
+        "--full-universe",
+        action="store_true",
+        help="Analyse every industry and concept board instead of the default sample",
+    )
+    parser.add_argument(
+        "--keep-untradable",
+        action="store_true",
+        help="Download every constituent, including ST, suspended and newly listed stocks",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep caches warm across days and serve the latest result over a local API",
+    )
+    parser.add_argument("--port", type=int, default=8765, help="Result API port on 127.0.0.1 (daemon mode)")
+    parser.add_argument("--socket", type=Path, default=None, help="Serve the result API on a Unix socket instead")
+    parser.add_argument(
+        "--intraday",
+        action="store_true",
+        help="Refresh signals during the trading session (combine with --daemon to serve them)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=INTRADAY_INTERVAL,
+        help="Seconds between intraday refreshes",
+    )
+    parser.add_argument(
+        "--metrics-dir",
+        type=Path,
+        default=None,
+        help="Write per-stage metrics (JSON and Prometheus textfile) to this directory",
+    )
+    parser.add_argument(
+        "--profile-memory",
+        action="store_true",
+        help="Trace peak memory per stage with tracemalloc (slower)",
+    )
+    parser.add_argument(
+        "--as-of",
+        type=date.fromisoformat,
+        default=None,
+        help="Session to analyse with --once (YYYY-MM-DD, defaults to today)",
+    )
+    parser.add_argument(
+        "--constituents",
+        type=Path,
+        default=None,
+        help="JSON file keeping dated board constituent snapshots across runs (for point-in-time backfills)",
+    )
+    fixtures = parser.add_mutually_exclusive_group()
+    fixtures.add_argument("--record", type=Path, default=None, help="Record raw akshare responses to this directory")
+    fixtures.add_argument(
+        "--replay",
+        type=Path,
+        default=None,
+        help="Answer akshare calls from a recorded directory without network access",
+    )
     args = parser.parse_args(argv)
+    if args.as_of is not None and not args.once:
+        # The window, daemon and intraday loops always analyse the current session.
+        parser.error("--as-of only applies with --once")
 
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s [%(levelname)s] %(name)s - %(message)s",
     )
 
-    if args.once:
-        run(db_path=args.db)
+    with ExitStack() as stack:
+        if args.constituents is not None:
+            stack.enter_context(akshare_helper.constituent_history(args.constituents))
+        if args.record is not None:
+            stack.enter_context(akshare_helper.fixtures(args.record, mode="record"))
+        elif args.replay is not None:
+            stack.enter_context(akshare_helper.fixtures(args.replay, mode="replay"))
+        _dispatch(args)
+
+
+def _config(args: argparse.Namespace) -> Optional[AnalysisConfig]:
+    as_of = args.as_of
+    if as_of is None and args.replay is not None:
+        # A replay re-runs the recorded session, not today's.
+        as_of = akshare_helper.session_today()
+    if args.full_universe:
+        config = AnalysisConfig.full_universe(as_of)
+    elif as_of or args.keep_untradable:
+        config = AnalysisConfig.daily_defaults(as_of)
+    else:
+        return None
+    return replace(config, universe_rules=None) if args.keep_untradable else config
+
+
+def _dispatch(args: argparse.Namespace) -> None:
+    if args.backfill_from is not None:
+        db = Database(args.db)
+        # Like catch_up, stop at the last closed session: today belongs to the regular window run.
+        last_closed = akshare_helper.previous_trading_day(akshare_helper.session_today())
+        sessions = missing_sessions(db, last_closed, since=args.backfill_from)
+        backfill_sessions(
+            sessions,
+            db,
+            config_factory=config_factory(_config(args)),
+            workers=args.workers,
+            state_path=lead_lag.state_path(db.path),
+        )
+    elif args.once:
+        run(
+            config=_config(args),
+            db_path=args.db,
+            metrics_dir=args.metrics_dir,
+            profile_memory=args.profile_memory,
+            processes=args.processes,
+        )
+    elif args.daemon:
+        run_daemon(
+            config=_config(args),
+            db_path=args.db,
+            start=args.start,
+            end=args.end,
+            idle_ceiling=args.idle_ceiling,
+            port=args.port,
+            socket_path=args.socket,
+            intraday_interval=args.interval if args.intraday else None,
+            catch_up_days=args.catch_up_days,
+        )
+    elif args.intraday:
+        run_intraday_window(
+            config=_config(args), interval=args.interval, idle_ceiling=args.idle_ceiling, db_path=args.db
+        )
     else:
         run_daily_window(
+            config=_config(args),
             db_path=args.db,
             start=args.start,
             end=args.end,
             idle_ceiling=args.idle_ceiling,
+            catch_up_days=args.catch_up_days,
+            metrics_dir=args.metrics_dir,
         )
 
 
@@ -0,0 +1,23 @@
+"""Trading-session time windows shared by the scheduler entry points."""
+from __future__ import annotations
+
+from datetime import datetime, time, timedelta
+from typing import Sequence, Tuple
+
+
+INTRADAY_SESSIONS: Tuple[Tuple[time, time], ...] = ((time(9, 30), time(11, 30)), (time(13, 0), time(15, 0)))
+INTRADAY_INTERVAL = 300
+
+
+def in_sessions(current: time, sessions: Sequence[Tuple[time, time]] = INTRADAY_SESSIONS) -> bool:
+    return any(start <= current <= end for start, end in sessions)
+
+
+def seconds_until_next_session(
+    now: datetime,
+    sessions: Sequence[Tuple[time, time]] = INTRADAY_SESSIONS,
+) -> float:
+    candidates = [datetime.combine(now.date(), start) for start, _ in sessions]
+    upcoming = [candidate for candidate in candidates if candidate > now]
+    target = min(upcoming) if upcoming else min(candidates) + timedelta(days=1)
+    return max(1.0, (target - now).total_seconds())
@@ -0,0 +1,316 @@
+"""Process-pool sharding of the per-board pipeline.
+
+Factor scoring is per board and pure Python, so one process uses one core.
+:func:`run_sharded_analysis` fetches every input once in the parent (on
+threads, the requests are I/O bound), packs the board bars and the stock
+closes into NumPy panels (:mod:`.data.factor_panels`) and publishes them
+with a :class:`~.data.factor_panels.PanelPublisher`.  A
+:class:`~concurrent.futures.ProcessPoolExecutor` then scores the boards in
+shards: each worker maps the published block zero-copy at start-up, and a
+shard is a contiguous run of panel rows, i.e. a view.  The per-board
+factor scores are merged and ranked in the parent exactly as in
+:func:`~.main.run_daily_analysis`.
+
+Workers receive a small pickled :class:`PanelShards` (config, panel
+descriptors and component quotes); tasks only carry a list of board codes
+and return compact factor components.  :class:`ShardPayload` and
+:func:`score_shard` remain for workers on other hosts
+(:mod:`.distributed`), which cannot map this host's memory and fetch
+their shards themselves.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import socket
+import time as time_module
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .config import AnalysisConfig
+from .data import board_data, stock_data
+from .data.factor_panels import (
+    FactorPanels,
+    PanelDescriptor,
+    PanelPublisher,
+    attach_panels,
+    build_close_panel,
+    build_panels,
+)
+from .data.universe_filter import UniverseReport
+from .db.async_writer import AsyncWriter
+from .db.database import Database
+from .db.writer import write_results
+from .factors import capital_factor, hype_factor, leader_factor, trend_factor
+from .main import (
+    FactorScores,
+    _collect_board_members,
+    _fetch_each,
+    analyse_factors,
+    collapse_overlaps,
+    compute_factors,
+    lead_lag_start,
+    lead_lag_state_path,
+    load_market_data,
+    lookback_panels,
+    merge_factor_scores,
+    track_follow_graph,
+)
+from .models import lead_lag
+from .utils import akshare_helper, logger
+from .utils.profiler import StageProfiler
+from .utils.telemetry import Checkpoint
+
+
+# Shards per process: smaller shards even out slow boards across workers.
+SHARDS_PER_PROCESS = 4
+
+
+@dataclass
+class ShardPayload:
+    """Read-only inputs shared by every worker."""
+
+    cfg: AnalysisConfig
+    boards: Dict[str, board_data.Board]
+    members: Dict[str, List[str]]
+    source: Dict[str, object]
+
+
+@dataclass
+class ShardResult:
+    boards: List[str]
+    factors: FactorScores
+    seconds: float
+    worker: str
+    # Constituents the worker screened out (None when no filter ran).
+    universe: Optional[UniverseReport] = None
+
+
+def shard_boards(boards: Sequence[board_data.Board], shard_count: int) -> List[List[board_data.Board]]:
+    """Deal ``boards`` round-robin into at most ``shard_count`` non-empty shards."""
+
+    shard_count = max(1, min(shard_count, len(boards)))
+    return [list(boards[index::shard_count]) for index in range(shard_count)]
+
+
+@dataclass
+class PanelShards:
+    """What a pool worker needs to score shards of already fetched data."""
+
+    cfg: AnalysisConfig
+    boards: PanelDescriptor
+    closes: PanelDescriptor
+    component_quotes: Dict[str, List[stock_data.BoardComponentQuote]]
+
+
+_WORKER_SHARDS: Optional[PanelShards] = None
+# Attached once per worker; pool workers live for one run.
+_WORKER_PANELS: Optional[FactorPanels] = None
+_WORKER_CLOSES: Optional[FactorPanels] = None
+
+
+def _init_worker(shards: PanelShards) -> None:
+    global _WORKER_SHARDS, _WORKER_PANELS, _WORKER_CLOSES
+    _WORKER_SHARDS = shards
+    _WORKER_PANELS = attach_panels(shards.boards)
+    _WORKER_CLOSES = attach_panels(shards.closes)
+
+
+def score_panels(
+    cfg: AnalysisConfig,
+    panels: FactorPanels,
+    closes: FactorPanels,
+    component_quotes: Dict[str, List[stock_data.BoardComponentQuote]],
+    codes: Sequence[str],
+) -> FactorScores:
+    """Factor components of the boards ``codes`` read from published panels."""
+
+    shard = panels.select(codes)
+    leader_candidates, leader_components = leader_factor.calculate_leader_factor_from_panels(
+        {code: component_quotes[code] for code in codes if code in component_quotes},
+        closes,
+        top_n=cfg.leaders_per_board,
+    )
+    return FactorScores(
+        trend=trend_factor.calculate_trend_factor_from_panels(shard),
+        hype=hype_factor.calculate_hype_factor_from_panels(shard),
+        capital=capital_factor.calculate_capital_factor_from_panels(shard),
+        leader_candidates=leader_candidates,
+        leader_components=leader_components,
+    )
+
+
+def _score_panel_shard(codes: List[str]) -> ShardResult:
+    assert _WORKER_SHARDS is not None and _WORKER_PANELS is not None, "worker was not initialised"
+    started = time_module.perf_counter()
+    factors = score_panels(_WORKER_SHARDS.cfg, _WORKER_PANELS, _WORKER_CLOSES, _WORKER_SHARDS.component_quotes, codes)
+    return ShardResult(
+        boards=list(codes),
+        factors=factors,
+        seconds=time_module.perf_counter() - started,
+        worker=f"{socket.gethostname()}:{os.getpid()}",
+    )
+
+
+def score_shard(payload: ShardPayload, codes: Sequence[str]) -> ShardResult:
+    """Fetch and score the boards ``codes`` of ``payload`` (used by remote workers)."""
+
+    started = time_module.perf_counter()
+    boards = [payload.boards[code] for code in codes]
+    with akshare_helper.pooled_http():
+        data = load_market_data(payload.cfg, boards, board_members=payload.members)
+    factors = compute_factors(payload.cfg, data)
+    return ShardResult(
+        boards=list(codes),
+        factors=factors,
+        seconds=time_module.perf_counter() - started,
+        worker=f"{socket.gethostname()}:{os.getpid()}",
+        universe=data.universe,
+    )
+
+
+def run_sharded_analysis(
+    cfg: Optional[AnalysisConfig] = None,
+    processes: Optional[int] = None,
+    db_path: Optional[Path] = None,
+    writer: Optional[AsyncWriter] = None,
+    profiler: Optional[StageProfiler] = None,
+    shards_per_process: int = SHARDS_PER_PROCESS,
+    mp_context: Optional[multiprocessing.context.BaseContext] = None,
+) -> Dict[str, object]:
+    """Like :func:`~.main.run_daily_analysis`, scoring boards on ``processes`` workers.
+
+    Workers are started with ``spawn`` by default so no lock held by a
+    thread of this process (HTTP pool, async writer) is inherited.
+    ``result["sharding"]`` reports per-shard timings; ``result["telemetry"]``
+    only covers calls made by this process.
+    """
+
+    cfg = cfg or AnalysisConfig.daily_defaults()
+    processes = processes or os.cpu_count() or 1
+    profiler = profiler or StageProfiler()
+    log = logger.get_logger(__name__)
+    checkpoint = akshare_helper.telemetry_checkpoint()
+
+    payload = build_payload(cfg, profiler)
+    boards = list(payload.boards.values())
+    state_path = lead_lag_state_path(db_path, writer)
+    # Fetching is I/O bound: one set of requests on threads, before the pool starts.
+    fetch_cfg = replace(cfg, fetch_workers=max(cfg.fetch_workers, processes))
+    with akshare_helper.pooled_http():
+        data = load_market_data(
+            fetch_cfg, boards, profiler, board_members=payload.members, lead_lag_start=lead_lag_start(cfg, state_path)
+        )
+    shards = shard_boards(boards, processes * max(1, shards_per_process))
+    tasks = [[board.code for board in shard] for shard in shards]
+    with profiler.stage("plan.panels", items=len(boards)):
+        # Rows in shard order, so every shard is a contiguous view of the block.
+        panels = build_panels(data.price_history, data.money_flow, data.hot_metrics).select(
+            code for task in tasks for code in task
+        )
+        closes = build_close_panel(data.stock_history)
+    with profiler.stage("model.lead_lag", items=len(data.price_history)):
+        # Advanced here like analyse_factors does, since shard results carry no bars.
+        follow_graph = track_follow_graph(
+            cfg, boards, data.price_history, data.money_flow, state_path=state_path, lookback=lookback_panels(data)
+        ).graph()
+    log.info("Scoring %d boards in %d shards on %d processes", len(boards), len(shards), processes)
+    results: List[ShardResult] = []
+    with PanelPublisher(panels) as board_block, PanelPublisher(closes) as close_block:
+        shared = PanelShards(
+            cfg=cfg,
+            boards=board_block.descriptor,
+            closes=close_block.descriptor,
+            component_quotes=data.component_quotes,
+        )
+        with profiler.stage("shards", items=len(boards)):
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=mp_context or multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(shared,),
+            ) as pool:
+                results = list(pool.map(_score_panel_shard, tasks))
+
+    result = finish_analysis(
+        cfg, boards, results, db_path, writer, profiler, checkpoint, universe=data.universe, follow_graph=follow_graph
+    )
+    result["sharding"] = _shard_summary(processes, results)
+    return result
+
+
+def build_payload(cfg: AnalysisConfig, profiler: StageProfiler) -> ShardPayload:
+    """List boards and constituents once for every shard of a run (constituents on ``cfg.fetch_workers`` threads)."""
+
+    with profiler.stage("fetch.boards") as stage:
+        boards = board_data.list_boards(limit=cfg.board_count, categories=cfg.categories)
+        stage.items = len(boards)
+    with profiler.stage("fetch.members") as stage, akshare_helper.pooled_http(), ExitStack() as stack:
+        pool = None
+        if cfg.fetch_workers > 1:
+            pool = stack.enter_context(ThreadPoolExecutor(cfg.fetch_workers, thread_name_prefix="fetch"))
+        members = _fetch_each(pool, _collect_board_members, boards, cfg.end_date)
+        stage.items = sum(len(symbols) for symbols in members.values())
+    boards, members = collapse_overlaps(cfg, boards, members, profiler)
+    return ShardPayload(
+        cfg=cfg,
+        boards={board.code: board for board in boards},
+        members=members,
+        source=akshare_helper.source_config(),
+    )
+
+
+def finish_analysis(
+    cfg: AnalysisConfig,
+    boards: List[board_data.Board],
+    results: Sequence[ShardResult],
+    db_path: Optional[Path],
+    writer: Optional[AsyncWriter],
+    profiler: StageProfiler,
+    checkpoint: Checkpoint,
+    universe: Optional[UniverseReport] = None,
+    follow_graph: Optional[lead_lag.FollowGraph] = None,
+) -> Dict[str, object]:
+    """Merge shard scores, then rank, report and persist like a single-process run."""
+
+    factors = merge_factor_scores(result.factors for result in results)
+    try:
+        outcome = analyse_factors(
+            cfg,
+            boards,
+            factors,
+            profiler=profiler,
+            follow_graph=follow_graph,
+            lead_lag_state=lead_lag_state_path(db_path, writer),
+        )
+        if universe is not None:
+            outcome.result["universe"] = universe.as_dict()
+        with profiler.stage("persist") as stage:
+            sink = writer if writer is not None else Database(db_path) if db_path is not None else None
+            if sink is not None:
+                write_results(
+                    sink, cfg.end_date, outcome.top_selection, outcome.rotation_candidates, outcome.leader_picks
+                )
+            stage.items = len(outcome.top_selection) + len(outcome.rotation_candidates)
+    finally:
+        profiler.close()
+
+    outcome.result["metrics"] = profiler.as_dict()
+    telemetry = akshare_helper.telemetry_snapshot(since=checkpoint)
+    akshare_helper.warn_on_fallbacks(telemetry)
+    outcome.result["telemetry"] = telemetry
+    return outcome.result
+
+
+def _shard_summary(processes: int, results: Sequence[ShardResult]) -> Dict[str, object]:
+    busy: Dict[str, float] = {}
+    for result in results:
+        busy[result.worker] = busy.get(result.worker, 0.0) + result.seconds
+    return {
+        "processes": processes,
+        "shards": [{"boards": len(result.boards), "seconds": result.seconds} for result in results],
+        "busy_seconds": dict(sorted(busy.items())),
+    }
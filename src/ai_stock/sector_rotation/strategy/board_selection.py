@@ -1,19 +1,33 @@
 """Board selection logic."""
 from __future__ import annotations
 
-from typing import Iterable, List, Sequence
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence
 
 from ..models.rps_predict import RpsCandidate
 from ..models.strong_board import BoardScore
 
+if TYPE_CHECKING:  # pragma: no cover
+    from ..data.board_similarity import BoardClusters
 
-def select_primary_boards(scores: Sequence[BoardScore], top_n: int, min_score: float = 0.0) -> List[BoardScore]:
-    """Select the strongest boards currently in an up-leg."""
+
+def select_primary_boards(
+    scores: Sequence[BoardScore],
+    top_n: int,
+    min_score: float = 0.0,
+    clusters: Optional["BoardClusters"] = None,
+) -> List[BoardScore]:
+    """Select the strongest boards currently in an up-leg.
+
+    With ``clusters`` a board directly overlapping a better scoring
+    selected board is skipped.
+    """
 
     primary: List[BoardScore] = []
     for score in scores:
         if score.score < min_score and len(primary) >= top_n:
             continue
+        if clusters is not None and clusters.overlapping(score.board, [kept.board for kept in primary]) is not None:
+            continue
         primary.append(score)
         if len(primary) >= top_n:
             break
@@ -2,22 +2,56 @@
 
 The helper sits between the domain logic and the "akshare" package to
 provide deterministic fallbacks when network access is unavailable.
+Every endpoint call goes through :func:`_call` and every synthetic
+substitution through :func:`_record_fallback`, so :func:`telemetry_snapshot`
+shows which endpoints are slow, failing or being replaced by fake data.
+Inside :func:`fixtures` the raw responses are recorded to, or replayed
+from, a local :class:`~.fixture_store.FixtureStore`; while replaying,
+:func:`session_today` is the recorded day, so window defaults and cache
+expiry behave as they did on that day.  Live calls pass a
+per-endpoint circuit breaker (:mod:`.circuit_breaker`) so a degraded
+endpoint fails fast instead of timing out once per symbol.  Within
+:func:`pooled_http` akshare's HTTP requests share keep-alive connections.
+Response caches are :func:`~.single_flight.single_flight` caches: threads
+asking for the same key at the same time wait for one fetch, data caches
+are bounded by a byte budget and windows that include today expire after
+:data:`LIVE_TTL` (windows of closed sessions never do).  Live constituent
+lists are also versioned by date in :data:`CONSTITUENTS`.  A board whose
+history request fails is priced from its constituents' bars
+(:mod:`.board_index`) before falling back to synthetic data.
 """
 from __future__ import annotations
 
+import bisect
 import logging
 import random
+import time
+import zlib
+from contextlib import ExitStack, contextmanager, nullcontext
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
-from functools import lru_cache
 import math
-from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from . import board_index, synthetic_market
+from .circuit_breaker import BreakerRegistry, CircuitOpenError, call_with_retry
+from .constituent_store import ConstituentStore
+from .fixture_store import FixtureStore
+from .history_store import ResidentHistory
+from .single_flight import SessionTTL, single_flight
+from .telemetry import Checkpoint, Telemetry
 
 try:  # pragma: no cover - exercised in integration scenarios.
     import akshare as ak
 except ImportError:  # pragma: no cover - unit tests rely on the fallback path.
     ak = None  # type: ignore
 
+try:  # requests ships with akshare.
+    from .http_pool import HttpPool
+except ImportError:  # pragma: no cover - depends on the environment.
+    HttpPool = None  # type: ignore
+
 
 LOGGER = logging.getLogger(__name__)
 AK_AVAILABLE = ak is not None
@@ -30,6 +64,22 @@ class BoardInfo:
     category: str = "industry"
 
 
+class FallbackRecords(list):
+    """Records substituted for an unavailable endpoint (synthetic or rebuilt).
+
+    They are returned like live data but never kept as final history, and
+    response caches keep them for :data:`FALLBACK_TTL` seconds at most.
+    """
+
+
+class FallbackMapping(dict):
+    """Mapping counterpart of :class:`FallbackRecords`."""
+
+
+def _is_fallback(value: object) -> bool:
+    return isinstance(value, (FallbackRecords, FallbackMapping))
+
+
 @dataclass(frozen=True)
 class SyntheticBoard:
     code: str
@@ -57,6 +107,80 @@ _SYNTHETIC_BOARDS: Dict[str, Dict[str, SyntheticBoard]] = {
 _DEFAULT_MAX_MEMBERS = 50
 _DEFAULT_CALENDAR_SPAN = 365
 
+_MB = 1 << 20
+# Intraday responses go stale after this; set ``LIVE_TTL.live_seconds`` to retune.
+LIVE_TTL = SessionTTL(live_seconds=15 * 60, today=lambda: session_today())
+# Substitutes for an unavailable endpoint are retried after this many seconds.
+FALLBACK_TTL = 60.0
+# Weighting of board indices rebuilt from constituents when a board history request fails.
+INDEX_FALLBACK_WEIGHTING = "turnover"
+
+# Bars of closed sessions, kept across runs of a long-lived process.
+_RESIDENT_HISTORY = ResidentHistory(
+    today=lambda: session_today(), keep=lambda records, first, last: _is_final_history(records, first, last)
+)
+
+TELEMETRY = Telemetry()
+# Dated member lists of every board fetched live, see :func:`constituent_history`.
+CONSTITUENTS = ConstituentStore()
+# One breaker per endpoint; tune via ``BREAKERS.policy`` before the first call.
+BREAKERS = BreakerRegistry()
+# Shared keep-alive connections, installed by :func:`pooled_http`.
+HTTP_POOL = HttpPool() if HttpPool is not None else None
+
+# Active record/replay store, see :func:`fixtures`.
+_FIXTURES: Optional[FixtureStore] = None
+
+
+def _source_available() -> bool:
+    return AK_AVAILABLE or (_FIXTURES is not None and _FIXTURES.replaying)
+
+
+def session_today() -> date:
+    """Today, or the recorded day while replaying fixtures that know it."""
+
+    store = _FIXTURES
+    if store is not None and store.replaying and store.recorded_on is not None:
+        return store.recorded_on
+    return date.today()
+
+
+def _call(endpoint: str, **kwargs: object):
+    """Call ``ak.<endpoint>`` recording latency, row count and failures."""
+
+    store = _FIXTURES
+    started = time.perf_counter()
+    try:
+        if store is not None and store.replaying:
+            df = store.load(endpoint, kwargs)
+        else:
+            func = getattr(ak, endpoint)
+            with _http_route():
+                df = call_with_retry(BREAKERS.get(endpoint), lambda: func(**kwargs))
+    except Exception:
+        TELEMETRY.record_call(endpoint, time.perf_counter() - started, error=True)
+        raise
+    TELEMETRY.record_call(endpoint, time.perf_counter() - started, rows=len(df) if df is not None else 0)
+    if store is not None and store.recording:
+        store.save(endpoint, kwargs, df)
+    return df
+
+
+def _http_route():
+    """Scope in which akshare's requests use :data:`HTTP_POOL` (when :func:`pooled_http` is active)."""
+
+    return HTTP_POOL.route() if HTTP_POOL is not None else nullcontext()
+
+
+def _record_fallback(endpoint: str) -> None:
+    TELEMETRY.record_fallback(endpoint)
+
+
+def _warn_failure(exc: Exception, message: str, *args: object) -> None:
+    # An open circuit is reported once when it trips, not for every symbol.
+    level = logging.DEBUG if isinstance(exc, CircuitOpenError) else logging.WARNING
+    LOGGER.log(level, message, *args)
+
 
 # ---------------------------------------------------------------------------
 # Board metadata helpers
@@ -67,10 +191,12 @@ def list_boards(
     categories: Optional[Sequence[str]] = None,
 ) -> List[BoardInfo]:
     cats = tuple(categories) if categories is not None else ("industry",)
-    boards: List[BoardInfo] = []
+    unique: Dict[str, BoardInfo] = {}
     for category in cats:
-        boards.extend(_load_board_infos(category))
-    boards.sort(key=lambda info: (info.category, info.code))
+        for info in _load_board_infos(category):
+            # A code listed under several categories is kept once, under the first.
+            unique.setdefault(info.code, info)
+    boards = sorted(unique.values(), key=lambda info: (info.category, info.code))
     if limit is not None:
         boards = boards[:limit]
     return boards
@@ -92,80 +218,101 @@ def get_board_info(code: str) -> BoardInfo:
         raise KeyError(f"Unknown board code '{code}'") from exc
 
 
-def board_members(code: str, category: Optional[str] = None, limit: Optional[int] = None) -> List[str]:
+def board_members(
+    code: str,
+    category: Optional[str] = None,
+    limit: Optional[int] = None,
+    as_of: Optional[date] = None,
+) -> List[str]:
+    """Constituent symbols; past sessions use the snapshot in effect on ``as_of`` when one was recorded."""
+
     info = get_board_info(code)
     if category and category != info.category:
         info = BoardInfo(code=info.code, name=info.name, category=category)
     limit = limit or _DEFAULT_MAX_MEMBERS
-    if AK_AVAILABLE:
-        try:
-            if info.category == "concept":
-                df = ak.stock_board_concept_cons_em(symbol=info.name)
-            else:
-                df = ak.stock_board_industry_cons_em(symbol=info.name)
-        except Exception as exc:  # pragma: no cover - network dependent.
-            LOGGER.warning("Falling back to synthetic members for %s: %s", code, exc)
-        else:
-            members = [
-                str(item).strip()
-                for item in df.get("代码", [])
-                if str(item).strip()
-            ]
-            if members:
-                return members[:limit]
+    if as_of is not None and as_of < session_today():
+        recorded = CONSTITUENTS.members_as_of(code, as_of)
+        if recorded is not None:
+            return recorded[:limit]
+    live = _board_constituents_cache(info.category, info.code, info.name)
+    members = [str(item["symbol"]) for item in live]
+    if members:
+        return members[:limit]
     synthetic = _SYNTHETIC_BOARDS.get(info.category, {}).get(code)
     if synthetic is None:
         raise KeyError(f"No member data for board '{code}'")
     return synthetic.members[:limit]
 
 
-def board_member_snapshot(code: str, category: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, float]]:
+def board_member_snapshot(
+    code: str,
+    category: Optional[str] = None,
+    limit: Optional[int] = None,
+    refresh: bool = False,
+) -> List[Dict[str, float]]:
+    """Return constituent quotes; ``refresh`` bypasses the session cache."""
+
     info = get_board_info(code)
     if category and category != info.category:
         info = BoardInfo(code=info.code, name=info.name, category=category)
     limit = limit or _DEFAULT_MAX_MEMBERS
-    if AK_AVAILABLE:
-        try:
-            if info.category == "concept":
-                df = ak.stock_board_concept_cons_em(symbol=info.name)
-            else:
-                df = ak.stock_board_industry_cons_em(symbol=info.name)
-        except Exception as exc:  # pragma: no cover
-            LOGGER.warning("Unable to fetch live component snapshot for %s: %s", code, exc)
-        else:
-            records: List[Dict[str, float]] = []
-            for _, row in df.head(limit).iterrows():
-                symbol = str(row.get("代码") or "").strip()
-                name = str(row.get("名称") or "").strip()
-                if not symbol or not name:
-                    continue
-                records.append(
-                    {
-                        "symbol": symbol,
-                        "name": name,
-                        "price": _to_float(row.get("最新价")),
-                        "pct_change": _to_float(row.get("涨跌幅")),
-                        "turnover": _to_float(row.get("成交额")),
-                        "turnover_rate": _to_float(row.get("换手率")),
-                    }
-                )
-            if records:
-                return records
+    loader = _board_constituents_cache.__wrapped__ if refresh else _board_constituents_cache
+    live = loader(info.category, info.code, info.name)
+    if live:
+        return [dict(item) for item in live[:limit]]
     return _synthetic_component_snapshot(info, limit)
 
 
-@lru_cache(maxsize=4)
+@single_flight(maxsize=None, max_bytes=64 * _MB, ttl=LIVE_TTL, fallback=_is_fallback, fallback_ttl=FALLBACK_TTL)
+def _board_constituents_cache(category: str, code: str, name: str) -> List[Dict[str, float]]:
+    """Return the live constituent table of a board (empty when unavailable).
+
+    Member lists and component snapshots come from the same
+    ``stock_board_*_cons_em`` endpoint, so one request serves both.
+    """
+
+    endpoint = "stock_board_concept_cons_em" if category == "concept" else "stock_board_industry_cons_em"
+    if not _source_available():
+        _record_fallback(endpoint)
+        return FallbackRecords()
+    try:
+        df = _call(endpoint, symbol=name)
+    except Exception as exc:  # pragma: no cover - network dependent.
+        _warn_failure(exc, "Falling back to synthetic members for %s: %s", code, exc)
+        _record_fallback(endpoint)
+        return FallbackRecords()
+    records: List[Dict[str, float]] = []
+    for _, row in df.iterrows():
+        symbol = str(row.get("代码") or "").strip()
+        if not symbol:
+            continue
+        records.append(
+            {
+                "symbol": symbol,
+                "name": str(row.get("名称") or "").strip() or symbol,
+                "price": _to_float(row.get("最新价")),
+                "pct_change": _to_float(row.get("涨跌幅")),
+                "turnover": _to_float(row.get("成交额")),
+                "turnover_rate": _to_float(row.get("换手率")),
+            }
+        )
+    if not records:
+        _record_fallback(endpoint)
+        return FallbackRecords()
+    CONSTITUENTS.record(code, [record["symbol"] for record in records], session_today())
+    return records
+
+
+@single_flight(maxsize=4, fallback=_is_fallback, fallback_ttl=FALLBACK_TTL)
 def _load_board_infos(category: str) -> List[BoardInfo]:
     if category not in _SYNTHETIC_BOARDS:
         raise ValueError(f"Unsupported board category: {category}")
-    if AK_AVAILABLE:
+    endpoint = "stock_board_concept_name_em" if category == "concept" else "stock_board_industry_name_em"
+    if _source_available():
         try:
-            if category == "concept":
-                df = ak.stock_board_concept_name_em()
-            else:
-                df = ak.stock_board_industry_name_em()
+            df = _call(endpoint)
         except Exception as exc:  # pragma: no cover
-            LOGGER.warning("Unable to fetch %s board list, using fallback: %s", category, exc)
+            _warn_failure(exc, "Unable to fetch %s board list, using fallback: %s", category, exc)
         else:
             if "排名" in df.columns:
                 df = df.sort_values(by="排名")
@@ -178,19 +325,66 @@ def _load_board_infos(category: str) -> List[BoardInfo]:
                 boards.append(BoardInfo(code=code, name=name, category=category))
             if boards:
                 return boards
-    return [
+    _record_fallback(endpoint)
+    return FallbackRecords(
         BoardInfo(code=board.code, name=board.name, category=board.category)
         for board in _SYNTHETIC_BOARDS[category].values()
-    ]
+    )
 
 
-@lru_cache(maxsize=1)
+@single_flight(maxsize=1, fallback=_is_fallback, fallback_ttl=FALLBACK_TTL)
 def _board_info_index() -> Dict[str, BoardInfo]:
     mapping: Dict[str, BoardInfo] = {}
+    degraded = False
     for category in _SYNTHETIC_BOARDS.keys():
-        for info in _load_board_infos(category):
+        infos = _load_board_infos(category)
+        degraded = degraded or _is_fallback(infos)
+        for info in infos:
             mapping[info.code] = info
-    return mapping
+    return FallbackMapping(mapping) if degraded else mapping
+
+
+@single_flight(maxsize=1)
+def _synthetic_sectors() -> Dict[str, str]:
+    """Map each synthetic symbol to the first board listing it."""
+
+    sectors: Dict[str, str] = {}
+    for category in sorted(_SYNTHETIC_BOARDS):
+        for code, board in sorted(_SYNTHETIC_BOARDS[category].items()):
+            for symbol in board.members:
+                sectors.setdefault(symbol, code)
+    return sectors
+
+
+def board_spot_quotes(category: str = "industry") -> Dict[str, Dict[str, float]]:
+    """Return live board quotes keyed by board code (never cached).
+
+    The board list endpoints double as the intraday spot feed: besides the
+    names they carry the latest index level, change and turnover rate.
+    """
+
+    endpoint = "stock_board_concept_name_em" if category == "concept" else "stock_board_industry_name_em"
+    if _source_available():
+        try:
+            df = _call(endpoint)
+        except Exception as exc:  # pragma: no cover
+            _warn_failure(exc, "Unable to fetch %s board spot quotes: %s", category, exc)
+        else:
+            quotes: Dict[str, Dict[str, float]] = {}
+            for _, row in df.iterrows():
+                code = str(row.get("板块代码") or row.get("代码") or "").strip()
+                if not code:
+                    continue
+                quotes[code] = {
+                    "price": _to_float(row.get("最新价")),
+                    "change_pct": _to_float(row.get("涨跌幅")),
+                    "change_amount": _to_float(row.get("涨跌额")),
+                    "turnover_rate": _to_float(row.get("换手率")),
+                }
+            if quotes:
+                return quotes
+    _record_fallback(endpoint)
+    return {}
 
 
 # ---------------------------------------------------------------------------
@@ -202,26 +396,44 @@ def iter_trading_days(start: date, end: date) -> Iterator[date]:
         return
     calendar = _load_trading_calendar()
     if not calendar:
-        yield from _iter_simple_days(start, end)
+        yield from _iter_weekdays(start, end)
         return
     if start < calendar[0] or end > calendar[-1]:
-        yield from _iter_simple_days(start, end)
+        yield from _iter_weekdays(start, end)
         return
-    for trading_day in calendar:
-        if trading_day < start:
-            continue
-        if trading_day > end:
-            break
-        yield trading_day
+    idx = bisect.bisect_left(calendar, start)
+    while idx < len(calendar) and calendar[idx] <= end:
+        yield calendar[idx]
+        idx += 1
+
+
+def is_trading_day(day: date) -> bool:
+    """Return whether ``day`` is a session (weekdays outside the calendar)."""
+
+    calendar = _load_trading_calendar()
+    if not calendar or day < calendar[0] or day > calendar[-1]:
+        return day.weekday() < 5
+    idx = bisect.bisect_left(calendar, day)
+    return idx < len(calendar) and calendar[idx] == day
+
+
+def previous_trading_day(day: date) -> date:
+    """Return the last trading session strictly before ``day``."""
+
+    calendar = _load_trading_calendar()
+    if calendar and calendar[0] < day <= calendar[-1] + timedelta(days=1):
+        idx = bisect.bisect_left(calendar, day)
+        return calendar[idx - 1]
+    return day - timedelta(days=1)
 
 
-@lru_cache(maxsize=1)
+@single_flight(maxsize=1, fallback=_is_fallback, fallback_ttl=FALLBACK_TTL)
 def _load_trading_calendar() -> List[date]:
-    if AK_AVAILABLE:
+    if _source_available():
         try:
-            df = ak.tool_trade_date_hist_sina()
+            df = _call("tool_trade_date_hist_sina")
         except Exception as exc:  # pragma: no cover
-            LOGGER.warning("Unable to fetch trading calendar, using naive dates: %s", exc)
+            _warn_failure(exc, "Unable to fetch trading calendar, using naive dates: %s", exc)
         else:
             days: List[date] = []
             for value in df.get("trade_date", []):
@@ -231,9 +443,10 @@ def _load_trading_calendar() -> List[date]:
             if days:
                 days.sort()
                 return days
-    today = date.today()
+    _record_fallback("tool_trade_date_hist_sina")
+    today = session_today()
     start = today - timedelta(days=_DEFAULT_CALENDAR_SPAN)
-    return [start + timedelta(days=offset) for offset in range(_DEFAULT_CALENDAR_SPAN * 2)]
+    return FallbackRecords(_iter_weekdays(start, today + timedelta(days=_DEFAULT_CALENDAR_SPAN)))
 
 
 # ---------------------------------------------------------------------------
@@ -251,9 +464,13 @@ def board_price_history(
     if category and category != info.category:
         info = BoardInfo(code=info.code, name=info.name, category=category)
     name = board_name or info.name
-    start_key = start.strftime("%Y%m%d")
-    end_key = end.strftime("%Y%m%d")
-    return _board_price_cache(info.category, code, name, start_key, end_key, start, end)
+
+    def fetch(first: date, last: date) -> List[Dict[str, float]]:
+        return _board_price_cache(
+            info.category, code, name, first.strftime("%Y%m%d"), last.strftime("%Y%m%d"), first, last
+        )
+
+    return _RESIDENT_HISTORY.get(("board", info.category, code), start, end, fetch)
 
 
 def board_money_flow(
@@ -293,7 +510,7 @@ def board_hot_metrics(
     return metrics
 
 
-@lru_cache(maxsize=128)
+@single_flight(maxsize=None, max_bytes=64 * _MB, ttl=LIVE_TTL, fallback=_is_fallback, fallback_ttl=FALLBACK_TTL)
 def _board_price_cache(
     category: str,
     code: str,
@@ -303,26 +520,15 @@ def _board_price_cache(
     start: date,
     end: date,
 ) -> List[Dict[str, float]]:
-    if AK_AVAILABLE:
+    if category == "concept":
+        endpoint, period = "stock_board_concept_hist_em", "daily"
+    else:
+        endpoint, period = "stock_board_industry_hist_em", "日k"
+    if _source_available():
         try:
-            if category == "concept":
-                df = ak.stock_board_concept_hist_em(
-                    symbol=name,
-                    start_date=start_key,
-                    end_date=end_key,
-                    period="daily",
-                    adjust="",
-                )
-            else:
-                df = ak.stock_board_industry_hist_em(
-                    symbol=name,
-                    start_date=start_key,
-                    end_date=end_key,
-                    period="日k",
-                    adjust="",
-                )
+            df = _call(endpoint, symbol=name, start_date=start_key, end_date=end_key, period=period, adjust="")
         except Exception as exc:  # pragma: no cover
-            LOGGER.warning("Fallback to synthetic price history for %s: %s", code, exc)
+            _warn_failure(exc, "Fallback to synthetic price history for %s: %s", code, exc)
         else:
             records: List[Dict[str, float]] = []
             for _, row in df.iterrows():
@@ -343,10 +549,64 @@ def _board_price_cache(
             if records:
                 records.sort(key=lambda item: item["date"])
                 return records
-    return _synthetic_board_history(code, start, end)
+        rebuilt = _constituent_fallback(category, code, name, start, end)
+        if rebuilt:
+            _record_fallback(endpoint)
+            return FallbackRecords(rebuilt)
+    _record_fallback(endpoint)
+    return FallbackRecords(_synthetic_board_history(code, start, end))
+
+
+def _constituent_fallback(category: str, code: str, name: str, start: date, end: date) -> List[Dict[str, float]]:
+    """Board records rebuilt from live constituent bars; empty when those are unavailable too."""
+
+    if BREAKERS.get("stock_zh_a_hist").is_open():
+        return []
+    constituents = _board_constituents_cache(category, code, name)
+    if _is_fallback(constituents) or not constituents:
+        return []
+    members = tuple(str(item["symbol"]) for item in constituents)[:_DEFAULT_MAX_MEMBERS]
+    LOGGER.warning("Rebuilding %s history from %d constituents", code, len(members))
+    return constituent_index_history(code, members, start, end, INDEX_FALLBACK_WEIGHTING)
+
+
+def constituent_index_history(
+    code: str,
+    members: Sequence[str],
+    start: date,
+    end: date,
+    weighting: str = "equal",
+) -> List[Dict[str, float]]:
+    """Board price records built from ``members``' daily bars.
+
+    Also prices custom boards that only exist as symbol lists; ``code``
+    just names the result.  Members whose history is a synthetic fallback
+    are left out, so the index only reflects live bars; such a partial (or
+    empty) index is a :class:`FallbackRecords` and is rebuilt once it
+    expires.
+    """
+
+    return _constituent_index_cache(code, tuple(members), weighting, start, end)
+
+
+@single_flight(maxsize=None, max_bytes=32 * _MB, ttl=LIVE_TTL, fallback=_is_fallback, fallback_ttl=FALLBACK_TTL)
+def _constituent_index_cache(
+    code: str,
+    members: Tuple[str, ...],
+    weighting: str,
+    start: date,
+    end: date,
+) -> List[Dict[str, float]]:
+    history = {symbol: stock_history(symbol, start, end) for symbol in members}
+    live = {symbol: bars for symbol, bars in history.items() if not _is_fallback(bars)}
+    index = board_index.build_board_indices({code: list(live)}, live, weighting=weighting)[code]
+    if len(live) < len(history) or not index:
+        LOGGER.warning("Index of %s leaves out %d constituents without live bars", code, len(history) - len(live))
+        return FallbackRecords(index)
+    return index
 
 
-@lru_cache(maxsize=128)
+@single_flight(maxsize=None, max_bytes=32 * _MB, ttl=LIVE_TTL, fallback=_is_fallback, fallback_ttl=FALLBACK_TTL)
 def _board_money_cache(
     category: str,
     code: str,
@@ -354,14 +614,12 @@ def _board_money_cache(
     start: date,
     end: date,
 ) -> List[Dict[str, float]]:
-    if AK_AVAILABLE:
+    endpoint = "stock_concept_fund_flow_hist" if category == "concept" else "stock_sector_fund_flow_hist"
+    if _source_available():
         try:
-            if category == "concept":
-                df = ak.stock_concept_fund_flow_hist(symbol=name)
-            else:
-                df = ak.stock_sector_fund_flow_hist(symbol=name)
+            df = _call(endpoint, symbol=name)
         except Exception as exc:  # pragma: no cover
-            LOGGER.warning("Fallback to synthetic money flow for %s: %s", code, exc)
+            _warn_failure(exc, "Fallback to synthetic money flow for %s: %s", code, exc)
         else:
             records: List[Dict[str, float]] = []
             for _, row in df.iterrows():
@@ -381,7 +639,8 @@ def _board_money_cache(
             if records:
                 records.sort(key=lambda item: item["date"])
                 return records
-    return _synthetic_board_money_flow(code, start, end)
+    _record_fallback(endpoint)
+    return FallbackRecords(_synthetic_board_money_flow(code, start, end))
 
 
 # ---------------------------------------------------------------------------
@@ -389,18 +648,19 @@ def _board_money_cache(
 
 
 def stock_history(symbol: str, start: date, end: date) -> List[Dict[str, float]]:
-    start_key = start.strftime("%Y%m%d")
-    end_key = end.strftime("%Y%m%d")
-    return _stock_history_cache(symbol, start_key, end_key, start, end)
+    def fetch(first: date, last: date) -> List[Dict[str, float]]:
+        return _stock_history_cache(symbol, first.strftime("%Y%m%d"), last.strftime("%Y%m%d"), first, last)
+
+    return _RESIDENT_HISTORY.get(("stock", symbol), start, end, fetch)
 
 
 def stock_money_flow(symbol: str, start: date, end: date) -> List[Dict[str, float]]:
     market = _detect_market(symbol)
-    if AK_AVAILABLE and market is not None:
+    if _source_available() and market is not None:
         try:
-            df = ak.stock_individual_fund_flow(stock=symbol[:6], market=market)
+            df = _call("stock_individual_fund_flow", stock=symbol[:6], market=market)
         except Exception as exc:  # pragma: no cover
-            LOGGER.debug("Stock %s money flow unavailable, using synthetic data: %s", symbol, exc)
+            _warn_failure(exc, "Stock %s money flow unavailable, using synthetic data: %s", symbol, exc)
         else:
             records: List[Dict[str, float]] = []
             for _, row in df.iterrows():
@@ -419,15 +679,51 @@ def stock_money_flow(symbol: str, start: date, end: date) -> List[Dict[str, floa
             if records:
                 records.sort(key=lambda item: item["date"])
                 return records
+    _record_fallback("stock_individual_fund_flow")
     return _synthetic_stock_money_flow(symbol, start, end)
 
 
+def stock_spot_listing() -> Dict[str, Dict[str, object]]:
+    """Current session quote of every A-share keyed by symbol (empty when unavailable).
+
+    One bulk ``stock_zh_a_spot_em`` request; used to screen constituents
+    (ST, suspended, new listings) before their histories are requested.
+    """
+
+    return _stock_spot_cache()
+
+
+@single_flight(maxsize=1, ttl=LIVE_TTL, fallback=_is_fallback, fallback_ttl=FALLBACK_TTL)
+def _stock_spot_cache() -> Dict[str, Dict[str, object]]:
+    if _source_available():
+        try:
+            df = _call("stock_zh_a_spot_em")
+        except Exception as exc:  # pragma: no cover - network dependent.
+            _warn_failure(exc, "A-share spot snapshot unavailable, keeping every constituent: %s", exc)
+        else:
+            listing: Dict[str, Dict[str, object]] = {}
+            for _, row in df.iterrows():
+                symbol = str(row.get("代码") or "").strip()
+                if not symbol:
+                    continue
+                listing[symbol] = {
+                    "name": str(row.get("名称") or "").strip(),
+                    "price": _to_float(row.get("最新价")),
+                    "volume": _to_float(row.get("成交量")),
+                    "turnover": _to_float(row.get("成交额")),
+                }
+            if listing:
+                return listing
+    _record_fallback("stock_zh_a_spot_em")
+    return FallbackMapping()
+
+
 def stock_hot_rank(limit: int = 20) -> List[Dict[str, object]]:
-    if AK_AVAILABLE:
+    if _source_available():
         try:
-            df = ak.stock_hot_rank_em()
+            df = _call("stock_hot_rank_em")
         except Exception as exc:  # pragma: no cover
-            LOGGER.debug("Hot rank unavailable, using synthetic data: %s", exc)
+            _warn_failure(exc, "Hot rank unavailable, using synthetic data: %s", exc)
         else:
             records: List[Dict[str, object]] = []
             for _, row in df.head(limit).iterrows():
@@ -442,13 +738,14 @@ def stock_hot_rank(limit: int = 20) -> List[Dict[str, object]]:
                 )
             if records:
                 return records
+    _record_fallback("stock_hot_rank_em")
     return _synthetic_hot_rank(limit)
 
 
 def stock_news(symbol: str, limit: int = 10) -> List[Dict[str, object]]:
-    if AK_AVAILABLE:
+    if _source_available():
         try:
-            df = ak.stock_news_em(symbol=symbol)
+            df = _call("stock_news_em", symbol=symbol)
         except Exception as exc:  # pragma: no cover
             LOGGER.debug("News fetch failed for %s: %s", symbol, exc)
         else:
@@ -465,12 +762,13 @@ def stock_news(symbol: str, limit: int = 10) -> List[Dict[str, object]]:
                         "url": str(row.get("新闻链接") or "").strip(),
                     }
                 )
-            if records:
-                return records
+            # No recent news is a valid answer, not a fallback.
+            return records
+    _record_fallback("stock_news_em")
     return []
 
 
-@lru_cache(maxsize=256)
+@single_flight(maxsize=None, max_bytes=256 * _MB, ttl=LIVE_TTL, fallback=_is_fallback, fallback_ttl=FALLBACK_TTL)
 def _stock_history_cache(
     symbol: str,
     start_key: str,
@@ -478,13 +776,13 @@ def _stock_history_cache(
     start: date,
     end: date,
 ) -> List[Dict[str, float]]:
-    if AK_AVAILABLE:
+    if _source_available():
         market = _detect_market(symbol)
         if market is not None:
             try:
-                df = ak.stock_zh_a_hist(symbol=symbol[:6], start_date=start_key, end_date=end_key, adjust="")
+                df = _call("stock_zh_a_hist", symbol=symbol[:6], start_date=start_key, end_date=end_key, adjust="")
             except Exception as exc:  # pragma: no cover
-                LOGGER.debug("Unable to fetch history for %s: %s", symbol, exc)
+                _warn_failure(exc, "Unable to fetch history for %s, using synthetic data: %s", symbol, exc)
             else:
                 records: List[Dict[str, float]] = []
                 for _, row in df.iterrows():
@@ -503,74 +801,257 @@ def _stock_history_cache(
                 if records:
                     records.sort(key=lambda item: item["date"])
                     return records
-    return _synthetic_stock_history(symbol, start, end)
+    _record_fallback("stock_zh_a_hist")
+    return FallbackRecords(_synthetic_stock_history(symbol, start, end))
+
+
+def _is_final_history(records: List[Dict[str, object]], first: date, last: date) -> bool:
+    """Live records, or an empty live answer for a window without sessions."""
+
+    if isinstance(records, FallbackRecords):
+        return False
+    return bool(records) or next(iter_trading_days(first, last), None) is None
+
+
+# ---------------------------------------------------------------------------
+# Cache management
+
+# Caches holding live snapshots and windows that may include today's
+# (partial) bar; their entries for closed sessions stay valid.
+_SESSION_CACHES = (
+    _board_constituents_cache,
+    _board_price_cache,
+    _board_money_cache,
+    _stock_history_cache,
+    _constituent_index_cache,
+    _stock_spot_cache,
+)
+_STATIC_CACHES = (_load_board_infos, _board_info_index, _load_trading_calendar)
+
+
+def roll_session(today: Optional[date] = None) -> None:
+    """Invalidate session scoped entries after a day rollover.
+
+    Board lists, the trading calendar and finalized history stay resident;
+    the calendar is only reloaded once ``today`` runs past its last entry.
+    Resident instruments skipping a session between their bars are dropped
+    and fetched again.
+    """
+
+    for cache in _SESSION_CACHES:
+        cache.discard_expiring()
+    today = today or session_today()
+    calendar = _load_trading_calendar()
+    if not calendar or today > calendar[-1]:
+        _load_trading_calendar.cache_clear()
+    dropped = _RESIDENT_HISTORY.drop_incomplete(iter_trading_days)
+    if dropped:
+        LOGGER.info("Dropped %d resident histories with missing sessions", dropped)
+
+
+def clear_caches() -> None:
+    """Drop every cached response, including resident history."""
+
+    for cache in _ALL_CACHES:
+        cache.cache_clear()
+    _RESIDENT_HISTORY.clear()
+
+
+def cache_stats() -> Dict[str, Dict[str, object]]:
+    stats: Dict[str, Dict[str, object]] = {cache.__name__: cache.stats() for cache in _ALL_CACHES}
+    stats["resident_history"] = _RESIDENT_HISTORY.stats()
+    return stats
+
+
+@contextmanager
+def offline(catalogue: Optional[Dict[str, Dict[str, SyntheticBoard]]] = None) -> Iterator[None]:
+    """Serve synthetic data only, optionally from a generated board catalogue.
+
+    ``catalogue`` maps category to boards like the built-in
+    ``_SYNTHETIC_BOARDS``.  Caches are cleared on entry and exit so nothing
+    leaks between live and offline mode.
+    """
+
+    global AK_AVAILABLE, _SYNTHETIC_BOARDS, _FIXTURES
+    saved = (AK_AVAILABLE, _SYNTHETIC_BOARDS, _FIXTURES)
+    AK_AVAILABLE = False
+    _FIXTURES = None
+    if catalogue is not None:
+        _SYNTHETIC_BOARDS = {"industry": {}, "concept": {}, **catalogue}
+    clear_caches()
+    try:
+        yield
+    finally:
+        AK_AVAILABLE, _SYNTHETIC_BOARDS, _FIXTURES = saved
+        clear_caches()
+
+
+@contextmanager
+def fixtures(root: Path, mode: str = "replay") -> Iterator[FixtureStore]:
+    """Record every akshare response under ``root``, or replay them.
+
+    In ``replay`` mode no network request is made; calls that were not
+    recorded fail like an unreachable endpoint and fall back to synthetic
+    data (visible in :func:`telemetry_snapshot`).
+    """
+
+    global _FIXTURES
+    saved = _FIXTURES
+    store = FixtureStore(root, mode)
+    _FIXTURES = store
+    clear_caches()
+    try:
+        yield store
+    finally:
+        _FIXTURES = saved
+        clear_caches()
+
+
+@contextmanager
+def pooled_http() -> Iterator[Optional["HttpPool"]]:
+    """Route akshare's ``requests.get``/``post`` through :data:`HTTP_POOL`.
+
+    Only requests issued by :func:`_call` use the pool; other HTTP clients
+    in the process are unaffected.  Re-entrant; connections stay pooled
+    after the block for the next run.  Yields ``None`` when ``requests`` is
+    not installed.
+    """
+
+    if HTTP_POOL is None:
+        yield None
+        return
+    with HTTP_POOL.install() as pool:
+        yield pool
+
+
+@contextmanager
+def constituent_history(path: Path) -> Iterator[ConstituentStore]:
+    """Load :data:`CONSTITUENTS` from ``path`` and write it back on exit.
+
+    Keeps the dated membership snapshots of live runs across processes so
+    later backtests can ask for members as of a past session.
+    """
+
+    CONSTITUENTS.load(path)
+    try:
+        yield CONSTITUENTS
+    finally:
+        CONSTITUENTS.save(path)
+
+
+def source_config() -> Dict[str, object]:
+    """Describe the active data source so worker processes can mirror it."""
+
+    return {
+        "live": AK_AVAILABLE,
+        "catalogue": _SYNTHETIC_BOARDS,
+        "fixtures": (str(_FIXTURES.root), _FIXTURES.mode) if _FIXTURES is not None else None,
+    }
+
+
+@contextmanager
+def use_source(config: Dict[str, object]) -> Iterator[None]:
+    """Serve data like the process that produced ``config`` (see :func:`source_config`)."""
+
+    with ExitStack() as stack:
+        if config.get("fixtures"):
+            root, mode = config["fixtures"]  # type: ignore[misc]
+            stack.enter_context(fixtures(Path(root), mode))
+        elif not config.get("live"):
+            stack.enter_context(offline(config.get("catalogue")))  # type: ignore[arg-type]
+        yield
+
+
+def telemetry_checkpoint() -> Checkpoint:
+    return TELEMETRY.checkpoint()
+
+
+def telemetry_snapshot(since: Optional[Checkpoint] = None) -> Dict[str, object]:
+    """Return endpoint latency/error/fallback stats plus cache hit ratios.
+
+    With ``since`` (from :func:`telemetry_checkpoint`) endpoint counters
+    only cover calls made after it; cache counters are always cumulative.
+    """
+
+    snapshot = TELEMETRY.snapshot(since)
+    snapshot["caches"] = cache_stats()
+    snapshot["breakers"] = BREAKERS.snapshot()
+    if HTTP_POOL is not None:
+        snapshot["http"] = HTTP_POOL.stats()
+    if _FIXTURES is not None:
+        snapshot["fixtures"] = _FIXTURES.stats()
+    return snapshot
+
+
+def warn_on_fallbacks(snapshot: Dict[str, object]) -> Dict[str, int]:
+    """Log one warning listing endpoints that served synthetic data."""
+
+    endpoints: Dict[str, Dict[str, float]] = snapshot.get("endpoints", {})  # type: ignore[assignment]
+    fallbacks = {name: int(stats["fallbacks"]) for name, stats in endpoints.items() if stats.get("fallbacks")}
+    if fallbacks:
+        LOGGER.warning(
+            "Synthetic data used for %d requests: %s",
+            sum(fallbacks.values()),
+            ", ".join(f"{name}={count}" for name, count in sorted(fallbacks.items())),
+        )
+    return fallbacks
 
 
 # ---------------------------------------------------------------------------
 # Fallback generators
+#
+# Price and money series come from :mod:`.synthetic_market`: identical
+# across processes, on weekday sessions, and every window is a slice of the
+# same path.  The first request for a window generates the panel of the
+# whole synthetic catalogue at once; later instruments are lookups.
+
+_BOARD_PRICE_FIELDS = ("close", "change_pct", "change_amount", "volume", "turnover", "turnover_rate")
+_BOARD_MONEY_FIELDS = ("net_inflow", "main_inflow")
+_STOCK_PRICE_FIELDS = ("close", "turnover_rate", "turnover", "pct_change")
+_STOCK_MONEY_FIELDS = ("main_inflow", "large_inflow", "medium_inflow", "small_inflow")
 
 
 def seed_for(key: str) -> int:
-    return abs(hash(key)) % (2**32)
+    """Return a seed for ``key`` that is stable across processes."""
 
+    return zlib.crc32(key.encode("utf-8"))
+
+
+@single_flight(maxsize=16)
+def _synthetic_board_panel(start: date, end: date) -> synthetic_market.Panel:
+    codes = sorted({code for boards in _SYNTHETIC_BOARDS.values() for code in boards})
+    return synthetic_market.board_panel(codes, start, end)
+
+
+@single_flight(maxsize=16)
+def _synthetic_stock_panel(start: date, end: date) -> synthetic_market.Panel:
+    sectors = _synthetic_sectors()
+    return synthetic_market.stock_panel(sorted(sectors), start, end, sectors=sectors)
 
-def random_walk(base: float, step: float, days: int, seed: int) -> List[float]:
-    rng = random.Random(seed)
-    price = base
-    series = []
-    for _ in range(days):
-        change = rng.uniform(-step, step)
-        price = max(1.0, price * (1 + change))
-        series.append(round(price, 2))
-    return series
+
+# Deterministic, so they survive session rolls; cleared with the catalogue.
+_SYNTHETIC_CACHES = (_synthetic_sectors, _synthetic_board_panel, _synthetic_stock_panel)
+_ALL_CACHES = _SESSION_CACHES + _STATIC_CACHES + _SYNTHETIC_CACHES
+
+
+def _synthetic_records(kind: str, key: str, start: date, end: date, fields: Sequence[str]) -> List[Dict[str, float]]:
+    if kind == "board":
+        panel = _synthetic_board_panel(start, end)
+        if key not in panel:
+            panel = synthetic_market.board_panel([key], start, end)
+    else:
+        panel = _synthetic_stock_panel(start, end)
+        if key not in panel:
+            panel = synthetic_market.stock_panel([key], start, end)
+    return panel.records(key, fields)  # type: ignore[return-value]
 
 
 def _synthetic_board_history(code: str, start: date, end: date) -> List[Dict[str, float]]:
-    days = list(_iter_simple_days(start, end))
-    seed = seed_for(f"price-{code}")
-    closes = random_walk(base=100.0, step=0.05, days=len(days), seed=seed)
-    rng = random.Random(seed)
-    records: List[Dict[str, float]] = []
-    prev_close = closes[0]
-    for idx, trading_day in enumerate(days):
-        close = closes[idx]
-        change_amount = close - prev_close if idx else 0.0
-        change_pct = (change_amount / prev_close * 100) if idx and prev_close else 0.0
-        volume = round(1_000_000 * (1 + rng.uniform(-0.3, 0.3)), 2)
-        turnover = round(close * volume / 10_000, 2)
-        turnover_rate = round(max(0.5, rng.uniform(0.5, 8.0)), 2)
-        records.append(
-            {
-                "date": trading_day,
-                "close": close,
-                "change_pct": change_pct,
-                "change_amount": change_amount,
-                "volume": volume,
-                "turnover": turnover,
-                "turnover_rate": turnover_rate,
-            }
-        )
-        prev_close = close
-    return records
+    return _synthetic_records("board", code, start, end, _BOARD_PRICE_FIELDS)
 
 
 def _synthetic_board_money_flow(code: str, start: date, end: date) -> List[Dict[str, float]]:
-    days = list(_iter_simple_days(start, end))
-    seed = seed_for(f"money-{code}")
-    rng = random.Random(seed)
-    records: List[Dict[str, float]] = []
-    for trading_day in days:
-        main = rng.uniform(-5_000_000, 5_000_000)
-        medium = rng.uniform(-1_000_000, 1_000_000)
-        small = rng.uniform(-500_000, 500_000)
-        records.append(
-            {
-                "date": trading_day,
-                "net_inflow": round(main + medium + small, 2),
-                "main_inflow": round(main, 2),
-            }
-        )
-    return records
+    return _synthetic_records("board", code, start, end, _BOARD_MONEY_FIELDS)
 
 
 def _synthetic_component_snapshot(info: BoardInfo, limit: int) -> List[Dict[str, float]]:
@@ -596,46 +1077,11 @@ def _synthetic_component_snapshot(info: BoardInfo, limit: int) -> List[Dict[str,
 
 
 def _synthetic_stock_history(symbol: str, start: date, end: date) -> List[Dict[str, float]]:
-    days = list(_iter_simple_days(start, end))
-    seed = seed_for(f"stock-{symbol}")
-    closes = random_walk(base=50.0, step=0.08, days=len(days), seed=seed)
-    rng = random.Random(seed)
-    records: List[Dict[str, float]] = []
-    prev_close = closes[0] if closes else 0.0
-    for idx, trading_day in enumerate(days):
-        close = closes[idx]
-        change_pct = ((close - prev_close) / prev_close * 100) if idx and prev_close else 0.0
-        turnover = round(close * rng.uniform(100_000, 2_000_000), 2)
-        records.append(
-            {
-                "date": trading_day,
-                "close": close,
-                "turnover_rate": round(rng.uniform(0.5, 10.0), 3),
-                "turnover": turnover,
-                "pct_change": change_pct,
-            }
-        )
-        prev_close = close
-    return records
+    return _synthetic_records("stock", symbol, start, end, _STOCK_PRICE_FIELDS)
 
 
 def _synthetic_stock_money_flow(symbol: str, start: date, end: date) -> List[Dict[str, float]]:
-    days = list(_iter_simple_days(start, end))
-    seed = seed_for(f"stock-money-{symbol}")
-    rng = random.Random(seed)
-    records: List[Dict[str, float]] = []
-    for trading_day in days:
-        main = rng.uniform(-2_000_000, 2_000_000)
-        records.append(
-            {
-                "date": trading_day,
-                "main_inflow": round(main, 2),
-                "large_inflow": round(main * rng.uniform(0.4, 0.8), 2),
-                "medium_inflow": round(rng.uniform(-500_000, 500_000), 2),
-                "small_inflow": round(rng.uniform(-200_000, 200_000), 2),
-            }
-        )
-    return records
+    return _synthetic_records("stock", symbol, start, end, _STOCK_MONEY_FIELDS)
 
 
 def _synthetic_hot_rank(limit: int) -> List[Dict[str, object]]:
@@ -668,6 +1114,12 @@ def _iter_simple_days(start: date, end: date) -> Iterator[date]:
         current += timedelta(days=1)
 
 
+def _iter_weekdays(start: date, end: date) -> Iterator[date]:
+    for day in _iter_simple_days(start, end):
+        if day.weekday() < 5:
+            yield day
+
+
 def _detect_market(symbol: str) -> Optional[str]:
     digits = "".join(ch for ch in symbol if ch.isdigit())
     if len(digits) != 6:
@@ -0,0 +1,108 @@
+"""Board indices computed from constituent daily bars.
+
+When ``stock_board_*_hist_em`` is unavailable for a board, its price
+series can still be derived from the stocks it lists, and the same
+builder prices custom boards that exist only as symbol lists.  All
+boards of one request are built together: constituent bars are packed
+into stock × session arrays and each session's board return is a
+weighted mean of member returns, two sparse products over the
+:class:`~..data.membership.MembershipMatrix`::
+
+    board_return = M @ (weights * returns) / (M @ weights)
+
+Member returns are the exchange's ``pct_change`` (涨跌幅), not ratios of
+unadjusted closes, so ex-dividend and split sessions do not show up as
+price moves.  ``"equal"`` weights every member that traded alike;
+``"turnover"`` weights members by the session's turnover.  Levels are
+relative to :data:`BASE_LEVEL` at the close before the first session;
+suspended members drop out of the sessions they did not trade.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict, List, Mapping, Sequence
+
+import numpy as np
+
+from ..data.membership import MembershipMatrix
+
+
+WEIGHTINGS = ("equal", "turnover")
+BASE_LEVEL = 1000.0
+
+Record = Mapping[str, object]
+
+
+def build_board_indices(
+    members: Mapping[str, Sequence[str]],
+    stock_history: Mapping[str, Sequence[Record]],
+    weighting: str = "equal",
+    base: float = BASE_LEVEL,
+) -> Dict[str, List[Dict[str, float]]]:
+    """Board price records (as from ``_board_price_cache``) for every board of ``members``.
+
+    ``stock_history`` holds daily records with ``date``, ``close``,
+    ``pct_change`` (percent), ``turnover`` and ``turnover_rate``.  Boards
+    without any constituent bars get an empty list.
+    """
+
+    if weighting not in WEIGHTINGS:
+        raise ValueError(f"Unsupported weighting '{weighting}', expected one of {WEIGHTINGS}")
+    matrix = MembershipMatrix.from_members(
+        {board: [symbol for symbol in symbols if stock_history.get(symbol)] for board, symbols in members.items()}
+    )
+    dates: List[date] = sorted({record["date"] for symbol in matrix.symbols for record in stock_history[symbol]})
+    if not dates:
+        return {board: [] for board in members}
+    columns = {day: idx for idx, day in enumerate(dates)}
+
+    shape = (len(matrix.symbols), len(dates))
+    close = np.full(shape, np.nan)
+    pct_change = np.full(shape, np.nan)
+    turnover = np.zeros(shape)
+    turnover_rate = np.zeros(shape)
+    for row, symbol in enumerate(matrix.symbols):
+        records = stock_history[symbol]
+        cells = np.fromiter((columns[record["date"]] for record in records), dtype=np.intp, count=len(records))
+        close[row, cells] = [float(record.get("close") or np.nan) for record in records]
+        pct_change[row, cells] = [_number(record.get("pct_change")) for record in records]
+        turnover[row, cells] = [float(record.get("turnover") or 0.0) for record in records]
+        turnover_rate[row, cells] = [float(record.get("turnover_rate") or 0.0) for record in records]
+
+    traded = ~np.isnan(close)
+    priced = traded & ~np.isnan(pct_change)
+    returns = np.where(priced, pct_change / 100.0, 0.0)
+    weights = priced.astype(np.float64) if weighting == "equal" else np.where(priced, turnover, 0.0)
+
+    weight_sums = matrix.matmat(weights)
+    board_returns = np.divide(
+        matrix.matmat(weights * returns), weight_sums, out=np.zeros_like(weight_sums), where=weight_sums > 0
+    )
+    levels = base * np.cumprod(1.0 + board_returns, axis=1)
+    changes = np.diff(levels, axis=1, prepend=base)
+    members_traded = matrix.matmat(traded.astype(np.float64))
+    turnovers = matrix.matmat(turnover)
+    volumes = matrix.matmat(np.divide(turnover, close, out=np.zeros(shape), where=traded & (close > 0)))
+    rates = np.divide(
+        matrix.matmat(turnover_rate), members_traded, out=np.zeros_like(members_traded), where=members_traded > 0
+    )
+
+    indices: Dict[str, List[Dict[str, float]]] = {board: [] for board in members}
+    for row, board in enumerate(matrix.boards):
+        indices[board] = [
+            {
+                "date": dates[column],
+                "close": float(levels[row, column]),
+                "change_pct": float(board_returns[row, column] * 100.0),
+                "change_amount": float(changes[row, column]),
+                "volume": float(volumes[row, column]),
+                "turnover": float(turnovers[row, column]),
+                "turnover_rate": float(rates[row, column]),
+            }
+            for column in np.flatnonzero(members_traded[row])
+        ]
+    return indices
+
+
+def _number(value: object) -> float:
+    return float(value) if value is not None else np.nan
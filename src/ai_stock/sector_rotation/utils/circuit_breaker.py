@@ -0,0 +1,217 @@
+"""Per-endpoint circuit breakers with jittered retries.
+
+When an endpoint degrades, every symbol would otherwise wait for its own
+timeout before falling back.  A :class:`CircuitBreaker` watches the
+failure rate over the last ``window`` calls; once it crosses
+``failure_threshold`` the circuit *opens* and calls fail immediately with
+:class:`CircuitOpenError`.  After a cool-down (doubling on every repeated
+trip) one probe call is let through (*half-open*): success closes the
+circuit, failure re-opens it.
+
+:func:`call_with_retry` retries transient errors (connection resets,
+timeouts, HTTP 429/5xx) with capped exponential backoff and jitter, as
+long as the breaker allows it.
+"""
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Optional, TypeVar
+
+
+LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_TRANSIENT_NAMES = {
+    "ChunkedEncodingError",
+    "ConnectTimeout",
+    "ConnectionError",
+    "ProtocolError",
+    "ReadTimeout",
+    "RemoteDisconnected",
+    "Timeout",
+}
+_TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an endpoint whose circuit is open."""
+
+
+@dataclass
+class BreakerPolicy:
+    window: int = 20
+    min_calls: int = 5
+    failure_threshold: float = 0.5
+    open_seconds: float = 30.0
+    max_open_seconds: float = 600.0
+    retries: int = 2
+    backoff_base: float = 0.5
+    backoff_cap: float = 8.0
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        policy: Optional[BreakerPolicy] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.policy = policy or BreakerPolicy()
+        self._clock = clock
+        self._outcomes: Deque[bool] = deque(maxlen=self.policy.window)
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.trips = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def cooldown(self) -> float:
+        return min(self.policy.max_open_seconds, self.policy.open_seconds * 2 ** max(0, self.trips - 1))
+
+    def allow(self) -> bool:
+        """Return whether a call may proceed (claims the half-open probe)."""
+
+        with self._lock:
+            if self.state == OPEN and self._clock() - self._opened_at >= self.cooldown:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def is_open(self) -> bool:
+        """Whether calls are currently rejected, without claiming the half-open probe."""
+
+        with self._lock:
+            return self.state == OPEN and self._clock() - self._opened_at < self.cooldown
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                LOGGER.info("Circuit for %s closed again", self.name)
+                self.state = CLOSED
+                self.trips = 0
+                self._outcomes.clear()
+            self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._trip()
+                return
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if (
+                self.state == CLOSED
+                and len(self._outcomes) >= self.policy.min_calls
+                and failures / len(self._outcomes) >= self.policy.failure_threshold
+            ):
+                self._trip()
+
+    def _trip(self) -> None:
+        self.state = OPEN
+        self.trips += 1
+        self._opened_at = self._clock()
+        self._probing = False
+        LOGGER.warning(
+            "Circuit for %s opened (trip %d); failing fast for %.0fs", self.name, self.trips, self.cooldown
+        )
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "state": self.state,
+                "trips": self.trips,
+                "rejected": self.rejected,
+                "window_calls": len(self._outcomes),
+                "window_failures": self._outcomes.count(False),
+            }
+
+
+class BreakerRegistry:
+    """Lazily created breakers by endpoint name, sharing one policy."""
+
+    def __init__(self, policy: Optional[BreakerPolicy] = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self.policy = policy or BreakerPolicy()
+        self._clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = self._breakers[name] = CircuitBreaker(name, self.policy, self._clock)
+            return breaker
+
+    def reset(self) -> None:
+        with self._lock:
+            self._breakers.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+def is_transient(exc: BaseException) -> bool:
+    """Connection problems, timeouts and throttling responses."""
+
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    if type(exc).__name__ in _TRANSIENT_NAMES:
+        return True
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None) in _TRANSIENT_STATUS
+
+
+def backoff_delay(attempt: int, policy: BreakerPolicy, rng: Callable[[], float] = random.random) -> float:
+    """Capped exponential delay with "equal jitter" (half fixed, half random)."""
+
+    ceiling = min(policy.backoff_cap, policy.backoff_base * 2**attempt)
+    return ceiling / 2 + ceiling / 2 * rng()
+
+
+def call_with_retry(
+    breaker: CircuitBreaker,
+    func: Callable[[], T],
+    sleep: Callable[[float], None] = time.sleep,
+    rng: Callable[[], float] = random.random,
+) -> T:
+    """Run ``func`` through ``breaker``, retrying transient failures."""
+
+    policy = breaker.policy
+    attempt = 0
+    last_error: Optional[BaseException] = None
+    while True:
+        if not breaker.allow():
+            raise CircuitOpenError(f"Circuit for {breaker.name} is open") from last_error
+        try:
+            result = func()
+        except Exception as exc:
+            last_error = exc
+            breaker.record_failure()
+            if attempt >= policy.retries or not is_transient(exc):
+                raise
+            sleep(backoff_delay(attempt, policy, rng))
+            attempt += 1
+            continue
+        breaker.record_success()
+        return result
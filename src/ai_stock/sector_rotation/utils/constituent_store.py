@@ -0,0 +1,167 @@
+"""Versioned board constituents with a symbol → boards index.
+
+``stock_board_*_cons_em`` only returns today's members, so a backtest
+that reads membership from the live endpoint sees today's boards in
+every past session.  :class:`ConstituentStore` keeps a dated snapshot
+per board whenever a fetched member list differs from the previous one;
+``members_as_of(board, day)`` bisects those dates, and an inverted index
+answers "which boards list this stock" without scanning every board.
+The store is small enough to persist as JSON between runs (see
+:meth:`ConstituentStore.save`).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+LOGGER = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class _Version:
+    since: date
+    members: Tuple[str, ...]
+    lookup: FrozenSet[str]
+
+
+class ConstituentStore:
+    """Dated member lists per board; a version holds until the next one."""
+
+    def __init__(self) -> None:
+        self._dates: Dict[str, List[date]] = {}
+        self._versions: Dict[str, List[_Version]] = {}
+        # Every board a symbol was ever listed in; point-in-time filtering happens on lookup.
+        self._boards_by_symbol: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, board: str, members: Sequence[str], as_of: date) -> bool:
+        """Store ``board``'s members observed on ``as_of``.
+
+        Returns ``True`` when this starts a new version, ``False`` when the
+        list matches the version already in effect.  Snapshots may arrive
+        out of order; a second snapshot of the same day replaces the first.
+        """
+
+        version = _Version(since=as_of, members=tuple(members), lookup=frozenset(members))
+        with self._lock:
+            dates = self._dates.setdefault(board, [])
+            versions = self._versions.setdefault(board, [])
+            position = bisect_left(dates, as_of)
+            if position < len(dates) and dates[position] == as_of:
+                if versions[position].members == version.members:
+                    return False
+                versions[position] = version
+            elif position and versions[position - 1].members == version.members:
+                return False
+            else:
+                dates.insert(position, as_of)
+                versions.insert(position, version)
+            # A following version with the same members now starts earlier.
+            if position + 1 < len(versions) and versions[position + 1].members == version.members:
+                del dates[position + 1], versions[position + 1]
+            if position and versions[position - 1].members == version.members:
+                del dates[position], versions[position]
+            for symbol in version.lookup:
+                self._boards_by_symbol.setdefault(symbol, set()).add(board)
+        return True
+
+    def members_as_of(self, board: str, day: date) -> Optional[List[str]]:
+        """Members in effect on ``day``; ``None`` before the first snapshot."""
+
+        with self._lock:
+            version = self._version_as_of(board, day)
+        return list(version.members) if version is not None else None
+
+    def latest(self, board: str) -> Optional[List[str]]:
+        with self._lock:
+            versions = self._versions.get(board)
+            return list(versions[-1].members) if versions else None
+
+    def boards_of(self, symbol: str, as_of: Optional[date] = None) -> List[str]:
+        """Boards listing ``symbol`` on ``as_of`` (the latest snapshots when omitted)."""
+
+        boards: List[str] = []
+        with self._lock:
+            for board in sorted(self._boards_by_symbol.get(symbol, ())):
+                version = self._version_as_of(board, as_of) if as_of is not None else self._versions[board][-1]
+                if version is not None and symbol in version.lookup:
+                    boards.append(board)
+        return boards
+
+    def history(self, board: str) -> List[Tuple[date, List[str]]]:
+        with self._lock:
+            return self._history(board)
+
+    def boards(self) -> List[str]:
+        with self._lock:
+            return sorted(self._versions)
+
+    def _history(self, board: str) -> List[Tuple[date, List[str]]]:
+        return [(version.since, list(version.members)) for version in self._versions.get(board, [])]
+
+    def _version_as_of(self, board: str, day: date) -> Optional[_Version]:
+        # Callers hold the lock: record() may insert into these lists concurrently.
+        dates = self._dates.get(board)
+        if not dates:
+            return None
+        position = bisect_right(dates, day)
+        return self._versions[board][position - 1] if position else None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "boards": len(self._versions),
+                "versions": sum(len(versions) for versions in self._versions.values()),
+                "symbols": len(self._boards_by_symbol),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._dates.clear()
+            self._versions.clear()
+            self._boards_by_symbol.clear()
+
+    def save(self, path: Path) -> None:
+        """Write every version to ``path``; readers never see a partial file."""
+
+        with self._lock:
+            payload = {
+                board: [[since.isoformat(), members] for since, members in self._history(board)]
+                for board in sorted(self._versions)
+            }
+        path = Path(path)
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def load(self, path: Path) -> None:
+        """Merge snapshots saved by :meth:`save`; a missing file is ignored.
+
+        An unreadable file is moved aside to ``<name>.corrupt`` so the next
+        :meth:`save` does not overwrite what may still be recovered by hand.
+        """
+
+        path = Path(path)
+        if not path.exists():
+            return
+        try:
+            payload: Dict[str, Iterable[Tuple[str, List[str]]]] = json.loads(path.read_text(encoding="utf-8"))
+            snapshots = [
+                (board, members, date.fromisoformat(since))
+                for board, versions in payload.items()
+                for since, members in versions
+            ]
+        except (ValueError, TypeError, AttributeError) as exc:
+            aside = path.with_name(f"{path.name}.corrupt")
+            LOGGER.warning("Ignoring unreadable constituent history %s (%s); moved to %s", path, exc, aside)
+            os.replace(path, aside)
+            return
+        for board, members, day in snapshots:
+            self.record(board, members, day)
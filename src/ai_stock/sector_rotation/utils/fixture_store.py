@@ -0,0 +1,118 @@
+"""Record and replay raw akshare responses.
+
+In ``record`` mode every response returned by an akshare endpoint is
+stored, keyed by endpoint name and keyword arguments, as a gzip-compressed
+pickle under ``root/<endpoint>/<digest>.pkl.gz``.  In ``replay`` mode the
+same calls are answered from disk without touching the network, so a
+production day can be re-run bit-for-bit, benchmarked for CPU cost only or
+debugged offline.  Use one directory per recorded day: the recording
+date is kept in ``root/manifest.json`` so a replay can run "as of" that
+day (:attr:`FixtureStore.recorded_on`).
+
+Fixtures are pickles: only replay directories you recorded yourself.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+
+MODES = ("record", "replay")
+MANIFEST = "manifest.json"
+
+
+class FixtureMissing(KeyError):
+    """Raised in replay mode for calls that were never recorded."""
+
+
+class FixtureStore:
+    def __init__(self, root: Path, mode: str = "replay") -> None:
+        if mode not in MODES:
+            raise ValueError(f"Unsupported fixture mode '{mode}', expected one of {MODES}")
+        self.root = Path(root)
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+        # Session the responses describe; None for directories recorded without a manifest.
+        self.recorded_on: Optional[date] = None
+        if self.recording:
+            self.recorded_on = date.today()
+            self.root.mkdir(parents=True, exist_ok=True)
+            (self.root / MANIFEST).write_text(json.dumps({"recorded_on": self.recorded_on.isoformat()}))
+        else:
+            self.recorded_on = _read_manifest(self.root)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    def path_for(self, endpoint: str, kwargs: Mapping[str, Any]) -> Path:
+        key = json.dumps({"endpoint": endpoint, "kwargs": dict(kwargs)}, sort_keys=True, default=str)
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:24]
+        return self.root / endpoint / f"{digest}.pkl.gz"
+
+    def load(self, endpoint: str, kwargs: Mapping[str, Any]) -> Any:
+        path = self.path_for(endpoint, kwargs)
+        try:
+            with gzip.open(path, "rb") as handle:
+                entry = pickle.load(handle)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            raise FixtureMissing(f"No recorded response for {endpoint}({_describe(kwargs)}) in {self.root}") from None
+        with self._lock:
+            self.hits += 1
+        return entry["data"]
+
+    def save(self, endpoint: str, kwargs: Mapping[str, Any], data: Any) -> None:
+        path = self.path_for(endpoint, kwargs)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {"endpoint": endpoint, "kwargs": dict(kwargs), "recorded_at": time.time(), "data": data}
+        tmp = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        with gzip.open(tmp, "wb", compresslevel=6) as handle:
+            pickle.dump(entry, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        with self._lock:
+            self.recorded += 1
+
+    def entries(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``(endpoint, kwargs)`` of every stored response."""
+
+        for path in sorted(self.root.glob("*/*.pkl.gz")):
+            with gzip.open(path, "rb") as handle:
+                entry = pickle.load(handle)
+            yield entry["endpoint"], entry["kwargs"]
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "root": str(self.root),
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded,
+        }
+
+
+def _read_manifest(root: Path) -> Optional[date]:
+    try:
+        return date.fromisoformat(json.loads((root / MANIFEST).read_text())["recorded_on"])
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _describe(kwargs: Mapping[str, Any]) -> str:
+    return ", ".join(f"{key}={value!r}" for key, value in sorted(kwargs.items()))
@@ -0,0 +1,134 @@
+"""Resident store for finalized daily history.
+
+The response caches in :mod:`akshare_helper` are keyed by the exact
+``start``/``end`` window, so a long-lived process still misses on every
+new day because the window has shifted by one session.  Bars of closed
+sessions never change, though, so :class:`ResidentHistory` keeps them per
+instrument and only asks the data source for the part of a request that
+it has not seen yet (usually just the latest session).
+
+Only responses the ``keep`` hook accepts become final: substituted
+(synthetic) records and empty answers for windows with sessions are
+returned to the caller but fetched again next time.
+:meth:`ResidentHistory.drop_incomplete` discards instruments whose stored
+bars skip a session between their first and last bar, e.g. on a day
+rollover.  Sessions before the first or after the last bar (listings newer
+than the window, stocks suspended at its end) are not gaps.
+"""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+
+Record = Dict[str, object]
+Fetcher = Callable[[date, date], List[Record]]
+# Whether records fetched for ``[first, last]`` may be kept as final history.
+KeepPolicy = Callable[[List[Record], date, date], bool]
+
+
+@dataclass
+class _Entry:
+    first: date
+    last: date
+    records: List[Record] = field(default_factory=list)
+
+
+class ResidentHistory:
+    """Per-instrument daily records for sessions before ``today``."""
+
+    def __init__(self, today: Optional[Callable[[], date]] = None, keep: Optional[KeepPolicy] = None) -> None:
+        self._today = today or date.today
+        self._keep = keep
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, start: date, end: date, fetch: Fetcher) -> List[Record]:
+        """Return records in ``[start, end]`` fetching only uncovered days.
+
+        The result has the type of the fetched list, so markers such as
+        a fallback list subclass reach the caller.
+        """
+
+        if start > end:
+            return []
+        last_final = min(end, self._today() - timedelta(days=1))
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is None or start < entry.first:
+            records = fetch(start, end)
+            self._store(key, start, last_final, records, replace=True)
+            self.misses += 1
+            return records.__class__(records)
+
+        fresh: List[Record] = []
+        if end > entry.last:
+            fresh = fetch(entry.last + timedelta(days=1), end)
+            if last_final > entry.last:
+                self._store(key, entry.last + timedelta(days=1), last_final, fresh, replace=False)
+            self.partial_hits += 1
+        else:
+            self.hits += 1
+
+        cached = [
+            record
+            for record in entry.records
+            if start <= record["date"] <= end  # type: ignore[operator]
+        ]
+        seen = {record["date"] for record in cached}
+        cached.extend(record for record in fresh if record["date"] not in seen)
+        return fresh.__class__(cached) if end > entry.last else cached
+
+    def _store(self, key: Hashable, first: date, last: date, records: List[Record], replace: bool) -> None:
+        if last < first:
+            return
+        if self._keep is not None and not self._keep(records, first, last):
+            return
+        final = [record for record in records if record["date"] <= last]  # type: ignore[operator]
+        with self._lock:
+            entry = self._entries.get(key)
+            if replace or entry is None:
+                self._entries[key] = _Entry(first=first, last=last, records=final)
+                return
+            if first != entry.last + timedelta(days=1):
+                return  # A concurrent request already extended the entry.
+            entry.records = entry.records + final
+            entry.last = last
+
+    def drop_incomplete(self, sessions: Callable[[date, date], Iterable[date]]) -> int:
+        """Forget instruments missing a bar for a session between their first and last bar; returns how many."""
+
+        with self._lock:
+            entries = list(self._entries.items())
+        stale = []
+        for key, entry in entries:
+            days = {record["date"] for record in entry.records}
+            if days and not set(sessions(min(days), max(days))) <= days:  # type: ignore[type-var]
+                stale.append(key)
+        with self._lock:
+            for key in stale:
+                self._entries.pop(key, None)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self.hits = self.partial_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            instruments = len(self._entries)
+            rows = sum(len(entry.records) for entry in self._entries.values())
+        return {
+            "instruments": instruments,
+            "rows": rows,
+            "hits": self.hits,
+            "partial_hits": self.partial_hits,
+            "misses": self.misses,
+        }
@@ -0,0 +1,201 @@
+"""Pooled keep-alive HTTP session for akshare's ``requests`` calls.
+
+akshare calls ``requests.get`` directly, which builds a throw-away
+session, so every per-symbol fetch pays the TCP (and TLS) handshake to the
+same Eastmoney hosts again.  While :meth:`HttpPool.install` is active,
+``requests.get``/``requests.post`` made inside :meth:`HttpPool.route` (the
+akshare call sites wrap each endpoint call in it) go through one shared
+connection pool instead: connections are kept alive and reused, bounded
+per host, and calls without an explicit ``timeout`` get a default one.
+Requests made anywhere else in the process, including other threads, keep
+using the original functions.
+
+The urllib3 pools behind the shared adapter are thread-safe; cookies and
+headers live in one :class:`requests.Session` per thread, closed when the
+outermost install exits.  The connection pool outlives
+:meth:`~HttpPool.install`, so a long-lived process keeps its warm
+connections between runs until :meth:`~HttpPool.close`.
+"""
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+Timeout = Union[float, Tuple[float, float]]
+
+# (connect, read) seconds; akshare's own explicit timeouts take precedence.
+DEFAULT_TIMEOUT: Tuple[float, float] = (5.0, 20.0)
+
+
+class _CountingAdapter(HTTPAdapter):
+    """Adapter whose connection pools report every new connection."""
+
+    def __init__(self, on_connect: Callable[[], None], **kwargs: Any) -> None:
+        self._on_connect = on_connect
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting(HTTPConnectionPool, self._on_connect),
+            "https": _counting(HTTPSConnectionPool, self._on_connect),
+        }
+
+
+def _counting(base: type, on_connect: Callable[[], None]) -> type:
+    class CountingPool(base):  # type: ignore[misc, valid-type]
+        def _new_conn(self):  # type: ignore[no-untyped-def]
+            on_connect()
+            return super()._new_conn()
+
+    return CountingPool
+
+
+class HttpPool:
+    """Keeps up to ``pool_maxsize`` idle connections for each of ``pool_connections`` hosts."""
+
+    def __init__(
+        self,
+        pool_connections: int = 16,
+        pool_maxsize: int = 32,
+        timeout: Optional[Timeout] = DEFAULT_TIMEOUT,
+    ) -> None:
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self._adapter = _CountingAdapter(
+            self._connected, pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0
+        )
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._saved: Optional[Tuple[Callable[..., requests.Response], Callable[..., requests.Response]]] = None
+        self._sessions: List[requests.Session] = []
+        self.requests = 0
+        self.errors = 0
+        self.connections = 0
+
+    def _connected(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+    def session(self) -> requests.Session:
+        """Return this thread's session, mounted on the shared adapter."""
+
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", self._adapter)
+            session.mount("https://", self._adapter)
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def request(self, method: str, url: str, **kwargs: object) -> requests.Response:
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        try:
+            return self.session().request(method, url, **kwargs)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self.requests += 1
+
+    def get(self, url: str, params: object = None, **kwargs: object) -> requests.Response:
+        return self.request("GET", url, params=params, **kwargs)
+
+    def post(self, url: str, data: object = None, json: object = None, **kwargs: object) -> requests.Response:
+        return self.request("POST", url, data=data, json=json, **kwargs)
+
+    @contextmanager
+    def route(self) -> Iterator[None]:
+        """Send this thread's ``requests.get``/``post`` calls through the pool while installed."""
+
+        local = self._local
+        local.routing = getattr(local, "routing", 0) + 1
+        try:
+            yield
+        finally:
+            local.routing -= 1
+
+    def _routed(self) -> bool:
+        return getattr(self._local, "routing", 0) > 0
+
+    def _shim_get(self, url: str, params: object = None, **kwargs: object) -> requests.Response:
+        if self._routed():
+            return self.get(url, params=params, **kwargs)
+        return self._saved[0](url, params=params, **kwargs)  # type: ignore[index]
+
+    def _shim_post(self, url: str, data: object = None, json: object = None, **kwargs: object) -> requests.Response:
+        if self._routed():
+            return self.post(url, data=data, json=json, **kwargs)
+        return self._saved[1](url, data=data, json=json, **kwargs)  # type: ignore[index]
+
+    @contextmanager
+    def install(self) -> Iterator["HttpPool"]:
+        """Let :meth:`route` blocks use the pool while this block runs.
+
+        Re-entrant: nested or concurrent installs share one patch, which is
+        undone (and the per-thread sessions closed) when the outermost
+        block exits.
+        """
+
+        with self._lock:
+            if self._depth == 0:
+                self._saved = (requests.get, requests.post)
+                requests.get = self._shim_get  # type: ignore[assignment]
+                requests.post = self._shim_post  # type: ignore[assignment]
+            self._depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._depth -= 1
+                if self._depth == 0 and self._saved is not None:
+                    requests.get, requests.post = self._saved  # type: ignore[assignment]
+                    self._saved = None
+                    self._close_sessions()
+
+    def _close_sessions(self) -> None:
+        # Caller holds the lock.  The shared adapter is detached first so
+        # closing a session keeps the warm connections.
+        for session in self._sessions:
+            for prefix, adapter in list(session.adapters.items()):
+                if adapter is self._adapter:
+                    del session.adapters[prefix]
+            session.close()
+        self._sessions.clear()
+        self._local = threading.local()
+
+    @property
+    def installed(self) -> bool:
+        return self._depth > 0
+
+    def close(self) -> None:
+        """Drop idle connections; the pool reconnects on the next request."""
+
+        self._adapter.close()
+
+    def stats(self) -> Dict[str, object]:
+        """Request and connection counters since the pool was created."""
+
+        with self._lock:
+            requests_made, errors, connections = self.requests, self.errors, self.connections
+        return {
+            "installed": self.installed,
+            "requests": requests_made,
+            "errors": errors,
+            "connections_opened": connections,
+            "connections_reused": max(0, requests_made - connections),
+            "reuse_ratio": max(0.0, 1.0 - connections / requests_made) if requests_made else 0.0,
+        }
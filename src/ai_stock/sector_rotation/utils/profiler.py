@@ -0,0 +1,196 @@
+"""Per-stage instrumentation for the analysis pipeline.
+
+:class:`StageProfiler` records wall time, process CPU time, item counts
+and, when ``trace_memory`` is enabled, the peak traced allocation of each
+stage (``tracemalloc``; nested stages are folded into their parent's
+peak).  The collected metrics are plain dictionaries so they can travel in
+the result dict, and can be exported as JSON or in the Prometheus
+node-exporter textfile-collector format.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional
+
+
+@dataclass
+class StageMetrics:
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_memory_bytes: Optional[int] = None
+    items: Optional[int] = None
+    calls: int = 0
+
+
+class StageHandle:
+    """Yielded by :meth:`StageProfiler.stage` so callers can report counts."""
+
+    __slots__ = ("items", "_peak")
+
+    def __init__(self) -> None:
+        self.items: Optional[int] = None
+        self._peak = 0
+
+
+class StageProfiler:
+    """Collect metrics for named pipeline stages."""
+
+    def __init__(self, trace_memory: bool = False, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self.trace_memory = trace_memory and enabled
+        self._stages: Dict[str, StageMetrics] = {}
+        self._stack: List[StageHandle] = []
+        self._lock = threading.Lock()
+        self._started_tracing = False
+        self.started_at = time.time()
+
+    @classmethod
+    def disabled(cls) -> "StageProfiler":
+        return cls(enabled=False)
+
+    @contextmanager
+    def stage(self, name: str, items: Optional[int] = None) -> Iterator[StageHandle]:
+        handle = StageHandle()
+        handle.items = items
+        if not self.enabled:
+            yield handle
+            return
+
+        tracing = self.trace_memory
+        if tracing:
+            self._ensure_tracing()
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                parent = self._stack[-1]
+                parent._peak = max(parent._peak, peak)
+            tracemalloc.reset_peak()
+            baseline = current
+        self._stack.append(handle)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield handle
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            self._stack.pop()
+            peak_bytes: Optional[int] = None
+            if tracing:
+                peak = max(handle._peak, tracemalloc.get_traced_memory()[1])
+                peak_bytes = max(0, peak - baseline)
+                if self._stack:
+                    parent = self._stack[-1]
+                    parent._peak = max(parent._peak, peak)
+            self._record(name, wall, cpu, peak_bytes, handle.items)
+
+    def _record(self, name: str, wall: float, cpu: float, peak: Optional[int], items: Optional[int]) -> None:
+        with self._lock:
+            metrics = self._stages.setdefault(name, StageMetrics(name=name))
+            metrics.wall_seconds += wall
+            metrics.cpu_seconds += cpu
+            metrics.calls += 1
+            if peak is not None:
+                metrics.peak_memory_bytes = max(metrics.peak_memory_bytes or 0, peak)
+            if items is not None:
+                metrics.items = (metrics.items or 0) + items
+
+    def _ensure_tracing(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def close(self) -> None:
+        """Stop ``tracemalloc`` if this profiler started it."""
+
+        if self._started_tracing and not self._stack:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @property
+    def stages(self) -> List[StageMetrics]:
+        with self._lock:
+            return list(self._stages.values())
+
+    def as_dict(self) -> Dict[str, object]:
+        stages = [asdict(metrics) for metrics in self.stages]
+        return {
+            "started_at": self.started_at,
+            "memory_traced": self.trace_memory,
+            "stages": stages,
+        }
+
+    def summary(self) -> str:
+        lines = [f"{'stage':<28}{'wall_ms':>10}{'cpu_ms':>10}{'peak_kb':>10}{'items':>8}"]
+        for metrics in self.stages:
+            peak = f"{metrics.peak_memory_bytes / 1024:.0f}" if metrics.peak_memory_bytes is not None else "-"
+            items = str(metrics.items) if metrics.items is not None else "-"
+            lines.append(
+                f"{metrics.name:<28}{metrics.wall_seconds * 1000:>10.1f}{metrics.cpu_seconds * 1000:>10.1f}"
+                f"{peak:>10}{items:>8}"
+            )
+        return "\n".join(lines)
+
+
+def export_json(metrics: Mapping[str, object], path: Path) -> None:
+    _atomic_write(Path(path), json.dumps(metrics, indent=2, ensure_ascii=False, default=str))
+
+
+def export_prometheus(
+    metrics: Mapping[str, object],
+    path: Path,
+    prefix: str = "sector_rotation",
+    labels: Optional[Mapping[str, str]] = None,
+) -> None:
+    """Write ``metrics`` (from :meth:`StageProfiler.as_dict`) as a ``.prom`` file."""
+
+    base_labels = dict(labels or {})
+    series = (
+        ("stage_wall_seconds", "wall_seconds", "Wall clock time spent in the stage"),
+        ("stage_cpu_seconds", "cpu_seconds", "Process CPU time spent in the stage"),
+        ("stage_peak_memory_bytes", "peak_memory_bytes", "Peak traced allocation during the stage"),
+        ("stage_items", "items", "Items processed by the stage"),
+        ("stage_calls", "calls", "Number of times the stage ran"),
+    )
+    stages = list(metrics.get("stages", []))  # type: ignore[arg-type]
+    lines: List[str] = []
+    for suffix, key, help_text in series:
+        samples = [stage for stage in stages if stage.get(key) is not None]
+        if not samples:
+            continue
+        name = f"{prefix}_{suffix}"
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for stage in samples:
+            label_text = _format_labels({**base_labels, "stage": str(stage["name"])})
+            lines.append(f"{name}{label_text} {float(stage[key]):.6g}")
+    name = f"{prefix}_last_run_timestamp_seconds"
+    lines.append(f"# HELP {name} Start time of the profiled run")
+    lines.append(f"# TYPE {name} gauge")
+    lines.append(f"{name}{_format_labels(base_labels)} {float(metrics.get('started_at', 0.0)):.3f}")  # type: ignore[arg-type]
+    _atomic_write(Path(path), "\n".join(lines) + "\n")
+
+
+def _format_labels(labels: Mapping[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in sorted(labels.items()):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    # The textfile collector may read at any time; never expose partial files.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
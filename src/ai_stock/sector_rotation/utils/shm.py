@@ -0,0 +1,26 @@
+"""Helpers for :mod:`multiprocessing.shared_memory` segments.
+
+The creating process owns a segment and unlinks it; other processes only
+attach.  Attachments are kept away from the resource tracker so a worker
+exiting does not remove a segment its parent still serves.
+"""
+from __future__ import annotations
+
+from multiprocessing import resource_tracker, shared_memory
+
+
+def create_segment(size: int) -> shared_memory.SharedMemory:
+    """Create a segment of at least ``size`` bytes; the caller unlinks it."""
+
+    return shared_memory.SharedMemory(create=True, size=max(1, size))
+
+
+def attach_segment(name: str) -> shared_memory.SharedMemory:
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # pragma: no cover - Python < 3.13
+        # Older versions register attachments with the resource tracker,
+        # which would unlink the parent's segment when a worker exits.
+        segment = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(segment._name, "shared_memory")  # type: ignore[attr-defined]
+        return segment
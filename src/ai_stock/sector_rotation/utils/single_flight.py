@@ -0,0 +1,368 @@
+"""Response cache with single-flight misses, byte budgets and TTLs.
+
+``functools.lru_cache`` computes a missing key in every thread that asks
+for it before the first result lands, so parallel loaders (or the daemon
+answering a query during a run) fetch the same response several times.
+:func:`single_flight` keeps one in-flight call per key: the first caller
+computes it, later callers block on that call and share its result or
+exception.  Failures are not cached.
+
+Entries are evicted least recently used once the cache holds more than
+``maxsize`` entries or, with ``max_bytes``, once their estimated size
+(:func:`estimate_size`) exceeds the budget, so a few thousand symbols fit
+as well as a handful of large ones.  ``ttl`` expires entries: a number of
+seconds for every entry, or a policy such as :class:`SessionTTL` that
+keeps windows of closed sessions forever and lets windows that include
+today go stale after a few minutes.  Results the ``fallback`` predicate
+flags (substitutes for an unavailable source) are kept for at most
+``fallback_ttl`` seconds whatever ``ttl`` says, so they are retried soon
+and :meth:`SingleFlightCache.discard_expiring` always drops them.
+
+Decorated functions keep the ``lru_cache`` surface (``cache_info()``,
+``cache_clear()``, ``__wrapped__``).  Coroutine functions are supported
+too, sharing one task per key within an event loop; synchronous ones can
+be awaited without blocking the loop through ``acall``.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Hashable, Mapping, NamedTuple, Optional, Tuple, Union
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: Optional[int]
+    currsize: int
+
+
+class SessionTTL:
+    """Expiry policy for caches keyed by a date window.
+
+    Entries whose ``end_arg`` lies before today cover closed sessions only
+    and never expire; others (including calls without that argument, such
+    as live snapshots) expire after ``live_seconds``.  Change
+    ``live_seconds`` at runtime to retune every cache sharing the policy.
+    """
+
+    def __init__(
+        self,
+        live_seconds: float,
+        end_arg: str = "end",
+        today: Callable[[], date] = date.today,
+    ) -> None:
+        self.live_seconds = live_seconds
+        self.end_arg = end_arg
+        self._today = today
+
+    def __call__(self, arguments: Mapping[str, Any]) -> Optional[float]:
+        end = arguments.get(self.end_arg)
+        if isinstance(end, date) and end < self._today():
+            return None
+        return self.live_seconds
+
+
+TTL = Union[float, Callable[[Mapping[str, Any]], Optional[float]], None]
+
+
+class _Entry(NamedTuple):
+    value: Any
+    size: int
+    expires_at: Optional[float]
+
+
+class _Flight:
+    __slots__ = ("done", "owner", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.owner = threading.get_ident()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+_KWARGS_MARK = object()
+# Sequences longer than this are sized from a sample of their items.
+_SAMPLE = 4
+_ATOMIC = (str, bytes, int, float, bool, date, type(None))
+
+
+def _make_key(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Hashable:
+    if not kwargs:
+        return args
+    return args + (_KWARGS_MARK,) + tuple(sorted(kwargs.items()))
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate deep size in bytes of a cached response.
+
+    Handles NumPy arrays, containers and plain objects; long sequences are
+    extrapolated from their first items and string dict keys (shared field
+    names) are not counted.
+    """
+
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        # Arrays owning their buffer already include it in getsizeof; views do not.
+        return max(sys.getsizeof(value), nbytes)
+    size = sys.getsizeof(value)
+    if isinstance(value, _ATOMIC):
+        return size
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if not isinstance(key, str):
+                size += estimate_size(key)
+            size += sys.getsizeof(item) if isinstance(item, _ATOMIC) else estimate_size(item)
+        return size
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = list(value) if not isinstance(value, (list, tuple)) else value
+        if len(items) > _SAMPLE:
+            sample = sum(estimate_size(item) for item in items[:_SAMPLE])
+            return size + sample * len(items) // _SAMPLE
+        return size + sum(estimate_size(item) for item in items)
+    attributes = getattr(value, "__dict__", None)
+    if attributes is not None:
+        return size + estimate_size(attributes)
+    return size
+
+
+class SingleFlightCache:
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        maxsize: Optional[int] = 128,
+        max_bytes: Optional[int] = None,
+        ttl: TTL = None,
+        clock: Callable[[], float] = time.monotonic,
+        fallback: Optional[Callable[[Any], bool]] = None,
+        fallback_ttl: float = 60.0,
+    ) -> None:
+        self.__wrapped__ = func
+        functools.update_wrapper(self, func)
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.fallback = fallback
+        self.fallback_ttl = fallback_ttl
+        self._clock = clock
+        self._parameters = list(inspect.signature(func).parameters) if callable(ttl) else None
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._flights: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        # Bumped by cache_clear() so calls started before it do not store.
+        self._generation = 0
+        self.bytes = 0
+        self._reset_counters()
+        self._is_coroutine = inspect.iscoroutinefunction(func)
+
+    def _reset_counters(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        if self._is_coroutine:
+            return self._call_async(args, kwargs)
+        key = _make_key(args, kwargs)
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                return value
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                generation = self._generation
+                self.misses += 1
+                leader = True
+            else:
+                leader = False
+                self.shared += 1
+
+        if not leader:
+            if flight.owner == threading.get_ident():
+                # Recursive call for the key being computed; do not wait on ourselves.
+                return self.__wrapped__(*args, **kwargs)
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self.__wrapped__(*args, **kwargs)
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        else:
+            self._store(key, flight.result, generation, args, kwargs)
+            return flight.result
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+    async def _call_async(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Any:
+        key = _make_key(args, kwargs)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                return value
+            task = self._flights.get(key)
+            if task is not None and task.get_loop() is loop:
+                self.shared += 1
+            else:
+                task = loop.create_task(self.__wrapped__(*args, **kwargs))
+                self._flights[key] = task
+                self.misses += 1
+                task.add_done_callback(functools.partial(self._finish_task, key, self._generation, args, kwargs))
+        # Cancelling one waiter must not cancel the shared call.
+        return await asyncio.shield(task)
+
+    def _finish_task(
+        self,
+        key: Hashable,
+        generation: int,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        task: "asyncio.Task[Any]",
+    ) -> None:
+        with self._lock:
+            if self._flights.get(key) is task:
+                del self._flights[key]
+        if not task.cancelled() and task.exception() is None:
+            self._store(key, task.result(), generation, args, kwargs)
+
+    async def acall(self, *args: Any, **kwargs: Any) -> Any:
+        """Await a synchronous cached function from a worker thread."""
+
+        if self._is_coroutine:
+            return await self._call_async(args, kwargs)
+        key = _make_key(args, kwargs)
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                return value
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(self, *args, **kwargs))
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        # Caller holds the lock.
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry.expires_at is not None and self._clock() >= entry.expires_at:
+            self._discard(key)
+            self.expired += 1
+            return False, None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True, entry.value
+
+    def _store(self, key: Hashable, value: Any, generation: int, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> None:
+        seconds = self._ttl_for(args, kwargs)
+        if self.fallback is not None and self.fallback(value):
+            seconds = self.fallback_ttl if seconds is None else min(seconds, self.fallback_ttl)
+        if seconds is not None and seconds <= 0:
+            return
+        size = estimate_size(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        expires_at = self._clock() + seconds if seconds is not None else None
+        with self._lock:
+            if generation != self._generation:
+                return
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = _Entry(value, size, expires_at)
+            self.bytes += size
+            while self._entries and (
+                (self.maxsize is not None and len(self._entries) > self.maxsize)
+                or (self.max_bytes is not None and self.bytes > self.max_bytes)
+            ):
+                self._discard(next(iter(self._entries)))
+                self.evicted += 1
+
+    def _ttl_for(self, args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Optional[float]:
+        if self._parameters is None:
+            return self.ttl  # type: ignore[return-value]
+        arguments = dict(zip(self._parameters, args), **kwargs)
+        return self.ttl(arguments)  # type: ignore[operator, misc]
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+
+    def discard_expiring(self) -> int:
+        """Drop every entry that has a TTL (fallbacks included), keeping only finalized ones."""
+
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry.expires_at is not None]
+            for key in keys:
+                self._discard(key)
+            self._generation += 1
+            return len(keys)
+
+    def cache_info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "shared": self.shared,
+                "expired": self.expired,
+                "evicted": self.evicted,
+                "size": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def cache_clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+            self._generation += 1
+            self._reset_counters()
+
+    def __get__(self, instance: Any, owner: Any = None) -> Any:
+        # Like lru_cache, decorating a method binds the instance as first argument.
+        if instance is None:
+            return self
+        return functools.partial(self, instance)
+
+
+def single_flight(
+    maxsize: Optional[int] = 128,
+    max_bytes: Optional[int] = None,
+    ttl: TTL = None,
+    clock: Callable[[], float] = time.monotonic,
+    fallback: Optional[Callable[[Any], bool]] = None,
+    fallback_ttl: float = 60.0,
+) -> Callable[[Callable[..., Any]], SingleFlightCache]:
+    """Drop-in replacement for ``lru_cache(maxsize=...)``.
+
+    Pass ``maxsize=None`` with ``max_bytes`` to bound the cache by memory
+    only.  ``ttl`` is either seconds or a callable receiving the bound call
+    arguments and returning seconds, ``None`` for "never expires".
+    Results for which ``fallback`` returns true expire after
+    ``fallback_ttl`` seconds at the latest.
+    """
+
+    def decorate(func: Callable[..., Any]) -> SingleFlightCache:
+        return SingleFlightCache(func, maxsize, max_bytes, ttl, clock, fallback, fallback_ttl)
+
+    return decorate
@@ -0,0 +1,246 @@
+"""Vectorised, deterministic synthetic market used as the offline data source.
+
+Every random number is a pure function of ``(instrument key, field,
+session index)``: a 64-bit counter hash (splitmix64) seeded with
+:func:`stable_seed` instead of Python's salted ``hash()``, so series are
+identical across processes and runs.  Each hash yields two unit-variance
+uniform shocks; no per-instrument RNG objects are created, which keeps
+thousands of instruments over years of sessions well under a second.
+Sessions are weekdays counted from :data:`EPOCH`.
+
+Price levels are Brownian bridges between anchor levels placed every
+:data:`BLOCK` sessions, so any window can be generated from the blocks it
+touches (plus a cumulative sum over the few anchors before it) and is an
+exact slice of the same long path.  Board log-prices load on a common
+market walk plus their own walk; stocks add their primary board's walk on
+top of an idiosyncratic one, which makes board and constituent returns
+correlated.  Turnover, volume and money flow are driven by the same daily
+return shocks.
+"""
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+EPOCH = date(2000, 1, 3)
+BLOCK = 256
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX_2 = np.uint64(0x94D049BB133111EB)
+_LOW_32 = np.uint64(0xFFFFFFFF)
+
+_MARKET_SIGMA = 0.008
+_BOARD_SIGMA = 0.010
+_STOCK_SIGMA = 0.015
+
+
+def stable_seed(key: str) -> int:
+    """Return a process-independent 32-bit seed for ``key``."""
+
+    return zlib.crc32(key.encode("utf-8"))
+
+
+def session_index(day: date) -> int:
+    if day < EPOCH:
+        raise ValueError(f"Synthetic market starts on {EPOCH.isoformat()}, got {day.isoformat()}")
+    return int(np.busday_count(EPOCH, day))
+
+
+def session_dates(start: date, end: date) -> List[date]:
+    """Weekday sessions in ``[start, end]``."""
+
+    if start > end:
+        return []
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(end + timedelta(days=1), "D"))
+    return days[np.is_busday(days)].astype(object).tolist()
+
+
+@dataclass
+class Panel:
+    """Instrument × session arrays for one window."""
+
+    instruments: List[str]
+    dates: List[date]
+    fields: Dict[str, np.ndarray]
+    _rows: Dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._rows = {instrument: idx for idx, instrument in enumerate(self.instruments)}
+
+    def __contains__(self, instrument: object) -> bool:
+        return instrument in self._rows
+
+    def records(self, instrument: str, fields: Optional[Sequence[str]] = None) -> List[Dict[str, object]]:
+        """Return ``instrument``'s rows as ``akshare_helper`` style dicts."""
+
+        row = self._rows[instrument]
+        names = list(fields) if fields is not None else list(self.fields)
+        columns = [self.fields[name][row].tolist() for name in names]
+        return [
+            {"date": day, **{name: column[idx] for name, column in zip(names, columns)}}
+            for idx, day in enumerate(self.dates)
+        ]
+
+
+def board_panel(codes: Sequence[str], start: date, end: date) -> Panel:
+    """Price, turnover and money-flow panel for boards."""
+
+    dates, first, last = _window(start, end)
+    keys = [f"board-{code}" for code in codes]
+    log_price = _MARKET_SIGMA * _walk(["market"], first, last) + _BOARD_SIGMA * _walk(keys, first, last)
+    close, change_amount, change_pct, shock = _prices(100.0, log_price, _MARKET_SIGMA + _BOARD_SIGMA, first)
+    volume_noise, rate_noise = _noise(keys, "activity", first, last)
+    main_noise, retail_noise = _noise(keys, "flow", first, last)
+
+    size = np.abs(shock)
+    volume = 1_000_000 * np.exp(0.25 * volume_noise + 0.3 * size)
+    main = 3_000_000 * (0.6 * shock + 0.8 * main_noise)
+    rest = 1_000_000 * retail_noise
+    return Panel(
+        instruments=list(codes),
+        dates=dates,
+        fields={
+            "close": close,
+            "change_pct": change_pct,
+            "change_amount": change_amount,
+            "volume": volume,
+            "turnover": close * volume / 10_000,
+            "turnover_rate": np.clip(3.0 * np.exp(0.35 * rate_noise + 0.25 * size), 0.5, 30.0),
+            "net_inflow": main + rest,
+            "main_inflow": main,
+        },
+    )
+
+
+def stock_panel(
+    symbols: Sequence[str],
+    start: date,
+    end: date,
+    sectors: Optional[Mapping[str, str]] = None,
+) -> Panel:
+    """Price, turnover and money-flow panel for stocks.
+
+    ``sectors`` maps a symbol to the board code whose walk it follows.
+    """
+
+    dates, first, last = _window(start, end)
+    sectors = sectors or {}
+    keys = [f"stock-{symbol}" for symbol in symbols]
+    log_price = _MARKET_SIGMA * _walk(["market"], first, last) + _STOCK_SIGMA * _walk(keys, first, last)
+    sector_codes = sorted({sectors[symbol] for symbol in symbols if symbol in sectors})
+    if sector_codes:
+        # A trailing zero row serves symbols without a sector.
+        sector_walks = _BOARD_SIGMA * _walk([f"board-{code}" for code in sector_codes], first, last)
+        sector_walks = np.concatenate([sector_walks, np.zeros((1, sector_walks.shape[1]))])
+        position = {code: idx for idx, code in enumerate(sector_codes)}
+        log_price += sector_walks[[position.get(sectors.get(symbol, ""), -1) for symbol in symbols]]
+    close, _, pct_change, shock = _prices(50.0, log_price, _MARKET_SIGMA + _BOARD_SIGMA + _STOCK_SIGMA, first)
+    turnover_noise, rate_noise = _noise(keys, "activity", first, last)
+    main_noise, large_noise = _noise(keys, "flow", first, last)
+    medium_noise, small_noise = _noise(keys, "retail", first, last)
+
+    size = np.abs(shock)
+    main = 1_500_000 * (0.6 * shock + 0.8 * main_noise)
+    return Panel(
+        instruments=list(symbols),
+        dates=dates,
+        fields={
+            "close": close,
+            "pct_change": pct_change,
+            "turnover": close * np.exp(13.5 + 0.5 * turnover_noise + 0.3 * size),
+            "turnover_rate": np.clip(2.5 * np.exp(0.4 * rate_noise + 0.3 * size), 0.2, 40.0),
+            "main_inflow": main,
+            "large_inflow": main * (0.6 + 0.1 * large_noise),
+            "medium_inflow": 300_000 * medium_noise,
+            "small_inflow": 150_000 * small_noise,
+        },
+    )
+
+
+def _window(start: date, end: date) -> tuple:
+    dates = session_dates(max(start, EPOCH), end)
+    if not dates:
+        return dates, 0, -1
+    first = session_index(dates[0])
+    return dates, first, first + len(dates) - 1
+
+
+def _prices(base: float, log_price: np.ndarray, sigma: float, first: int) -> tuple:
+    """Turn log levels (with one leading session when ``first > 0``) into bars."""
+
+    levels = base * np.exp(log_price)
+    if first > 0:
+        previous, levels = levels[:, :-1], levels[:, 1:]
+    else:
+        previous = np.concatenate([levels[:, :1], levels[:, :-1]], axis=1)
+    close = np.round(levels, 2)
+    previous = np.round(previous, 2)
+    change_amount = close - previous
+    change_pct = np.divide(change_amount * 100, previous, out=np.zeros_like(close), where=previous > 0)
+    shock = np.log(np.maximum(close, 0.01) / np.maximum(previous, 0.01)) / sigma
+    return close, change_amount, change_pct, shock
+
+
+def _walk(keys: Sequence[str], first: int, last: int) -> np.ndarray:
+    """Unit-variance random walk levels for sessions ``[first - 1, last]``.
+
+    The leading session (skipped when ``first == 0``) lets callers derive
+    the first day's change.
+    """
+
+    start = max(first - 1, 0)
+    if last < start:
+        return np.zeros((len(keys), 0))
+    first_block, last_block = start // BLOCK, last // BLOCK
+    # Anchor levels at block boundaries: a cumulative sum over few blocks.
+    anchors = np.concatenate(
+        [np.zeros((len(keys), 1)), np.cumsum(_noise(keys, "anchor", 0, last_block)[0] * np.sqrt(BLOCK), axis=1)],
+        axis=1,
+    )
+    steps = _noise(keys, "step", first_block * BLOCK, (last_block + 1) * BLOCK - 1)[0]
+    steps = steps.reshape(len(keys), last_block - first_block + 1, BLOCK)
+    path = np.cumsum(steps, axis=2)
+    fraction = np.arange(1, BLOCK + 1) / BLOCK
+    lower = anchors[:, first_block : last_block + 1, None]
+    upper = anchors[:, first_block + 1 : last_block + 2, None]
+    bridge = lower + path - fraction * path[:, :, -1:] + fraction * (upper - lower)
+    # Offset by one so that each block starts right after its lower anchor.
+    flat = np.concatenate([lower[:, :1, 0], bridge.reshape(len(keys), -1)[:, :-1]], axis=1)
+    offset = first_block * BLOCK
+    return flat[:, start - offset : last - offset + 1]
+
+
+def _noise(keys: Sequence[str], field: str, first: int, last: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Two independent zero-mean, unit-variance uniform shock arrays.
+
+    Values depend only on ``(key, field, session)``; summed over sessions
+    they behave like Gaussian steps.
+    """
+
+    seeds = np.array([stable_seed(f"{key}|{field}") for key in keys], dtype=np.uint64)[:, None]
+    index = np.arange(first, last + 1, dtype=np.uint64)[None, :]
+    with np.errstate(over="ignore"):
+        bits = _splitmix64(seeds * _GOLDEN + index)
+    # Each 64-bit hash is read as two 32-bit halves (native byte order).
+    shocks = bits.view(np.uint32).astype(np.float64)
+    shocks *= np.sqrt(12.0) / 2**32
+    shocks -= np.sqrt(3.0)
+    return shocks[:, 0::2], shocks[:, 1::2]
+
+
+def _splitmix64(values: np.ndarray) -> np.ndarray:
+    """splitmix64 finaliser, in place on ``values``."""
+
+    with np.errstate(over="ignore"):
+        values ^= values >> np.uint64(30)
+        values *= _MIX_1
+        values ^= values >> np.uint64(27)
+        values *= _MIX_2
+        values ^= values >> np.uint64(31)
+    return values
@@ -0,0 +1,161 @@
+"""Per-endpoint call telemetry for the data source layer.
+
+Every external call made by :mod:`akshare_helper` is recorded here:
+latency in a fixed-bucket histogram (constant memory however long the
+process runs), error and synthetic-fallback counters and the number of
+rows returned.  :meth:`Telemetry.snapshot` turns the counters into a plain
+dictionary with p50/p95/p99 estimates; passing a previous
+:meth:`Telemetry.checkpoint` restricts it to the calls made since, which is
+how a single run's share is attached to its result.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+
+
+# Upper bucket bounds in seconds; the last bucket is open ended.
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+@dataclass
+class EndpointCounters:
+    calls: int = 0
+    errors: int = 0
+    fallbacks: int = 0
+    rows: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    def copy(self) -> "EndpointCounters":
+        return replace(self, buckets=list(self.buckets))
+
+    def minus(self, earlier: "EndpointCounters") -> "EndpointCounters":
+        buckets = [now - then for now, then in zip(self.buckets, earlier.buckets)]
+        return EndpointCounters(
+            calls=self.calls - earlier.calls,
+            errors=self.errors - earlier.errors,
+            fallbacks=self.fallbacks - earlier.fallbacks,
+            rows=self.rows - earlier.rows,
+            total_seconds=self.total_seconds - earlier.total_seconds,
+            max_seconds=self._interval_max(earlier, buckets),
+            buckets=buckets,
+        )
+
+    def _interval_max(self, earlier: "EndpointCounters", buckets: List[int]) -> float:
+        """Slowest call since ``earlier``.
+
+        A new running maximum can only come from the interval, so it is exact;
+        otherwise the interval's slowest call lies in its highest non-empty
+        bucket and that bucket's upper bound is used.
+        """
+
+        if self.max_seconds > earlier.max_seconds:
+            return self.max_seconds
+        used = [index for index, count in enumerate(buckets) if count]
+        if not used:
+            return 0.0
+        upper = LATENCY_BUCKETS[used[-1]] if used[-1] < len(LATENCY_BUCKETS) else self.max_seconds
+        return min(upper, self.max_seconds)
+
+
+Checkpoint = Dict[str, EndpointCounters]
+
+
+class Telemetry:
+    """Thread-safe registry of :class:`EndpointCounters` by endpoint name."""
+
+    def __init__(self) -> None:
+        self._endpoints: Dict[str, EndpointCounters] = {}
+        self._lock = threading.Lock()
+
+    def record_call(self, endpoint: str, seconds: float, rows: int = 0, error: bool = False) -> None:
+        index = bisect.bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            counters = self._endpoints.setdefault(endpoint, EndpointCounters())
+            counters.calls += 1
+            counters.rows += rows
+            counters.total_seconds += seconds
+            counters.max_seconds = max(counters.max_seconds, seconds)
+            counters.buckets[index] += 1
+            if error:
+                counters.errors += 1
+
+    def record_fallback(self, endpoint: str) -> None:
+        with self._lock:
+            self._endpoints.setdefault(endpoint, EndpointCounters()).fallbacks += 1
+
+    def checkpoint(self) -> Checkpoint:
+        with self._lock:
+            return {name: counters.copy() for name, counters in self._endpoints.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+    def snapshot(self, since: Optional[Checkpoint] = None) -> Dict[str, object]:
+        """Summarise every endpoint, optionally only activity after ``since``."""
+
+        current = self.checkpoint()
+        endpoints: Dict[str, Dict[str, object]] = {}
+        for name, counters in sorted(current.items()):
+            if since is not None and name in since:
+                counters = counters.minus(since[name])
+            if not counters.calls and not counters.fallbacks:
+                continue
+            endpoints[name] = _summarise(counters)
+        totals = {
+            key: sum(int(stats[key]) for stats in endpoints.values())  # type: ignore[call-overload]
+            for key in ("calls", "errors", "fallbacks", "rows")
+        }
+        return {"endpoints": endpoints, "totals": totals}
+
+
+def _summarise(counters: EndpointCounters) -> Dict[str, object]:
+    summary: Dict[str, object] = {
+        "calls": counters.calls,
+        "errors": counters.errors,
+        "fallbacks": counters.fallbacks,
+        "rows": counters.rows,
+        "error_rate": counters.errors / counters.calls if counters.calls else 0.0,
+        "mean_ms": counters.total_seconds / counters.calls * 1000 if counters.calls else 0.0,
+        "max_ms": counters.max_seconds * 1000,
+    }
+    for quantile in QUANTILES:
+        summary[f"p{int(quantile * 100)}_ms"] = _quantile(counters.buckets, quantile, counters.max_seconds) * 1000
+    return summary
+
+
+def _quantile(buckets: List[int], quantile: float, ceiling: float) -> float:
+    """Estimate a quantile by linear interpolation inside its bucket."""
+
+    total = sum(buckets)
+    if not total:
+        return 0.0
+    rank = quantile * total
+    seen = 0
+    for index, count in enumerate(buckets):
+        if count and seen + count >= rank:
+            lower = LATENCY_BUCKETS[index - 1] if index else 0.0
+            upper = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else max(ceiling, lower)
+            return min(lower + (upper - lower) * (rank - seen) / count, max(ceiling, lower))
+        seen += count
+    return ceiling
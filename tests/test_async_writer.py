@@ -0,0 +1,148 @@
+import queue
+import sqlite3
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from ai_stock.sector_rotation.db.async_writer import AsyncWriter, PersistenceError
+from ai_stock.sector_rotation.db.database import Database
+from ai_stock.sector_rotation.db.writer import write_results
+from ai_stock.sector_rotation.models.strong_board import BoardScore
+
+
+class _BlockingDatabase:
+    def __init__(self):
+        self.release = threading.Event()
+        self.batches = []
+
+    def append_many(self, table, records):
+        self.release.wait(5)
+        self.batches.append((table, list(records)))
+
+
+def _board_scores(count):
+    return [
+        BoardScore(
+            board=f"BK{idx:03d}",
+            name=f"板块{idx}",
+            score=float(idx),
+            breakdown={"trend": 1.0, "hype": 1.0, "capital": 1.0, "leader": 1.0},
+        )
+        for idx in range(count)
+    ]
+
+
+def test_flush_makes_queued_results_visible(tmp_path):
+    db_path = tmp_path / "results.sqlite"
+    with AsyncWriter(Database(db_path), batch_size=4) as writer:
+        write_results(writer, date(2024, 1, 2), _board_scores(10), [], {})
+        assert writer.flush(timeout=5)
+
+        with sqlite3.connect(db_path) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM strong_boards").fetchone()[0]
+
+    assert count == 10
+    assert writer.stats.written == 10
+    assert writer.stats.batches >= 3
+
+
+def test_full_queue_applies_backpressure():
+    db = _BlockingDatabase()
+    writer = AsyncWriter(db, max_queue=2, batch_size=1, flush_interval=0.01)
+    try:
+        writer.append("strong_boards", {"n": 0})
+        # The writer thread is now stuck on the first batch; fill the queue.
+        writer.append("strong_boards", {"n": 1}, timeout=1)
+        writer.append("strong_boards", {"n": 2}, timeout=1)
+        with pytest.raises(queue.Full):
+            writer.append("strong_boards", {"n": 3}, timeout=0.05)
+    finally:
+        db.release.set()
+        writer.close(timeout=5)
+
+    assert [batch[1][0]["n"] for batch in db.batches] == [0, 1, 2]
+
+
+def test_close_drains_queue_and_rejects_new_records(tmp_path):
+    db_path = tmp_path / "results.json"
+    writer = AsyncWriter(Database(db_path))
+    writer.append_many("strong_boards", [{"run_date": "2024-01-02", "board_name": "A"}] * 3)
+    assert writer.close(timeout=5)
+
+    with pytest.raises(RuntimeError):
+        writer.append("strong_boards", {})
+    assert db_path.read_text(encoding="utf-8").count('"board_name"') == 3
+
+
+class _FailingDatabase:
+    def append_many(self, table, records):
+        raise sqlite3.OperationalError("disk I/O error")
+
+
+class _SlowFailingDatabase:
+    """Blocks the first batch until released; later batches fail after a while."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = 0
+        self.failed_at = None
+
+    def append_many(self, table, records):
+        self.calls += 1
+        if self.calls == 1:
+            self.release.wait(5)
+            return
+        threading.Event().wait(0.2)
+        self.failed_at = time.monotonic()
+        raise sqlite3.OperationalError("disk I/O error")
+
+
+def test_barriers_racing_close_wait_for_the_leftover_rows():
+    db = _SlowFailingDatabase()
+    writer = AsyncWriter(db, flush_interval=0.01)
+    writer.append("strong_boards", {"n": 0})
+    while writer.pending:
+        time.sleep(0.01)
+    errors, returned = [], []
+
+    def barrier(call, **kwargs):
+        try:
+            call(**kwargs)
+        except PersistenceError as exc:
+            errors.append(exc)
+        returned.append(time.monotonic())
+
+    closer = threading.Thread(target=barrier, args=(writer.close,), kwargs={"timeout": 5})
+    closer.start()
+    while not writer.pending:
+        time.sleep(0.01)
+    # A producer that passed the closed check before close(), then a flush: both land after the stop marker.
+    writer._put(("strong_boards", {"n": 1}), None, allow_closed=True)
+    flusher = threading.Thread(target=barrier, args=(writer.flush,), kwargs={"timeout": 5})
+    flusher.start()
+    while writer.pending < 3:
+        time.sleep(0.01)
+    db.release.set()
+    flusher.join(5)
+    closer.join(5)
+
+    # Neither barrier returns before the leftover row was attempted, and its failure is reported once.
+    assert db.calls == 2 and min(returned) >= db.failed_at
+    [error] = errors
+    assert error.failed == 1
+
+
+def test_failed_batches_are_raised_at_the_next_barrier():
+    writer = AsyncWriter(_FailingDatabase(), batch_size=2)
+    writer.append_many("strong_boards", [{"n": 0}, {"n": 1}, {"n": 2}])
+    with pytest.raises(PersistenceError) as excinfo:
+        writer.flush(timeout=5)
+    assert excinfo.value.failed == 3 and isinstance(excinfo.value.errors[0], sqlite3.OperationalError)
+    # Reported once; a later barrier without new failures passes.
+    assert writer.flush(timeout=5)
+    writer.append("strong_boards", {"n": 3})
+    with pytest.raises(PersistenceError):
+        writer.close(timeout=5)
+    assert writer.stats.failed == 4 and writer.stats.enqueued == 4
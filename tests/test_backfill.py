@@ -0,0 +1,115 @@
+from datetime import date
+from functools import partial
+
+import pytest
+
+from ai_stock.sector_rotation.config import AnalysisConfig
+from ai_stock.sector_rotation.db.database import Database
+from ai_stock.sector_rotation.main import run_daily_analysis
+from ai_stock.sector_rotation.models import lead_lag
+from ai_stock.sector_rotation.scheduler import backfill
+
+
+def _seed(db, *days):
+    for day in days:
+        db.append(
+            "strong_boards",
+            {
+                "run_date": day.isoformat(),
+                "board_name": "A",
+                "score": 1.0,
+                "trend_score": 0.0,
+                "hype_score": 0.0,
+                "capital_score": 0.0,
+                "leader_score": 0.0,
+            },
+        )
+
+
+def test_missing_sessions_skip_weekends_and_stored_dates(tmp_path):
+    db = Database(tmp_path / "results.sqlite")
+    _seed(db, date(2024, 3, 4), date(2024, 3, 8))
+
+    missing = backfill.missing_sessions(db, date(2024, 3, 12))
+
+    assert missing == [date(2024, 3, 5), date(2024, 3, 6), date(2024, 3, 7), date(2024, 3, 11), date(2024, 3, 12)]
+
+
+def test_empty_database_has_nothing_to_catch_up(tmp_path):
+    db = Database(tmp_path / "results.sqlite")
+    assert backfill.missing_sessions(db, date(2024, 3, 12)) == []
+
+
+def test_backfill_shares_one_data_load(tmp_path, monkeypatch):
+    db = Database(tmp_path / "results.sqlite")
+    _seed(db, date(2024, 3, 4))
+    loads = []
+    original = backfill.load_market_data
+
+    def counting_load(cfg, boards=None):
+        loads.append((cfg.start_date, cfg.end_date))
+        return original(cfg, boards)
+
+    monkeypatch.setattr(backfill, "load_market_data", counting_load)
+
+    written = backfill.catch_up(db, date(2024, 3, 8), workers=2)
+
+    assert written == [date(2024, 3, 5), date(2024, 3, 6), date(2024, 3, 7)]
+    assert loads == [(date(2024, 2, 27), date(2024, 3, 7))]
+    assert db.run_dates() == {date(2024, 3, 4), date(2024, 3, 5), date(2024, 3, 6), date(2024, 3, 7)}
+
+
+def test_backfill_from_stops_at_the_last_closed_session(tmp_path, monkeypatch):
+    from ai_stock.sector_rotation.scheduler import daily_task
+    from ai_stock.sector_rotation.utils import akshare_helper
+
+    db_path = tmp_path / "results.sqlite"
+    _seed(Database(db_path), date(2024, 3, 4))
+    requested = []
+    monkeypatch.setattr(akshare_helper, "session_today", lambda: date(2024, 3, 11))
+    monkeypatch.setattr(daily_task, "backfill_sessions", lambda sessions, *args, **kwargs: requested.extend(sessions))
+
+    daily_task.main(["--backfill-from", "2024-03-04", "--db", str(db_path)])
+
+    # Monday 2024-03-11 is left to the regular window run.
+    assert requested == [date(2024, 3, 5), date(2024, 3, 6), date(2024, 3, 7), date(2024, 3, 8)]
+
+
+def _edges(result):
+    return {(edge["leader"], edge["follower"], edge["lag"]): edge["correlation"] for edge in result["follow_graph"]}
+
+
+def test_lead_lag_graphs_match_across_batches_and_daily_runs(tmp_path, monkeypatch):
+    # Keep every defined link so the comparison does not hinge on a threshold.
+    monkeypatch.setattr(lead_lag, "follow_graph", partial(lead_lag.follow_graph, min_correlation=-1.0))
+    days = [date(2024, 3, 5), date(2024, 3, 6), date(2024, 3, 7), date(2024, 3, 8)]
+
+    together = backfill.backfill_sessions(days, workers=2)
+    alone = backfill.backfill_sessions(days[-1:])
+    db_path = tmp_path / "results.sqlite"
+    run_daily_analysis(AnalysisConfig.daily_defaults(days[-2]), db_path=db_path)
+    sessions = lead_lag.LeadLagState.load(lead_lag.state_path(db_path)).returns.sessions
+    daily = run_daily_analysis(AnalysisConfig.daily_defaults(days[-1]), db_path=db_path)
+    state = lead_lag.LeadLagState.load(lead_lag.state_path(db_path))
+
+    assert (state.last, state.returns.sessions) == (days[-1], sessions + 1)
+    assert sessions > lead_lag.DEFAULT_WINDOW
+    expected = _edges(alone[days[-1]])
+    assert expected
+    for result in (together[days[-1]], daily):
+        assert _edges(result) == pytest.approx(expected)
+
+
+def test_runs_for_earlier_sessions_leave_a_newer_lead_lag_state_alone(tmp_path):
+    db_path = tmp_path / "results.sqlite"
+    path = lead_lag.state_path(db_path)
+    run_daily_analysis(AnalysisConfig.daily_defaults(date(2024, 3, 8)), db_path=db_path)
+    saved = path.read_bytes()
+
+    run_daily_analysis(AnalysisConfig.daily_defaults(date(2024, 3, 6)), db_path=db_path)
+    backfill.backfill_sessions([date(2024, 3, 5), date(2024, 3, 7)], state_path=path)
+    assert path.read_bytes() == saved
+
+    backfill.backfill_sessions([date(2024, 3, 11)], state_path=path)
+    assert lead_lag.saved_as_of(path) == date(2024, 3, 11)
+    assert not list(tmp_path.glob(".*.tmp"))
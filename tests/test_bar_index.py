@@ -0,0 +1,64 @@
+import random
+from dataclasses import replace
+from datetime import date, timedelta
+
+from ai_stock.sector_rotation.benchmark import make_catalogue
+from ai_stock.sector_rotation.config import AnalysisConfig
+from ai_stock.sector_rotation.data.bar_index import BarIndex
+from ai_stock.sector_rotation.data.stock_data import StockBar
+from ai_stock.sector_rotation.main import load_market_data, slice_market_data
+from ai_stock.sector_rotation.utils import akshare_helper
+
+
+def _select_bar(bars, target):
+    return max((bar for bar in bars if bar.date <= target), key=lambda bar: bar.date, default=None)
+
+
+def test_as_of_lookups_match_a_linear_scan():
+    rng = random.Random(5)
+    first = date(2023, 1, 2)
+    history = {}
+    for index in range(40):
+        days = sorted(rng.sample(range(300), rng.randint(0, 60)))
+        bars = [StockBar(f"S{index}", first + timedelta(days=day), 10.0 + day, 1.0, 1e6, 0.5) for day in days]
+        rng.shuffle(bars)
+        history[f"S{index}"] = bars
+    index = BarIndex(history)
+    symbols = list(history) + ["missing"]
+
+    for _ in range(50):
+        day = first + timedelta(days=rng.randint(-5, 310))
+        since = day - timedelta(days=rng.randint(0, 30))
+        assert index.as_of_many(symbols, day) == {
+            symbol: _select_bar(history.get(symbol, []), day) for symbol in symbols
+        }
+        assert index.as_of_many(symbols, day, since=since) == {
+            symbol: _select_bar([bar for bar in history.get(symbol, []) if bar.date >= since], day)
+            for symbol in symbols
+        }
+        expected = {
+            symbol: sorted((bar for bar in bars if since <= bar.date <= day), key=lambda bar: bar.date)
+            for symbol, bars in history.items()
+        }
+        assert index.window(since, day) == {symbol: bars for symbol, bars in expected.items() if bars}
+    latest = max(history["S1"], key=lambda bar: bar.date)
+    assert index.as_of("S1", date(2030, 1, 1)) == latest == index.bars("S1")[-1]
+    assert index.as_of("missing", date(2030, 1, 1)) is None and "missing" not in index
+
+
+def test_sliced_sessions_reprice_quotes_from_the_shared_index():
+    cfg = replace(AnalysisConfig.daily_defaults(date(2024, 3, 8)), board_count=8)
+    wide = replace(cfg, start_date=date(2024, 2, 1))
+    catalogue = make_catalogue(8, 20, members_per_board=6)
+    with akshare_helper.offline(catalogue):
+        data = load_market_data(wide)
+        index = BarIndex(data.stock_history)
+        for end in (date(2024, 3, 1), date(2024, 3, 5), date(2024, 3, 8)):
+            start = end - timedelta(days=7)
+            shared = slice_market_data(data, start, end, index=index)
+            assert shared == slice_market_data(data, start, end)
+            for quotes in shared.component_quotes.values():
+                for quote in quotes:
+                    bar = _select_bar(shared.stock_history.get(quote.symbol, []), end)
+                    assert bar is not None and quote.last_price == bar.close
+            assert all(start <= bar.date <= end for bars in shared.stock_history.values() for bar in bars)
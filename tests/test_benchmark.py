@@ -0,0 +1,37 @@
+from ai_stock.sector_rotation import benchmark
+from ai_stock.sector_rotation.data import board_data
+from ai_stock.sector_rotation.utils import akshare_helper
+
+
+def test_catalogue_is_deterministic_and_sized():
+    first = benchmark.make_catalogue(30, 50, members_per_board=5)
+    second = benchmark.make_catalogue(30, 50, members_per_board=5)
+
+    assert first == second
+    assert len(first["industry"]) == 30
+    assert all(len(board.members) == 5 for board in first["industry"].values())
+
+
+def test_offline_universe_is_restored_afterwards():
+    with akshare_helper.offline(benchmark.make_catalogue(12, 20)):
+        assert len(board_data.list_boards()) == 12
+    assert [board.code for board in board_data.list_boards()][:1] == ["BK001"]
+
+
+def test_run_benchmark_times_every_stage_and_flags_regressions(tmp_path):
+    result = benchmark.run_benchmark(20, stock_count=40, members_per_board=5, repeat=1)
+
+    assert {"fetch.board_prices", "factor.trend", "rank", "persist", "total"} <= set(result.timings)
+    assert {"micro.rank_boards", "micro.write_results", "micro.portfolio"} <= set(result.timings)
+    assert result.peak_memory["total"] > 0
+
+    path = tmp_path / "baseline.json"
+    benchmark.save_baseline([result], path)
+    assert benchmark.compare([result], benchmark.load_baseline(path)) == []
+
+    slower = benchmark.BenchmarkResult(
+        boards=20, stocks=40, timings={stage: seconds * 2 + 0.01 for stage, seconds in result.timings.items()}
+    )
+    flagged = benchmark.compare([slower], benchmark.load_baseline(path), threshold=0.25)
+    assert {regression.stage for regression in flagged} == set(result.timings)
+    assert all(regression.ratio > 1.25 for regression in flagged)
@@ -0,0 +1,124 @@
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from ai_stock.sector_rotation.utils import akshare_helper
+from ai_stock.sector_rotation.utils.board_index import build_board_indices
+from ai_stock.sector_rotation.utils.circuit_breaker import BreakerPolicy, BreakerRegistry
+from ai_stock.sector_rotation.utils.constituent_store import ConstituentStore
+
+DAYS = [date(2024, 3, 4), date(2024, 3, 5), date(2024, 3, 6)]
+
+
+def _bars(closes, changes, turnovers):
+    return [
+        {"date": day, "close": close, "pct_change": change, "turnover": turnover, "turnover_rate": 2.0}
+        for day, close, change, turnover in zip(DAYS, closes, changes, turnovers)
+        if close is not None
+    ]
+
+
+HISTORY = {
+    "a": _bars([10.0, 11.0, 12.1], [0.0, 10.0, 10.0], [100.0, 300.0, 100.0]),
+    # Suspended on the second session: its third bar moved -5% from the first.
+    "b": _bars([20.0, None, 19.0], [0.0, None, -5.0], [100.0, 0.0, 100.0]),
+}
+
+
+def test_equal_and_turnover_weighted_indices():
+    members = {"custom": ["a", "b"], "only_a": ["a"], "unknown": ["zzz"]}
+    equal = build_board_indices(members, HISTORY, base=100.0)
+    weighted = build_board_indices(members, HISTORY, weighting="turnover", base=100.0)
+
+    assert equal["unknown"] == []
+    assert [bar["close"] for bar in equal["only_a"]] == pytest.approx([100.0, 110.0, 121.0])
+    # Session 2: only "a" trades (+10%); session 3: a +10%, b -5% against its last close.
+    assert [bar["change_pct"] for bar in equal["custom"]] == pytest.approx([0.0, 10.0, 2.5])
+    assert [bar["change_pct"] for bar in weighted["custom"]] == pytest.approx([0.0, 10.0, 2.5])
+    assert equal["custom"][1]["turnover"] == 300.0 and equal["custom"][2]["turnover"] == 200.0
+    assert equal["custom"][2]["close"] == pytest.approx(100.0 * 1.1 * 1.025)
+    assert equal["custom"][2]["change_amount"] == pytest.approx(110.0 * 0.025)
+
+    # Ex-dividend: the unadjusted close falls while the session's reported change is +1%.
+    dividend = build_board_indices({"x": ["c"]}, {"c": _bars([10.0, 9.0], [0.0, 1.0], [1.0, 1.0])}, base=100.0)["x"]
+    assert [bar["close"] for bar in dividend] == pytest.approx([100.0, 101.0])
+
+    skewed = dict(HISTORY, b=_bars([20.0, None, 19.0], [0.0, None, -5.0], [100.0, 0.0, 300.0]))
+    rebuilt = build_board_indices({"custom": ["a", "b"]}, skewed, weighting="turnover")["custom"]
+    assert rebuilt[2]["change_pct"] == pytest.approx((0.1 * 100 - 0.05 * 300) / 400 * 100)
+    with pytest.raises(ValueError):
+        build_board_indices(members, HISTORY, weighting="cap")
+
+
+class _Frame:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def iterrows(self):
+        return enumerate(self.rows)
+
+
+def test_failed_board_history_is_rebuilt_from_constituents(monkeypatch):
+    def stock_board_industry_hist_em(**kwargs):
+        raise ConnectionError("endpoint down")
+
+    def stock_board_industry_cons_em(symbol):
+        return _Frame([{"代码": "a"}, {"代码": "b"}, {"代码": "c"}])
+
+    monkeypatch.setattr(
+        akshare_helper,
+        "ak",
+        SimpleNamespace(
+            stock_board_industry_hist_em=stock_board_industry_hist_em,
+            stock_board_industry_cons_em=stock_board_industry_cons_em,
+        ),
+    )
+    monkeypatch.setattr(akshare_helper, "AK_AVAILABLE", True)
+    monkeypatch.setattr(akshare_helper, "BREAKERS", BreakerRegistry(BreakerPolicy(retries=0)))
+    monkeypatch.setattr(akshare_helper, "CONSTITUENTS", ConstituentStore())
+    # "c" only has synthetic bars: it must not enter the rebuilt index.
+    synthetic = akshare_helper.FallbackRecords(_bars([5.0, 6.0, 7.0], [0.0, 20.0, 16.7], [1e6, 1e6, 1e6]))
+    monkeypatch.setattr(akshare_helper, "stock_history", lambda symbol, start, end: HISTORY.get(symbol, synthetic))
+    akshare_helper.clear_caches()
+    checkpoint = akshare_helper.telemetry_checkpoint()
+    try:
+        records = akshare_helper._board_price_cache(
+            "industry", "BK0001", "板块", "20240304", "20240306", DAYS[0], DAYS[-1]
+        )
+        custom = akshare_helper.constituent_index_history("custom", ["a", "b", "c"], DAYS[0], DAYS[-1], "turnover")
+        endpoints = akshare_helper.telemetry_snapshot(checkpoint)["endpoints"]
+        # With the stock history breaker open the members are not requested at all.
+        akshare_helper.BREAKERS.get("stock_zh_a_hist")._trip()
+        akshare_helper.clear_caches()
+        assert akshare_helper._constituent_fallback("industry", "BK0001", "板块", DAYS[0], DAYS[-1]) == []
+    finally:
+        akshare_helper.clear_caches()
+
+    assert records == custom == build_board_indices({"x": ["a", "b"]}, HISTORY, weighting="turnover")["x"]
+    assert isinstance(records, akshare_helper.FallbackRecords) and isinstance(custom, akshare_helper.FallbackRecords)
+    assert endpoints["stock_board_industry_hist_em"]["fallbacks"] == 1
+
+
+def test_partial_constituent_indices_are_rebuilt_once_members_recover(monkeypatch):
+    history = {"a": HISTORY["a"], "b": akshare_helper.FallbackRecords(HISTORY["b"])}
+    now = [0.0]
+    monkeypatch.setattr(akshare_helper, "stock_history", lambda symbol, start, end: history[symbol])
+    monkeypatch.setattr(akshare_helper._constituent_index_cache, "_clock", lambda: now[0])
+    monkeypatch.setattr(akshare_helper, "session_today", lambda: date(2024, 3, 8))  # a closed window
+    akshare_helper.clear_caches()
+    try:
+        partial = akshare_helper.constituent_index_history("custom", ["a", "b"], DAYS[0], DAYS[-1])
+        history["b"] = HISTORY["b"]
+        assert akshare_helper.constituent_index_history("custom", ["a", "b"], DAYS[0], DAYS[-1]) == partial
+        now[0] += akshare_helper.FALLBACK_TTL + 1
+        recovered = akshare_helper.constituent_index_history("custom", ["a", "b"], DAYS[0], DAYS[-1])
+    finally:
+        akshare_helper.clear_caches()
+
+    assert isinstance(partial, akshare_helper.FallbackRecords)
+    assert not isinstance(recovered, akshare_helper.FallbackRecords)
+    assert recovered == build_board_indices({"x": ["a", "b"]}, HISTORY)["x"] != partial
@@ -0,0 +1,101 @@
+import random
+from dataclasses import replace
+from datetime import date
+from itertools import combinations
+
+import pytest
+
+from ai_stock.sector_rotation import progressive
+from ai_stock.sector_rotation.config import UNIVERSE_CATEGORIES, AnalysisConfig
+from ai_stock.sector_rotation.data.board_similarity import cluster_boards, minhash_signatures
+from ai_stock.sector_rotation.main import load_market_data
+from ai_stock.sector_rotation.models.strong_board import BoardScore
+from ai_stock.sector_rotation.strategy.board_selection import select_primary_boards
+from ai_stock.sector_rotation.utils import akshare_helper
+from ai_stock.sector_rotation.utils.akshare_helper import SyntheticBoard
+
+
+def test_lsh_finds_the_overlapping_pairs_a_full_comparison_finds():
+    rng = random.Random(7)
+    stocks = [f"{index:06d}" for index in range(3000)]
+    members = {f"B{index}": rng.sample(stocks, rng.randint(20, 200)) for index in range(150)}
+    for index in range(20):
+        source = members[f"B{index}"]
+        members[f"D{index}"] = source[: int(len(source) * 0.8)] + rng.sample(stocks, 3)
+
+    clusters = cluster_boards(members, threshold=0.5)
+    expected = set()
+    for first, second in combinations(members, 2):
+        left, right = set(members[first]), set(members[second])
+        if len(left & right) / len(left | right) >= 0.5:
+            expected.add(tuple(sorted((first, second))))
+    assert set(clusters.similarity) == expected and len(expected) == 20
+    assert clusters.cluster_of("D3") == ("B3", "D3") and clusters.cluster_of("B40") == ("B40",)
+    assert clusters.representatives(["D3", "B3", "B40"]) == {"D3": "D3", "B3": "D3", "B40": "B40"}
+
+    # A overlaps B and B overlaps C, but A and C barely overlap: C is not dropped for A's sake.
+    chained = cluster_boards({"A": ["1", "2", "3", "4"], "B": ["2", "3", "4", "5"], "C": ["3", "4", "5", "6"]})
+    assert chained.cluster_of("C") == ("A", "B", "C")
+    assert chained.representatives(["A", "B", "C"]) == {"A": "A", "B": "A", "C": "C"}
+    assert chained.representatives(["B", "A", "C"]) == {"B": "B", "A": "B", "C": "B"}
+
+    boards, signatures = minhash_signatures({"x": ["a", "b", "c", "d"], "y": ["a", "b", "c", "e"], "z": []}, 1000)
+    assert (signatures[0] == signatures[1]).mean() == pytest.approx(0.6, abs=0.05)
+    assert boards == ["x", "y", "z"]
+
+
+def test_selection_takes_one_board_per_cluster():
+    clusters = cluster_boards({"BK002": ["300750", "002594", "002812"], "BK006": ["002594", "601238", "300750"]})
+    scores = [BoardScore(board, board, score, {}) for board, score in (("BK006", 9.0), ("BK002", 8.0), ("BK001", 7.0))]
+
+    assert [score.board for score in select_primary_boards(scores, 2)] == ["BK006", "BK002"]
+    assert [score.board for score in select_primary_boards(scores, 2, clusters=clusters)] == ["BK006", "BK001"]
+
+
+def test_overlapping_boards_are_not_fetched():
+    cfg = replace(AnalysisConfig.daily_defaults(date(2024, 3, 8)), overlap_threshold=0.5)
+    with akshare_helper.offline():
+        data = load_market_data(cfg)
+    # 新能源 (BK002) and 新能源汽车 (BK006) share two of three constituents.
+    codes = [board.code for board in data.boards]
+    assert "BK002" in codes and "BK006" not in codes
+    assert set(data.price_history) == set(data.board_members) == set(codes)
+
+    result = progressive.run_progressive_analysis(replace(cfg, board_count=None), prior_scores={"BK006": 1.0})
+    assert result["coverage"]["boards_collapsed"] == ["BK002"]
+    assert "BK006" in result["coverage"]["order"]
+
+
+def test_industry_boards_win_overlaps_with_concept_boards():
+    catalogue = {
+        "industry": {"BK900": SyntheticBoard("BK900", "汽车整车", "industry", ["600104", "601238", "002594"])},
+        "concept": {"BK100": SyntheticBoard("BK100", "新能源车", "concept", ["600104", "601238", "002594", "300750"])},
+    }
+    cfg = replace(
+        AnalysisConfig.daily_defaults(date(2024, 3, 8)), categories=UNIVERSE_CATEGORIES, overlap_threshold=0.5
+    )
+    with akshare_helper.offline(catalogue):
+        data = load_market_data(cfg)
+    assert [board.code for board in data.boards] == ["BK900"]
+
+
+def test_constituent_lists_count_against_the_time_budget(monkeypatch):
+    import time
+
+    from ai_stock.sector_rotation.data import board_data
+
+    listed = board_data.list_board_members
+
+    def list_board_members(board, **kwargs):
+        if board.code == "BK003":
+            time.sleep(2.0)  # never answers within the budget
+            return []
+        return listed(board, **kwargs)
+
+    monkeypatch.setattr(board_data, "list_board_members", list_board_members)
+    cfg = replace(AnalysisConfig.daily_defaults(date(2024, 3, 8)), board_count=None, overlap_threshold=0.5)
+    started = time.perf_counter()
+    with akshare_helper.offline():
+        result = progressive.run_progressive_analysis(cfg, time_budget=0.5)
+    assert time.perf_counter() - started < 1.5
+    assert "BK003" in result["coverage"]["boards_skipped"] and not result["coverage"]["complete"]
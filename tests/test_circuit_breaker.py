@@ -0,0 +1,103 @@
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from ai_stock.sector_rotation.utils import akshare_helper
+from ai_stock.sector_rotation.utils.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    BreakerPolicy,
+    BreakerRegistry,
+    CircuitBreaker,
+    CircuitOpenError,
+    call_with_retry,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_half_opens_and_recovers():
+    clock = FakeClock()
+    breaker = CircuitBreaker("hist", BreakerPolicy(window=10, min_calls=4, open_seconds=30), clock)
+    for _ in range(4):
+        assert breaker.allow()
+        breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        call_with_retry(breaker, lambda: pytest.fail("an open circuit must not call the endpoint"))
+
+    clock.now = 30.0
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()  # only one probe at a time
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.cooldown == 60.0
+    clock.now = 60.0
+    assert not breaker.allow()
+
+    clock.now = 90.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.stats()["rejected"] == 4
+
+
+def test_call_with_retry_only_retries_transient_errors():
+    breaker = CircuitBreaker("hist", BreakerPolicy(retries=2, backoff_base=1.0, min_calls=100))
+    sleeps = []
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("reset by peer")
+        return "ok"
+
+    assert call_with_retry(breaker, flaky, sleep=sleeps.append, rng=lambda: 1.0) == "ok"
+    assert sleeps == [1.0, 2.0]
+
+    def broken():
+        attempts.append(1)
+        raise ValueError("bad payload")
+
+    attempts.clear()
+    with pytest.raises(ValueError):
+        call_with_retry(breaker, broken, sleep=sleeps.append)
+    assert len(attempts) == 1
+
+
+def test_degraded_endpoint_fails_fast_and_falls_back(monkeypatch):
+    calls = []
+
+    def stock_zh_a_hist(**kwargs):
+        calls.append(kwargs["symbol"])
+        raise ConnectionError("endpoint down")
+
+    monkeypatch.setattr(akshare_helper, "ak", SimpleNamespace(stock_zh_a_hist=stock_zh_a_hist))
+    monkeypatch.setattr(akshare_helper, "AK_AVAILABLE", True)
+    monkeypatch.setattr(akshare_helper, "BREAKERS", BreakerRegistry(BreakerPolicy(min_calls=3, retries=0)))
+    akshare_helper.clear_caches()
+
+    symbols = [f"{600000 + index:06d}" for index in range(10)]
+    try:
+        histories = [akshare_helper.stock_history(symbol, date(2024, 3, 1), date(2024, 3, 8)) for symbol in symbols]
+    finally:
+        akshare_helper.clear_caches()
+
+    assert all(histories)
+    assert len(calls) == 3
+    breakers = akshare_helper.telemetry_snapshot()["breakers"]
+    assert breakers["stock_zh_a_hist"]["state"] == OPEN
+    assert breakers["stock_zh_a_hist"]["rejected"] == 7
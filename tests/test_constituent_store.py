@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from ai_stock.sector_rotation.utils import akshare_helper
+from ai_stock.sector_rotation.utils.constituent_store import ConstituentStore
+
+
+def test_point_in_time_members_and_symbol_index(tmp_path):
+    store = ConstituentStore()
+    assert store.record("BK1", ["a", "b"], date(2024, 1, 2))
+    assert not store.record("BK1", ["a", "b"], date(2024, 1, 9))
+    assert store.record("BK1", ["a", "c"], date(2024, 2, 1))
+    # Late snapshot between two versions, and one matching the next version.
+    assert store.record("BK1", ["a", "b", "d"], date(2024, 1, 15))
+    assert store.record("BK1", ["a", "c"], date(2024, 1, 20))
+    store.record("BK2", ["c"], date(2024, 1, 2))
+
+    assert store.history("BK1") == [
+        (date(2024, 1, 2), ["a", "b"]),
+        (date(2024, 1, 15), ["a", "b", "d"]),
+        (date(2024, 1, 20), ["a", "c"]),
+    ]
+    assert store.members_as_of("BK1", date(2024, 1, 1)) is None
+    assert store.members_as_of("BK1", date(2024, 1, 16)) == ["a", "b", "d"]
+    assert store.latest("BK1") == ["a", "c"]
+    assert store.boards_of("c") == ["BK1", "BK2"]
+    assert store.boards_of("c", as_of=date(2024, 1, 10)) == ["BK2"]
+    assert store.boards_of("b", as_of=date(2024, 1, 10)) == ["BK1"] and store.boards_of("b") == []
+
+    store.save(tmp_path / "constituents.json")
+    restored = ConstituentStore()
+    restored.load(tmp_path / "constituents.json")
+    assert restored.history("BK1") == store.history("BK1") and restored.stats() == store.stats()
+    assert [path.name for path in tmp_path.iterdir()] == ["constituents.json"]
+
+    (tmp_path / "constituents.json").write_text('{"BK1": [["2024-01-02", ["a"]]', encoding="utf-8")
+    damaged = ConstituentStore()
+    damaged.load(tmp_path / "constituents.json")
+    assert damaged.stats()["boards"] == 0
+    assert (tmp_path / "constituents.json.corrupt").exists() and not (tmp_path / "constituents.json").exists()
+
+
+class _Frame:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def iterrows(self):
+        return enumerate(self.rows)
+
+
+def test_live_constituents_are_versioned_and_served_for_past_sessions(monkeypatch):
+    store = ConstituentStore()
+    monkeypatch.setattr(akshare_helper, "CONSTITUENTS", store)
+
+    def stock_board_industry_cons_em(symbol):
+        return _Frame([{"代码": "600001", "名称": "甲"}, {"代码": "600002", "名称": "乙"}])
+
+    monkeypatch.setattr(akshare_helper, "ak", SimpleNamespace(stock_board_industry_cons_em=stock_board_industry_cons_em))
+    monkeypatch.setattr(akshare_helper, "AK_AVAILABLE", True)
+    akshare_helper._board_constituents_cache.__wrapped__("industry", "BK0001", "半导体")
+    assert store.history("BK0001") == [(date.today(), ["600001", "600002"])]
+    assert store.boards_of("600002") == ["BK0001"]
+    # A replayed fixture is filed under its recorded session, not the replay day.
+    monkeypatch.setattr(akshare_helper, "session_today", lambda: date(2024, 3, 8))
+    akshare_helper._board_constituents_cache.__wrapped__("industry", "BK0002", "芯片")
+    assert store.history("BK0002") == [(date(2024, 3, 8), ["600001", "600002"])]
+
+    monkeypatch.undo()
+    monkeypatch.setattr(akshare_helper, "CONSTITUENTS", store)
+    with akshare_helper.offline():
+        code = akshare_helper.list_boards(limit=1)[0].code
+        last_month = date.today() - timedelta(days=30)
+        store.record(code, ["000001"], last_month)
+        assert akshare_helper.board_members(code, as_of=last_month + timedelta(days=1)) == ["000001"]
+        # Sessions before the first snapshot, and today, use the live list.
+        assert akshare_helper.board_members(code, as_of=last_month - timedelta(days=1)) != ["000001"]
+        assert akshare_helper.board_members(code, as_of=date.today()) != ["000001"]
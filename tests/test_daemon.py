@@ -0,0 +1,166 @@
+import json
+import urllib.error
+import urllib.request
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from ai_stock.sector_rotation.config import AnalysisConfig
+from ai_stock.sector_rotation.scheduler.daemon import SchedulerDaemon, start_api_server
+from ai_stock.sector_rotation.utils.history_store import ResidentHistory
+
+
+def _get(server, path):
+    port = server.server_address[1]
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=5) as response:
+        return response.status, response.read().decode("utf-8")
+
+
+@pytest.fixture
+def daemon_server():
+    daemon = SchedulerDaemon(config_factory=AnalysisConfig.daily_defaults)
+    server = start_api_server(daemon.cache, port=0)
+    try:
+        yield daemon, server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_api_serves_latest_result_from_memory(daemon_server):
+    daemon, server = daemon_server
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        _get(server, "/report")
+    assert excinfo.value.code == 503
+
+    result = daemon.run_once(date(2024, 3, 8))
+
+    status, body = _get(server, "/health")
+    health = json.loads(body)
+    assert status == 200
+    assert health["status"] == "ok"
+    assert health["run_date"] == "2024-03-08"
+
+    _, report = _get(server, "/report")
+    assert report == result["report"]
+
+    _, rotation = _get(server, "/rotation?top=1")
+    assert len(json.loads(rotation)) == 1
+
+    board = result["selected_boards"][0]["board"]
+    _, leaders = _get(server, f"/leaders?board={board}")
+    assert json.loads(leaders) == json.loads(json.dumps(result["leaders"][board]))
+
+
+def test_run_once_outside_the_loop_persists_to_the_database(tmp_path):
+    from ai_stock.sector_rotation.db.database import Database
+    from ai_stock.sector_rotation.models import lead_lag
+
+    db_path = tmp_path / "results.sqlite"
+    daemon = SchedulerDaemon(config_factory=AnalysisConfig.daily_defaults, db_path=db_path)
+    daemon.run_once(date(2024, 3, 8))
+
+    assert Database(db_path).run_dates() == {date(2024, 3, 8)}
+    assert lead_lag.state_path(db_path).exists()
+
+
+def test_resident_history_only_fetches_uncovered_sessions():
+    calls = []
+
+    def fetch(first, last):
+        calls.append((first, last))
+        days = (last - first).days + 1
+        return [{"date": first + timedelta(days=offset)} for offset in range(days)]
+
+    today = {"value": date(2024, 3, 8)}
+    store = ResidentHistory(today=lambda: today["value"])
+
+    first = store.get("BK001", date(2024, 3, 1), date(2024, 3, 8), fetch)
+    assert len(first) == 8
+
+    today["value"] = date(2024, 3, 9)
+    second = store.get("BK001", date(2024, 3, 2), date(2024, 3, 9), fetch)
+
+    assert [record["date"] for record in second] == [date(2024, 3, 2) + timedelta(days=i) for i in range(8)]
+    # The second call re-fetches the previously partial session and the new one only.
+    assert calls == [(date(2024, 3, 1), date(2024, 3, 8)), (date(2024, 3, 8), date(2024, 3, 9))]
+    assert store.stats()["partial_hits"] == 1
+
+
+def test_resident_history_refetches_rejected_and_incomplete_windows():
+    calls = []
+    answers = {"BK001": []}
+
+    def fetcher(key):
+        def fetch(first, last):
+            calls.append((key, first, last))
+            return answers[key]
+
+        return fetch
+
+    store = ResidentHistory(today=lambda: date(2024, 3, 9), keep=lambda records, first, last: bool(records))
+    store.get("BK001", date(2024, 3, 4), date(2024, 3, 8), fetcher("BK001"))
+    store.get("BK001", date(2024, 3, 4), date(2024, 3, 8), fetcher("BK001"))
+    # An empty answer is not final: the window is requested again.
+    assert [key for key, _, _ in calls] == ["BK001", "BK001"]
+
+    answers["BK002"] = [{"date": date(2024, 3, day)} for day in (4, 5, 7, 8)]
+    # Listed mid-window, and suspended since the middle of the window: no gap between their bars.
+    answers["NEW"] = [{"date": date(2024, 3, day)} for day in (6, 7, 8)]
+    answers["HALTED"] = [{"date": date(2024, 3, day)} for day in (4, 5)]
+    for key in ("BK002", "NEW", "HALTED"):
+        store.get(key, date(2024, 3, 4), date(2024, 3, 8), fetcher(key))
+    assert store.stats()["instruments"] == 3
+    weekdays = lambda first, last: [  # noqa: E731
+        first + timedelta(days=offset)
+        for offset in range((last - first).days + 1)
+        if (first + timedelta(days=offset)).weekday() < 5
+    ]
+    # BK002 misses 2024-03-06 between its bars, so only it is dropped on the next roll.
+    assert store.drop_incomplete(weekdays) == 1 and store.stats()["instruments"] == 2
+    assert store.drop_incomplete(weekdays) == 0
+
+
+def test_daemon_and_intraday_modes_keep_the_universe_flags(monkeypatch):
+    from ai_stock.sector_rotation.scheduler import daily_task
+
+    configs = []
+    monkeypatch.setattr(daily_task, "run_daemon", lambda config=None, **kwargs: configs.append(config))
+    monkeypatch.setattr(daily_task, "run_intraday_window", lambda config=None, **kwargs: configs.append(config))
+
+    daily_task.main(["--daemon", "--full-universe"])
+    daily_task.main(["--intraday", "--keep-untradable"])
+    full, untradable = configs
+    assert full.board_count is None and full.categories == AnalysisConfig.full_universe().categories
+    assert untradable.universe_rules is None
+    with pytest.raises(SystemExit):
+        daily_task.main(["--daemon", "--as-of", "2024-03-08"])
+
+
+def test_intraday_window_sleeps_through_non_trading_days(monkeypatch):
+    from ai_stock.sector_rotation.scheduler import daily_task
+
+    class Saturday(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2024, 3, 9, 10, 0)
+
+    class Stop(Exception):
+        pass
+
+    slept = []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        raise Stop
+
+    def no_session(**kwargs):
+        raise AssertionError("no intraday session on a Saturday")
+
+    monkeypatch.setattr(daily_task, "datetime", Saturday)
+    monkeypatch.setattr(daily_task.time_module, "sleep", sleep)
+    monkeypatch.setattr(daily_task, "IntradaySession", no_session)
+    with pytest.raises(Stop):
+        daily_task.run_intraday_window(idle_ceiling=100_000)
+    # Sleeps until the next day's first session, where the calendar is checked again.
+    assert slept == [(datetime(2024, 3, 10, 9, 30) - datetime(2024, 3, 9, 10, 0)).total_seconds()]
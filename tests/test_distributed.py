@@ -0,0 +1,70 @@
+from dataclasses import replace
+from datetime import date
+
+from ai_stock.sector_rotation.benchmark import make_catalogue
+from ai_stock.sector_rotation.config import AnalysisConfig
+from ai_stock.sector_rotation.db.task_queue import DONE, FAILED, PENDING, TaskQueue
+from ai_stock.sector_rotation.distributed import collect_job, publish_job, run_coordinator, run_worker
+from ai_stock.sector_rotation.main import run_daily_analysis
+from ai_stock.sector_rotation.utils import akshare_helper
+
+
+def test_expired_lease_is_claimed_again_and_failures_retry(tmp_path):
+    queue = TaskQueue(tmp_path / "queue.sqlite", max_attempts=2)
+    job_id = queue.publish({"shared": True}, [["BK1"], ["BK2"]])
+
+    first = queue.claim("node-a", lease_seconds=60)
+    second = queue.claim("node-b", lease_seconds=-1)
+    assert (first.task_id, second.task_id) == (0, 1)
+    # node-b died: its lease has already expired.
+    reclaimed = queue.claim("node-c", lease_seconds=60)
+    assert reclaimed.task_id == 1 and reclaimed.attempts == 2
+    assert queue.claim("node-d") is None
+
+    queue.fail(first, "boom")
+    assert queue.progress(job_id)[PENDING] == 1
+    queue.complete(reclaimed, {"scores": 1})
+
+    assert queue.progress(job_id)[DONE] == 1
+    assert queue.results(job_id) == [{"scores": 1}]
+    assert queue.job_payload(job_id) == {"shared": True}
+
+
+def test_expired_leases_count_as_attempts_and_stale_workers_cannot_finish(tmp_path):
+    queue = TaskQueue(tmp_path / "queue.sqlite", max_attempts=2)
+    job_id = queue.publish(None, [["BK1"], ["BK2"]])
+
+    stale = queue.claim("node-a", lease_seconds=-1)
+    taken_over = queue.claim("node-b", lease_seconds=-1)
+    assert (stale.task_id, taken_over.task_id, taken_over.attempts) == (0, 0, 2)
+    # node-a's lease is gone: it can neither renew nor overwrite the task.
+    assert not queue.heartbeat(stale) and not queue.complete(stale, "late") and not queue.fail(stale, "late")
+
+    # Both attempts expired, so the next claim gives up on the task instead of handing it out.
+    fresh = queue.claim("node-c", lease_seconds=60)
+    assert fresh.task_id == 1
+    assert queue.progress(job_id)[FAILED] == 1
+    assert "expired on attempt 2" in queue.errors(job_id)[0]
+
+    assert queue.heartbeat(fresh, lease_seconds=120)
+    assert queue.complete(fresh, "scores") and not queue.complete(fresh, "again")
+    assert queue.results(job_id) == ["scores"]
+
+
+def test_workers_and_coordinator_match_single_process_run(tmp_path):
+    cfg = replace(AnalysisConfig.daily_defaults(date(2024, 3, 8)), board_count=12)
+    queue = TaskQueue(tmp_path / "queue.sqlite")
+    with akshare_helper.offline(make_catalogue(12, 80, members_per_board=8)):
+        single = run_daily_analysis(cfg)
+
+        job_id = publish_job(queue, cfg, shard_size=5)
+        assert run_worker(queue, worker_id="node-a", idle_timeout=0, max_tasks=2) == 2
+        assert run_worker(queue, worker_id="node-b", idle_timeout=0) == 1
+        assert len(collect_job(queue, job_id, timeout=1)) == 3
+
+        result = run_coordinator(queue, cfg, db_path=tmp_path / "results.sqlite", shard_size=4, timeout=30)
+
+    assert result["selected_boards"] == single["selected_boards"]
+    assert result["rotation_candidates"] == single["rotation_candidates"]
+    assert result["distributed"]["shards"] == 3
+    assert (tmp_path / "results.sqlite").exists()
@@ -0,0 +1,104 @@
+import subprocess
+import sys
+from dataclasses import replace
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from ai_stock.sector_rotation.benchmark import make_catalogue
+from ai_stock.sector_rotation.config import AnalysisConfig
+from ai_stock.sector_rotation.data.factor_panels import (
+    PanelPublisher,
+    attach_panels,
+    build_panels,
+)
+from ai_stock.sector_rotation.factors import capital_factor, hype_factor, trend_factor
+from ai_stock.sector_rotation.main import load_market_data
+from ai_stock.sector_rotation.utils import akshare_helper
+
+
+@pytest.fixture(scope="module")
+def market():
+    cfg = replace(AnalysisConfig.daily_defaults(date(2024, 3, 8)), board_count=12)
+    cfg = replace(cfg, start_date=date(2024, 2, 1))
+    with akshare_helper.offline(make_catalogue(12, 60, members_per_board=5)):
+        data = load_market_data(cfg)
+    # Gaps: a board missing sessions and one without money flow.
+    first, second = list(data.price_history)[:2]
+    data.price_history[first] = data.price_history[first][::2]
+    data.hot_metrics[first] = data.hot_metrics[first][3:]
+    del data.money_flow[second]
+    return data
+
+
+def _assert_same(expected, actual):
+    assert list(actual) == list(expected)
+    for board, components in expected.items():
+        assert actual[board].__dict__ == pytest.approx(components.__dict__, rel=1e-9, abs=1e-9)
+
+
+def test_panel_factors_match_per_bar_factors(market):
+    panels = build_panels(market.price_history, market.money_flow, market.hot_metrics)
+
+    _assert_same(
+        trend_factor.calculate_trend_factor(market.price_history),
+        trend_factor.calculate_trend_factor_from_panels(panels),
+    )
+    _assert_same(
+        hype_factor.calculate_hype_factor(market.hot_metrics),
+        hype_factor.calculate_hype_factor_from_panels(panels),
+    )
+    assert len(capital_factor.calculate_capital_factor_from_panels(panels)) == len(market.money_flow)
+    _assert_same(
+        capital_factor.calculate_capital_factor(market.money_flow),
+        capital_factor.calculate_capital_factor_from_panels(panels),
+    )
+
+    start, end = date(2024, 2, 26), date(2024, 3, 4)
+    sliced = {board: [bar for bar in bars if start <= bar.date <= end] for board, bars in market.price_history.items()}
+    window = panels.window(start, end)
+    assert np.shares_memory(window.fields["close"], panels.fields["close"])
+    _assert_same(
+        trend_factor.calculate_trend_factor(sliced),
+        trend_factor.calculate_trend_factor_from_panels(window),
+    )
+
+
+_ATTACH = """
+import datetime
+import sys
+from ai_stock.sector_rotation.data.factor_panels import PanelDescriptor, attach_panels
+from ai_stock.sector_rotation.factors import trend_factor
+descriptor = eval(sys.stdin.read())
+panels = attach_panels(descriptor)
+assert not panels.fields["close"].flags.writeable
+scores = trend_factor.calculate_trend_factor_from_panels(panels)
+print(repr({board: round(components.score, 9) for board, components in scores.items()}))
+"""
+
+
+@pytest.mark.parametrize("in_file", [False, True])
+def test_workers_attach_published_panels_without_copying(market, tmp_path, in_file):
+    panels = build_panels(market.price_history, market.money_flow, market.hot_metrics)
+    expected = {
+        board: round(components.score, 9)
+        for board, components in trend_factor.calculate_trend_factor(market.price_history).items()
+    }
+
+    with PanelPublisher(panels, path=tmp_path / "panels.npy" if in_file else None) as publisher:
+        attached = attach_panels(publisher.descriptor)
+        assert attached.boards == panels.boards and attached.dates == panels.dates
+        assert np.array_equal(attached.fields["mentions"], panels.fields["mentions"], equal_nan=True)
+        attached.close()
+
+        output = subprocess.run(
+            [sys.executable, "-c", _ATTACH],
+            input=repr(publisher.descriptor),
+            capture_output=True,
+            text=True,
+            check=True,
+            env={"PYTHONPATH": str(Path(__file__).resolve().parents[1] / "src")},
+        ).stdout
+    assert eval(output) == pytest.approx(expected)
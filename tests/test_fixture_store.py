@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+
+from ai_stock.sector_rotation.utils import akshare_helper
+from ai_stock.sector_rotation.utils.fixture_store import FixtureMissing, FixtureStore
+
+
+def test_store_round_trips_by_endpoint_and_arguments(tmp_path):
+    store = FixtureStore(tmp_path, mode="record")
+    store.save("stock_zh_a_hist", {"symbol": "600703", "adjust": ""}, [{"收盘": 10.5}])
+
+    replay = FixtureStore(tmp_path, mode="replay")
+    assert replay.load("stock_zh_a_hist", {"adjust": "", "symbol": "600703"}) == [{"收盘": 10.5}]
+    with pytest.raises(FixtureMissing):
+        replay.load("stock_zh_a_hist", {"symbol": "600584", "adjust": ""})
+    assert list(replay.entries()) == [("stock_zh_a_hist", {"symbol": "600703", "adjust": ""})]
+    assert replay.stats()["hits"] == 1 and replay.stats()["misses"] == 1
+
+
+def test_replay_serves_recorded_calls_without_akshare(tmp_path, monkeypatch):
+    calls = []
+
+    def stock_hot_rank_em(**kwargs):
+        calls.append(kwargs)
+        return ["live response"]
+
+    monkeypatch.setattr(akshare_helper, "ak", SimpleNamespace(stock_hot_rank_em=stock_hot_rank_em))
+    monkeypatch.setattr(akshare_helper, "AK_AVAILABLE", True)
+    with akshare_helper.fixtures(tmp_path, mode="record") as store:
+        assert akshare_helper._call("stock_hot_rank_em") == ["live response"]
+    assert store.recorded == 1
+
+    monkeypatch.setattr(akshare_helper, "ak", None)
+    monkeypatch.setattr(akshare_helper, "AK_AVAILABLE", False)
+    with akshare_helper.fixtures(tmp_path, mode="replay"):
+        assert akshare_helper._source_available()
+        assert akshare_helper._call("stock_hot_rank_em") == ["live response"]
+        with pytest.raises(FixtureMissing):
+            akshare_helper._call("stock_news_em", symbol="600703")
+        assert akshare_helper.telemetry_snapshot()["fixtures"]["hits"] == 1
+    assert calls == [{}]
+    assert not akshare_helper._source_available()
+
+
+def test_replay_runs_as_of_the_recorded_day(tmp_path):
+    from datetime import date
+
+    from ai_stock.sector_rotation.scheduler import daily_task
+
+    FixtureStore(tmp_path, mode="record")
+    assert FixtureStore(tmp_path, mode="replay").recorded_on == date.today()
+    (tmp_path / "manifest.json").write_text('{"recorded_on": "2024-03-08"}')
+
+    with akshare_helper.fixtures(tmp_path, mode="replay"):
+        assert akshare_helper.session_today() == date(2024, 3, 8)
+        # The recorded session is still "live": its responses expire like they did that day.
+        assert akshare_helper.LIVE_TTL({"end": date(2024, 3, 8)}) == akshare_helper.LIVE_TTL.live_seconds
+        assert akshare_helper.LIVE_TTL({"end": date(2024, 3, 7)}) is None
+        args = daily_task.argparse.Namespace(as_of=None, replay=tmp_path, full_universe=False, keep_untradable=False)
+        assert daily_task._config(args).end_date == date(2024, 3, 8)
+    assert akshare_helper.session_today() == date.today()
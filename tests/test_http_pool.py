@@ -0,0 +1,100 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from ai_stock.sector_rotation.utils.http_pool import HttpPool  # noqa: E402
+
+# Stands in for the TCP + TLS handshake to a remote host.
+SETUP_DELAY = 0.03
+CALLS = 10
+
+
+class SlowHandshakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def setup(self) -> None:
+        time.sleep(SETUP_DELAY)
+        super().setup()
+
+    def do_GET(self) -> None:
+        body = b'{"data": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url(monkeypatch):
+    for name in ("HTTP_PROXY", "http_proxy", "ALL_PROXY", "all_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandshakeHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/api"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _timed_calls(url: str) -> float:
+    started = time.perf_counter()
+    for _ in range(CALLS):
+        assert requests.get(url, timeout=5).json() == {"data": []}
+    return time.perf_counter() - started
+
+
+def test_installed_pool_reuses_connections_and_cuts_latency(server_url):
+    original = requests.get
+    fresh = _timed_calls(server_url)
+
+    pool = HttpPool()
+    with pool.install():
+        assert requests.get is not original
+        # Outside a route() block requests keep their own connections.
+        requests.get(server_url, timeout=5)
+        assert pool.stats()["requests"] == 0
+        with pool.route():
+            pooled = _timed_calls(server_url)
+        assert pool._sessions
+    assert requests.get is original
+    assert not pool._sessions
+    pool.close()
+
+    stats = pool.stats()
+    assert stats["requests"] == CALLS
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == CALLS - 1
+    assert fresh >= CALLS * SETUP_DELAY
+    assert pooled < fresh / 2
+
+
+def test_install_is_reentrant_across_threads(server_url):
+    original = requests.get
+    pool = HttpPool(pool_maxsize=4)
+
+    def worker() -> None:
+        with pool.install(), pool.route():
+            requests.get(server_url)
+
+    with pool.install():
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert pool.installed
+    assert requests.get is original
+    assert pool.stats()["requests"] == 4
+    assert pool.stats()["connections_opened"] <= 4
@@ -0,0 +1,73 @@
+from datetime import date
+from functools import partial
+
+import pytest
+
+from ai_stock.sector_rotation.intraday import IntradaySession
+from ai_stock.sector_rotation.utils import akshare_helper
+
+
+def test_tick_refreshes_live_data_without_reloading_history(monkeypatch):
+    session_day = date(2024, 3, 8)
+    session = IntradaySession(session_day=session_day)
+    board = session.closed.boards[0]
+    last_closed = session.closed.price_history[board.code][-1]
+    assert last_closed.date < session_day
+
+    def no_history(*args, **kwargs):
+        raise AssertionError("intraday ticks must not refetch history or unused snapshots")
+
+    monkeypatch.setattr(akshare_helper, "stock_history", no_history)
+    monkeypatch.setattr(akshare_helper, "board_price_history", no_history)
+    monkeypatch.setattr(akshare_helper, "board_money_flow", no_history)
+    monkeypatch.setattr(akshare_helper, "stock_hot_rank", no_history)
+    monkeypatch.setattr(
+        akshare_helper,
+        "board_spot_quotes",
+        lambda category: {
+            board.code: {
+                "price": last_closed.close * 1.05,
+                "change_pct": 5.0,
+                "change_amount": last_closed.close * 0.05,
+                "turnover_rate": last_closed.turnover_rate * 2,
+            }
+        },
+    )
+
+    result = session.tick()
+
+    intraday = result["intraday"]
+    assert intraday["tick"] == 1
+    assert board.code not in intraday["stale_boards"]
+    assert len(intraday["stale_boards"]) == len(session.closed.boards) - 1
+    assert result["config"]["end_date"] == session_day
+    assert result["report"].startswith(f"Sector rotation summary for {session_day.isoformat()}")
+
+
+def _edges(graph):
+    return {
+        (edge.leader, follower, edge.lag): edge.correlation for follower, edges in graph.edges.items() for edge in edges
+    }
+
+
+def test_session_advances_the_persisted_lead_lag_state(tmp_path, monkeypatch):
+    from ai_stock.sector_rotation import main
+    from ai_stock.sector_rotation.config import AnalysisConfig
+    from ai_stock.sector_rotation.models import lead_lag
+
+    monkeypatch.setattr(lead_lag, "follow_graph", partial(lead_lag.follow_graph, min_correlation=-1.0))
+    session_day = date(2024, 3, 8)
+    cold = IntradaySession(session_day=session_day).follow_graph
+    db_path = tmp_path / "results.sqlite"
+    main.run_daily_analysis(AnalysisConfig.daily_defaults(date(2024, 3, 6)), db_path=db_path)
+
+    def no_lookback(*args, **kwargs):
+        raise AssertionError("a session with a recent state must not refetch the lead-lag lookback")
+
+    monkeypatch.setattr(main, "lead_lag_panels", no_lookback)
+    session = IntradaySession(session_day=session_day, db_path=db_path)
+
+    assert not session.closed.lead_lag_prices
+    assert lead_lag.saved_as_of(lead_lag.state_path(db_path)) == date(2024, 3, 7)
+    assert cold.edges
+    assert _edges(session.follow_graph) == pytest.approx(_edges(cold))
@@ -0,0 +1,120 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from ai_stock.sector_rotation.config import RotationWeights
+from ai_stock.sector_rotation.data.factor_panels import FactorPanels
+from ai_stock.sector_rotation.factors.rotation_factor import RotationComponents
+from ai_stock.sector_rotation.models.lead_lag import (
+    LeadLagMatrix,
+    LeadLagState,
+    build_follow_graph,
+    follow_graph,
+    graphs_by_session,
+    session_signals,
+    state_path,
+)
+from ai_stock.sector_rotation.models.rps_predict import predict_rotation_candidates
+from ai_stock.sector_rotation.models.strong_board import BoardScore
+from ai_stock.sector_rotation.reports.visualization import rotation_pathway
+
+
+def _lagged_panels(sessions=80, lag=2, seed=3):
+    """Board B repeats A's returns ``lag`` sessions later (plus noise); C is independent."""
+
+    rng = np.random.default_rng(seed)
+    leader = rng.normal(0, 0.02, sessions)
+    follower = np.concatenate([rng.normal(0, 0.02, lag), leader[:-lag]]) + rng.normal(0, 0.005, sessions)
+    returns = np.vstack([leader, follower, rng.normal(0, 0.02, sessions)])
+    close = 100.0 * np.cumprod(1.0 + returns, axis=1)
+    close[2, 10:13] = np.nan  # a suspended board
+    flows = returns * 1e8
+    dates = [date(2024, 1, 1) + timedelta(days=day) for day in range(sessions)]
+    fields = {"close": close, "net_inflow": flows}
+    return FactorPanels(boards=["A", "B", "C"], dates=dates, fields=fields)
+
+
+def test_incremental_updates_match_a_batch_fold():
+    rng = np.random.default_rng(11)
+    values = rng.normal(size=(12, 40))
+    values[rng.random(values.shape) < 0.1] = np.nan
+    boards = [f"B{index}" for index in range(12)]
+    for window in (None, 15):
+        pushed = LeadLagMatrix(boards, max_lag=3, window=window)
+        for column in range(values.shape[1]):
+            pushed.push(values[:, column])
+        batch = LeadLagMatrix.from_series(boards, values, max_lag=3, window=window)
+        np.testing.assert_allclose(pushed.correlations(), batch.correlations(), rtol=1e-9, atol=1e-12)
+
+    full = LeadLagMatrix.from_series(boards, values[:, :25], max_lag=2, window=None).correlations(min_periods=1)
+    pair = ~np.isnan(values[3, :23]) & ~np.isnan(values[5, 2:25])
+    expected = np.corrcoef(values[3, :23][pair], values[5, 2:25][pair])[0, 1]
+    assert full[1, 3, 5] == pytest.approx(expected, rel=1e-9)
+
+
+def test_planted_follower_is_found_with_its_lag():
+    panels = _lagged_panels()
+    graph = build_follow_graph(panels)
+    [edge] = graph.leaders_of("B")
+    assert (edge.leader, edge.lag) == ("A", 2)
+    assert edge.correlation > 0.9 and edge.flow_correlation > 0.9
+    assert not graph.leaders_of("A") and not graph.leaders_of("C")
+    assert graph.follow_score("B", ["A"]) == edge.correlation and graph.follow_score("B", ["C"]) == 0.0
+
+    graphs = graphs_by_session(panels, [panels.dates[5], panels.dates[-1]], window=None)
+    batch = follow_graph(LeadLagMatrix.from_series(panels.boards, session_signals(panels)[0], window=None))
+    assert graphs[panels.dates[5]].edges == {}
+    assert graphs[panels.dates[-1]].leaders_of("B")[0].correlation == pytest.approx(batch.leaders_of("B")[0].correlation)
+
+
+def test_followers_of_strong_boards_rank_higher_and_show_their_leader():
+    graph = build_follow_graph(_lagged_panels())
+    flat = RotationComponents(0.5, 0.5, 0.5, 0.5, 0.5)
+    strengths = [BoardScore(board="A", name="A", score=80.0, breakdown={})]
+    rotation = {"A": flat, "B": flat, "C": flat}
+
+    plain = predict_rotation_candidates(strengths, rotation, RotationWeights())
+    linked = predict_rotation_candidates(strengths, rotation, RotationWeights(), follow_graph=graph)
+    assert [candidate.board for candidate in linked] == ["B", "C"]
+    assert linked[0].predicted > plain[0].predicted == linked[1].predicted
+    assert linked[0].breakdown["lead_lag"] == pytest.approx(0.2 * graph.follow_score("B", ["A"]))
+
+    pathway = rotation_pathway(linked, {"B": 0.6, "C": 0.4}, graph)
+    assert "follows A by 2d" in pathway
+    assert "follows" not in rotation_pathway(linked, {"B": 0.6, "C": 0.4})
+
+
+def test_saved_state_takes_one_session_per_run(tmp_path):
+    panels = _lagged_panels()
+    dates = panels.dates
+    path = state_path(tmp_path / "results.sqlite")
+    assert path.name == "results.sqlite.leadlag.npz"
+    assert LeadLagState.load(path).last is None
+
+    state = LeadLagState()
+    assert state.advance(panels.window(dates[0], dates[70])) == 71
+    state.save(path)
+    for end, expected in ((71, 1), (72, 1), (72, 0)):
+        state = LeadLagState.load(path)
+        assert state.advance(panels.window(dates[end - 6], dates[end])) == expected
+        state.save(path)
+    assert state.last == dates[72] and not list(tmp_path.glob(".*.tmp"))
+
+    batch = LeadLagMatrix.from_series(panels.boards, session_signals(panels)[0][:, :73])
+    np.testing.assert_allclose(state.returns.correlations(), batch.correlations(), rtol=1e-9, atol=1e-12)
+    edge = state.graph().leaders_of("B")[0]
+    assert (edge.leader, edge.lag) == ("A", 2)
+
+    # Boards join the state as they are listed and leave once none of their sessions is in the window.
+    long = _lagged_panels(sessions=140)
+    state = LeadLagState()
+    state.advance(long.select(["C"]).window(long.dates[0], long.dates[5]))
+    state.advance(long.window(long.dates[0], long.dates[70]))
+    assert state.boards == ["C", "A", "B"]
+    state.advance(long.select(["A", "B"]))
+    assert state.boards == ["A", "B"] and state.graph().leaders_of("B")[0].leader == "A"
+    (tmp_path / "broken.npz").write_bytes(b"not a state")
+    assert LeadLagState.load(tmp_path / "broken.npz").last is None
+    with pytest.raises(ValueError):
+        LeadLagState(window=5)
@@ -0,0 +1,106 @@
+from dataclasses import replace
+from datetime import date
+
+import pytest
+
+from ai_stock.sector_rotation.benchmark import make_catalogue
+from ai_stock.sector_rotation.config import AnalysisConfig
+from ai_stock.sector_rotation.data import stock_data
+from ai_stock.sector_rotation.data.bar_index import BarIndex
+from ai_stock.sector_rotation.data.membership import MembershipMatrix
+from ai_stock.sector_rotation.factors import leader_factor
+from ai_stock.sector_rotation.main import load_market_data
+from ai_stock.sector_rotation.utils import akshare_helper
+
+
+def test_products_match_hand_sums_and_follow_updates():
+    matrix = MembershipMatrix.from_members(
+        {"B1": ["a", "b"], "B2": ["b", "c", "d"], "B3": []},
+        weights={"B1": [1.0, 2.0], "B2": [1.0, 1.0, 0.5], "B3": []},
+    )
+    assert matrix.shape == (3, 4) and matrix.nnz == 5
+    values = matrix.vector({"a": 10.0, "b": 20.0, "c": 30.0}, default=-1.0)
+    assert values.tolist() == [10.0, 20.0, 30.0, -1.0]
+
+    assert matrix.aggregate(values) == {"B1": 50.0, "B2": 49.5, "B3": 0.0}
+    assert matrix.matvec(values, weighted=False).tolist() == [30.0, 49.0, 0.0]
+    assert matrix.counts(weighted=False).tolist() == [2.0, 3.0, 0.0]
+    indptr, indices, data = matrix.csr()
+    assert indptr.tolist() == [0, 2, 5, 5] and indices.tolist() == [0, 1, 1, 2, 3]
+
+    # Updates touch one row; existing columns keep their positions.
+    matrix.set_members("B1", ["e", "a"])
+    matrix.remove("B2")
+    assert matrix.symbols == ["a", "b", "c", "d", "e"]
+    assert matrix.members("B1") == ["e", "a"] and "B2" not in matrix
+    assert matrix.aggregate(matrix.vector({"a": 1.0, "e": 3.0}), how="mean") == {"B1": 2.0, "B3": 0.0}
+    with pytest.raises(ValueError):
+        matrix.matvec(values)
+
+
+@pytest.fixture(scope="module")
+def market():
+    cfg = replace(AnalysisConfig.daily_defaults(date(2024, 3, 8)), board_count=10)
+    # Fewer members per board than boards, so constituents repeat across boards.
+    catalogue = make_catalogue(10, 15, members_per_board=6)
+    with akshare_helper.offline(catalogue):
+        yield cfg, catalogue, load_market_data(cfg)
+
+
+def test_batched_component_quotes_match_per_board_quotes(market, monkeypatch):
+    cfg, catalogue, data = market
+    indexed = []
+
+    class CountingIndex(BarIndex):
+        def __init__(self, history):
+            indexed.append(len(history))
+            super().__init__(history)
+
+    monkeypatch.setattr(stock_data, "BarIndex", CountingIndex)
+    with akshare_helper.offline(catalogue):
+        expected = {
+            board.code: stock_data.fetch_board_component_quotes(
+                board, limit=80, history=data.stock_history, target_date=cfg.end_date,
+                members=data.board_members.get(board.code),
+            )
+            for board in data.boards
+        }
+    assert list(data.component_quotes) == list(expected)
+    for board, quotes in expected.items():
+        # Python's sum() is compensated, the sparse product is not: equal up to rounding.
+        assert [quote.__dict__ for quote in data.component_quotes[board]] == [
+            pytest.approx(quote.__dict__, rel=1e-12) for quote in quotes
+        ]
+    assert sum(len(quotes) for quotes in expected.values()) > len(data.stock_history)
+    # A single board only indexes the bars of its own quoted constituents.
+    assert indexed == [len(quotes) for quotes in expected.values()]
+
+
+def test_leader_aggregation_matches_per_board_loop(market):
+    _, _, data = market
+    candidates, components = leader_factor.calculate_leader_factor(data.component_quotes, data.stock_history)
+    assert list(components) == list(candidates)
+    for board, board_candidates in candidates.items():
+        expected = _aggregate_board(board, board_candidates)
+        assert components[board].__dict__ == pytest.approx(expected.__dict__, rel=1e-12)
+
+
+def test_a_leader_of_two_boards_keeps_each_boards_values():
+    def candidate(pct_change):
+        return leader_factor.LeaderCandidate("600001", "甲", pct_change / 100.0, pct_change, 0.5, pct_change >= 9.8)
+
+    candidates = {"B1": [candidate(10.0)], "B2": [candidate(2.0)]}
+    components = leader_factor.aggregate_leaders(candidates)
+    for board, board_candidates in candidates.items():
+        assert components[board].__dict__ == pytest.approx(_aggregate_board(board, board_candidates).__dict__)
+    assert components["B1"].limit_up_count == 1 and components["B2"].limit_up_count == 0
+
+
+def _aggregate_board(board, candidates):
+    return leader_factor.LeaderComponents(
+        board=board,
+        limit_up_count=sum(1 for candidate in candidates if candidate.is_limit_up),
+        leader_turnover_share=sum(candidate.turnover_share for candidate in candidates),
+        avg_leader_return=sum(candidate.return_pct for candidate in candidates) / len(candidates),
+        leader_symbols=[candidate.symbol for candidate in candidates],
+    )
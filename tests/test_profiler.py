@@ -0,0 +1,76 @@
+from datetime import date
+
+from ai_stock.sector_rotation.config import AnalysisConfig
+from ai_stock.sector_rotation.main import run_daily_analysis
+from ai_stock.sector_rotation.scheduler.daily_task import export_metrics
+from ai_stock.sector_rotation.utils.profiler import StageProfiler, export_prometheus
+
+
+def test_stage_records_wall_cpu_items_and_memory():
+    profiler = StageProfiler(trace_memory=True)
+    with profiler.stage("outer") as outer:
+        with profiler.stage("inner", items=3):
+            payload = [bytearray(1024) for _ in range(256)]
+        outer.items = len(payload)
+    with profiler.stage("inner", items=2):
+        pass
+    profiler.close()
+
+    stages = {metrics.name: metrics for metrics in profiler.stages}
+    assert stages["inner"].calls == 2
+    assert stages["inner"].items == 5
+    assert stages["outer"].items == 256
+    assert stages["outer"].wall_seconds >= stages["inner"].wall_seconds > 0
+    assert stages["outer"].peak_memory_bytes >= stages["inner"].peak_memory_bytes >= 256 * 1024
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = StageProfiler.disabled()
+    with profiler.stage("work") as stage:
+        stage.items = 1
+    assert profiler.stages == []
+
+
+def test_daily_run_reports_every_stage(tmp_path):
+    result = run_daily_analysis(AnalysisConfig.daily_defaults(date(2024, 3, 8)), db_path=tmp_path / "db.sqlite")
+
+    names = {stage["name"] for stage in result["metrics"]["stages"]}
+    assert {
+        "fetch.boards",
+        "fetch.board_prices",
+        "fetch.money_flow",
+        "fetch.hot_metrics",
+        "fetch.members",
+        "fetch.stock_history",
+        "fetch.component_quotes",
+        "factor.trend",
+        "factor.hype",
+        "factor.capital",
+        "factor.leader",
+        "factor.rotation",
+        "rank",
+        "predict",
+        "select",
+        "report",
+        "persist",
+    } <= names
+
+    export_metrics(result["metrics"], tmp_path / "metrics")
+    assert (tmp_path / "metrics" / "sector_rotation_metrics.json").exists()
+    assert "sector_rotation_stage_wall_seconds" in (tmp_path / "metrics" / "sector_rotation.prom").read_text()
+
+
+def test_prometheus_textfile_format(tmp_path):
+    metrics = {
+        "started_at": 1700000000.0,
+        "stages": [{"name": 'fetch "x"', "wall_seconds": 0.5, "cpu_seconds": 0.25, "items": 4, "calls": 1}],
+    }
+    path = tmp_path / "run.prom"
+    export_prometheus(metrics, path, labels={"host": "a"})
+
+    lines = path.read_text().splitlines()
+    assert "# TYPE sector_rotation_stage_wall_seconds gauge" in lines
+    assert 'sector_rotation_stage_wall_seconds{host="a",stage="fetch \\"x\\""} 0.5' in lines
+    assert 'sector_rotation_stage_items{host="a",stage="fetch \\"x\\""} 4' in lines
+    assert not any(line.startswith("sector_rotation_stage_peak_memory_bytes") for line in lines)
+    assert lines[-1] == 'sector_rotation_last_run_timestamp_seconds{host="a"} 1700000000.000'
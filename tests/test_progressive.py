@@ -0,0 +1,67 @@
+import threading
+from datetime import date
+
+from ai_stock.sector_rotation import progressive
+from ai_stock.sector_rotation.config import AnalysisConfig
+from ai_stock.sector_rotation.data.board_data import Board
+
+
+def test_prioritise_boards_prefers_prior_score_then_turnover():
+    boards = [Board("BK001", "A"), Board("BK002", "B"), Board("BK003", "C")]
+    ordered = progressive.prioritise_boards(
+        boards,
+        prior_scores={"C": 10.0},
+        spot={"BK001": {"turnover_rate": 1.0}, "BK002": {"turnover_rate": 3.0}},
+    )
+    assert [board.code for board in ordered] == ["BK003", "BK002", "BK001"]
+
+
+def test_budget_returns_partial_ranking_with_coverage(monkeypatch):
+    release = threading.Event()
+    original = progressive.load_market_data
+
+    def slow_for_one_board(cfg, boards=None, **kwargs):
+        if boards and boards[0].code == "BK005":
+            release.wait(5)
+        return original(cfg, boards, **kwargs)
+
+    monkeypatch.setattr(progressive, "load_market_data", slow_for_one_board)
+    updates = []
+    cfg = AnalysisConfig.daily_defaults(date(2024, 3, 8))
+    try:
+        result = progressive.run_progressive_analysis(
+            cfg, time_budget=0.5, prior_scores={"BK005": 99.0}, on_progress=updates.append, workers=2
+        )
+    finally:
+        release.set()
+
+    coverage = result["coverage"]
+    assert coverage["order"][0] == "BK005"
+    assert coverage["boards_skipped"] == ["BK005"]
+    assert coverage["complete"] is False
+    assert coverage["boards_processed"] == coverage["boards_total"] - 1
+    assert "Partial coverage" in result["report"]
+    assert updates and updates[-1].processed == coverage["boards_processed"]
+    assert all(score.board != "BK005" for score in updates[-1].rankings)
+
+
+def test_unbounded_run_covers_every_board(monkeypatch):
+    cfg = AnalysisConfig.daily_defaults(date(2024, 3, 8))
+    parts = []
+    original = progressive.load_market_data
+
+    def recording_load(cfg, boards=None, **kwargs):
+        part = original(cfg, boards, **kwargs)
+        parts.append(part)
+        return part
+
+    monkeypatch.setattr(progressive, "load_market_data", recording_load)
+    updates = []
+    result = progressive.run_progressive_analysis(cfg, on_progress=updates.append)
+    assert result["coverage"]["complete"] is True
+    # Boards are scored as they arrive; the running ranking matches re-scoring everything at once.
+    full = progressive._rank_part(cfg, progressive.merge_market_data(parts))
+    assert [(score.board, score.score) for score in updates[-1].rankings] == sorted(
+        ((score.board, score.score) for score in full), key=lambda item: -item[1]
+    )
+    assert "Partial coverage" not in result["report"]
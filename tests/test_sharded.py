@@ -0,0 +1,69 @@
+from dataclasses import asdict, replace
+from datetime import date
+
+import pytest
+
+from ai_stock.sector_rotation.benchmark import make_catalogue
+from ai_stock.sector_rotation.config import AnalysisConfig
+from ai_stock.sector_rotation.data.board_data import Board
+from ai_stock.sector_rotation.data.factor_panels import build_close_panel, build_panels
+from ai_stock.sector_rotation.main import compute_factors, load_market_data, run_daily_analysis
+from ai_stock.sector_rotation.sharded import run_sharded_analysis, score_panels, shard_boards
+from ai_stock.sector_rotation.utils import akshare_helper
+
+
+def test_shard_boards_round_robin_without_empty_shards():
+    boards = [Board(code=f"BK{index}", name=str(index)) for index in range(5)]
+
+    shards = shard_boards(boards, 8)
+
+    assert len(shards) == 5
+    assert [board.code for board in shard_boards(boards, 2)[1]] == ["BK1", "BK3"]
+
+
+def test_published_panels_score_like_the_bar_lists():
+    cfg = replace(AnalysisConfig.daily_defaults(date(2024, 3, 8)), board_count=8)
+    with akshare_helper.offline(make_catalogue(8, 40, members_per_board=6)):
+        data = load_market_data(cfg)
+    codes = [board.code for board in data.boards]
+    # Shard rows are contiguous, so selecting them yields views of the block.
+    panels = build_panels(data.price_history, data.money_flow, data.hot_metrics).select(codes)
+    shard = panels.select(codes[2:5])
+    assert all(values.base is not None for values in shard.fields.values())
+
+    scored = score_panels(cfg, panels, build_close_panel(data.stock_history), data.component_quotes, codes[2:5])
+    expected = compute_factors(cfg, data)
+    assert set(scored.trend) == set(codes[2:5])
+    for code in codes[2:5]:
+        for factor in ("trend", "hype", "capital"):
+            assert asdict(getattr(scored, factor)[code]) == pytest.approx(asdict(getattr(expected, factor)[code]))
+        assert scored.leader_components[code] == expected.leader_components[code]
+
+
+def test_sharded_run_matches_single_process_run(tmp_path):
+    cfg = replace(AnalysisConfig.daily_defaults(date(2024, 3, 8)), board_count=24)
+    with akshare_helper.offline(make_catalogue(24, 120, members_per_board=10)):
+        single = run_daily_analysis(cfg)
+        akshare_helper.clear_caches()
+        sharded = run_sharded_analysis(cfg, processes=2, db_path=tmp_path / "sharded.sqlite")
+
+    # Shards read NumPy panels, so scores agree with the bar-list path up to rounding.
+    for key in ("selected_boards", "rotation_candidates", "leaders"):
+        _assert_close(sharded[key], single[key])
+    assert sum(shard["boards"] for shard in sharded["sharding"]["shards"]) == 24
+    assert (tmp_path / "sharded.sqlite").exists()
+
+
+def _assert_close(value, expected):
+    if isinstance(expected, dict):
+        assert value.keys() == expected.keys()
+        for key in expected:
+            _assert_close(value[key], expected[key])
+    elif isinstance(expected, list):
+        assert len(value) == len(expected)
+        for item, reference in zip(value, expected):
+            _assert_close(item, reference)
+    elif isinstance(expected, float):
+        assert value == pytest.approx(expected)
+    else:
+        assert value == expected
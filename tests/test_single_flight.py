@@ -0,0 +1,182 @@
+import asyncio
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from ai_stock.sector_rotation.utils.single_flight import SessionTTL, estimate_size, single_flight
+
+
+def test_concurrent_misses_share_one_call():
+    calls = []
+    release = threading.Event()
+
+    @single_flight(maxsize=8)
+    def fetch(symbol):
+        calls.append(symbol)
+        release.wait(2)
+        return [symbol]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fetch("600000"))) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["600000"]
+    assert results == [["600000"]] * 6
+    info = fetch.cache_info()
+    assert (info.misses, info.currsize) == (1, 1)
+    assert fetch.shared + info.hits == 5
+    assert fetch.__wrapped__("x") == ["x"]
+
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    attempts = []
+    release = threading.Event()
+
+    @single_flight()
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            release.wait(2)
+            raise ConnectionError("down")
+        return "ok"
+
+    errors = []
+
+    def call():
+        try:
+            flaky()
+        except ConnectionError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 3 and len(attempts) == 1
+    assert flaky() == "ok"
+    flaky.cache_clear()
+    assert flaky.cache_info().currsize == 0
+
+
+def test_coroutines_share_one_task_per_key():
+    calls = []
+
+    @single_flight()
+    async def fetch(code):
+        calls.append(code)
+        await asyncio.sleep(0.01)
+        return code.lower()
+
+    @single_flight()
+    def blocking(code):
+        calls.append(code)
+        return code * 2
+
+    async def main():
+        first = await asyncio.gather(*(fetch("BK01") for _ in range(5)))
+        second = await asyncio.gather(blocking.acall("BK02"), blocking.acall("BK02"))
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert first == ["bk01"] * 5
+    assert second == ["BK02BK02"] * 2
+    assert calls == ["BK01", "BK02"]
+    assert fetch.cache_info().misses == 1
+
+
+def test_unhashable_arguments_raise_like_lru_cache():
+    @single_flight()
+    def total(values):
+        return sum(values)
+
+    with pytest.raises(TypeError):
+        total([1, 2])
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_byte_budget_evicts_least_recently_used():
+    @single_flight(maxsize=None, max_bytes=3 * estimate_size([0.0] * 100))
+    def bars(symbol):
+        return [0.0] * 100
+
+    for symbol in ("a", "b", "c"):
+        bars(symbol)
+    bars("a")
+    bars("d")
+
+    stats = bars.stats()
+    assert stats["size"] == 3 and stats["evicted"] == 1
+    assert stats["bytes"] <= stats["max_bytes"]
+    bars("a")
+    assert bars.stats()["hits"] == 2  # "b" was evicted, "a" survived
+    bars("b")
+    assert bars.stats()["misses"] == 5
+
+
+def test_session_ttl_keeps_closed_windows_and_expires_today():
+    clock = FakeClock()
+    policy = SessionTTL(live_seconds=600, today=lambda: date(2024, 3, 8))
+    calls = []
+
+    @single_flight(maxsize=None, ttl=policy, clock=clock)
+    def history(symbol, start, end):
+        calls.append(end)
+        return [end]
+
+    history("600000", date(2024, 3, 1), date(2024, 3, 7))
+    history("600000", date(2024, 3, 1), date(2024, 3, 8))
+    clock.now = 601
+    history("600000", date(2024, 3, 1), date(2024, 3, 7))
+    history("600000", date(2024, 3, 1), date(2024, 3, 8))
+
+    assert calls == [date(2024, 3, 7), date(2024, 3, 8), date(2024, 3, 8)]
+    assert history.stats()["expired"] == 1
+    assert history.discard_expiring() == 1
+    assert history.cache_info().currsize == 1
+
+
+def test_fallback_results_expire_quickly_even_for_closed_windows():
+    clock = FakeClock()
+    policy = SessionTTL(live_seconds=600, today=lambda: date(2024, 3, 8))
+    calls = []
+
+    class Synthetic(list):
+        pass
+
+    def is_synthetic(value):
+        return isinstance(value, Synthetic)
+
+    @single_flight(maxsize=None, ttl=policy, clock=clock, fallback=is_synthetic, fallback_ttl=30)
+    def history(symbol, start, end):
+        calls.append(symbol)
+        return Synthetic([end]) if symbol == "down" else [end]
+
+    for symbol in ("up", "down"):
+        history(symbol, date(2024, 3, 1), date(2024, 3, 7))
+    clock.now = 31
+    for symbol in ("up", "down"):
+        history(symbol, date(2024, 3, 1), date(2024, 3, 7))
+    assert calls == ["up", "down", "down"]
+
+    # A session roll keeps the closed live window and drops the substitute.
+    assert history.discard_expiring() == 1
+    assert history.cache_info().currsize == 1
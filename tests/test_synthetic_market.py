@@ -0,0 +1,69 @@
+import subprocess
+import sys
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from ai_stock.sector_rotation.utils import akshare_helper, synthetic_market
+
+
+def test_windows_are_slices_of_one_path_on_weekdays():
+    wide = synthetic_market.board_panel(["BK001", "BK002"], date(2023, 6, 1), date(2024, 3, 8))
+    narrow = synthetic_market.board_panel(["BK001"], date(2024, 2, 26), date(2024, 3, 8))
+
+    assert all(day.weekday() < 5 for day in wide.dates)
+    assert narrow.dates == [day for day in wide.dates if day >= date(2024, 2, 26)]
+    assert wide.records("BK001")[-len(narrow.dates):] == narrow.records("BK001")
+
+
+def test_seeds_do_not_depend_on_hash_randomisation():
+    code = (
+        "from datetime import date\n"
+        "from ai_stock.sector_rotation.utils import akshare_helper\n"
+        "print(akshare_helper.seed_for('price-BK001'), "
+        "akshare_helper._synthetic_stock_history('600703', date(2024, 3, 1), date(2024, 3, 8))[-1]['close'])\n"
+    )
+    outputs = {
+        subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={"PYTHONHASHSEED": seed, "PYTHONPATH": str(Path(__file__).resolve().parents[1] / "src")},
+        ).stdout
+        for seed in ("1", "2")
+    }
+    assert len(outputs) == 1
+
+
+def test_stocks_follow_their_sector():
+    symbols = [f"{600000 + idx:06d}" for idx in range(40)]
+    sectors = {symbol: ("BK001" if idx < 20 else "BK002") for idx, symbol in enumerate(symbols)}
+    stocks = synthetic_market.stock_panel(symbols, date(2020, 1, 1), date(2024, 3, 8), sectors)
+    boards = synthetic_market.board_panel(["BK001", "BK002"], date(2020, 1, 1), date(2024, 3, 8))
+
+    stock_returns = np.diff(np.log(stocks.fields["close"]), axis=1)
+    board_returns = np.diff(np.log(boards.fields["close"]), axis=1)
+    own = np.mean([np.corrcoef(stock_returns[idx], board_returns[0])[0, 1] for idx in range(20)])
+    other = np.mean([np.corrcoef(stock_returns[idx], board_returns[1])[0, 1] for idx in range(20)])
+
+    assert own > other + 0.2
+    assert np.all(stocks.fields["turnover_rate"] > 0)
+
+
+def test_large_panels_are_vectorised():
+    symbols = [f"{600000 + idx:06d}" for idx in range(2000)]
+    panel = synthetic_market.stock_panel(symbols, date(2021, 1, 1), date(2024, 3, 8))
+
+    assert panel.fields["close"].shape == (2000, len(panel.dates))
+    assert len(panel.dates) > 800
+
+
+def test_helper_serves_catalogue_panels():
+    with akshare_helper.offline():
+        history = akshare_helper.board_price_history("BK001", date(2024, 3, 4), date(2024, 3, 8))
+        direct = synthetic_market.board_panel(["BK001"], date(2024, 3, 4), date(2024, 3, 8)).records("BK001")
+
+    assert [item["date"] for item in history] == [date(2024, 3, day) for day in range(4, 9)]
+    assert history[-1]["close"] == direct[-1]["close"]
@@ -0,0 +1,84 @@
+from datetime import date
+
+import pytest
+
+from ai_stock.sector_rotation.config import AnalysisConfig
+from ai_stock.sector_rotation.main import run_daily_analysis
+from ai_stock.sector_rotation.utils import akshare_helper
+from ai_stock.sector_rotation.utils.telemetry import Telemetry
+
+
+def test_snapshot_reports_quantiles_errors_and_rows():
+    telemetry = Telemetry()
+    for _ in range(90):
+        telemetry.record_call("fast", 0.004, rows=10)
+    for _ in range(10):
+        telemetry.record_call("fast", 0.8, error=True)
+    telemetry.record_fallback("fast")
+
+    stats = telemetry.snapshot()["endpoints"]["fast"]
+
+    assert stats["calls"] == 100
+    assert stats["errors"] == 10
+    assert stats["fallbacks"] == 1
+    assert stats["rows"] == 900
+    assert stats["error_rate"] == pytest.approx(0.1)
+    assert 1.0 <= stats["p50_ms"] <= 5.0
+    assert 500.0 <= stats["p95_ms"] <= 800.0
+    assert stats["p99_ms"] <= stats["max_ms"] == pytest.approx(800.0)
+
+
+def test_snapshot_since_checkpoint_only_counts_new_calls():
+    telemetry = Telemetry()
+    telemetry.record_call("a", 0.01)
+    checkpoint = telemetry.checkpoint()
+    telemetry.record_call("a", 0.02, rows=5)
+    telemetry.record_call("b", 0.02)
+
+    snapshot = telemetry.snapshot(since=checkpoint)
+
+    assert snapshot["endpoints"]["a"]["calls"] == 1
+    assert snapshot["endpoints"]["a"]["rows"] == 5
+    assert snapshot["totals"]["calls"] == 2
+
+
+def test_interval_max_is_not_the_cumulative_max():
+    telemetry = Telemetry()
+    telemetry.record_call("a", 3.0)
+    checkpoint = telemetry.checkpoint()
+    telemetry.record_call("a", 0.02)
+    # The 3s call predates the checkpoint; the interval max is bounded by its 25ms bucket.
+    assert telemetry.snapshot(since=checkpoint)["endpoints"]["a"]["max_ms"] == pytest.approx(25.0)
+
+    checkpoint = telemetry.checkpoint()
+    telemetry.record_call("a", 4.0)
+    assert telemetry.snapshot(since=checkpoint)["endpoints"]["a"]["max_ms"] == pytest.approx(4000.0)
+
+
+def test_run_output_flags_synthetic_fallbacks(monkeypatch, caplog):
+    monkeypatch.setattr(akshare_helper, "AK_AVAILABLE", False)
+    akshare_helper.clear_caches()
+
+    result = run_daily_analysis(AnalysisConfig.daily_defaults(date(2024, 3, 8)))
+
+    telemetry = result["telemetry"]
+    assert telemetry["endpoints"]["stock_board_industry_hist_em"]["fallbacks"] > 0
+    assert telemetry["totals"]["fallbacks"] > 0
+    assert "_board_price_cache" in telemetry["caches"]
+    assert "Synthetic data used" in caplog.text
+
+
+def test_empty_news_is_not_a_fallback(monkeypatch):
+    class NoRows:
+        def head(self, limit):
+            return self
+
+        def iterrows(self):
+            return iter(())
+
+    monkeypatch.setattr(akshare_helper, "AK_AVAILABLE", True)
+    monkeypatch.setattr(akshare_helper, "_call", lambda endpoint, **kwargs: NoRows())
+    checkpoint = akshare_helper.telemetry_checkpoint()
+
+    assert akshare_helper.stock_news("600000") == []
+    assert "stock_news_em" not in akshare_helper.telemetry_snapshot(since=checkpoint)["endpoints"]
@@ -0,0 +1,54 @@
+from dataclasses import replace
+from datetime import date
+
+from ai_stock.sector_rotation import benchmark
+from ai_stock.sector_rotation.config import UNIVERSE_CATEGORIES, AnalysisConfig
+from ai_stock.sector_rotation.data import board_data
+from ai_stock.sector_rotation.main import run_daily_analysis
+from ai_stock.sector_rotation.utils import akshare_helper
+
+
+def test_full_universe_lists_industry_and_concept_boards_once():
+    catalogue = benchmark.make_catalogue(3, 40, members_per_board=5, concept_count=4)
+    # Eastmoney lists a few codes under both categories.
+    catalogue["concept"]["BK0000"] = catalogue["industry"]["BK0000"]
+    cfg = AnalysisConfig.full_universe(date(2024, 3, 8))
+    assert cfg.board_count is None and cfg.categories == UNIVERSE_CATEGORIES
+
+    with akshare_helper.offline(catalogue):
+        boards = board_data.list_boards(limit=cfg.board_count, categories=cfg.categories)
+
+    assert [board.code for board in boards] == ["BK0003", "BK0004", "BK0005", "BK0006", "BK0000", "BK0001", "BK0002"]
+    assert boards[-1].category == "industry"
+
+
+def test_threaded_fetches_match_sequential_run():
+    catalogue = benchmark.make_catalogue(6, 60, members_per_board=8, concept_count=10)
+    sequential = replace(AnalysisConfig.full_universe(date(2024, 3, 8)), fetch_workers=1)
+    with akshare_helper.offline(catalogue):
+        expected = run_daily_analysis(sequential)
+        akshare_helper.clear_caches()
+        threaded = run_daily_analysis(replace(sequential, fetch_workers=8))
+
+    assert threaded["selected_boards"] == expected["selected_boards"]
+    assert threaded["leaders"] == expected["leaders"]
+    assert threaded["factor_table"] == expected["factor_table"]
+
+
+def test_universe_benchmark_counts_deduplicated_requests():
+    result = benchmark.run_universe_benchmark(
+        industry=4, concept=8, stocks=30, members_per_board=10, latency=0.01, fetch_workers=8
+    )
+    symbols = {
+        symbol
+        for boards in benchmark.make_catalogue(4, 30, 10, concept_count=8).values()
+        for board in boards.values()
+        for symbol in board.members
+    }
+
+    assert result.boards == 12
+    # Price, money flow and constituents per board, then each symbol once; a cold run widens the
+    # board fetches to cover the lead-lag lookback instead of requesting it separately.
+    assert result.requests == 3 * 12 + len(symbols)
+    assert result.seconds < result.requests * 0.01
+    assert benchmark.format_universe(result).endswith("(target 10)")
@@ -0,0 +1,114 @@
+from dataclasses import replace
+from datetime import date, datetime
+
+from ai_stock.sector_rotation import benchmark
+from ai_stock.sector_rotation.config import AnalysisConfig, UniverseRules
+from ai_stock.sector_rotation.data import stock_data
+from ai_stock.sector_rotation.data import universe_filter
+from ai_stock.sector_rotation.data.universe_filter import ListingStatus, filter_symbols
+from ai_stock.sector_rotation.db.task_queue import TaskQueue
+from ai_stock.sector_rotation.distributed import run_coordinator
+from ai_stock.sector_rotation.main import analyse_market_data, load_market_data, run_daily_analysis
+from ai_stock.sector_rotation.utils import akshare_helper
+
+
+def _status(symbol, name, price=10.0, volume=1e5):
+    return ListingStatus(symbol=symbol, name=name, price=price, volume=volume)
+
+
+def test_rules_drop_st_suspended_and_new_listings():
+    listing = {
+        status.symbol: status
+        for status in (
+            _status("600001", "*ST 海润"),
+            _status("600002", "退市 锦港"),
+            _status("600003", "停牌股份", volume=0.0),
+            _status("600004", "无价股份", price=0.0),
+            _status("600005", "N 新股"),
+            _status("600006", "C 注册"),
+            _status("600007", "正常股份"),
+        )
+    }
+    symbols = [f"60000{index}" for index in range(1, 9)]  # 600008 is missing from the snapshot
+
+    kept, report = filter_symbols(symbols + ["600007"], listing, UniverseRules())
+    assert kept == ["600007", "600008"]
+    assert report.as_dict() == {
+        "checked": 8,
+        "kept": 2,
+        "excluded": {
+            "st": ["600001", "600002"],
+            "suspended": ["600003", "600004"],
+            "new_listing": ["600005", "600006"],
+        },
+        "requests_saved": 6,
+    }
+
+    kept, report = filter_symbols(symbols, listing, UniverseRules(exclude_st=False, exclude_new_listings=False))
+    assert kept == ["600001", "600002", "600005", "600006", "600007", "600008"]
+    assert report.requests_saved == 2
+
+
+def test_live_loads_skip_histories_of_excluded_constituents(monkeypatch):
+    catalogue = benchmark.make_catalogue(4, 12, members_per_board=6)
+    today = date.today()
+    listing = {"600001": {"name": "ST 甲", "price": 5.0, "volume": 1e4}, "600002": {"name": "乙", "volume": 0.0}}
+    monkeypatch.setattr(akshare_helper, "stock_spot_listing", lambda: listing)
+    monkeypatch.setattr(universe_filter, "session_opened", lambda now=None: True)
+    requested = []
+    fetch = stock_data.fetch_stock_data
+    monkeypatch.setattr(
+        stock_data, "fetch_stock_data", lambda symbols, *args: requested.extend(symbols) or fetch(symbols, *args)
+    )
+
+    cfg = AnalysisConfig.daily_defaults(today)
+    with akshare_helper.offline(catalogue):
+        data = load_market_data(cfg)
+        fetched = list(requested)
+        result = analyse_market_data(cfg, data).result
+        closed = load_market_data(replace(cfg, end_date=date(2024, 3, 8), start_date=date(2024, 3, 1)))
+
+    listed = {symbol for board in catalogue["industry"].values() for symbol in board.members[:6]}
+    assert {"600001", "600002"} <= listed
+    assert sorted(fetched) == sorted(listed - {"600001", "600002"})
+    assert all("600001" not in symbols and "600002" not in symbols for symbols in data.board_members.values())
+    assert result["universe"]["requests_saved"] == 2
+    assert result["universe"]["excluded"] == {"st": ["600001"], "suspended": ["600002"]}
+    # Closed windows keep every constituent: today's snapshot says nothing about them.
+    assert closed.universe is None and "600001" in closed.stock_history
+
+
+def test_suspensions_are_not_judged_before_the_open(monkeypatch):
+    monday = datetime(2024, 3, 11, 9, 0)
+    assert not universe_filter.session_opened(monday)
+    assert universe_filter.session_opened(monday.replace(hour=9, minute=30))
+    assert universe_filter.session_opened(datetime(2024, 3, 9, 8, 0))  # a Saturday shows Friday's session
+
+    rules = universe_filter.rules_at(UniverseRules(), monday)
+    assert rules == UniverseRules(exclude_suspended=False)
+    listing = {"600001": _status("600001", "乙", price=0.0, volume=0.0), "600002": _status("600002", "ST 甲", volume=0)}
+    assert filter_symbols(["600001", "600002"], listing, rules)[0] == ["600001"]
+
+    catalogue = benchmark.make_catalogue(4, 12, members_per_board=6)
+    monkeypatch.setattr(akshare_helper, "stock_spot_listing", lambda: {"600002": {"name": "乙", "volume": 0.0}})
+    monkeypatch.setattr(universe_filter, "session_opened", lambda now=None: False)
+    with akshare_helper.offline(catalogue):
+        data = load_market_data(AnalysisConfig.daily_defaults(date.today()))
+    assert "600002" in data.stock_history and data.universe.requests_saved == 0
+
+
+def test_distributed_runs_report_the_universe_of_every_worker(tmp_path, monkeypatch):
+    catalogue = benchmark.make_catalogue(8, 40, members_per_board=6)
+    first, *_, last = catalogue["industry"].values()  # dealt to different shards
+    st, new = first.members[0], last.members[-1]
+    listing = {st: {"name": "ST 甲", "price": 5.0, "volume": 1e4}, new: {"name": "N 新股", "price": 20.0, "volume": 1e4}}
+    monkeypatch.setattr(akshare_helper, "stock_spot_listing", lambda: listing)
+    monkeypatch.setattr(universe_filter, "session_opened", lambda now=None: True)
+    cfg = replace(AnalysisConfig.daily_defaults(date.today()), board_count=8)
+    with akshare_helper.offline(catalogue):
+        single = run_daily_analysis(cfg)
+        distributed = run_coordinator(TaskQueue(tmp_path / "queue.sqlite"), cfg, shard_size=3, timeout=30)
+
+    assert distributed["distributed"]["shards"] == 3
+    assert distributed["universe"] == single["universe"]
+    assert single["universe"]["excluded"] == {"st": [st], "new_listing": [new]}